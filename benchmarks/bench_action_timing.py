@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Per-action time breakdown of a simulated build, and the cost of timing it.
+
+Builds a program with create_simple_program on the simulated PictoBlox
+backend and prints the self time of every timed action (drags, readiness
+waits, screenshots, typing, ...) from get_status()['action_timings']. Every
+second block has one parameter. It then measures the real overhead of one
+timing span, with and without a program being recorded.
+
+Usage:
+    python benchmarks/bench_action_timing.py [--blocks 20] [--spans 200000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.action_timing import ActionTimer  # noqa: E402
+from automation.backends import DEFAULT_PALETTE, SimulatedBackend  # noqa: E402
+from automation.drag_plan import C_BLOCKS  # noqa: E402
+from automation.pictoblox_controller import PictoBloxController  # noqa: E402
+
+# Plain stack blocks (no hats or C-blocks) to follow the script's hat block
+STACK_OPCODES = [op for op in DEFAULT_PALETTE if not op.startswith("event_") and op not in C_BLOCKS]
+
+
+def make_program(size):
+    program = [{'opcode': 'event_whenflagclicked'}]
+    for i in range(1, size):
+        block = {'opcode': STACK_OPCODES[i % len(STACK_OPCODES)]}
+        if i % 2:
+            block['inputs'] = {'VALUE': i}
+        program.append(block)
+    return program
+
+
+def breakdown(size):
+    backend = SimulatedBackend()
+    controller = PictoBloxController(backend=backend, templates=backend.block_images)
+    controller.connect_to_pictoblox()
+    assert controller.create_simple_program(make_program(size))
+    return controller.get_status()['action_timings']['last_program']
+
+
+def span_overhead(spans, recording):
+    timer = ActionTimer()
+    start = time.perf_counter()
+    if recording:
+        with timer.program("overhead"):
+            for _ in range(spans):
+                with timer.span("drag"):
+                    pass
+    else:
+        for _ in range(spans):
+            with timer.span("drag"):
+                pass
+    return (time.perf_counter() - start) / spans
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--blocks", type=int, default=20)
+    arg_parser.add_argument("--spans", type=int, default=200000)
+    args = arg_parser.parse_args()
+
+    timings = breakdown(args.blocks)
+    print(f"{args.blocks} blocks, {timings['seconds']:.2f}s simulated")
+    print(f"{'action':>24} {'calls':>6} {'self':>8} {'share':>6}")
+    for name, seconds in timings['self_seconds'].items():
+        share = seconds / timings['seconds'] * 100 if timings['seconds'] else 0.0
+        print(f"{name:>24} {timings['actions'][name]['count']:>6} {seconds:>7.2f}s {share:>5.1f}%")
+    print(f"{'unaccounted':>24} {'':>6} {timings['unaccounted_seconds']:>7.2f}s")
+
+    for recording in (False, True):
+        label = "recording" if recording else "idle"
+        print(f"span overhead ({label}): {span_overhead(args.spans, recording) * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main_cli()
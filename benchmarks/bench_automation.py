@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Offline GUI automation throughput on the simulated PictoBlox backend.
+
+Runs the unchanged PictoBloxController.create_simple_program against
+SimulatedBackend for programs of increasing size (every second block has
+one parameter). Reports the simulated build time, which is what a desktop
+run would cost under the backend's UI latency model, together with the
+action and capture counts and the real time the simulation took.
+
+Usage:
+    python benchmarks/bench_automation.py [--sizes 5 10 20] [--capture-ms 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.backends import DEFAULT_PALETTE, SimulatedBackend  # noqa: E402
+from automation.drag_plan import C_BLOCKS  # noqa: E402
+from automation.pictoblox_controller import PictoBloxController  # noqa: E402
+
+
+# Plain stack blocks (no hats or C-blocks) to follow the script's hat block
+STACK_OPCODES = [op for op in DEFAULT_PALETTE if not op.startswith("event_") and op not in C_BLOCKS]
+
+
+def make_program(size):
+    program = [{'opcode': 'event_whenflagclicked'}]
+    for i in range(1, size):
+        block = {'opcode': STACK_OPCODES[i % len(STACK_OPCODES)]}
+        if i % 2:
+            block['inputs'] = {'VALUE': i}
+        program.append(block)
+    return program
+
+
+def build(size, capture_ms):
+    backend = SimulatedBackend(capture_cost=capture_ms / 1000)
+    controller = PictoBloxController(backend=backend, templates=backend.block_images)
+    controller.connect_to_pictoblox()
+    program = make_program(size)
+    start_sim, start_wall = backend.now, time.perf_counter()
+    ok = controller.create_simple_program(program)
+    wall = time.perf_counter() - start_wall
+    assert ok and backend.scripts() == [[b['opcode'] for b in program]], "build failed"
+    kinds = [action[1] for action in backend.actions]
+    return backend.now - start_sim, wall, kinds, controller.get_status()
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 20])
+    arg_parser.add_argument("--capture-ms", type=float, default=8.0)
+    args = arg_parser.parse_args()
+
+    print(f"{'blocks':>6} {'simulated':>10} {'per block':>10} {'drags':>6} {'actions':>8} {'waits':>6} {'wall':>8}")
+    for size in args.sizes:
+        simulated, wall, kinds, status = build(size, args.capture_ms)
+        print(f"{size:>6} {simulated:>9.2f}s {simulated / size:>9.2f}s {kinds.count('drag'):>6} "
+              f"{len(kinds):>8} {status['readiness']['waits']:>6} {wall:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main_cli()
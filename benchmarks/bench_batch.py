@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for generate_scratch_blocks_batch.
+
+Runs batches of 10, 100 and 1,000 prompts through the MCP tool handler and
+compares them with the same prompts sent as individual generate_scratch_blocks
+calls. Use --duplicates to make a fraction of each batch repeat earlier prompts
+(worksheets often do), which the batch tool generates only once.
+
+Usage:
+    python benchmarks/bench_batch.py [--sizes 10 100 1000] [--duplicates 0.3]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import main  # noqa: E402
+
+ACTIONS = ["move right {n} steps", "move left {n} steps", "jump", "play sound",
+           "when space pressed jump", "say hello", "turn right", "hide", "show",
+           "when flag clicked move up {n} steps"]
+
+
+def make_prompts(size, duplicates, seed=1):
+    rng = random.Random(seed)
+    prompts = []
+    for i in range(size):
+        if prompts and rng.random() < duplicates:
+            prompts.append(rng.choice(prompts))
+        else:
+            prompts.append(ACTIONS[i % len(ACTIONS)].format(n=i + 1) + f" #{i}")
+    return prompts
+
+
+async def run_batch(prompts, output_format):
+    start = time.perf_counter()
+    result = await main.generate_scratch_blocks_batch(prompts, output_format)
+    return time.perf_counter() - start, result
+
+
+async def run_individual(prompts, output_format):
+    start = time.perf_counter()
+    await asyncio.gather(*[main.generate_scratch_blocks(p, output_format) for p in prompts])
+    return time.perf_counter() - start
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    arg_parser.add_argument("--duplicates", type=float, default=0.0)
+    arg_parser.add_argument("--format", default="text")
+    args = arg_parser.parse_args()
+
+    print(f"cpu pool: {main.pools.get_stats()['cpu_pool_type']} x {main.pools.cpu_workers}, "
+          f"chunk size {main.BATCH_CHUNK_SIZE}, duplicates {args.duplicates:.0%}")
+    print(f"{'size':>6} {'unique':>7} {'batch s':>9} {'batch /s':>10} {'single s':>9} {'single /s':>10}")
+    for size in args.sizes:
+        prompts = make_prompts(size, args.duplicates)
+        asyncio.run(run_batch(prompts[:5], args.format))  # warm up pools
+        batch_seconds, result = asyncio.run(run_batch(prompts, args.format))
+        single_seconds = asyncio.run(run_individual(prompts, args.format))
+        print(f"{size:>6} {result['unique_prompts']:>7} {batch_seconds:>9.4f} {size / batch_seconds:>10.0f} "
+              f"{single_seconds:>9.4f} {size / single_seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for sharded corpus processing.
+
+Writes a synthetic prompt corpus, then runs programming.corpus.process_corpus
+with 1, 2, 4, ... workers up to the CPU count (or --workers) and reports
+throughput and speed-up over the single-process run.
+
+Usage:
+    python benchmarks/bench_corpus.py [--prompts 20000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from programming.corpus import process_corpus  # noqa: E402
+
+ACTIONS = ["move right {n} steps", "move left {n} steps", "jump", "play sound",
+           "when space pressed jump", "say hello", "turn right", "hide", "show",
+           "when flag clicked move up {n} steps"]
+
+
+def write_corpus(path, size):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(size):
+            f.write(ACTIONS[i % len(ACTIONS)].format(n=i % 50 + 1) + f" #{i}\n")
+
+
+def main_cli():
+    cpus = os.cpu_count() or 1
+    default_workers = [w for w in (1, 2, 4, 8, 16) if w <= max(cpus, 2)]
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--prompts", type=int, default=20000)
+    arg_parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    arg_parser.add_argument("--format", default="text")
+    arg_parser.add_argument("--start-method", default=None)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, "corpus.txt")
+        write_corpus(corpus, args.prompts)
+        print(f"{args.prompts} prompts, {cpus} CPU(s)")
+        print(f"{'workers':>7} {'shards':>6} {'seconds':>8} {'prompts/s':>10} {'speed-up':>8}  sharing")
+        baseline = None
+        for workers in args.workers:
+            manifest = process_corpus(corpus, os.path.join(tmp, f"out-{workers}"), workers=workers,
+                                      output_format=args.format, start_method=args.start_method)
+            seconds = manifest["elapsed_seconds"]
+            baseline = baseline or seconds
+            print(f"{workers:>7} {manifest['shards']:>6} {seconds:>8.3f} "
+                  f"{manifest['throughput_per_second']:>10.0f} {baseline / seconds:>7.2f}x  "
+                  f"{manifest['knowledge_sharing']}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Drag plan vs place-then-connect, on the simulated PictoBlox backend.
+
+"legacy" replays the old create_simple_program loop with the controller's
+primitives: drop each block 10 px below the last one, select it and edit
+each parameter, then drag it again onto the previous block with
+connect_blocks. "plan" is the current create_simple_program: one drag per
+block straight onto its snap point, then the field edits. Every second
+block has one parameter. Both report the GUI actions performed and the
+simulated build time; "plan" also shows its own up-front estimate.
+
+Usage:
+    python benchmarks/bench_drag_plan.py [--sizes 5 10 20]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.backends import DEFAULT_PALETTE, SimulatedBackend  # noqa: E402
+from automation.drag_plan import C_BLOCKS  # noqa: E402
+from automation.pictoblox_controller import PictoBloxController  # noqa: E402
+
+GUI_ACTIONS = {"drag", "click", "double_click", "type", "press"}
+
+
+# Plain stack blocks (no hats or C-blocks) to follow the script's hat block
+STACK_OPCODES = [op for op in DEFAULT_PALETTE if not op.startswith("event_") and op not in C_BLOCKS]
+
+
+def make_program(size):
+    program = [{'opcode': 'event_whenflagclicked'}]
+    for i in range(1, size):
+        block = {'opcode': STACK_OPCODES[i % len(STACK_OPCODES)]}
+        if i % 2:
+            block['inputs'] = {'VALUE': i}
+        program.append(block)
+    return program
+
+
+def legacy(controller, program):
+    placed = []
+    for i, block_data in enumerate(program):
+        palette = controller.find_blocks_in_palette([b['opcode'] for b in program[i:]])
+        block_pos = controller.place_block(block_data['opcode'], palette_location=palette.get(block_data['opcode']))
+        placed.append(block_pos)
+        for name, value in (block_data.get('inputs') or {}).items():
+            controller.set_block_parameter(block_pos, name, value)
+        if i > 0:
+            controller.connect_blocks(placed[i - 1], block_pos)
+
+
+def run(size, use_plan):
+    backend = SimulatedBackend()
+    controller = PictoBloxController(backend=backend, templates=backend.block_images)
+    controller.connect_to_pictoblox()
+    program = make_program(size)
+    start, first_action = backend.now, len(backend.actions)
+    if use_plan:
+        assert controller.create_simple_program(program)
+    else:
+        legacy(controller, program)
+    assert backend.scripts() == [[b['opcode'] for b in program]], "program not built"
+    actions = [a for a in backend.actions[first_action:] if a[1] in GUI_ACTIONS]
+    estimate = controller.last_plan.estimated_seconds() if use_plan else None
+    return len(actions), sum(a[1] == "drag" for a in actions), backend.now - start, estimate
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 20])
+    args = arg_parser.parse_args()
+
+    print(f"{'blocks':>6} {'':>7} {'actions':>8} {'drags':>6} {'simulated':>10} {'estimate':>9}")
+    for size in args.sizes:
+        for label, use_plan in (("legacy", False), ("plan", True)):
+            actions, drags, seconds, estimate = run(size, use_plan)
+            estimate = f"{estimate:8.2f}s" if estimate is not None else f"{'-':>9}"
+            print(f"{size:>6} {label:>7} {actions:>8} {drags:>6} {seconds:>9.2f}s {estimate}")
+
+
+if __name__ == "__main__":
+    main_cli()
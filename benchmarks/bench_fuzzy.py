@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Lookup latency of the typo-tolerant FuzzyIndex as the vocabulary grows.
+
+Builds indexes over 100 to 10,000 synthetic terms (4-10 letters), then looks
+up one- and two-edit typos of random terms plus random misses, and compares
+with a brute-force scan over the vocabulary. Exits non-zero if the worst
+indexed lookup exceeds --budget-ms.
+
+Usage:
+    python benchmarks/bench_fuzzy.py [--sizes 100 1000 10000] [--budget-ms 5]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from programming.fuzzy import FuzzyIndex, edit_distance  # noqa: E402
+
+
+def make_terms(size, rng):
+    terms = set()
+    while len(terms) < size:
+        terms.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))))
+    return sorted(terms)
+
+
+def typo(word, edits, rng):
+    for _ in range(edits):
+        i = rng.randrange(len(word))
+        kind = rng.choice("sdit")
+        if kind == "s":
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+        elif kind == "d" and len(word) > 2:
+            word = word[:i] + word[i + 1:]
+        elif kind == "i":
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+        elif i + 1 < len(word):
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * (len(values) - 1)))]
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000, 10000])
+    arg_parser.add_argument("--queries", type=int, default=2000)
+    arg_parser.add_argument("--budget-ms", type=float, default=5.0)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(11)
+    print(f"{'terms':>6} {'build s':>8} {'entries':>9} {'p50 us':>7} {'p99 us':>7} {'max us':>7} {'scan p50 us':>11}")
+    over_budget = []
+    for size in args.sizes:
+        terms = make_terms(size, rng)
+        start = time.perf_counter()
+        index = FuzzyIndex(terms)
+        build = time.perf_counter() - start
+
+        queries = [typo(rng.choice(terms), rng.choice([1, 2]), rng) for _ in range(args.queries // 2)]
+        queries += ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+                    for _ in range(args.queries // 2)]
+        timings = []
+        for word in queries:
+            start = time.perf_counter()
+            index.lookup(word, 2)
+            timings.append((time.perf_counter() - start) * 1e6)
+        timings.sort()
+
+        scan = []
+        for word in queries[:200]:
+            start = time.perf_counter()
+            sorted((t, d) for t in terms for d in [edit_distance(word, t, 2)] if d <= 2)
+            scan.append((time.perf_counter() - start) * 1e6)
+        scan.sort()
+
+        print(f"{size:>6} {build:>8.2f} {len(index._deletes):>9} {percentile(timings, 0.5):>7.0f} "
+              f"{percentile(timings, 0.99):>7.0f} {timings[-1]:>7.0f} {percentile(scan, 0.5):>11.0f}")
+        if timings[-1] > args.budget_ms * 1000:
+            over_budget.append(f"{size} terms: worst lookup {timings[-1] / 1000:.2f} ms")
+
+    if over_budget:
+        print("Lookup budget exceeded:\n  " + "\n  ".join(over_budget))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
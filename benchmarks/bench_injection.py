@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Project file injection vs block-by-block dragging, on the simulated PictoBlox backend.
+
+"gui" is create_simple_program: one drag per block plus the field edits.
+"file" is inject_program: write the program as a .sb3 project and open it
+with one file-open dialog interaction (shortcut, typed path, Enter).
+Every second block has one parameter. Both report the GUI actions performed
+and the end-to-end simulated time. "write" is the real time spent writing
+the .sb3 archive, which the simulated clock doesn't see.
+
+Usage:
+    python benchmarks/bench_injection.py [--sizes 5 20 50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.backends import DEFAULT_PALETTE, SimulatedBackend  # noqa: E402
+from automation.drag_plan import C_BLOCKS  # noqa: E402
+from automation.pictoblox_controller import PictoBloxController  # noqa: E402
+from automation.project_file import write_project  # noqa: E402
+
+GUI_ACTIONS = {"drag", "click", "double_click", "type", "press", "hotkey"}
+
+# Plain stack blocks (no hats or C-blocks) to follow the script's hat block
+STACK_OPCODES = [op for op in DEFAULT_PALETTE if not op.startswith("event_") and op not in C_BLOCKS]
+
+
+def make_program(size):
+    program = [{'opcode': 'event_whenflagclicked'}]
+    for i in range(1, size):
+        block = {'opcode': STACK_OPCODES[i % len(STACK_OPCODES)]}
+        if i % 2:
+            block['inputs'] = {'VALUE': i}
+        program.append(block)
+    return program
+
+
+def run(size, route, directory):
+    backend = SimulatedBackend()
+    controller = PictoBloxController(backend=backend, templates=backend.block_images)
+    controller.connect_to_pictoblox()
+    program = make_program(size)
+    start, first_action = backend.now, len(backend.actions)
+    if route == "file":
+        controller.inject_program(program, os.path.join(directory, f"program_{size}.sb3"))
+    else:
+        assert controller.create_simple_program(program)
+    assert backend.scripts() == [[b['opcode'] for b in program]], "program not built"
+    actions = sum(a[1] in GUI_ACTIONS for a in backend.actions[first_action:])
+    return actions, backend.now - start
+
+
+def write_seconds(size, directory, repeat=20):
+    program = make_program(size)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        write_project(os.path.join(directory, "timing.sb3"), program)
+    return (time.perf_counter() - start) / repeat
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[5, 20, 50])
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'blocks':>6} {'route':>5} {'actions':>8} {'simulated':>10} {'write':>9}")
+        for size in args.sizes:
+            for route in ("gui", "file"):
+                actions, seconds = run(size, route, directory)
+                write = f"{write_seconds(size, directory) * 1000:7.2f}ms" if route == "file" else f"{'-':>9}"
+                print(f"{size:>6} {route:>5} {actions:>8} {seconds:>9.2f}s {write}")
+
+
+if __name__ == "__main__":
+    main_cli()
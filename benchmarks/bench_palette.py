@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Palette lookup for a 20-block program: per-block search vs one batched pass.
+
+Builds a synthetic palette screenshot with --blocks distinct block images
+and saves the screenshot and templates as .npy files, as on a headless box.
+"per block" mimics the old locateOnScreen flow: for every block it takes a
+fresh capture (reloads the screenshot), decodes its template from disk again
+and runs a single-template match. "batched" captures once and matches all
+templates in one PaletteMatcher pass.
+
+Usage:
+    python benchmarks/bench_palette.py [--blocks 20] [--repeats 5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.palette_matcher import PaletteMatcher, load_image  # noqa: E402
+
+
+def build_fixture(directory, blocks):
+    rng = np.random.default_rng(0)
+    palette = np.full((50 * blocks + 40, 320), 235, dtype=np.uint8)
+    paths = {}
+    for i in range(blocks):
+        block = rng.integers(0, 255, (36, 150), dtype=np.uint8)
+        palette[20 + 50 * i:56 + 50 * i, 20:170] = block
+        paths[f"block_{i}"] = os.path.join(directory, f"block_{i}.npy")
+        np.save(paths[f"block_{i}"], block)
+    screenshot = os.path.join(directory, "palette.npy")
+    np.save(screenshot, palette)
+    return screenshot, paths
+
+
+def per_block(screenshot, paths):
+    found = {}
+    for name, path in paths.items():
+        capture = load_image(screenshot)
+        matcher = PaletteMatcher({name: load_image(path)})
+        found.update(matcher.match(capture))
+    return found
+
+
+def batched(screenshot, matcher):
+    return matcher.match(load_image(screenshot))
+
+
+def best_of(repeats, fn, *args):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--blocks", type=int, default=20)
+    arg_parser.add_argument("--repeats", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        screenshot, paths = build_fixture(tmp, args.blocks)
+        start = time.perf_counter()
+        matcher = PaletteMatcher.from_files(paths)
+        decode = time.perf_counter() - start
+
+        slow, slow_found = best_of(args.repeats, per_block, screenshot, paths)
+        fast, fast_found = best_of(args.repeats, batched, screenshot, matcher)
+
+    assert slow_found == fast_found and len(fast_found) == args.blocks, "matchers disagree"
+    print(f"{args.blocks} blocks, palette {50 * args.blocks + 40}x320")
+    print(f"per block : {slow * 1000:8.1f} ms")
+    print(f"batched   : {fast * 1000:8.1f} ms  (+{decode * 1000:.1f} ms one-off template decode)")
+    print(f"speed-up  : {slow / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main_cli()
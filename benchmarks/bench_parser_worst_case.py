@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Worst-case latency benchmark for NaturalLanguageParser.
+
+Feeds adversarial inputs that made the original greedy trigger regexes
+backtrack quadratically (repeated "when ", long whitespace and digit runs),
+at growing lengths, and fails if any parse exceeds its latency bound. Run
+once with budgets disabled to show linear growth, and once with the default
+budgets to show the per-request cap.
+
+Usage:
+    python benchmarks/bench_parser_worst_case.py [--sizes 1000 10000 100000] [--bound-ms 50]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from programming.parsers import NaturalLanguageParser  # noqa: E402
+
+ADVERSARIAL = {
+    "repeated when": lambda n: ("when " * (n // 5 + 1))[:n],
+    "when ... no suffix": lambda n: "when " + "x" * n,
+    "whitespace run": lambda n: "move" + " " * n + "x",
+    "digit run": lambda n: "move " + "1" * n + "x",
+    "many sentences": lambda n: (" and jump" * (n // 9 + 1))[:n],
+}
+
+
+def worst_ms(parser, text, repeats):
+    worst = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        parser.parse_bounded(text)
+        worst = max(worst, (time.perf_counter() - start) * 1000)
+    return worst
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    arg_parser.add_argument("--repeats", type=int, default=5)
+    arg_parser.add_argument("--bound-ms", type=float, default=50.0,
+                            help="Max latency with default budgets; unbounded runs allow bound x size/1000")
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)  # truncation warnings are expected here
+
+    unbounded = NaturalLanguageParser(max_input_chars=10 ** 9, time_budget_ms=10 ** 9)
+    bounded = NaturalLanguageParser()
+    print(f"default budgets: {bounded.max_input_chars} chars, {bounded.time_budget_ms:g} ms")
+    print(f"{'input':<20} {'chars':>8} {'unbounded ms':>13} {'bounded ms':>11}")
+
+    failures = []
+    for name, make in ADVERSARIAL.items():
+        for size in args.sizes:
+            text = make(size)
+            free = worst_ms(unbounded, text, args.repeats)
+            capped = worst_ms(bounded, text, args.repeats)
+            print(f"{name:<20} {size:>8} {free:>13.2f} {capped:>11.2f}")
+            # Linear: allow a generous constant per 1,000 characters
+            if free > args.bound_ms * max(1.0, size / 1000):
+                failures.append(f"{name} @ {size} unbounded: {free:.1f} ms")
+            if capped > args.bound_ms + bounded.time_budget_ms:
+                failures.append(f"{name} @ {size} bounded: {capped:.1f} ms")
+
+    if failures:
+        print("Latency bound exceeded:\n  " + "\n  ".join(failures))
+        return 1
+    print("All inputs within latency bounds")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
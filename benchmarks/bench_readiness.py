@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Build time of a standard program: fixed sleeps vs readiness polling.
+
+Replays the GUI actions of create_simple_program (activate the window,
+then drag, connect and edit each block) against a replayed UI on a simulated
+clock. Each action starts an animation whose length is taken in turn from
+a settle-time trace. "fixed" pays the old sleeps plus pyautogui.PAUSE = 0.1
+per call. "polling" pays PAUSE = 0.02 and ScreenPoller waits, and every
+capture costs --capture-ms. Drag durations are the same on both sides.
+
+Usage:
+    python benchmarks/bench_readiness.py [--blocks 10] [--capture-ms 8]
+"""
+
+import argparse
+import itertools
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.readiness import ScreenPoller  # noqa: E402
+
+# Seconds from an action until the region starts changing, and how long it animates
+SETTLE_TRACE = {
+    "activate": [(0.05, 0.30), (0.05, 0.42)],
+    "drop": [(0.02, 0.14), (0.02, 0.18), (0.03, 0.22), (0.02, 0.16)],
+    "snap": [(0.02, 0.10), (0.02, 0.12), (0.03, 0.15)],
+    "click": [(0.01, 0.04), (0.01, 0.06)],
+    "edit": [(0.02, 0.05), (0.02, 0.08)],
+}
+
+# Sleeps the controller used per step, and drag durations (unchanged)
+FIXED_SLEEPS = {"activate": 1.0, "drop": 0.5, "snap": 0.3, "click": 0.2, "edit": 0.1}
+DRAG_DURATION = {"drop": 0.5, "snap": 0.3}
+
+
+class ReplayUI:
+    """Screen whose regions animate after each action, following SETTLE_TRACE"""
+
+    def __init__(self, capture_seconds):
+        self.now = 0.0
+        self.capture_seconds = capture_seconds
+        self.captures = 0
+        self.change_at = self.settle_at = 0.0
+        self.traces = {kind: itertools.cycle(samples) for kind, samples in SETTLE_TRACE.items()}
+        self.state = 0
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def clock(self):
+        return self.now
+
+    def act(self, kind):
+        lag, duration = next(self.traces[kind])
+        self.change_at = self.now + lag
+        self.settle_at = self.change_at + duration
+        self.state += 1
+
+    def capture(self, region):
+        self.now += self.capture_seconds
+        self.captures += 1
+        if self.now < self.change_at:
+            return np.full((8, 8), self.state - 1, dtype=np.float32)
+        if self.now < self.settle_at:
+            return np.full((8, 8), 100 + self.captures % 50, dtype=np.float32)
+        return np.full((8, 8), 200 + self.state % 50, dtype=np.float32)
+
+
+def program_steps(blocks):
+    """Actions of create_simple_program: (kind, pyautogui calls) per step"""
+    steps = [("activate", 1)]
+    for i in range(blocks):
+        steps.append(("drop", 1))
+        if i % 2:
+            # click, double-click (edit), typewrite + enter
+            steps += [("click", 1), ("edit", 1), (None, 2)]
+        if i:
+            steps.append(("snap", 1))
+    return steps
+
+
+def fixed(steps):
+    total = 0.0
+    for kind, calls in steps:
+        total += calls * 0.1 + DRAG_DURATION.get(kind, 0.0) + FIXED_SLEEPS.get(kind, 0.0)
+    return total
+
+
+def polling(steps, capture_seconds):
+    ui = ReplayUI(capture_seconds)
+    poller = ScreenPoller(ui.capture, clock=ui.clock, sleep=ui.sleep)
+    region = (0, 0, 140, 70)
+    for kind, calls in steps:
+        # As in the controller: every step but a plain click waits for its change to appear
+        before = poller.frame(region) if kind not in (None, "click") else None
+        ui.sleep(calls * 0.02 + DRAG_DURATION.get(kind, 0.0))
+        if kind is None:
+            continue
+        ui.act(kind)
+        poller.wait_until_stable(region, before=before)
+    return ui.now, poller.stats(), ui.captures
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--blocks", type=int, default=10)
+    arg_parser.add_argument("--capture-ms", type=float, default=8.0)
+    args = arg_parser.parse_args()
+
+    steps = program_steps(args.blocks)
+    before = fixed(steps)
+    after, stats, captures = polling(steps, args.capture_ms / 1000)
+    drags = sum(DRAG_DURATION.get(kind, 0.0) for kind, _ in steps)
+    print(f"{args.blocks} blocks, {len(steps)} steps, {drags:.1f} s of drag motion on both sides")
+    print(f"fixed sleeps : {before:6.2f} s")
+    print(f"polling      : {after:6.2f} s  ({captures} captures, {stats['timeouts']} timeouts)")
+    print(f"speed-up     : {before / after:6.2f}x  (excluding drag motion: "
+          f"{(before - drags) / (after - drags):.1f}x)")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Resuming a failed build vs starting it over, on the simulated PictoBlox backend.
+
+A program of --blocks blocks fails at block --fail-at: that block's opcode
+is missing from the palette until the retry. Every second block has one
+parameter. "restart" runs create_simple_program again, which builds a second
+copy of the program and leaves the first, partly built one on the canvas.
+"resume" calls resume_program, which detects the window again and continues
+from the last checkpoint. Both report the GUI actions of the retry, its
+simulated time and the blocks left in the workspace.
+
+Usage:
+    python benchmarks/bench_resume.py [--blocks 20] [--fail-at 14]
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.backends import SimulatedBackend, block_image  # noqa: E402
+from automation.pictoblox_controller import PictoBloxController  # noqa: E402
+
+GUI_ACTIONS = {"drag", "click", "double_click", "type", "press"}
+
+# Stands in for the block that fails; absent from the palette on the first try
+FLAKY_OPCODE = "looks_show"
+STACK_OPCODES = ["motion_movesteps", "motion_turnright", "motion_turnleft", "motion_changexby",
+                 "motion_changeyby", "looks_sayforsecs", "looks_hide", "sound_play", "control_wait"]
+
+
+def make_program(size, fail_at):
+    program = [{'opcode': 'event_whenflagclicked'}]
+    for i in range(1, size):
+        block = {'opcode': FLAKY_OPCODE if i == fail_at - 1 else STACK_OPCODES[i % len(STACK_OPCODES)]}
+        if i % 2:
+            block['inputs'] = {'VALUE': i}
+        program.append(block)
+    return program
+
+
+def run(size, fail_at, resume):
+    # Tall enough that a restarted copy still lands on screen
+    backend = SimulatedBackend(geometry=(0, 0, 1280, 2000))
+    templates = backend.block_images
+    templates[FLAKY_OPCODE] = block_image(FLAKY_OPCODE)
+    backend.palette.remove(FLAKY_OPCODE)
+    controller = PictoBloxController(backend=backend, templates=templates)
+    controller.connect_to_pictoblox()
+
+    program = make_program(size, fail_at)
+    assert not controller.create_simple_program(program)
+    backend.palette.append(FLAKY_OPCODE)
+
+    start, first_action = backend.now, len(backend.actions)
+    assert controller.resume_program() if resume else controller.create_simple_program(program)
+    actions = sum(a[1] in GUI_ACTIONS for a in backend.actions[first_action:])
+    return actions, backend.now - start, len(backend.blocks)
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--blocks", type=int, default=20)
+    arg_parser.add_argument("--fail-at", type=int, default=14)
+    args = arg_parser.parse_args()
+    logging.getLogger("automation.pictoblox_controller").setLevel(logging.CRITICAL)  # the planned failure
+
+    print(f"{args.blocks} blocks, failing at block {args.fail_at}")
+    print(f"{'retry':>8} {'actions':>8} {'simulated':>10} {'blocks on canvas':>17}")
+    for label, resume in (("restart", False), ("resume", True)):
+        actions, seconds, blocks = run(args.blocks, args.fail_at, resume)
+        print(f"{label:>8} {actions:>8} {seconds:>9.2f}s {blocks:>17}")
+
+
+if __name__ == "__main__":
+    main_cli()
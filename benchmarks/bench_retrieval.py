@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+TF-IDF pattern retrieval as the pattern library grows.
+
+Builds synthetic libraries of 10 to 10,000 patterns (description, keywords
+and explanation drawn from a 2,000-word vocabulary), then measures index
+build time, single-query latency, batched throughput, and a plain-Python
+per-pattern dot-product loop for comparison.
+
+Usage:
+    python benchmarks/bench_retrieval.py [--sizes 10 100 1000 10000] [--queries 1000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from programming.retrieval import PatternIndex  # noqa: E402
+
+
+def make_library(size, vocabulary, rng):
+    def words(n):
+        return " ".join(rng.choice(vocabulary) for _ in range(n))
+    return {"generated": {f"pattern_{i}": {
+        "description": words(6), "keywords": words(4).split(), "explanation": words(15)
+    } for i in range(size)}}
+
+
+def python_loop_search(index, text, k):
+    """Per-pattern scoring without the vectorized postings, for comparison"""
+    columns, weights = index._query(text)
+    query = dict(zip(columns.tolist(), weights.tolist()))
+    rows = [{} for _ in index.documents]
+    for column in query:
+        for position in range(index._term_ptr[column], index._term_ptr[column + 1]):
+            rows[index._term_docs[position]][column] = index._term_weights[position]
+    scores = [sum(w * row.get(c, 0.0) for c, w in query.items()) for row in rows]
+    return sorted(range(len(scores)), key=lambda i: -scores[i])[:k]
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    arg_parser.add_argument("--queries", type=int, default=1000)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(2)
+    vocabulary = ["".join(chr(97 + int(d)) for d in str(i)) + "x" for i in range(2000)]
+    queries = [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(3, 8))) for _ in range(args.queries)]
+
+    print(f"{'patterns':>8} {'build s':>8} {'single us':>10} {'batch q/s':>10} {'loop us':>9}")
+    for size in args.sizes:
+        library = make_library(size, vocabulary, rng)
+        start = time.perf_counter()
+        index = PatternIndex.from_library(library)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query, 3)
+        single = (time.perf_counter() - start) / len(queries) * 1e6
+
+        start = time.perf_counter()
+        index.search_batch(queries, 3)
+        batch = len(queries) / (time.perf_counter() - start)
+
+        sample = queries[:50]
+        start = time.perf_counter()
+        for query in sample:
+            python_loop_search(index, query, 3)
+        loop = (time.perf_counter() - start) / len(sample) * 1e6
+
+        print(f"{size:>8} {build:>8.2f} {single:>10.0f} {batch:>10.0f} {loop:>9.0f}")
+
+
+if __name__ == "__main__":
+    main_cli()
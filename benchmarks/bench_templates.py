@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Template cache and DPI pyramid: memory and per-match latency.
+
+"before" keeps only template file paths, as _load_ui_templates used to, so
+every single-block lookup decodes its template from disk again and matches
+at 100% scale only. "after" decodes all templates once into grayscale
+arrays, calibrates the scale on the first screenshot (keeping only the
+resized copies for that scale) and reuses cached template spectra up to
+--spectrum-cache-mib.
+
+Usage:
+    python benchmarks/bench_templates.py [--blocks 20] [--scale 1.5] [--repeats 5] [--spectrum-cache-mib 16]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.palette_matcher import (  # noqa: E402
+    DPI_SCALES, SPECTRUM_CACHE_BYTES, PaletteMatcher, load_image, resize
+)
+
+
+def build_fixture(directory, blocks, scale):
+    rng = np.random.default_rng(0)
+    palette = np.full((50 * blocks + 40, 320), 235, dtype=np.float32)
+    paths = {}
+    for i in range(blocks):
+        block = np.kron(rng.integers(0, 255, (9, 30)), np.ones((4, 5))).astype(np.float32)
+        palette[20 + 50 * i:56 + 50 * i, 20:170] = block
+        paths[f"block_{i}"] = os.path.join(directory, f"block_{i}.npy")
+        np.save(paths[f"block_{i}"], block)
+    return resize(palette, scale) if scale != 1.0 else palette, paths
+
+
+def before(screenshot, paths):
+    """One lookup per block, decoding its template each time"""
+    found = {}
+    for name, path in paths.items():
+        found.update(PaletteMatcher({name: load_image(path)}).match(screenshot, [name]))
+    return found
+
+
+def after(screenshot, matcher):
+    found = {}
+    for name in matcher.names:
+        found.update(matcher.match(screenshot, [name]))
+    return found
+
+
+def best_of(repeats, fn, *args):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--blocks", type=int, default=20)
+    arg_parser.add_argument("--scale", type=float, default=1.5)
+    arg_parser.add_argument("--repeats", type=int, default=5)
+    arg_parser.add_argument("--spectrum-cache-mib", type=float, default=SPECTRUM_CACHE_BYTES / 2 ** 20)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        screenshot, paths = build_fixture(tmp, args.blocks, args.scale)
+        path_bytes = sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in paths.items())
+
+        start = time.perf_counter()
+        matcher = PaletteMatcher.from_files(paths, scales=DPI_SCALES,
+                                            spectrum_cache_bytes=int(args.spectrum_cache_mib * 2 ** 20))
+        load = time.perf_counter() - start
+        start = time.perf_counter()
+        matcher.calibrate(screenshot)
+        calibrate = time.perf_counter() - start
+        after(screenshot, matcher)  # warm the spectrum cache
+
+        slow, slow_found = best_of(args.repeats, before, screenshot, paths)
+        fast, fast_found = best_of(args.repeats, after, screenshot, matcher)
+        spectra_bytes = matcher.spectra_nbytes
+        template_bytes = matcher.nbytes - spectra_bytes
+
+    print(f"{args.blocks} templates, display scale {args.scale:g}, palette {screenshot.shape[1]}x{screenshot.shape[0]}")
+    print(f"before : {path_bytes / 1024:8.1f} KiB  {slow * 1000 / args.blocks:7.1f} ms/match  "
+          f"found {len(slow_found)}/{args.blocks}")
+    print(f"after  : {template_bytes / 1024:8.1f} KiB templates + "
+          f"{spectra_bytes / 2 ** 20:.1f} MiB spectra  "
+          f"{fast * 1000 / args.blocks:7.1f} ms/match  found {len(fast_found)}/{args.blocks}")
+    print(f"one-off: {load * 1000:.1f} ms decode + pyramid, {calibrate * 1000:.1f} ms calibration "
+          f"(scale {matcher.scale:g})")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -35,10 +35,12 @@ setup(
     entry_points={
         "console_scripts": [
             "scratchattach-mcp=main:main",
+            "scratchattach-mcp-replay=utils.replay:main",
+            "scratchattach-mcp-corpus=programming.corpus:main",
         ],
     },
     include_package_data=True,
     package_data={
         "knowledge": ["*.json"],
     },
-)
\ No newline at end of file
+)
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+Action Timing - Where a GUI build spends its time
+
+PictoBloxController's primitives (find_block_in_palette, place_block,
+connect_blocks, set_block_parameter, ...) and the steps inside them each run
+in a span: template matching, screenshots, drags, readiness waits, clicks
+and typing. Spans nest. Each span's self time is its duration minus that of
+the spans it contains, so self times never count the same second twice.
+Per program they add up to the program's total, apart from the
+unaccounted time between spans.
+
+Spans run on the controller's backend clock. A SimulatedBackend clock only
+advances for simulated UI time, so CPU work such as matching reads as zero
+there.
+
+Spans are only recorded inside program(). Each finished program is kept as
+`last`. If SCRATCH_AUTOMATION_TRACE_FILE names a file, the program is also
+appended to it as one JSONL line: its breakdown plus every span with its
+start offset and nesting depth. The file is never rotated, so tracing is
+off unless asked for.
+"""
+
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class ActionStats:
+    """Calls of one action within a program"""
+    count: int = 0
+    seconds: float = 0.0
+    self_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'seconds': round(self.seconds, 4),
+            'self_seconds': round(self.self_seconds, 4),
+            'mean_ms': round(self.seconds / self.count * 1000, 2) if self.count else 0.0,
+            'max_ms': round(self.max_seconds * 1000, 2)
+        }
+
+
+class ProgramTimings:
+    """Spans recorded while one program was built"""
+
+    def __init__(self, label: str, start: float, info: Dict[str, Any]):
+        self.label = label
+        self.info = info
+        self.start = start
+        self.started_at = time.time()
+        self.seconds = 0.0
+        self.actions: Dict[str, ActionStats] = {}
+        self.events: List[Dict[str, Any]] = []
+        self._covered = 0.0
+
+    def add(self, name: str, start: float, duration: float, own: float, depth: int):
+        stats = self.actions.setdefault(name, ActionStats())
+        stats.count += 1
+        stats.seconds += duration
+        stats.self_seconds += own
+        stats.max_seconds = max(stats.max_seconds, duration)
+        if depth == 0:
+            self._covered += duration
+        self.events.append({
+            'name': name,
+            'start': round(start - self.start, 4),
+            'seconds': round(duration, 4),
+            'depth': depth
+        })
+
+    def breakdown(self) -> Dict[str, Any]:
+        """Totals per action plus self time per action, largest first"""
+        ranked = sorted(self.actions.items(), key=lambda item: -item[1].self_seconds)
+        return dict(
+            self.info,
+            program=self.label,
+            started_at=round(self.started_at, 3),
+            seconds=round(self.seconds, 4),
+            self_seconds={name: round(stats.self_seconds, 4) for name, stats in ranked},
+            unaccounted_seconds=round(max(self.seconds - self._covered, 0.0), 4),
+            actions={name: stats.to_dict() for name, stats in sorted(self.actions.items())}
+        )
+
+
+class ActionTimer:
+    """
+    Nested timing spans on a (possibly simulated) clock.
+
+    Args:
+        clock: Time source; the controller passes its backend's clock
+        trace_file: JSONL file each finished program is appended to (None: keep in memory only)
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter, trace_file: Optional[Path] = None):
+        self.clock = clock
+        self.trace_file = trace_file
+        self.last: Optional[ProgramTimings] = None
+        self.programs = 0
+        self.write_errors = 0
+        self._program: Optional[ProgramTimings] = None
+        self._open: List[List[Any]] = []  # [name, start, seconds spent in child spans]
+
+    @classmethod
+    def from_env(cls, clock: Callable[[], float] = time.perf_counter) -> "ActionTimer":
+        """Trace file from SCRATCH_AUTOMATION_TRACE_FILE; unset or empty keeps timings in memory only"""
+        path = os.environ.get("SCRATCH_AUTOMATION_TRACE_FILE")
+        return cls(clock, Path(path) if path else None)
+
+    @contextmanager
+    def program(self, label: str, **info) -> Iterator[Optional[ProgramTimings]]:
+        """Record spans for one program build; nested calls join the outer program"""
+        if self._program is not None:
+            yield self._program
+            return
+        program = self._program = ProgramTimings(label, self.clock(), info)
+        try:
+            yield program
+        finally:
+            program.seconds = self.clock() - program.start
+            self._program = None
+            self._open = []
+            self.last = program
+            self.programs += 1
+            self._write(program)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time a block of code as one call of `name` (a re-entrant call counts once)"""
+        if self._program is None or (self._open and self._open[-1][0] == name):
+            yield
+            return
+        entry = [name, self.clock(), 0.0]
+        self._open.append(entry)
+        try:
+            yield
+        finally:
+            self._open.pop()
+            duration = self.clock() - entry[1]
+            self._program.add(name, entry[1], duration, duration - entry[2], len(self._open))
+            if self._open:
+                self._open[-1][2] += duration
+
+    def wrap(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """fn with every call timed as `name`"""
+        @functools.wraps(fn)
+        def timed_call(*args, **kwargs):
+            with self.span(name):
+                return fn(*args, **kwargs)
+        return timed_call
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'programs': self.programs,
+            'trace_file': str(self.trace_file) if self.trace_file else None,
+            'write_errors': self.write_errors,
+            'last_program': self.last.breakdown() if self.last else None
+        }
+
+    def _write(self, program: ProgramTimings):
+        if self.trace_file is None:
+            return
+        record = dict(program.breakdown(), events=program.events)
+        try:
+            self.trace_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.trace_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+        except OSError:
+            self.write_errors += 1
+
+
+def timed(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Method decorator: time each call in the instance's `timer`"""
+    def decorate(method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def timed_method(self, *args, **kwargs):
+            with self.timer.span(name):
+                return method(self, *args, **kwargs)
+        return timed_method
+    return decorate
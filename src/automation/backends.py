@@ -0,0 +1,595 @@
+"""
+Automation Backends - Input and screen primitives behind PictoBloxController
+
+PictoBloxController only talks to the desktop through an AutomationBackend:
+screenshots, mouse and keyboard input, window lookup, process launch and
+time. PyAutoGUIBackend drives the real desktop. SimulatedBackend keeps a
+model of the PictoBlox window instead. It has a palette of block images and
+a workspace of placed blocks that snap into stacks and C-block mouths, and
+a file-open dialog that loads .sb3/.pbl projects. It records every action, renders
+synthetic screenshots for template matching and readiness polling, and
+applies configurable UI latency on a simulated clock. The same controller
+code can therefore run, be tested and be benchmarked on a headless machine.
+"""
+
+import subprocess
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .drag_plan import C_BLOCKS, C_BOTTOM_ARM, C_EMPTY_MOUTH, C_MOUTH_INDENT, CAP_BLOCKS
+from .project_file import read_project
+
+Point = Tuple[int, int]
+Region = Tuple[int, int, int, int]
+
+
+class AutomationBackend(ABC):
+    """Desktop primitives used by PictoBloxController"""
+
+    @abstractmethod
+    def screenshot(self, region: Region) -> np.ndarray:
+        """Grayscale capture of a (left, top, width, height) screen region"""
+
+    @abstractmethod
+    def drag(self, start: Point, end: Point, duration: float):
+        """Press at start, move to end over `duration` seconds, release"""
+
+    @abstractmethod
+    def click(self, x: int, y: int):
+        pass
+
+    @abstractmethod
+    def double_click(self, x: int, y: int):
+        pass
+
+    @abstractmethod
+    def type_text(self, text: str):
+        pass
+
+    @abstractmethod
+    def press(self, key: str):
+        pass
+
+    @abstractmethod
+    def hotkey(self, *keys: str):
+        """Press keys together, e.g. hotkey('ctrl', 'o')"""
+
+    @abstractmethod
+    def scroll(self, clicks: int, x: int, y: int):
+        pass
+
+    @abstractmethod
+    def find_windows(self, title: str) -> List[Any]:
+        """Windows whose title contains `title` (case-insensitive); each has
+        left, top, width, height, title and activate()"""
+
+    @abstractmethod
+    def launch(self, path: str):
+        """Start the PictoBlox executable"""
+
+    def clock(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+class PyAutoGUIBackend(AutomationBackend):
+    """The real desktop, through pyautogui and pygetwindow"""
+
+    def __init__(self, pause: float = 0.02):
+        import pyautogui
+        import pygetwindow
+
+        self._gui = pyautogui
+        self._windows = pygetwindow
+        # Fail-safe: moving the mouse to a screen corner aborts. Settling is
+        # handled by readiness polling, so the pause only keeps input orderly
+        pyautogui.FAILSAFE = True
+        pyautogui.PAUSE = pause
+
+    def screenshot(self, region: Region) -> np.ndarray:
+        return np.asarray(self._gui.screenshot(region=region).convert("L"))
+
+    def drag(self, start: Point, end: Point, duration: float):
+        self._gui.moveTo(start[0], start[1])
+        self._gui.dragTo(end[0], end[1], duration=duration, button='left')
+
+    def click(self, x: int, y: int):
+        self._gui.click(x, y)
+
+    def double_click(self, x: int, y: int):
+        self._gui.doubleClick(x, y)
+
+    def type_text(self, text: str):
+        self._gui.typewrite(text)
+
+    def press(self, key: str):
+        self._gui.press(key)
+
+    def hotkey(self, *keys: str):
+        self._gui.hotkey(*keys)
+
+    def scroll(self, clicks: int, x: int, y: int):
+        self._gui.scroll(clicks, x, y)
+
+    def find_windows(self, title: str) -> List[Any]:
+        return [w for w in self._windows.getAllWindows() if title.lower() in w.title.lower()]
+
+    def launch(self, path: str):
+        subprocess.Popen([path])
+
+
+# Default UI latency of the simulated PictoBlox, in seconds: (delay before the
+# screen starts changing, duration of the change)
+DEFAULT_LATENCY = {
+    "launch": (2.0, 0.5),
+    "activate": (0.05, 0.3),
+    "drop": (0.02, 0.15),
+    "move": (0.02, 0.12),
+    "click": (0.01, 0.05),
+    "edit": (0.02, 0.05),
+    "type": (0.0, 0.0),
+    "scroll": (0.02, 0.15),
+    "dialog": (0.15, 0.1),
+    "load": (0.4, 0.6),
+}
+
+# Keyboard shortcut for File > Open, and the title of the dialog it opens
+OPEN_SHORTCUT = ("ctrl", "o")
+FILE_DIALOG_TITLE = "Open"
+
+# Blocks offered by the simulated palette when none are given
+DEFAULT_PALETTE = (
+    "event_whenflagclicked", "event_whenkeypressed", "event_whenthisspriteclicked",
+    "motion_movesteps", "motion_turnright", "motion_turnleft", "motion_changexby", "motion_changeyby",
+    "looks_sayforsecs", "looks_show", "looks_hide", "sound_play", "control_wait", "control_repeat",
+    "control_forever"
+)
+
+BLOCK_SIZE = (120, 32)   # width, height of simulated blocks
+SNAP_RADIUS = 48         # pixels within which a dropped block joins a stack (as in scratch-blocks)
+
+
+def block_image(opcode: str, size: Tuple[int, int] = BLOCK_SIZE) -> np.ndarray:
+    """Deterministic synthetic picture of a block (coarse pattern, like real block art)"""
+    width, height = size
+    seed = sum((i + 1) * ord(c) for i, c in enumerate(opcode))
+    cells = np.random.default_rng(seed).integers(30, 220, (height // 8, width // 10))
+    return np.kron(cells, np.ones((8, 10))).astype(np.uint8)
+
+
+@dataclass
+class SimulatedWindow:
+    """pygetwindow-like window of the simulated PictoBlox"""
+    backend: "SimulatedBackend" = field(repr=False)
+    title: str = "PictoBlox"
+    left: int = 0
+    top: int = 0
+    width: int = 1280
+    height: int = 900
+
+    def activate(self):
+        self.backend._record("activate")
+        self.backend._animate("activate", (self.left, self.top, self.width, self.height))
+
+    def moveTo(self, left: int, top: int):
+        """Move the window; workspace blocks move with it"""
+        dx, dy = left - self.left, top - self.top
+        self.left, self.top = left, top
+        if self is self.backend.window:
+            for block in self.backend.blocks.values():
+                block.x += dx
+                block.y += dy
+
+
+@dataclass
+class WorkspaceBlock:
+    """A block placed in the simulated workspace"""
+    id: int
+    opcode: str
+    x: int
+    y: int
+    parent: Optional[int] = None
+    slot: Optional[str] = None  # "next" or "substack" of the parent
+    values: List[str] = field(default_factory=list)
+
+    def contains(self, point: Point) -> bool:
+        return self.x <= point[0] < self.x + BLOCK_SIZE[0] and self.y <= point[1] < self.y + BLOCK_SIZE[1]
+
+
+class SimulatedBackend(AutomationBackend):
+    """
+    Virtual PictoBlox screen with a simulated clock.
+
+    Args:
+        palette: Opcodes shown in the palette, top to bottom
+        latency: Overrides for DEFAULT_LATENCY per action kind
+        capture_cost: Simulated seconds per screenshot
+        running: Whether PictoBlox is already open (else launch() opens it)
+        geometry: Window (left, top, width, height)
+    """
+
+    def __init__(self, palette: Sequence[str] = DEFAULT_PALETTE, latency: Optional[Dict[str, Tuple[float, float]]] = None,
+                 capture_cost: float = 0.008, running: bool = True, geometry: Region = (0, 0, 1280, 900)):
+        self.palette = list(palette)
+        self.latency = {**DEFAULT_LATENCY, **(latency or {})}
+        self.capture_cost = capture_cost
+        self.now = 0.0
+        self.actions: List[Tuple[Any, ...]] = []
+        self.blocks: Dict[int, WorkspaceBlock] = {}
+        self.palette_scroll = 0
+        self.window = SimulatedWindow(self, "PictoBlox", *geometry)
+        self._window_at = 0.0 if running else None
+        self.dialog: Optional[SimulatedWindow] = None
+        self.loaded_projects: List[str] = []
+        self.load_errors: List[str] = []
+        self._dialog_at = 0.0
+        self._dialog_path = ""
+        self._next_id = 1
+        self._editing: Optional[Tuple[int, str]] = None
+        self._frozen: Optional[np.ndarray] = None
+        self._frozen_frame: Optional[np.ndarray] = None
+        self._change_at = self._settle_at = 0.0
+        self._animated: Region = (0, 0, 0, 0)
+        self._captures = 0
+
+    # --- layout (mirrors PictoBloxController._detect_ui_areas) ---
+
+    @property
+    def palette_bounds(self) -> Region:
+        w = self.window
+        return (w.left, w.top + 100, int(w.width * 0.25), w.height - 200)
+
+    @property
+    def workspace_bounds(self) -> Region:
+        w = self.window
+        palette_width = int(w.width * 0.25)
+        return (w.left + palette_width, w.top + 100, w.width - palette_width - 200, w.height - 200)
+
+    @property
+    def block_images(self) -> Dict[str, np.ndarray]:
+        """Palette templates, as they would be saved in ui_templates"""
+        return {opcode: block_image(opcode) for opcode in self.palette}
+
+    def palette_location(self, opcode: str) -> Point:
+        """Top-left screen position of a palette block at the current scroll offset"""
+        left, top, _, _ = self.palette_bounds
+        return (left + 20, top + 20 + 40 * self.palette.index(opcode) + 30 * self.palette_scroll)
+
+    # --- screen ---
+
+    def render(self) -> np.ndarray:
+        """Full-screen frame of the current state"""
+        w = self.window
+        screen = np.full((w.top + w.height, w.left + w.width), 245, dtype=np.uint8)
+        if self._window_at is None or self.now < self._window_at:
+            return screen
+        left, top, width, height = self.palette_bounds
+        screen[top:top + height, left:left + width] = 230
+        for opcode in self.palette:
+            x, y = self.palette_location(opcode)
+            if top <= y and y + BLOCK_SIZE[1] <= top + height:
+                _blit(screen, block_image(opcode), x, y)
+        for block in self.blocks.values():
+            _blit(screen, block_image(block.opcode), block.x, block.y)
+        return screen
+
+    def screenshot(self, region: Region) -> np.ndarray:
+        self.now += self.capture_cost
+        self._captures += 1
+        if self.now < self._change_at and self._frozen is not None:
+            frame = self._frozen
+        else:
+            frame = self.render()
+            if self.now < self._settle_at:
+                # Mid-animation: the affected area differs on every capture
+                ax, ay, aw, ah = self._animated
+                frame[ay:ay + ah, ax:ax + aw] = (frame[ay:ay + ah, ax:ax + aw].astype(np.int32)
+                                                 + 40 + 30 * (self._captures % 4)) % 256
+        left, top, width, height = region
+        out = np.full((height, width), 245, dtype=np.uint8)
+        crop = frame[top:top + height, left:left + width]
+        out[:crop.shape[0], :crop.shape[1]] = crop
+        return out
+
+    def _animate(self, kind: str, area: Region):
+        """Freeze the current frame until the action's change shows, then animate `area`"""
+        lag, duration = self.latency[kind]
+        self._frozen = self._frozen_frame
+        self._change_at = self.now + lag
+        self._settle_at = self._change_at + duration
+        self._animated = area
+
+    def _record(self, *action):
+        # Capture the pre-action frame before any state changes
+        self._frozen_frame = self.render()
+        self.actions.append((round(self.now, 4),) + action)
+
+    # --- input ---
+
+    def drag(self, start: Point, end: Point, duration: float):
+        self._record("drag", start, end, duration)
+        self.now += duration
+        dx, dy = end[0] - start[0], end[1] - start[1]
+
+        source = self._palette_block_at(start)
+        if source is not None:
+            px, py = self.palette_location(source)
+            block = WorkspaceBlock(self._next_id, source, px + dx, py + dy)
+            self._next_id += 1
+            self.blocks[block.id] = block
+            kind = "drop"
+        else:
+            block = self._workspace_block_at(start)
+            if block is None:
+                return
+            # Dragging a block takes everything attached below it along
+            old_root = self._root(block)
+            block.parent = block.slot = None
+            if old_root is not block:
+                self._relayout(old_root)
+            for moved in self._descendants(block):
+                moved.x += dx
+                moved.y += dy
+            kind = "move"
+
+        if self._in_palette(end):
+            # Dropping onto the palette deletes the blocks
+            for removed in self._descendants(block):
+                del self.blocks[removed.id]
+        else:
+            self._snap(block)
+        self._animate(kind, (block.x - 10, block.y - 10, BLOCK_SIZE[0] + 20, BLOCK_SIZE[1] + 20))
+
+    def click(self, x: int, y: int):
+        self._record("click", (x, y))
+        self._editing = None
+        self._animate("click", (x - 30, y - 20, 60, 40))
+
+    def double_click(self, x: int, y: int):
+        self._record("double_click", (x, y))
+        block = self._workspace_block_at((x, y))
+        self._editing = (block.id, "") if block else None
+        self._animate("edit", (x - 30, y - 20, 60, 40))
+
+    def type_text(self, text: str):
+        self._record("type", text)
+        if self._dialog_open():
+            self._dialog_path += text
+        elif self._editing:
+            self._editing = (self._editing[0], self._editing[1] + text)
+
+    def press(self, key: str):
+        self._record("press", key)
+        if self._dialog_open():
+            if key == "enter":
+                self._load_project(self._dialog_path)
+            if key in ("enter", "escape"):
+                self.dialog = None
+        elif key == "enter" and self._editing:
+            block_id, text = self._editing
+            if block_id in self.blocks:
+                self.blocks[block_id].values.append(text)
+            self._editing = None
+
+    def hotkey(self, *keys: str):
+        self._record("hotkey", keys)
+        if tuple(keys) == OPEN_SHORTCUT and self.dialog is None and self.find_windows(self.window.title):
+            w = self.window
+            self.dialog = SimulatedWindow(self, FILE_DIALOG_TITLE, w.left + w.width // 4, w.top + w.height // 4,
+                                          w.width // 2, w.height // 2)
+            self._dialog_at = self.now + sum(self.latency["dialog"])
+            self._dialog_path = ""
+
+    def scroll(self, clicks: int, x: int, y: int):
+        self._record("scroll", clicks, (x, y))
+        self.palette_scroll += clicks
+        self._animate("scroll", self.palette_bounds)
+
+    # --- windows and time ---
+
+    def find_windows(self, title: str) -> List[Any]:
+        windows = []
+        if self._window_at is not None and self.now >= self._window_at:
+            windows.append(self.window)
+        if self._dialog_open():
+            windows.append(self.dialog)
+        return [w for w in windows if title.lower() in w.title.lower()]
+
+    def _dialog_open(self) -> bool:
+        return self.dialog is not None and self.now >= self._dialog_at
+
+    def launch(self, path: str):
+        self.actions.append((round(self.now, 4), "launch", path))
+        if self._window_at is None:
+            self._window_at = self.now + sum(self.latency["launch"])
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+    # --- project files ---
+
+    def _load_project(self, path: str):
+        """Replace the workspace with the sprite scripts of a .sb3/.pbl file"""
+        try:
+            project = read_project(path)
+            sprite = next(t for t in project["targets"] if not t.get("isStage"))
+        except (OSError, KeyError, ValueError, StopIteration, zipfile.BadZipFile) as e:
+            # PictoBlox shows an error and leaves the open project alone
+            self.load_errors.append(f"{path}: {e}")
+            return
+
+        entries = sprite.get("blocks", {})
+        ids = {}
+        self.blocks = {}
+        left, top, _, _ = self.workspace_bounds
+        for key, entry in entries.items():
+            if entry.get("shadow"):
+                continue
+            block = WorkspaceBlock(self._next_id, entry["opcode"], left + int(entry.get("x", 0)),
+                                   top + int(entry.get("y", 0)))
+            self._next_id += 1
+            for name, value in entry.get("inputs", {}).items():
+                if name != "SUBSTACK":
+                    block.values.append(_input_value(value[1], entries))
+            ids[key] = block
+            self.blocks[block.id] = block
+        for key, block in ids.items():
+            parent_key = entries[key].get("parent")
+            if parent_key in ids:
+                block.parent = ids[parent_key].id
+                block.slot = "next" if entries[parent_key].get("next") == key else "substack"
+        for block in list(self.blocks.values()):
+            if block.parent is None:
+                self._relayout(block)
+
+        self.loaded_projects.append(path)
+        self._animate("load", self.workspace_bounds)
+
+    # --- workspace model ---
+
+    def scripts(self) -> List[List[Any]]:
+        """
+        Each script in the workspace, top to bottom, scripts ordered by position.
+
+        A C-block appears as (opcode, [its substack]).
+        """
+        tops = sorted((b for b in self.blocks.values() if b.parent is None), key=lambda b: (b.y, b.x))
+        return [self._script(top) for top in tops]
+
+    def _script(self, block: Optional[WorkspaceBlock]) -> List[Any]:
+        items = []
+        while block is not None:
+            if block.opcode in C_BLOCKS:
+                items.append((block.opcode, self._script(self._child(block, "substack"))))
+            else:
+                items.append(block.opcode)
+            block = self._child(block, "next")
+        return items
+
+    def _child(self, block: WorkspaceBlock, slot: str) -> Optional[WorkspaceBlock]:
+        return next((b for b in self.blocks.values() if b.parent == block.id and b.slot == slot), None)
+
+    def _root(self, block: WorkspaceBlock) -> WorkspaceBlock:
+        while block.parent is not None:
+            block = self.blocks[block.parent]
+        return block
+
+    def _descendants(self, block: WorkspaceBlock) -> List[WorkspaceBlock]:
+        found = [block]
+        for item in found:
+            found.extend(b for b in self.blocks.values() if b.parent == item.id)
+        return found
+
+    def height(self, block: WorkspaceBlock) -> int:
+        """Height on screen; a C-block grows with its substack"""
+        if block.opcode not in C_BLOCKS:
+            return BLOCK_SIZE[1]
+        mouth, inner = 0, self._child(block, "substack")
+        while inner is not None:
+            mouth += self.height(inner)
+            inner = self._child(inner, "next")
+        return BLOCK_SIZE[1] + max(mouth, C_EMPTY_MOUTH) + C_BOTTOM_ARM
+
+    def _relayout(self, block: WorkspaceBlock):
+        """Move attached blocks to their connection points below `block`"""
+        inner = self._child(block, "substack")
+        if inner is not None:
+            inner.x, inner.y = block.x + C_MOUTH_INDENT, block.y + BLOCK_SIZE[1]
+            self._relayout(inner)
+        after = self._child(block, "next")
+        if after is not None:
+            after.x, after.y = block.x, block.y + self.height(block)
+            self._relayout(after)
+
+    def _connections(self, exclude: set) -> List[Tuple[WorkspaceBlock, str, Point]]:
+        """Free connection points: below stackable blocks and inside empty C-block mouths"""
+        points = []
+        for block in self.blocks.values():
+            if block.id in exclude:
+                continue
+            if block.opcode not in CAP_BLOCKS and self._child(block, "next") is None:
+                points.append((block, "next", (block.x, block.y + self.height(block))))
+            if block.opcode in C_BLOCKS and self._child(block, "substack") is None:
+                points.append((block, "substack", (block.x + C_MOUTH_INDENT, block.y + BLOCK_SIZE[1])))
+        return points
+
+    def _snap(self, block: WorkspaceBlock):
+        """Attach a dropped block to the nearest free connection within SNAP_RADIUS"""
+        own = {b.id for b in self._descendants(block)}
+        best, best_distance = None, SNAP_RADIUS + 1
+        for target, slot, (x, y) in self._connections(own):
+            distance = max(abs(block.x - x), abs(block.y - y))
+            if distance < best_distance:
+                best, best_distance = (target, slot), distance
+        if best is None:
+            return
+        block.parent, block.slot = best[0].id, best[1]
+        self._relayout(self._root(block))
+
+    def _palette_block_at(self, point: Point) -> Optional[str]:
+        if not self._in_palette(point):
+            return None
+        for opcode in self.palette:
+            x, y = self.palette_location(opcode)
+            if x <= point[0] < x + BLOCK_SIZE[0] and y <= point[1] < y + BLOCK_SIZE[1]:
+                return opcode
+        return None
+
+    def _workspace_block_at(self, point: Point) -> Optional[WorkspaceBlock]:
+        # Later blocks are drawn on top
+        for block in reversed(list(self.blocks.values())):
+            if block.contains(point):
+                return block
+        return None
+
+    def _in_palette(self, point: Point) -> bool:
+        left, top, width, height = self.palette_bounds
+        return left <= point[0] < left + width and top <= point[1] < top + height
+
+
+def simulated_controller(backend: Optional[SimulatedBackend] = None, palette_without: Sequence[str] = (),
+                         connect: bool = True, **backend_options):
+    """
+    PictoBloxController on a SimulatedBackend, for tests and benchmarks.
+
+    Its templates cover the palette plus palette_without, which is then taken
+    out of the palette: blocks the controller knows but cannot find.
+    backend_options go to a new SimulatedBackend when none is given.
+    Returns (controller, backend).
+    """
+    from .pictoblox_controller import PictoBloxController  # imports this module
+
+    backend = backend or SimulatedBackend(**backend_options)
+    templates = backend.block_images
+    templates.update({opcode: block_image(opcode) for opcode in palette_without})
+    backend.palette = [opcode for opcode in backend.palette if opcode not in palette_without]
+    controller = PictoBloxController(backend=backend, templates=templates)
+    if connect:
+        controller.connect_to_pictoblox()
+    return controller, backend
+
+def _input_value(value: Any, entries: Dict[str, Any]) -> str:
+    """Text shown in an input: a typed primitive [type, value] or a menu shadow's field"""
+    if isinstance(value, list):
+        return str(value[1])
+    fields = entries.get(value, {}).get("fields", {})
+    return str(next(iter(fields.values()))[0]) if fields else ""
+
+
+def _blit(screen: np.ndarray, image: np.ndarray, x: int, y: int):
+    """Draw image at (x, y), clipped to the screen"""
+    height, width = image.shape
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + width, screen.shape[1]), min(y + height, screen.shape[0])
+    if x0 < x1 and y0 < y1:
+        screen[y0:y1, x0:x1] = image[y0 - y:y1 - y, x0 - x:x1 - x]
@@ -0,0 +1,99 @@
+"""
+Checkpoint - Resume a GUI build where it stopped
+
+A build that fails on block 14 of 20 leaves 13 blocks in the workspace, and
+starting over would add them a second time. execute_plan therefore records
+a checkpoint after every action that completed. Each step records the IR
+node id (PlannedBlock.node_id), the opcode and the block's screen geometry,
+plus the field and value for parameter edits. A failed or cancelled build
+resumes from the first action not recorded. The window is detected again
+first, and if the workspace has moved, the rest of the plan moves with it.
+
+An action that fails half-way (the drop landed but its wait raised) isn't
+recorded and runs again on resume.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .drag_plan import DragPlan
+
+
+@dataclass
+class BuildStep:
+    """One completed plan action"""
+    index: int  # position in DragPlan.actions
+    kind: str  # "place" or "edit"
+    node_id: str
+    opcode: str
+    geometry: Tuple[int, int, int, int]  # x, y, width, height on screen
+    name: Optional[str] = None
+    value: Any = None
+    at: float = 0.0  # backend clock
+
+    def to_dict(self) -> Dict[str, Any]:
+        step = {'index': self.index, 'kind': self.kind, 'node_id': self.node_id, 'opcode': self.opcode,
+                'geometry': list(self.geometry)}
+        if self.kind == "edit":
+            step.update(name=self.name, value=self.value)
+        return step
+
+
+@dataclass
+class BuildCheckpoint:
+    """
+    Progress of one plan through its actions.
+
+    Args:
+        plan: The compiled plan, in current screen coordinates
+        origin: Workspace top-left the plan's coordinates are relative to
+    """
+    plan: DragPlan
+    origin: Tuple[int, int]
+    steps: List[BuildStep] = field(default_factory=list)
+    status: str = "running"  # running, done, failed or cancelled
+    error: Optional[str] = None
+    resumes: int = 0
+
+    @property
+    def completed(self) -> int:
+        """Actions done; the build continues at plan.actions[completed]"""
+        return len(self.steps)
+
+    @property
+    def resumable(self) -> bool:
+        return self.status in ("failed", "cancelled")
+
+    def record(self, index: int, at: float = 0.0):
+        """Mark plan.actions[index] as done"""
+        if index != self.completed:
+            raise ValueError(f"Action {index} completed out of order (expected {self.completed})")
+        action = self.plan.actions[index]
+        block = self.plan.blocks[action.block]
+        self.steps.append(BuildStep(index, action.kind, block.node_id, block.opcode,
+                                    (block.x, block.y, block.width, block.height), action.name, action.value, at))
+
+    def rebase(self, origin: Tuple[int, int]):
+        """Move the plan and recorded geometry to a workspace now at `origin`"""
+        dx, dy = origin[0] - self.origin[0], origin[1] - self.origin[1]
+        if not (dx or dy):
+            return
+        self.plan.shift(dx, dy)
+        for step in self.steps:
+            x, y, width, height = step.geometry
+            step.geometry = (x + dx, y + dy, width, height)
+        self.origin = origin
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'status': self.status,
+            'completed_actions': self.completed,
+            'total_actions': len(self.plan.actions),
+            'blocks_placed': sum(1 for step in self.steps if step.kind == "place"),
+            'blocks_total': self.plan.drag_count,
+            'placed_nodes': [step.node_id for step in self.steps if step.kind == "place"],
+            'last_step': self.steps[-1].to_dict() if self.steps else None,
+            'resumable': self.resumable,
+            'resumes': self.resumes,
+            'error': self.error
+        }
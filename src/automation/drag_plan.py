@@ -0,0 +1,163 @@
+"""
+Drag Plan - Compile a block program into a minimal list of GUI actions
+
+create_simple_program used to drop every block 10 px below the previous one
+and then drag it again onto the previous block's connection (connect_blocks),
+and it clicked each block before editing a field. The plan compiler lays the
+whole program out up front instead: every block is dropped straight onto the
+snap point it will occupy, blocks inside a C-block (repeat, forever, if) go
+into its mouth, and parameter edits follow in one pass once the stack has
+stopped changing shape. That is one drag per block and three actions
+(double-click, type, enter) per parameter.
+
+Blocks are the automation dicts built by AutomationMCP
+({"opcode", "category", "inputs", ...}); a C-block's body is an optional
+"substack" list of the same dicts.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Blocks with a mouth; their templates show the top arm only
+C_BLOCKS = frozenset({"control_repeat", "control_forever", "control_if", "control_repeat_until"})
+
+# Blocks with nothing below them
+CAP_BLOCKS = frozenset({"control_forever", "control_stop", "control_delete_this_clone"})
+
+C_MOUTH_INDENT = 16   # x offset of a C-block's mouth
+C_EMPTY_MOUTH = 24    # height of an empty mouth
+C_BOTTOM_ARM = 24     # height of the arm closing a C-block
+
+# Seconds per drag and the readiness poller's settle overhead (2 stable frames)
+DRAG_DURATION = 0.5
+INPUT_PAUSE = 0.02
+SETTLE_FRAMES = 0.06
+
+
+@dataclass
+class PlannedBlock:
+    """Where one block of the program ends up"""
+    node_id: str
+    opcode: str
+    x: int
+    y: int
+    width: int
+    height: int
+    inputs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def drop_point(self) -> Tuple[int, int]:
+        """Screen point to release a block grabbed at its centre"""
+        return (self.x + self.width // 2, self.y + self.height // 2)
+
+    def field_point(self, index: int, count: int) -> Tuple[int, int]:
+        """Click point of the index-th of `count` input fields, spread across the block"""
+        return (self.x + self.width * (index + 1) // (count + 1), self.y + self.height // 2)
+
+
+@dataclass
+class PlanAction:
+    """One GUI action: place a block from the palette, or edit one of its fields"""
+    kind: str  # "place" or "edit"
+    block: int  # index into DragPlan.blocks
+    name: Optional[str] = None
+    value: Any = None
+    point: Optional[Tuple[int, int]] = None
+
+    @property
+    def gui_actions(self) -> int:
+        return 1 if self.kind == "place" else 3
+
+
+@dataclass
+class DragPlan:
+    """Compiled program: block layout plus the ordered action list"""
+    blocks: List[PlannedBlock]
+    actions: List[PlanAction]
+    bottom: int = 0  # y just below the laid-out script
+
+    @property
+    def action_count(self) -> int:
+        """Primitive GUI actions: drags, double-clicks, typing and key presses"""
+        return sum(action.gui_actions for action in self.actions)
+
+    @property
+    def drag_count(self) -> int:
+        return sum(1 for action in self.actions if action.kind == "place")
+
+    def estimated_seconds(self, latency: Optional[Dict[str, Tuple[float, float]]] = None) -> float:
+        """Execution time under a UI latency model (default: the simulated backend's)"""
+        if latency is None:
+            from .backends import DEFAULT_LATENCY  # backends imports the block shapes from here
+            latency = DEFAULT_LATENCY
+        total = 0.0
+        for action in self.actions:
+            if action.kind == "place":
+                total += INPUT_PAUSE + DRAG_DURATION + sum(latency["drop"]) + SETTLE_FRAMES
+            else:
+                total += 3 * INPUT_PAUSE + sum(latency["edit"]) + SETTLE_FRAMES
+        return total
+
+    def shift(self, dx: int, dy: int):
+        """Move the layout, e.g. after the window moved between two runs of the plan"""
+        for block in self.blocks:
+            block.x += dx
+            block.y += dy
+        for action in self.actions:
+            if action.point is not None:
+                action.point = (action.point[0] + dx, action.point[1] + dy)
+        self.bottom += dy
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'blocks': len(self.blocks),
+            'actions': self.action_count,
+            'drags': self.drag_count,
+            'estimated_seconds': round(self.estimated_seconds(), 3)
+        }
+
+
+def compile_plan(blocks_data: List[Dict[str, Any]], origin: Tuple[int, int],
+                 block_size: Callable[[str], Tuple[int, int]]) -> DragPlan:
+    """
+    Lay out a program and list the actions that build it.
+
+    Args:
+        blocks_data: Top-level blocks, in stack order
+        origin: Top-left screen point of the first block
+        block_size: (width, height) of an opcode's palette image
+
+    Returns:
+        DragPlan whose place actions come in an order where each drop lands
+        on an existing connection (a C-block is filled before the block
+        below it is placed, as filling it moves its bottom arm)
+    """
+    blocks: List[PlannedBlock] = []
+    places: List[PlanAction] = []
+
+    def lay_out(stack: List[Dict[str, Any]], x: int, y: int, prefix: str) -> int:
+        for i, block_data in enumerate(stack):
+            opcode = block_data.get('opcode', 'unknown')
+            width, height = block_size(opcode)
+            node_id = f"{prefix}{i}"
+            blocks.append(PlannedBlock(node_id, opcode, x, y, width, height, dict(block_data.get('inputs') or {})))
+            places.append(PlanAction("place", len(blocks) - 1, point=blocks[-1].drop_point))
+
+            if opcode in C_BLOCKS:
+                mouth_top = y + height
+                mouth_bottom = lay_out(block_data.get('substack') or [], x + C_MOUTH_INDENT, mouth_top, f"{node_id}.")
+                y = mouth_top + max(mouth_bottom - mouth_top, C_EMPTY_MOUTH) + C_BOTTOM_ARM
+            else:
+                y += height
+            if opcode in CAP_BLOCKS and i < len(stack) - 1:
+                raise ValueError(f"'{stack[i + 1].get('opcode')}' can't go below cap block '{opcode}'")
+        return y
+
+    bottom = lay_out(blocks_data, origin[0], origin[1], "")
+
+    # Field edits once the layout is final; editing doesn't move other blocks
+    edits = []
+    for index, block in enumerate(blocks):
+        for field_index, (name, value) in enumerate(block.inputs.items()):
+            edits.append(PlanAction("edit", index, name, value, block.field_point(field_index, len(block.inputs))))
+    return DragPlan(blocks, places + edits, bottom)
@@ -0,0 +1,255 @@
+"""
+Job Queue - Run PictoBlox automation on one background worker
+
+Building a program in PictoBlox takes from a second to about a minute, and
+only one build can drive the mouse at a time. MCP tools therefore submit a
+job and return its id at once. A single worker thread owns the screen and
+runs the jobs one after another. Teacher jobs go first; within a priority,
+jobs run in the order they were submitted. A job reports progress per block
+placed and per parameter set. A queued job can be cancelled before it starts;
+a running one stops before its next GUI action. A GUI build keeps its
+checkpoint, so a failed or cancelled job can be resumed by a later job.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .checkpoint import BuildCheckpoint
+from .drag_plan import DragPlan
+from .pictoblox_controller import AutomationCancelled
+
+# Lower runs first
+PRIORITIES = {"teacher": 0, "student": 1}
+
+FINISHED = ("succeeded", "failed", "cancelled")
+
+# Finished jobs kept for polling; older ones are forgotten
+HISTORY = 200
+
+
+@dataclass
+class AutomationJob:
+    """One queued automation run and its progress"""
+    id: str
+    kind: str
+    priority: str
+    submitted_at: float
+    info: Dict[str, Any] = field(default_factory=dict)
+    status: str = "queued"  # queued, running, succeeded, failed or cancelled
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    blocks_placed: int = 0
+    blocks_total: int = 0
+    parameters_set: int = 0
+    parameters_total: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    checkpoint: Optional[BuildCheckpoint] = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def report(self, plan: DragPlan, index: int):
+        """Progress callback for PictoBloxController: plan.actions[index] is done"""
+        done = plan.actions[:index + 1]
+        self.blocks_total = plan.drag_count
+        self.parameters_total = len(plan.actions) - plan.drag_count
+        self.blocks_placed = sum(1 for action in done if action.kind == "place")
+        self.parameters_set = len(done) - self.blocks_placed
+        if self.cancel_requested:
+            raise AutomationCancelled(f"Job {self.id} cancelled")
+
+    def to_dict(self, now: float, position: Optional[int] = None) -> Dict[str, Any]:
+        finished_or_now = self.finished_at if self.finished_at is not None else now
+        status = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "priority": self.priority,
+            "status": self.status,
+            "progress": {
+                "blocks_placed": self.blocks_placed,
+                "blocks_total": self.blocks_total,
+                "parameters_set": self.parameters_set,
+                "parameters_total": self.parameters_total
+            },
+            "queued_seconds": round((self.started_at if self.started_at is not None else finished_or_now)
+                                    - self.submitted_at, 3),
+            "run_seconds": round(finished_or_now - self.started_at, 3) if self.started_at is not None else None
+        }
+        status.update(self.info)
+        if position is not None:
+            status["queue_position"] = position
+        if self.cancel_requested and self.status == "running":
+            status["cancel_requested"] = True
+        if self.result is not None:
+            status["result"] = self.result
+        if self.error is not None:
+            status["error"] = self.error
+        if self.checkpoint is not None:
+            status["checkpoint"] = self.checkpoint.to_dict()
+        return status
+
+
+class AutomationJobQueue:
+    """
+    Priority queue of automation jobs with a single worker thread.
+
+    A job function takes its AutomationJob (pass job.report to the
+    controller as the progress callback) and returns a result dict. The job
+    fails if the function raises or the result has "success": False.
+    """
+
+    def __init__(self, history: int = HISTORY, clock: Callable[[], float] = time.monotonic):
+        self.history = history
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[int, int, AutomationJob]] = []
+        self._functions: Dict[str, Callable[[AutomationJob], Dict[str, Any]]] = {}
+        self._jobs: "OrderedDict[str, AutomationJob]" = OrderedDict()
+        self._sequence = itertools.count()
+        self._worker: Optional[threading.Thread] = None
+        self._current: Optional[AutomationJob] = None
+        self._closed = False
+        self._counts = {status: 0 for status in FINISHED}
+
+    def submit(self, kind: str, fn: Callable[[AutomationJob], Dict[str, Any]], priority: str = "student",
+               **info) -> Dict[str, Any]:
+        """Queue a job and return its status (with job_id) immediately"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}' (expected one of {', '.join(PRIORITIES)})")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Automation job queue is closed")
+            job = AutomationJob(uuid.uuid4().hex[:12], kind, priority, self._clock(), info)
+            self._jobs[job.id] = job
+            self._functions[job.id] = fn
+            heapq.heappush(self._heap, (PRIORITIES[priority], next(self._sequence), job))
+            self._ensure_worker()
+            self._cond.notify_all()
+            return job.to_dict(self._clock(), self._position(job))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status and progress of a job, or None if unknown"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return job.to_dict(self._clock(), self._position(job)) if job else None
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued job now, or ask a running one to stop at its next action"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in ("queued", "running"):
+                job._cancel.set()
+            if job.status == "queued":
+                self._heap = [entry for entry in self._heap if entry[2] is not job]
+                heapq.heapify(self._heap)
+                self._finish(job, "cancelled")
+            return job.to_dict(self._clock(), self._position(job))
+
+    def checkpoint(self, job_id: str) -> Optional[BuildCheckpoint]:
+        """Checkpoint of a job's GUI build, if it got that far"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return job.checkpoint if job else None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a job has finished (or timeout) and return its status"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            job = self._jobs.get(job_id)
+            while job is not None and job.status not in FINISHED:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return job.to_dict(self._clock(), self._position(job)) if job else None
+
+    def run(self, kind: str, fn: Callable[[AutomationJob], Dict[str, Any]], priority: str = "teacher",
+            timeout: Optional[float] = None, **info) -> Dict[str, Any]:
+        """Submit a job and wait for it; for short calls that still need the screen to themselves"""
+        return self.wait(self.submit(kind, fn, priority, **info)["job_id"], timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue length, the running job and finished-job counters"""
+        with self._cond:
+            stats = {
+                "queued": len(self._heap),
+                "running": self._current.id if self._current else None
+            }
+            stats.update(self._counts)
+            return stats
+
+    def close(self, timeout: float = 5.0):
+        """Cancel queued jobs and stop the worker once the running job ends"""
+        with self._cond:
+            self._closed = True
+            for _, _, job in self._heap:
+                job._cancel.set()
+                self._finish(job, "cancelled")
+            self._heap = []
+            self._cond.notify_all()
+        worker = self._worker
+        if worker and worker is not threading.current_thread():
+            worker.join(timeout)
+
+    def _position(self, job: AutomationJob) -> Optional[int]:
+        """1-based place in line for queued jobs; caller holds _cond"""
+        if job.status != "queued":
+            return None
+        line = sorted(self._heap, key=lambda entry: entry[:2])
+        return 1 + next(i for i, entry in enumerate(line) if entry[2] is job)
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="automation-jobs", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap and not self._closed:
+                    self._cond.wait()
+                if not self._heap:
+                    return
+                job = heapq.heappop(self._heap)[2]
+                fn = self._functions.pop(job.id)
+                job.status = "running"
+                job.started_at = self._clock()
+                self._current = job
+
+            status, result, error = "succeeded", None, None
+            try:
+                result = fn(job)
+                if isinstance(result, dict) and result.get("success") is False:
+                    status = "failed"
+                    error = result.get("message")
+            except AutomationCancelled:
+                status = "cancelled"
+            except Exception as e:
+                status, error = "failed", str(e)
+
+            with self._cond:
+                job.result, job.error = result, error
+                self._current = None
+                self._finish(job, status)
+
+    def _finish(self, job: AutomationJob, status: str):
+        """Record a final status; caller holds _cond"""
+        job.status = status
+        job.finished_at = self._clock()
+        self._functions.pop(job.id, None)
+        self._counts[status] += 1
+        finished = [job_id for job_id, other in self._jobs.items() if other.status in FINISHED]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
+        self._cond.notify_all()
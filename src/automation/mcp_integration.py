@@ -3,25 +3,51 @@ MCP Integration for PictoBlox Automation
 Extends the existing scratchattach-mcp with automation capabilities
 """
 
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
 from typing import Dict, Any, List, Optional
-from .pictoblox_controller import PictoBloxController, PictoBloxNotFoundError, BlockPlacementError
-from ..programming.block_generator import BlockGenerator, Intent
-from ..programming.parsers import NaturalLanguageParser
-from ..programming.formatters import TextFormatter
+from programming.block_generator import BlockGenerator, Intent
+from programming.parsers import NaturalLanguageParser
+from programming.formatters import TextFormatter
+from .backends import AutomationBackend
+from .job_queue import PRIORITIES, AutomationJob, AutomationJobQueue
+from .pictoblox_controller import AutomationCancelled, PictoBloxController, PictoBloxNotFoundError
+
+# How create_scratch_program_auto builds the program in PictoBlox; only "gui"
+# adds to the open project, the others replace it
+AUTOMATION_MODES = ("gui", "file", "auto")
 
 
 class AutomationMCP:
-    """Enhanced MCP with PictoBlox automation capabilities"""
+    """
+    Enhanced MCP with PictoBlox automation capabilities
+    
+    Args:
+        controller: Controller to drive (default: a new one on `backend`)
+        backend: Screen backend for the default controller (default: PyAutoGUI)
+    """
     
-    def __init__(self):
-        self.controller = PictoBloxController()
+    def __init__(self, controller: Optional[PictoBloxController] = None,
+                 backend: Optional[AutomationBackend] = None):
+        self.controller = controller or PictoBloxController(backend=backend)
         self.parser = NaturalLanguageParser()
         self.generator = BlockGenerator()
         self.formatter = TextFormatter()
         self.automation_enabled = False
+        # Generated .sb3 files for the file-open route, deleted once loaded
+        self.project_dir = Path(tempfile.gettempdir()) / "scratchattach-mcp"
+        # The one worker allowed to drive the PictoBlox window
+        self.jobs = AutomationJobQueue()
     
     def initialize_automation(self) -> Dict[str, Any]:
-        """Initialize PictoBlox automation"""
+        """Initialize PictoBlox automation (waits its turn behind any running build)"""
+        job = self.jobs.run("initialize", lambda job: self._initialize())
+        if job.get("result") is not None:
+            return job["result"]
+        return {"success": False, "message": f"PictoBlox automation failed to start: {job.get('error')}"}
+    
+    def _initialize(self) -> Dict[str, Any]:
         try:
             if self.controller.connect_to_pictoblox():
                 self.automation_enabled = True
@@ -44,30 +70,52 @@ class AutomationMCP:
                 "fallback": "Manual instructions will be provided instead."
             }
     
-    def create_scratch_program_auto(self, description: str, auto_execute: bool = True) -> Dict[str, Any]:
+    def create_scratch_program_auto(self, description: str, auto_execute: bool = True,
+                                    mode: str = "gui", priority: str = "student") -> Dict[str, Any]:
         """
         Generate AND automatically create Scratch program in PictoBlox
         
+        The build runs as a background job; the result carries its job_id
+        for get_automation_job and cancel_automation_job.
+        
         Args:
             description: Natural language description of the program
             auto_execute: Whether to automatically create blocks in PictoBlox
+            mode: "gui" (default) drags the blocks into the open project one by
+                one; "file" opens the program as a generated .sb3 project, which
+                replaces the open one (save it first: PictoBlox's unsaved-changes
+                prompt isn't handled); "auto" tries the file first and falls back
+                to dragging
+            priority: "teacher" jobs run before queued "student" jobs
         
         Returns:
-            Result with automation status and fallback instructions
+            Result with the queued job and fallback instructions; the job's
+            result has the automation status and seconds per route tried
         """
+        if mode not in AUTOMATION_MODES:
+            return {
+                "success": False,
+                "message": f"Unknown automation mode '{mode}'",
+                "available_modes": list(AUTOMATION_MODES)
+            }
+        if priority not in PRIORITIES:
+            return {
+                "success": False,
+                "message": f"Unknown priority '{priority}'",
+                "available_priorities": list(PRIORITIES)
+            }
+        
         try:
             # Parse the natural language input
             intents = self.parser.parse(description)
             
             if not intents:
+                hints = self.parser.suggest(description, limit=3)
                 return {
                     "success": False,
                     "message": "I didn't understand that request.",
-                    "suggestions": [
-                        "make the cat move right 10 steps",
-                        "when space key pressed jump up",
-                        "play sound when sprite clicked"
-                    ]
+                    "suggestions": hints["examples"],
+                    "did_you_mean": hints["did_you_mean"]
                 }
             
             # Generate block sequence
@@ -102,14 +150,16 @@ class AutomationMCP:
                     # Convert blocks to automation format
                     automation_blocks = self._convert_blocks_for_automation(block_sequence.blocks)
                     
-                    # Execute automation
-                    if self.controller.create_simple_program(automation_blocks):
-                        result["automation_success"] = True
-                        result["message"] = "✓ Program created successfully in PictoBlox!"
-                        result["blocks_placed"] = len(automation_blocks)
-                    else:
-                        result["message"] = "Automation failed, but here are manual instructions:"
-                        result["automation_error"] = "Block placement failed"
+                    # Build in the background; success is known once the job finishes
+                    job = self.jobs.submit(
+                        "create_program", lambda job: self._build_job(automation_blocks, mode, job),
+                        priority=priority, description=description
+                    )
+                    del result["automation_success"]
+                    result["job_id"] = job["job_id"]
+                    result["job"] = job
+                    result["message"] = ("Building the program in PictoBlox; check get_automation_job for progress. "
+                                         "Manual instructions are included in case it fails.")
                 
                 except Exception as e:
                     result["message"] = f"Automation failed ({str(e)}), but here are manual instructions:"
@@ -131,6 +181,64 @@ class AutomationMCP:
                 "error_type": "processing_error"
             }
     
+    def _build_job(self, automation_blocks: List[Dict[str, Any]], mode: str, job: AutomationJob) -> Dict[str, Any]:
+        """Job body for create_scratch_program_auto"""
+        with self._checkpointed(job):
+            outcome = self._build_in_pictoblox(automation_blocks, mode, job.report)
+        outcome["success"] = outcome["automation_success"]
+        if outcome["success"]:
+            outcome["message"] = "✓ Program created successfully in PictoBlox!"
+            outcome["blocks_placed"] = len(automation_blocks)
+        else:
+            outcome["message"] = outcome.get("automation_error", "Automation failed")
+        return outcome
+    
+    def _build_in_pictoblox(self, automation_blocks: List[Dict[str, Any]], mode: str,
+                            progress=None) -> Dict[str, Any]:
+        """
+        Build a program through the project file, the GUI, or the file with GUI fallback
+        
+        End-to-end seconds of every route tried are reported under
+        "automation_seconds", on the backend clock like the controller's own
+        timings, so the two can be compared.
+        """
+        outcome = {"automation_success": False, "automation_seconds": {}}
+        clock = self.controller.backend.clock
+        
+        if mode in ("auto", "file"):
+            start = clock()
+            path = None
+            try:
+                self.project_dir.mkdir(parents=True, exist_ok=True)
+                # A unique name per call; PictoBlox has read it once the load settles
+                with tempfile.NamedTemporaryFile(prefix="program_", suffix=".sb3", dir=self.project_dir,
+                                                 delete=False) as handle:
+                    path = Path(handle.name)
+                self.controller.inject_program(automation_blocks, path, progress)
+                outcome["automation_success"] = True
+                outcome["automation_mode"] = "file"
+            except AutomationCancelled:
+                raise
+            except Exception as e:
+                outcome["file_error"] = str(e)
+            finally:
+                if path is not None:
+                    path.unlink(missing_ok=True)
+            outcome["automation_seconds"]["file"] = round(clock() - start, 3)
+            if outcome["automation_success"] or mode == "file":
+                if not outcome["automation_success"]:
+                    outcome["automation_error"] = outcome["file_error"]
+                return outcome
+        
+        start = clock()
+        if self.controller.create_simple_program(automation_blocks, progress):
+            outcome["automation_success"] = True
+            outcome["automation_mode"] = "gui"
+        else:
+            outcome["automation_error"] = "Block placement failed"
+        outcome["automation_seconds"]["gui"] = round(clock() - start, 3)
+        return outcome
+    
     def _convert_blocks_for_automation(self, blocks) -> List[Dict[str, Any]]:
         """Convert generated blocks to automation format"""
         automation_blocks = []
@@ -164,6 +272,7 @@ class AutomationMCP:
         
         status = self.controller.get_status()
         status["automation_enabled"] = self.automation_enabled
+        status["jobs"] = self.jobs.get_stats()
         
         if status["connected"]:
             status["message"] = "✓ PictoBlox automation ready"
@@ -173,8 +282,15 @@ class AutomationMCP:
         
         return status
     
-    def modify_existing_project(self, modification: str) -> Dict[str, Any]:
-        """Modify currently open PictoBlox project"""
+    def modify_existing_project(self, modification: str, priority: str = "student") -> Dict[str, Any]:
+        """Modify currently open PictoBlox project (as a background job; see get_automation_job)"""
+        if priority not in PRIORITIES:
+            return {
+                "success": False,
+                "message": f"Unknown priority '{priority}'",
+                "available_priorities": list(PRIORITIES)
+            }
+        
         if not self.automation_enabled:
             return {
                 "success": False,
@@ -209,20 +325,27 @@ class AutomationMCP:
             # Convert and place blocks
             automation_blocks = self._convert_blocks_for_automation(block_sequence.blocks)
             
-            if self.controller.create_simple_program(automation_blocks):
-                return {
-                    "success": True,
-                    "message": f"✓ Added {len(automation_blocks)} blocks to your project",
-                    "modification": modification,
-                    "blocks_added": len(automation_blocks),
-                    "explanation": block_sequence.explanation
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": "Failed to modify project",
-                    "manual_instructions": self.formatter.format(block_sequence)
-                }
+            def add_blocks(job: AutomationJob) -> Dict[str, Any]:
+                with self._checkpointed(job):
+                    added = self.controller.create_simple_program(automation_blocks, job.report)
+                if added:
+                    return {
+                        "success": True,
+                        "message": f"✓ Added {len(automation_blocks)} blocks to your project",
+                        "blocks_added": len(automation_blocks)
+                    }
+                return {"success": False, "message": "Failed to modify project"}
+            
+            job = self.jobs.submit("modify_project", add_blocks, priority=priority, description=modification)
+            return {
+                "success": True,
+                "message": f"Adding {len(automation_blocks)} blocks to your project; check get_automation_job for progress",
+                "modification": modification,
+                "job_id": job["job_id"],
+                "job": job,
+                "explanation": block_sequence.explanation,
+                "manual_instructions": self.formatter.format(block_sequence)
+            }
         
         except Exception as e:
             return {
@@ -231,6 +354,67 @@ class AutomationMCP:
                 "error_type": "modification_error"
             }
     
+    def resume_automation_job(self, job_id: str, priority: str = "student") -> Dict[str, Any]:
+        """Queue a job that finishes a failed or cancelled build from its last checkpoint"""
+        if priority not in PRIORITIES:
+            return {
+                "success": False,
+                "message": f"Unknown priority '{priority}'",
+                "available_priorities": list(PRIORITIES)
+            }
+        checkpoint = self.jobs.checkpoint(job_id)
+        if checkpoint is None or not checkpoint.resumable:
+            return {
+                "success": False,
+                "message": f"Job '{job_id}' has no unfinished build to resume",
+                "job": self.jobs.get(job_id)
+            }
+        
+        def resume(job: AutomationJob) -> Dict[str, Any]:
+            job.checkpoint = checkpoint
+            if self.controller.resume_program(checkpoint, job.report):
+                return {"success": True, "message": "✓ Finished the program in PictoBlox"}
+            return {"success": False, "message": checkpoint.error or "Resume failed"}
+        
+        job = self.jobs.submit("resume_program", resume, priority=priority, resumes=job_id)
+        return {
+            "success": True,
+            "message": (f"Resuming after {checkpoint.completed} of {len(checkpoint.plan.actions)} steps; "
+                        "check get_automation_job for progress"),
+            "job_id": job["job_id"],
+            "job": job
+        }
+    
+    @contextmanager
+    def _checkpointed(self, job: AutomationJob):
+        """Attach the checkpoint of a GUI build started inside the block to the job"""
+        before = self.controller.checkpoint
+        try:
+            yield
+        finally:
+            if self.controller.checkpoint is not before:
+                job.checkpoint = self.controller.checkpoint
+    
+    def get_automation_job(self, job_id: str) -> Dict[str, Any]:
+        """Status, per-block progress and (once finished) result of an automation job"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"success": False, "message": f"Unknown automation job '{job_id}'"}
+        return dict(job, success=True)
+    
+    def cancel_automation_job(self, job_id: str) -> Dict[str, Any]:
+        """Cancel a queued job, or stop a running one before its next block"""
+        job = self.jobs.cancel(job_id)
+        if job is None:
+            return {"success": False, "message": f"Unknown automation job '{job_id}'"}
+        if job["status"] == "cancelled":
+            message = "Job cancelled"
+        elif job.get("cancel_requested"):
+            message = "Job will stop before its next block"
+        else:
+            message = f"Job already {job['status']}"
+        return dict(job, success=True, message=message)
+    
     def create_game_template(self, game_type: str, complexity: str = "beginner") -> Dict[str, Any]:
         """Create complete game templates"""
         templates = {
@@ -318,9 +502,10 @@ def enhance_existing_mcp(mcp_server):
         return automation.initialize_automation()
     
     @mcp_server.tool()
-    def create_scratch_program_auto(description: str, auto_execute: bool = True):
-        """Generate AND automatically create Scratch program in PictoBlox"""
-        return automation.create_scratch_program_auto(description, auto_execute)
+    def create_scratch_program_auto(description: str, auto_execute: bool = True, mode: str = "gui",
+                                    priority: str = "student"):
+        """Generate AND automatically create Scratch program in PictoBlox (mode gui, or file/auto which replace the open project); returns a job id"""
+        return automation.create_scratch_program_auto(description, auto_execute, mode, priority)
     
     @mcp_server.tool()
     def get_pictoblox_status():
@@ -328,9 +513,24 @@ def enhance_existing_mcp(mcp_server):
         return automation.get_pictoblox_status()
     
     @mcp_server.tool()
-    def modify_existing_project(modification: str):
-        """Modify currently open PictoBlox project"""
-        return automation.modify_existing_project(modification)
+    def modify_existing_project(modification: str, priority: str = "student"):
+        """Modify currently open PictoBlox project; returns a job id"""
+        return automation.modify_existing_project(modification, priority)
+    
+    @mcp_server.tool()
+    def get_automation_job(job_id: str):
+        """Check progress of a PictoBlox automation job"""
+        return automation.get_automation_job(job_id)
+    
+    @mcp_server.tool()
+    def cancel_automation_job(job_id: str):
+        """Cancel a queued or running PictoBlox automation job"""
+        return automation.cancel_automation_job(job_id)
+    
+    @mcp_server.tool()
+    def resume_automation_job(job_id: str, priority: str = "student"):
+        """Finish a failed or cancelled PictoBlox build from its last checkpoint"""
+        return automation.resume_automation_job(job_id, priority)
     
     @mcp_server.tool()
     def create_game_template(game_type: str, complexity: str = "beginner"):
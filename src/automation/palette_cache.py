@@ -0,0 +1,107 @@
+"""
+Palette Cache - Remember where blocks sit in the PictoBlox palette
+
+Block positions in the palette only move when the window moves or resizes,
+when another category is selected, or when the palette scrolls. Locations
+are cached per (window geometry, category, scroll offset) state. Each state
+also stores a fingerprint of a thin strip of the palette. If the strip
+looks different on a later lookup, the palette was changed behind our back
+(a user scrolled it, an extension added blocks), so that state's entries
+are dropped.
+"""
+
+import hashlib
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Width in pixels of the palette strip that is fingerprinted
+STRIP_WIDTH = 16
+
+# Grey levels are bucketed before hashing so capture noise doesn't look like a layout change
+_QUANTUM = 32
+
+PaletteState = Tuple[Hashable, ...]
+
+
+def fingerprint(strip: np.ndarray) -> str:
+    """Hash of a palette strip, tolerant of small pixel noise"""
+    strip = np.asarray(strip)
+    if strip.ndim == 3:
+        strip = strip[..., :3].mean(axis=-1)
+    quantized = (np.clip(strip, 0, 255) // _QUANTUM).astype(np.uint8)
+    digest = hashlib.blake2b(quantized.tobytes(), digest_size=16)
+    digest.update(str(quantized.shape).encode())
+    return digest.hexdigest()
+
+
+class PaletteLocationCache:
+    """
+    Block locations per palette state.
+
+    A location of None records that the block was searched for and not
+    found in that state, so repeated misses don't trigger new searches.
+    """
+
+    def __init__(self):
+        self._locations: Dict[PaletteState, Dict[str, Optional[Tuple[int, int]]]] = {}
+        self._fingerprints: Dict[PaletteState, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def validate(self, state: PaletteState, strip: np.ndarray) -> bool:
+        """
+        Check the palette still looks as it did when state was cached.
+
+        Returns False (after dropping the state's entries) on a mismatch, and
+        records the fingerprint for states seen for the first time.
+        """
+        current = fingerprint(strip)
+        known = self._fingerprints.get(state)
+        if known is None:
+            self._fingerprints[state] = current
+            return True
+        if known != current:
+            self.invalidate(state)
+            self._fingerprints[state] = current
+            return False
+        return True
+
+    def lookup(self, state: PaletteState, names: Iterable[str]) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+        """Split names into cached locations and names that still need a search"""
+        cached = self._locations.get(state, {})
+        found, missing = {}, []
+        for name in names:
+            if name in cached:
+                self.hits += 1
+                if cached[name] is not None:
+                    found[name] = cached[name]
+            else:
+                self.misses += 1
+                missing.append(name)
+        return found, missing
+
+    def store(self, state: PaletteState, searched: Iterable[str], found: Dict[str, Tuple[int, int]]):
+        """Record the result of a search for `searched` names"""
+        entries = self._locations.setdefault(state, {})
+        for name in searched:
+            entries[name] = found.get(name)
+
+    def invalidate(self, state: Optional[PaletteState] = None):
+        """Forget one state, or everything when state is None"""
+        self.invalidations += 1
+        if state is None:
+            self._locations.clear()
+            self._fingerprints.clear()
+        else:
+            self._locations.pop(state, None)
+            self._fingerprints.pop(state, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'states': len(self._locations),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations
+        }
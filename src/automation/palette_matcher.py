@@ -0,0 +1,312 @@
+"""
+Palette Matcher - Locate many block templates in one palette screenshot
+
+Replaces one pyautogui.locateOnScreen call per block (each taking a fresh
+screenshot and decoding its template PNG again) with a single pass: the
+screenshot is transformed once and correlated against every needed
+template in one batched FFT, giving normalized cross-correlation (NCC)
+scores for all of them. Works on numpy arrays, so saved screenshots can be
+matched on a headless machine.
+
+Templates are captured at 100% display scaling. Resized copies for the
+common Windows DPI factors are made on first use, and the matcher settles
+on one scale per session by calibrating against the first palette
+screenshot that contains a known block. After that only the 100% and the
+calibrated copies are kept.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# ITU-R BT.601 luma, as used by Pillow's convert("L")
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# Per-pixel variance below which a window counts as flat
+_MIN_PIXEL_VARIANCE = 1e-2
+
+# Display scaling factors offered by Windows (100% to 200%)
+DPI_SCALES = (1.0, 1.25, 1.5, 1.75, 2.0)
+
+# Templates tried per scale when calibrating; a few visible blocks settle it
+_CALIBRATION_TEMPLATES = 4
+
+# Default bound on cached template spectra (each is the size of a padded screenshot)
+SPECTRUM_CACHE_BYTES = 16 * 2 ** 20
+
+
+def to_grayscale(image: np.ndarray) -> np.ndarray:
+    """Convert an HxW, HxWx3 or HxWx4 image array to float32 grayscale"""
+    image = np.asarray(image)
+    if image.ndim == 3:
+        image = image[..., :3].astype(np.float32) @ _LUMA
+    return image.astype(np.float32, copy=False)
+
+
+def load_image(path: Union[str, Path]) -> np.ndarray:
+    """
+    Decode a saved screenshot or template to float32 grayscale.
+
+    .npy arrays are read with numpy; other formats go through Pillow, which
+    pyautogui already depends on for screenshots.
+    """
+    path = Path(path)
+    if path.suffix == ".npy":
+        return to_grayscale(np.load(path))
+    from PIL import Image
+    with Image.open(path) as image:
+        return to_grayscale(np.asarray(image.convert("L")))
+
+
+def resize(image: np.ndarray, scale: float) -> np.ndarray:
+    """Bilinear resize of a grayscale array by `scale` (pixel centres aligned)"""
+    image = to_grayscale(image)
+    height, width = image.shape
+    new_h, new_w = max(1, int(round(height * scale))), max(1, int(round(width * scale)))
+    if (new_h, new_w) == (height, width):
+        return image.copy()
+
+    def axis(size, new_size):
+        source = np.clip((np.arange(new_size) + 0.5) * (size / new_size) - 0.5, 0, size - 1)
+        low = np.floor(source).astype(np.intp)
+        high = np.minimum(low + 1, size - 1)
+        return low, high, (source - low).astype(np.float32)
+
+    y0, y1, fy = axis(height, new_h)
+    x0, x1, fx = axis(width, new_w)
+    rows = image[y0] * (1 - fy)[:, None] + image[y1] * fy[:, None]
+    return rows[:, x0] * (1 - fx) + rows[:, x1] * fx
+
+
+class PaletteMatcher:
+    """
+    Multi-template normalized cross-correlation matcher.
+
+    Templates are decoded and normalized once at construction, and resized
+    to another scale in `scales` the first time that scale is tried.
+    match() takes one screenshot of the palette and returns {name: (x, y)}
+    centre points for every template whose best NCC score reaches the
+    threshold. With more than one scale, the first screenshot in which any
+    template is found fixes the scale (see calibrate()); later matches only
+    use templates of that scale, and the other scales' copies are dropped.
+
+    Template spectra are cached per palette state (the padded FFT shape of
+    the screenshot) up to `spectrum_cache_bytes`. When the budget runs out,
+    the least recently used other states are evicted; spectra that don't
+    fit beside the current state's are computed per call rather than
+    evicting the current state's own, since lookups cycle through the same
+    blocks and would thrash.
+    """
+
+    def __init__(self, templates: Dict[str, np.ndarray], threshold: float = 0.8,
+                 scales: Sequence[float] = (1.0,), spectrum_cache_bytes: int = SPECTRUM_CACHE_BYTES):
+        self.threshold = threshold
+        self.scales = tuple(scales)
+        self.scale: Optional[float] = self.scales[0] if len(self.scales) == 1 else None
+        self.spectrum_cache_bytes = spectrum_cache_bytes
+        # Zero-mean grayscale templates as captured; other scales are derived on demand
+        self._base: Dict[str, np.ndarray] = {}
+        self._pyramid: Dict[float, Dict[str, Tuple[np.ndarray, float]]] = {scale: {} for scale in self.scales}
+        # {FFT shape: {(name, scale): spectrum}}, least recently used shape first
+        self._spectra: "OrderedDict[Tuple[int, int], Dict[Tuple[str, float], np.ndarray]]" = OrderedDict()
+        self._spectra_bytes = 0
+        for name, template in templates.items():
+            gray = to_grayscale(template)
+            if gray.size and gray.max() > gray.min():
+                # A flat template can't be located by correlation
+                self._base[name] = gray - gray.mean()
+
+    @classmethod
+    def from_files(cls, template_paths: Dict[str, str], threshold: float = 0.8,
+                   scales: Sequence[float] = (1.0,),
+                   spectrum_cache_bytes: int = SPECTRUM_CACHE_BYTES) -> "PaletteMatcher":
+        """Build from {name: path}, decoding every file once"""
+        return cls({name: load_image(path) for name, path in template_paths.items()}, threshold, scales,
+                   spectrum_cache_bytes)
+
+    @property
+    def _current_scale(self) -> float:
+        """The calibrated scale (the first scale until calibrated)"""
+        return self.scales[0] if self.scale is None else self.scale
+
+    def _template(self, name: str, scale: float) -> Tuple[np.ndarray, float]:
+        """(zero-mean template, its norm) at `scale`, resized on first use"""
+        level = self._pyramid[scale]
+        if name not in level:
+            if scale == 1.0:
+                centered = self._base[name]
+            else:
+                scaled = resize(self._base[name], scale)
+                centered = scaled - scaled.mean()
+            level[name] = (centered, float(np.sqrt((centered.astype(np.float64) ** 2).sum())))
+        return level[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._base
+
+    @property
+    def names(self):
+        return list(self._base)
+
+    def template_size(self, name: str) -> Optional[Tuple[int, int]]:
+        """(width, height) of a template at the current scale, or None if unknown"""
+        if name not in self._base:
+            return None
+        height, width = self._template(name, self._current_scale)[0].shape
+        return (width, height)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the templates, their resized copies and cached spectra"""
+        base = sum(gray.nbytes for gray in self._base.values())
+        pyramid = sum(centered.nbytes for scale, level in self._pyramid.items() if scale != 1.0
+                      for centered, _ in level.values())
+        return base + pyramid + self._spectra_bytes
+
+    @property
+    def spectra_nbytes(self) -> int:
+        """Memory held by cached template spectra"""
+        return self._spectra_bytes
+
+    def calibrate(self, screenshot: np.ndarray, names: Optional[Iterable[str]] = None) -> Optional[float]:
+        """
+        Fix the display scale from a palette screenshot.
+
+        Every scale is tried with the first few requested templates; the one
+        where most of them reach the threshold wins, ties going to the highest
+        single score. Returns the chosen scale, or None (leaving the matcher
+        uncalibrated) if no template was found.
+        """
+        names = [n for n in (names if names is not None else self._base) if n in self._base]
+        names = names[:_CALIBRATION_TEMPLATES]
+        best_key, best_scale = None, None
+        for scale in self.scales:
+            bests = [float(score_map.max()) for score_map in
+                     self.scores(screenshot, names, scale=scale, cache=False).values()]
+            found = sum(score >= self.threshold for score in bests)
+            key = (found, max(bests, default=0.0))
+            if found and (best_key is None or key > best_key):
+                best_key, best_scale = key, scale
+        if best_scale is not None:
+            self.scale = best_scale
+            # Copies made for the scales that lost are no longer needed
+            self._pyramid = {scale: level if scale == best_scale else {} for scale, level in self._pyramid.items()}
+            self._spectra = OrderedDict((shape, {key: spectrum for key, spectrum in cached.items()
+                                                 if key[1] == best_scale})
+                                        for shape, cached in self._spectra.items())
+            self._spectra_bytes = sum(spectrum.nbytes for cached in self._spectra.values()
+                                      for spectrum in cached.values())
+        return best_scale
+
+    def scores(self, screenshot: np.ndarray, names: Optional[Iterable[str]] = None,
+               scale: Optional[float] = None, cache: bool = True) -> Dict[str, np.ndarray]:
+        """NCC score map (one value per top-left position) for each requested template"""
+        if scale is None:
+            scale = self._current_scale
+        image = to_grayscale(screenshot).astype(np.float64)
+        height, width = image.shape
+        wanted = [n for n in (names if names is not None else self._base) if n in self._base]
+        templates = {n: self._template(n, scale) for n in wanted}
+        # A template that came out flat at this scale can't be located either
+        wanted = [n for n in wanted if templates[n][1] > 0
+                  and templates[n][0].shape[0] <= height and templates[n][0].shape[1] <= width]
+        if not wanted:
+            return {}
+
+        max_h = max(templates[n][0].shape[0] for n in wanted)
+        max_w = max(templates[n][0].shape[1] for n in wanted)
+        shape = (_fast_length(height + max_h - 1), _fast_length(width + max_w - 1))
+
+        # One forward transform of the screenshot, cached transforms of the
+        # (flipped, zero-mean) templates, one batched inverse: correlation maps
+        kernels = np.stack([self._spectrum(name, scale, shape, cache) for name in wanted])
+        spectrum = np.fft.rfft2(image, s=shape)
+        correlation = np.fft.irfft2(kernels * spectrum, s=shape)
+
+        # Window sums from integral images give each window's variance
+        integral = np.zeros((height + 1, width + 1))
+        integral[1:, 1:] = image.cumsum(0).cumsum(1)
+        integral_sq = np.zeros((height + 1, width + 1))
+        integral_sq[1:, 1:] = (image ** 2).cumsum(0).cumsum(1)
+
+        results = {}
+        for i, name in enumerate(wanted):
+            centered, norm = templates[name]
+            h, w = centered.shape
+            numerator = correlation[i, h - 1:height, w - 1:width]
+            window_sum = _window_sums(integral, h, w)
+            window_sq = _window_sums(integral_sq, h, w)
+            variance = np.maximum(window_sq - window_sum ** 2 / (h * w), 0.0)
+            denominator = np.sqrt(variance) * norm
+            # Near-flat windows (std under 0.1 grey levels) are rounding noise, not matches
+            with np.errstate(divide="ignore", invalid="ignore"):
+                results[name] = np.where(variance > _MIN_PIXEL_VARIANCE * h * w, numerator / denominator, 0.0)
+        return results
+
+    def _spectrum(self, name: str, scale: float, shape: Tuple[int, int], cache: bool = True) -> np.ndarray:
+        cached = self._spectra.get(shape)
+        if cached is not None:
+            self._spectra.move_to_end(shape)
+            if (name, scale) in cached:
+                return cached[(name, scale)]
+        centered = self._template(name, scale)[0]
+        # complex64 halves the cache; correlation precision is still ample
+        spectrum = np.fft.rfft2(centered[::-1, ::-1].astype(np.float64), s=shape).astype(np.complex64)
+        if cache:
+            # Make room by dropping the least recently used other palette states
+            while (self._spectra_bytes + spectrum.nbytes > self.spectrum_cache_bytes
+                   and next(iter(self._spectra), shape) != shape):
+                _, evicted = self._spectra.popitem(last=False)
+                self._spectra_bytes -= sum(old.nbytes for old in evicted.values())
+            if self._spectra_bytes + spectrum.nbytes <= self.spectrum_cache_bytes:
+                self._spectra.setdefault(shape, {})[(name, scale)] = spectrum
+                self._spectra.move_to_end(shape)
+                self._spectra_bytes += spectrum.nbytes
+        return spectrum
+
+    def match(self, screenshot: np.ndarray, names: Optional[Iterable[str]] = None,
+              origin: Tuple[int, int] = (0, 0)) -> Dict[str, Tuple[int, int]]:
+        """
+        Locate templates in a screenshot of the palette.
+
+        Args:
+            screenshot: Image array of the palette region
+            names: Templates to look for (default: all)
+            origin: Screen coordinates of the screenshot's top-left corner
+
+        Returns:
+            {name: (x, y)} screen centre of each template found
+        """
+        if self.scale is None:
+            names = list(names) if names is not None else None
+            self.calibrate(screenshot, names)
+        found = {}
+        for name, score_map in self.scores(screenshot, names).items():
+            y, x = np.unravel_index(int(np.argmax(score_map)), score_map.shape)
+            if score_map[y, x] >= self.threshold:
+                h, w = self._template(name, self._current_scale)[0].shape
+                found[name] = (origin[0] + int(x) + w // 2, origin[1] + int(y) + h // 2)
+        return found
+
+
+def _fast_length(n: int) -> int:
+    """Smallest 2^a * 3^b * 5^c >= n; FFTs of such sizes are much faster than of large primes"""
+    best = 1 << max(n - 1, 0).bit_length()
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            candidate = power35
+            while candidate < n:
+                candidate *= 2
+            best = min(best, candidate)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+def _window_sums(integral: np.ndarray, h: int, w: int) -> np.ndarray:
+    """Sum of every h x w window, from an integral image with a zero first row/column"""
+    return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
@@ -2,18 +2,36 @@
 PictoBlox Controller - Automation interface for PictoBlox desktop application
 """
 
-import time
-import subprocess
-import pyautogui
-import pygetwindow as gw
-from typing import Optional, Tuple, Dict, Any, List
+import logging
+import os
+from typing import Callable, Optional, Tuple, Dict, Any, List
 from dataclasses import dataclass
 from pathlib import Path
 import json
+import numpy as np
 
-# Configure pyautogui for safety
-pyautogui.FAILSAFE = True
-pyautogui.PAUSE = 0.1
+from .action_timing import ActionTimer, timed
+from .backends import FILE_DIALOG_TITLE, OPEN_SHORTCUT, AutomationBackend, PyAutoGUIBackend
+from .checkpoint import BuildCheckpoint
+from .drag_plan import DragPlan, compile_plan
+from .palette_cache import STRIP_WIDTH, PaletteLocationCache, PaletteState
+from .palette_matcher import DPI_SCALES, PaletteMatcher, load_image
+from .project_file import SCRIPT_ORIGIN, write_project
+from .readiness import Region, ScreenPoller
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds for readiness waits (seconds)
+LAUNCH_TIMEOUT = 30.0
+ACTIVATE_TIMEOUT = 3.0
+DIALOG_TIMEOUT = 3.0
+LOAD_TIMEOUT = 10.0
+
+# Vertical gap between separate scripts; beyond snapping range
+SCRIPT_GAP = 80
+
+# Called after each plan action with (plan, index of the action); may raise AutomationCancelled
+Progress = Callable[[DragPlan, int], None]
 
 
 @dataclass
@@ -47,27 +65,69 @@ class BlockPlacementError(Exception):
     pass
 
 
+class ProjectLoadError(Exception):
+    """Raised when a project file cannot be opened in PictoBlox"""
+    pass
+
+
+class AutomationCancelled(Exception):
+    """Raised by a progress callback to stop a build between two actions"""
+    pass
+
+
 class PictoBloxController:
-    """Main controller for PictoBlox automation"""
+    """
+    Main controller for PictoBlox automation
+    
+    All screen and input access goes through `backend` (the real desktop via
+    pyautogui by default, or a SimulatedBackend). `templates` overrides the
+    block images loaded from ui_templates.
+    """
     
-    def __init__(self, pictoblox_path: Optional[str] = None):
+    def __init__(self, pictoblox_path: Optional[str] = None, backend: Optional[AutomationBackend] = None,
+                 templates: Optional[Dict[str, np.ndarray]] = None):
         self.pictoblox_path = pictoblox_path
+        self.backend = backend or PyAutoGUIBackend()
         self.window = None
         self.workspace_bounds = None
         self.block_palette_bounds = None
         self.placed_blocks: List[BlockPosition] = []
+        self.last_plan: Optional[DragPlan] = None
+        self.last_plan_seconds: Optional[float] = None
+        self.checkpoint: Optional[BuildCheckpoint] = None
+        self.last_project: Optional[Path] = None
+        self.last_load_seconds: Optional[float] = None
+        self._next_script_y: Optional[int] = None
+        
+        # Palette state: block locations only change with these (plus window geometry)
+        self.palette_category: Optional[str] = None
+        self.palette_scroll = 0
+        self.palette_cache = PaletteLocationCache()
+        self._window_geometry: Optional[Tuple[int, int, int, int]] = None
         
-        # Load UI element templates for image recognition
-        self.ui_templates = self._load_ui_templates()
+        # Per-action timings of each program built, on the backend's clock
+        self.timer = ActionTimer.from_env(self.backend.clock)
+        
+        # Waits end when the affected screen region stops changing
+        self.poller = ScreenPoller(self._capture_region, clock=self.backend.clock, sleep=self.backend.sleep)
+        for wait in ("wait_until_stable", "wait_for_change", "wait_for"):
+            setattr(self.poller, wait, self.timer.wrap("wait", getattr(self.poller, wait)))
+        
+        # Load UI element templates for image recognition, decoded once up front
+        self.ui_templates = templates if templates is not None else self._load_ui_templates()
+        self._palette_matcher = PaletteMatcher(self.ui_templates, threshold=0.8, scales=DPI_SCALES)
     
-    def _load_ui_templates(self) -> Dict[str, str]:
-        """Load UI element templates for image recognition"""
+    def _load_ui_templates(self) -> Dict[str, np.ndarray]:
+        """Load UI element templates for image recognition as grayscale arrays"""
         templates_dir = Path(__file__).parent / "ui_templates"
         templates = {}
         
         if templates_dir.exists():
             for template_file in templates_dir.glob("*.png"):
-                templates[template_file.stem] = str(template_file)
+                try:
+                    templates[template_file.stem] = load_image(template_file)
+                except Exception as e:
+                    logger.warning("Skipping UI template %s: %s", template_file.name, e)
         
         return templates
     
@@ -75,7 +135,7 @@ class PictoBloxController:
         """Launch PictoBlox application and wait for it to be ready"""
         try:
             if self.pictoblox_path:
-                subprocess.Popen([self.pictoblox_path])
+                self.backend.launch(self.pictoblox_path)
             else:
                 # Try common installation paths
                 common_paths = [
@@ -86,13 +146,14 @@ class PictoBloxController:
                 
                 for path in common_paths:
                     if Path(path).exists():
-                        subprocess.Popen([path])
+                        self.backend.launch(path)
                         break
                 else:
                     raise PictoBloxNotFoundError("PictoBlox executable not found")
             
-            # Wait for PictoBlox to start
-            time.sleep(3)
+            # Wait for the PictoBlox window to appear
+            if not self.poller.wait_for(lambda: bool(self._find_pictoblox_windows()), LAUNCH_TIMEOUT):
+                raise PictoBloxNotFoundError("PictoBlox window did not appear")
             return self.connect_to_pictoblox()
             
         except Exception as e:
@@ -101,31 +162,34 @@ class PictoBloxController:
     def connect_to_pictoblox(self) -> bool:
         """Connect to running PictoBlox window"""
         try:
-            # Find PictoBlox window
-            windows = gw.getWindowsWithTitle("PictoBlox")
-            if not windows:
-                # Try alternative window titles
-                alt_titles = ["PictoBlox", "Scratch", "Block Programming"]
-                for title in alt_titles:
-                    windows = [w for w in gw.getAllWindows() if title.lower() in w.title.lower()]
-                    if windows:
-                        break
-            
+            windows = self._find_pictoblox_windows()
             if not windows:
                 raise PictoBloxNotFoundError("PictoBlox window not found")
             
             self.window = windows[0]
-            self.window.activate()
-            time.sleep(1)
             
             # Detect workspace and palette areas
             self._detect_ui_areas()
             
+            # Wait for the palette to be redrawn after activation
+            palette = self._palette_region()
+            before = self.poller.frame(palette)
+            self.window.activate()
+            self.poller.wait_until_stable(palette, before=before, timeout=ACTIVATE_TIMEOUT)
+            
             return True
             
         except Exception as e:
             raise PictoBloxNotFoundError(f"Failed to connect to PictoBlox: {e}")
     
+    def _find_pictoblox_windows(self) -> list:
+        """Find PictoBlox windows, trying alternative titles"""
+        for title in ["PictoBlox", "Scratch", "Block Programming"]:
+            windows = self.backend.find_windows(title)
+            if windows:
+                return windows
+        return []
+    
     def _detect_ui_areas(self):
         """Detect workspace and block palette areas"""
         if not self.window:
@@ -134,6 +198,7 @@ class PictoBloxController:
         # Get window bounds
         win_left, win_top = self.window.left, self.window.top
         win_width, win_height = self.window.width, self.window.height
+        self._window_geometry = (win_left, win_top, win_width, win_height)
         
         # Estimate areas based on typical PictoBlox layout
         # Block palette is typically on the left side
@@ -154,135 +219,422 @@ class PictoBloxController:
             'height': win_height - 200
         }
     
+    @property
+    def palette_matcher(self) -> PaletteMatcher:
+        """Template matcher over ui_templates with one pyramid level per DPI scale"""
+        return self._palette_matcher
+    
+    @property
+    def palette_state(self) -> PaletteState:
+        """Cache key for palette locations: (window geometry, category, scroll offset)"""
+        if not self.window:
+            return (None, self.palette_category, self.palette_scroll)
+        geometry = (self.window.left, self.window.top, self.window.width, self.window.height)
+        if geometry != self._window_geometry:
+            # Window moved or resized since the UI areas were measured
+            self._detect_ui_areas()
+        return (geometry, self.palette_category, self.palette_scroll)
+    
+    def _capture_region(self, region: Region) -> np.ndarray:
+        """Grayscale screenshot of a (left, top, width, height) region"""
+        return self.backend.screenshot(region)
+    
+    def _palette_region(self) -> Region:
+        return (
+            self.block_palette_bounds['left'],
+            self.block_palette_bounds['top'],
+            self.block_palette_bounds['width'],
+            self.block_palette_bounds['height']
+        )
+    
+    def _workspace_region(self) -> Region:
+        return (
+            self.workspace_bounds['left'],
+            self.workspace_bounds['top'],
+            self.workspace_bounds['width'],
+            self.workspace_bounds['height']
+        )
+    
+    def _palette_strip_region(self) -> Region:
+        """Thin vertical strip through the block flyout (left of it is the fixed category menu)"""
+        left, top, width, height = self._palette_region()
+        return (left + self._strip_offset(), top, STRIP_WIDTH, height)
+    
+    def _strip_offset(self) -> int:
+        return self.block_palette_bounds['width'] * 2 // 5
+    
+    @staticmethod
+    def _block_region(x: int, y: int, width: int = 100, height: int = 30, margin: int = 20) -> Region:
+        """Screen region around a block, where its drop or edit shows up"""
+        left, top = max(x - margin, 0), max(y - margin, 0)
+        return (left, top, width + 2 * margin, height + 2 * margin)
+    
+    def capture_palette(self) -> np.ndarray:
+        """Take one screenshot of the block palette region"""
+        return self._capture_region(self._palette_region())
+    
+    def select_category(self, category: str) -> bool:
+        """Click a palette category button (template 'category_<name>')"""
+        button = f"category_{category}"
+        location = self.palette_matcher.match(
+            self.capture_palette(), [button],
+            origin=(self.block_palette_bounds['left'], self.block_palette_bounds['top'])
+        ).get(button)
+        if not location:
+            return False
+        strip = self._palette_strip_region()
+        before = self.poller.frame(strip)
+        self.backend.click(location[0], location[1])
+        self.poller.wait_until_stable(strip, before=before)  # Palette scrolls to the category
+        self.palette_category = category
+        self.palette_scroll = 0
+        return True
+    
+    def scroll_palette(self, clicks: int):
+        """Scroll the block palette (positive scrolls up, as in pyautogui)"""
+        bounds = self.block_palette_bounds
+        strip = self._palette_strip_region()
+        before = self.poller.frame(strip)
+        self.backend.scroll(clicks, bounds['left'] + bounds['width'] // 2, bounds['top'] + bounds['height'] // 2)
+        self.poller.wait_until_stable(strip, before=before)
+        self.palette_scroll += clicks
+    
+    @timed("find_blocks_in_palette")
+    def find_blocks_in_palette(self, block_names: List[str],
+                               screenshot: Optional[np.ndarray] = None) -> Dict[str, Tuple[int, int]]:
+        """
+        Find several blocks in the palette with one screenshot and one matching pass
+        
+        Locations are cached per palette state; blocks already located in the
+        current state (checked against a fingerprint of a thin palette strip)
+        skip the screenshot and matching entirely.
+        
+        Args:
+            block_names: Opcodes to look for (those without a template are skipped)
+            screenshot: Saved palette image to match instead of capturing the screen
+        
+        Returns:
+            {opcode: (x, y)} screen coordinates of each block found
+        """
+        names = [name for name in dict.fromkeys(block_names) if name in self.ui_templates]
+        if not names:
+            return {}
+        
+        state = self.palette_state
+        if screenshot is not None:
+            offset = self._strip_offset()
+            strip = screenshot[:, offset:offset + STRIP_WIDTH]
+        else:
+            with self.timer.span("capture"):
+                strip = self._capture_region(self._palette_strip_region())
+        self.palette_cache.validate(state, strip)
+        found, missing = self.palette_cache.lookup(state, names)
+        if not missing:
+            return found
+        
+        if screenshot is None:
+            with self.timer.span("capture"):
+                screenshot = self.capture_palette()
+        origin = (self.block_palette_bounds['left'], self.block_palette_bounds['top'])
+        with self.timer.span("match"):
+            located = self.palette_matcher.match(screenshot, missing, origin=origin)
+        # Misses are only remembered once the display scale is known
+        searched = missing if self.palette_matcher.scale is not None else list(located)
+        self.palette_cache.store(state, searched, located)
+        found.update(located)
+        return found
+    
+    @timed("find_block_in_palette")
     def find_block_in_palette(self, block_name: str) -> Optional[Tuple[int, int]]:
         """Find a block in the block palette using image recognition"""
-        if block_name in self.ui_templates:
-            template_path = self.ui_templates[block_name]
-            
-            # Search within block palette area
-            search_area = (
-                self.block_palette_bounds['left'],
-                self.block_palette_bounds['top'],
-                self.block_palette_bounds['width'],
-                self.block_palette_bounds['height']
-            )
-            
-            try:
-                location = pyautogui.locateOnScreen(template_path, region=search_area, confidence=0.8)
-                if location:
-                    return pyautogui.center(location)
-            except pyautogui.ImageNotFoundException:
-                pass
-        
-        return None
+        return self.find_blocks_in_palette([block_name]).get(block_name)
     
-    def place_block(self, block_name: str, position: Optional[Tuple[int, int]] = None) -> BlockPosition:
-        """Place a block from palette to workspace"""
+    @timed("place_block")
+    def place_block(self, block_name: str, position: Optional[Tuple[int, int]] = None,
+                    palette_location: Optional[Tuple[int, int]] = None) -> BlockPosition:
+        """Place a block from palette to workspace (palette_location skips the palette search)"""
         if not self.window:
             raise PictoBloxNotFoundError("Not connected to PictoBlox")
         
         # Find block in palette
-        block_location = self.find_block_in_palette(block_name)
+        block_location = palette_location or self.find_block_in_palette(block_name)
         if not block_location:
             raise BlockPlacementError(f"Block '{block_name}' not found in palette")
         
-        # Calculate target position in workspace
+        # The block is grabbed at its centre; size it from the template when known
+        width, height = self.palette_matcher.template_size(block_name) or (100, 30)
+        
+        # Calculate target position (top-left corner) in workspace
         if position is None:
             # Auto-position: place below last block or at top-left of workspace
             if self.placed_blocks:
                 last_block = self.placed_blocks[-1]
                 target_x = last_block.x
                 target_y = last_block.y + last_block.height + 10
+                # Within snap range, so PictoBlox attaches it right under the last block
+                settled_y = last_block.y + last_block.height
             else:
                 target_x = self.workspace_bounds['left'] + 50
-                target_y = self.workspace_bounds['top'] + 50
+                target_y = settled_y = self.workspace_bounds['top'] + 50
         else:
             target_x, target_y = position
+            settled_y = target_y
         
         # Drag block from palette to workspace
         try:
-            pyautogui.drag(
-                block_location[0], block_location[1],
-                target_x, target_y,
-                duration=0.5
-            )
+            region = self._block_region(target_x, target_y, width, height)
+            before = self.poller.frame(region)
+            with self.timer.span("drag"):
+                self.backend.drag(
+                    block_location,
+                    (target_x + width // 2, target_y + height // 2),
+                    duration=0.5
+                )
             
             # Create block position record
-            block_pos = BlockPosition(target_x, target_y)
+            block_pos = BlockPosition(target_x, settled_y, width, height)
             self.placed_blocks.append(block_pos)
             
-            time.sleep(0.5)  # Wait for block to settle
+            self.poller.wait_until_stable(region, before=before)  # Wait for block to settle
             return block_pos
             
         except Exception as e:
             raise BlockPlacementError(f"Failed to place block '{block_name}': {e}")
     
+    @timed("connect_blocks")
     def connect_blocks(self, source_block: BlockPosition, target_block: BlockPosition) -> bool:
         """Connect two blocks together"""
         try:
+            region = self._block_region(target_block.x, target_block.y, target_block.width, target_block.height)
+            before = self.poller.frame(region)
             # Drag from source bottom connection to target top connection
-            pyautogui.drag(
-                source_block.bottom_connection[0], source_block.bottom_connection[1],
-                target_block.top_connection[0], target_block.top_connection[1],
-                duration=0.3
-            )
+            with self.timer.span("drag"):
+                self.backend.drag(source_block.bottom_connection, target_block.top_connection, duration=0.3)
             
-            time.sleep(0.3)
+            self.poller.wait_until_stable(region, before=before)
             return True
             
         except Exception as e:
             raise BlockPlacementError(f"Failed to connect blocks: {e}")
     
+    @timed("set_block_parameter")
     def set_block_parameter(self, block: BlockPosition, parameter_name: str, value: Any) -> bool:
         """Set a parameter value for a block"""
         try:
+            region = self._block_region(block.x, block.y, block.width, block.height)
+            
             # Click on the block to select it
-            pyautogui.click(block.center[0], block.center[1])
-            time.sleep(0.2)
+            with self.timer.span("click"):
+                self.backend.click(block.center[0], block.center[1])
+            self.poller.wait_until_stable(region)
             
             # Look for parameter input field (this would need specific UI recognition)
             # For now, we'll use a simple approach of clicking and typing
-            
-            # Double-click to select parameter field
-            pyautogui.doubleClick(block.center[0] + 30, block.center[1])  # Offset for parameter area
-            time.sleep(0.1)
-            
-            # Type the new value
-            pyautogui.typewrite(str(value))
-            pyautogui.press('enter')
-            
+            self._edit_field(region, (block.center[0] + 30, block.center[1]), value)  # Offset for parameter area
             return True
             
         except Exception as e:
             raise BlockPlacementError(f"Failed to set parameter '{parameter_name}' to '{value}': {e}")
     
-    def create_simple_program(self, blocks_data: List[Dict[str, Any]]) -> bool:
-        """Create a simple program from block data"""
+    @timed("edit_field")
+    def _edit_field(self, region: Region, point: Tuple[int, int], value: Any):
+        """Double-click an input field, type the value and confirm"""
+        before = self.poller.frame(region)
+        with self.timer.span("click"):
+            self.backend.double_click(point[0], point[1])
+        self.poller.wait_until_stable(region, before=before)  # Edit field opens
+        with self.timer.span("type"):
+            self.backend.type_text(str(value))
+            self.backend.press('enter')
+    
+    def _block_size(self, opcode: str) -> Tuple[int, int]:
+        return self.palette_matcher.template_size(opcode) or (100, 30)
+    
+    def compile_plan(self, blocks_data: List[Dict[str, Any]]) -> DragPlan:
+        """Lay out a program as a new script in the workspace (see drag_plan.compile_plan)"""
+        if not self.workspace_bounds:
+            raise PictoBloxNotFoundError("Not connected to PictoBlox")
+        x = self.workspace_bounds['left'] + 50
+        y = self.workspace_bounds['top'] + 50 if self._next_script_y is None else self._next_script_y
+        return compile_plan(blocks_data, (x, y), self._block_size)
+    
+    def execute_plan(self, plan: DragPlan, progress: Optional[Progress] = None,
+                     checkpoint: Optional[BuildCheckpoint] = None):
+        """
+        Run a compiled plan: one drag per block onto its snap point, then the field edits
+        
+        With a checkpoint, actions it already records are skipped and each
+        completed action is recorded before progress is called.
+        """
+        opcodes = [block.opcode for block in plan.blocks]
+        first = checkpoint.completed if checkpoint else 0
+        placed = first > 0
         try:
-            placed_blocks = []
-            
-            for i, block_data in enumerate(blocks_data):
-                block_name = block_data.get('opcode', 'unknown')
-                
-                # Place the block
-                block_pos = self.place_block(block_name)
-                placed_blocks.append(block_pos)
-                
-                # Set parameters if any
-                if 'inputs' in block_data and block_data['inputs']:
-                    for param_name, param_value in block_data['inputs'].items():
-                        self.set_block_parameter(block_pos, param_name, param_value)
-                
-                # Connect to previous block (except for the first block)
-                if i > 0:
-                    self.connect_blocks(placed_blocks[i-1], block_pos)
+            for index in range(first, len(plan.actions)):
+                action = plan.actions[index]
+                block = plan.blocks[action.block]
+                if action.kind == "place":
+                    # Served from the palette location cache after the first lookup
+                    palette = self.find_blocks_in_palette(opcodes[action.block:])
+                    self.place_block(block.opcode, position=(block.x, block.y), palette_location=palette.get(block.opcode))
+                    placed = True
+                else:
+                    try:
+                        region = self._block_region(block.x, block.y, block.width, block.height)
+                        self._edit_field(region, action.point, action.value)
+                    except Exception as e:
+                        raise BlockPlacementError(f"Failed to set parameter '{action.name}' to '{action.value}': {e}")
+                if checkpoint:
+                    checkpoint.record(index, self.backend.clock())
+                if progress:
+                    progress(plan, index)
+        finally:
+            # A stopped build still leaves blocks in the plan's area
+            if placed:
+                self._next_script_y = plan.bottom + SCRIPT_GAP
+    
+    def create_simple_program(self, blocks_data: List[Dict[str, Any]], progress: Optional[Progress] = None) -> bool:
+        """
+        Create a simple program from block data (C-blocks may carry a 'substack' list)
+        
+        progress is called after every block placed and parameter set; an
+        AutomationCancelled it raises stops the build and is passed on. The
+        run is checkpointed (self.checkpoint), so a failed or cancelled
+        build can be finished with resume_program.
+        """
+        self.checkpoint = None
+        try:
+            with self.timer.program("create_simple_program", blocks=len(_opcodes(blocks_data))):
+                # Locate every block first; this also fixes the display scale the layout depends on
+                self.find_blocks_in_palette(_opcodes(blocks_data))
+                plan = self.compile_plan(blocks_data)
+                self.last_plan = plan
+                self.checkpoint = BuildCheckpoint(plan, self._workspace_origin())
+                self._run_checkpointed(self.checkpoint, progress)
+            return True
             
+        except AutomationCancelled:
+            raise
+        except Exception as e:
+            logger.error("Failed to create program: %s", e)
+            return False
+    
+    def resume_program(self, checkpoint: Optional[BuildCheckpoint] = None,
+                       progress: Optional[Progress] = None) -> bool:
+        """
+        Finish a failed or cancelled build from its last checkpoint
+        
+        The window and UI areas are detected again first. If the workspace
+        moved meanwhile, the remaining actions move with it.
+        
+        Args:
+            checkpoint: Build to resume (default: the last one, self.checkpoint)
+            progress: As for create_simple_program
+        """
+        checkpoint = checkpoint or self.checkpoint
+        if checkpoint is None or not checkpoint.resumable:
+            logger.error("Nothing to resume")
+            return False
+        
+        self.checkpoint = checkpoint
+        checkpoint.resumes += 1
+        try:
+            with self.timer.program("resume_program", blocks=checkpoint.plan.drag_count,
+                                    resumed_at=checkpoint.completed):
+                self.connect_to_pictoblox()
+                checkpoint.rebase(self._workspace_origin())
+                self.last_plan = checkpoint.plan
+                self._run_checkpointed(checkpoint, progress)
             return True
             
+        except AutomationCancelled:
+            raise
         except Exception as e:
-            print(f"Failed to create program: {e}")
+            checkpoint.status, checkpoint.error = "failed", str(e)
+            logger.error("Failed to resume program: %s", e)
             return False
     
+    def _run_checkpointed(self, checkpoint: BuildCheckpoint, progress: Optional[Progress]):
+        """Execute the rest of a checkpoint's plan, keeping its status up to date"""
+        checkpoint.status, checkpoint.error = "running", None
+        start = self.backend.clock()
+        try:
+            self.execute_plan(checkpoint.plan, progress, checkpoint)
+        except AutomationCancelled:
+            checkpoint.status = "cancelled"
+            raise
+        except Exception as e:
+            checkpoint.status, checkpoint.error = "failed", str(e)
+            raise
+        checkpoint.status = "done"
+        self.last_plan_seconds = self.backend.clock() - start
+    
+    def _workspace_origin(self) -> Tuple[int, int]:
+        return (self.workspace_bounds['left'], self.workspace_bounds['top'])
+    
+    @timed("load_project")
+    def load_project(self, path) -> float:
+        """
+        Open a .sb3/.pbl file through PictoBlox's file-open dialog
+        
+        One scripted dialog interaction: the open shortcut, the file's full
+        path typed into the dialog, Enter. The file replaces the open project.
+        
+        Returns:
+            Seconds from the shortcut until the loaded workspace settled
+        """
+        if not self.window:
+            raise PictoBloxNotFoundError("Not connected to PictoBlox")
+        
+        start = self.backend.clock()
+        workspace = self._workspace_region()
+        before = self.poller.frame(workspace)
+        with self.timer.span("type"):
+            self.backend.hotkey(*OPEN_SHORTCUT)
+        if not self.poller.wait_for(lambda: bool(self.backend.find_windows(FILE_DIALOG_TITLE)), DIALOG_TIMEOUT):
+            raise ProjectLoadError("File-open dialog did not appear")
+        
+        with self.timer.span("type"):
+            self.backend.type_text(str(Path(path).resolve()))
+            self.backend.press('enter')
+        if not self.poller.wait_for_change(workspace, before, timeout=LOAD_TIMEOUT):
+            raise ProjectLoadError(f"PictoBlox did not load {Path(path).name}")
+        self.poller.wait_until_stable(workspace, timeout=LOAD_TIMEOUT)
+        
+        # Blocks placed before belonged to the project that was replaced
+        self.placed_blocks = []
+        self.checkpoint = None
+        self._next_script_y = None
+        self.last_project = Path(path)
+        self.last_load_seconds = self.backend.clock() - start
+        return self.last_load_seconds
+    
+    def inject_program(self, blocks_data: List[Dict[str, Any]], path, progress: Optional[Progress] = None) -> float:
+        """
+        Write a program as a project file and open it in PictoBlox
+        
+        Much faster than create_simple_program for anything beyond a few
+        blocks, but it replaces the open project instead of adding to it.
+        
+        Returns:
+            Seconds spent, writing the file included
+        """
+        if not self.workspace_bounds:
+            raise PictoBloxNotFoundError("Not connected to PictoBlox")
+        start = self.backend.clock()
+        # Same layout the file gets, so scripts added later by dragging go below it
+        origin = (self.workspace_bounds['left'] + SCRIPT_ORIGIN[0], self.workspace_bounds['top'] + SCRIPT_ORIGIN[1])
+        layout = compile_plan(blocks_data, origin, self._block_size)
+        
+        with self.timer.program("inject_program", blocks=len(layout.blocks)):
+            with self.timer.span("write_project"):
+                write_project(path, blocks_data)
+            self.load_project(path)
+        self._next_script_y = layout.bottom + SCRIPT_GAP
+        if progress and layout.actions:
+            progress(layout, len(layout.actions) - 1)  # Everything arrives at once
+        return self.backend.clock() - start
+    
     def get_status(self) -> Dict[str, Any]:
         """Get current status of PictoBlox connection and automation"""
         return {
@@ -290,10 +642,30 @@ class PictoBloxController:
             'window_title': self.window.title if self.window else None,
             'blocks_placed': len(self.placed_blocks),
             'workspace_detected': self.workspace_bounds is not None,
-            'palette_detected': self.block_palette_bounds is not None
+            'palette_detected': self.block_palette_bounds is not None,
+            'display_scale': self._palette_matcher.scale,
+            'palette_cache': self.palette_cache.stats(),
+            'readiness': self.poller.stats(),
+            'action_timings': self.timer.stats(),
+            'checkpoint': self.checkpoint.to_dict() if self.checkpoint else None,
+            'last_plan': dict(self.last_plan.summary(), executed_seconds=round(self.last_plan_seconds or 0.0, 3))
+            if self.last_plan else None,
+            'last_project': {
+                'path': str(self.last_project),
+                'load_seconds': round(self.last_load_seconds or 0.0, 3)
+            } if self.last_project else None
         }
 
 
+def _opcodes(blocks_data: List[Dict[str, Any]]) -> List[str]:
+    """Opcodes of a program in placement order, including C-block substacks"""
+    opcodes = []
+    for block_data in blocks_data:
+        opcodes.append(block_data.get('opcode', 'unknown'))
+        opcodes.extend(_opcodes(block_data.get('substack') or []))
+    return opcodes
+
+
 # Example usage and testing
 if __name__ == "__main__":
     controller = PictoBloxController()
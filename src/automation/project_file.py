@@ -0,0 +1,202 @@
+"""
+Project File - Write generated programs as loadable Scratch 3 projects
+
+Dragging blocks in one at a time costs about a second per block. PictoBlox
+opens Scratch 3 projects directly, and a .pbl file is the same zip
+container. So a whole program can instead be written to disk and loaded
+with a single file-open dialog. write_project builds a real project.json:
+a stage and one sprite, each with an SVG costume. The sprite's blocks are
+linked through next/parent, C-block bodies sit in SUBSTACK inputs and menu
+inputs get shadow blocks. The costumes are stored in the archive under
+their MD5 names, as Scratch expects.
+
+Blocks are the automation dicts built by AutomationMCP
+({"opcode", "inputs", "fields", "substack"}), as for drag_plan.
+"""
+
+import hashlib
+import json
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .drag_plan import C_BLOCKS
+
+PROJECT_SUFFIXES = (".sb3", ".pbl")
+
+# Opcode prefixes the Scratch VM provides without loading an extension
+CORE_CATEGORIES = frozenset({
+    "motion", "looks", "sound", "event", "control", "sensing", "operator", "data", "procedures", "argument"
+})
+
+# Workspace position of the first script; later scripts go below it
+SCRIPT_ORIGIN = (48, 48)
+
+# Primitive input types in project.json
+MATH_NUMBER = 4
+TEXT = 10
+
+# Inputs that take a dropdown shadow block instead of a typed value:
+# (opcode, input) -> (shadow opcode, shadow field)
+MENU_INPUTS = {
+    ("sound_play", "SOUND_MENU"): ("sound_sounds_menu", "SOUND_MENU"),
+    ("sound_playuntildone", "SOUND_MENU"): ("sound_sounds_menu", "SOUND_MENU"),
+    ("motion_goto", "TO"): ("motion_goto_menu", "TO"),
+    ("motion_glideto", "TO"): ("motion_glideto_menu", "TO"),
+    ("motion_pointtowards", "TOWARDS"): ("motion_pointtowards_menu", "TOWARDS"),
+    ("looks_switchcostumeto", "COSTUME"): ("looks_costume", "COSTUME"),
+    ("looks_switchbackdropto", "BACKDROP"): ("looks_backdrops", "BACKDROP"),
+    ("sensing_touchingobject", "TOUCHINGOBJECTMENU"): ("sensing_touchingobjectmenu", "TOUCHINGOBJECTMENU"),
+    ("sensing_keypressed", "KEY_OPTION"): ("sensing_keyoptions", "KEY_OPTION"),
+    ("control_create_clone_of", "CLONE_OPTION"): ("control_create_clone_of_menu", "CLONE_OPTION"),
+}
+
+_BACKDROP_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="480" height="360" viewBox="0 0 480 360">'
+    '<rect width="480" height="360" fill="#ffffff"/></svg>'
+)
+_COSTUME_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="64" height="64" viewBox="0 0 64 64">'
+    '<circle cx="32" cy="32" r="30" fill="#4c97ff" stroke="#3373cc" stroke-width="2"/></svg>'
+)
+
+
+def _costume(name: str, svg: str, center: Tuple[int, int]) -> Tuple[Dict[str, Any], bytes]:
+    data = svg.encode("utf-8")
+    asset_id = hashlib.md5(data).hexdigest()
+    return {
+        "name": name,
+        "dataFormat": "svg",
+        "assetId": asset_id,
+        "md5ext": f"{asset_id}.svg",
+        "rotationCenterX": center[0],
+        "rotationCenterY": center[1]
+    }, data
+
+
+def _primitive(value: Any) -> List[Any]:
+    """[type, value] of a typed-in input; numbers stay numbers, anything else is text"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return [MATH_NUMBER, str(value)]
+    try:
+        float(str(value))
+        return [MATH_NUMBER, str(value)]
+    except ValueError:
+        return [TEXT, str(value)]
+
+
+def build_blocks(blocks_data: List[Dict[str, Any]], origin: Tuple[int, int] = SCRIPT_ORIGIN) -> Dict[str, Dict[str, Any]]:
+    """
+    Serialize one script into project.json's flat block map.
+
+    Block ids are "b1", "b2", ... in placement order (C-block bodies before
+    the block below them, as drag_plan places them); menu shadows get "s1", ...
+    """
+    blocks: Dict[str, Dict[str, Any]] = {}
+    counters = {"b": 0, "s": 0}
+
+    def new_id(prefix: str) -> str:
+        counters[prefix] += 1
+        return f"{prefix}{counters[prefix]}"
+
+    def add_stack(stack: List[Dict[str, Any]], parent: Optional[str]) -> Optional[str]:
+        first = previous = None
+        for block_data in stack:
+            opcode = block_data.get("opcode", "unknown")
+            block_id = new_id("b")
+            block = {
+                "opcode": opcode,
+                "next": None,
+                "parent": previous or parent,
+                "inputs": {},
+                "fields": {},
+                "shadow": False,
+                "topLevel": False
+            }
+            blocks[block_id] = block
+
+            for name, value in (block_data.get("inputs") or {}).items():
+                menu = MENU_INPUTS.get((opcode, name))
+                if menu:
+                    shadow_id = new_id("s")
+                    blocks[shadow_id] = {
+                        "opcode": menu[0],
+                        "next": None,
+                        "parent": block_id,
+                        "inputs": {},
+                        "fields": {menu[1]: [str(value), None]},
+                        "shadow": True,
+                        "topLevel": False
+                    }
+                    block["inputs"][name] = [1, shadow_id]
+                else:
+                    block["inputs"][name] = [1, _primitive(value)]
+            for name, value in (block_data.get("fields") or {}).items():
+                block["fields"][name] = [str(value), None]
+
+            if opcode in C_BLOCKS:
+                inner = add_stack(block_data.get("substack") or [], block_id)
+                if inner:
+                    block["inputs"]["SUBSTACK"] = [2, inner]
+
+            if previous:
+                blocks[previous]["next"] = block_id
+            first = first or block_id
+            previous = block_id
+        return first
+
+    top = add_stack(blocks_data, None)
+    if top:
+        blocks[top].update(topLevel=True, x=origin[0], y=origin[1])
+    return blocks
+
+
+def build_project(blocks_data: List[Dict[str, Any]], sprite_name: str = "Sprite1") -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+    """
+    project.json for a one-sprite project running `blocks_data`.
+
+    Returns:
+        (project, assets) where assets maps archive file names to their bytes
+    """
+    backdrop, backdrop_data = _costume("backdrop1", _BACKDROP_SVG, (240, 180))
+    costume, costume_data = _costume("costume1", _COSTUME_SVG, (32, 32))
+    blocks = build_blocks(blocks_data)
+    extensions = sorted({
+        block["opcode"].split("_", 1)[0] for block in blocks.values()
+        if "_" in block["opcode"] and block["opcode"].split("_", 1)[0] not in CORE_CATEGORIES
+    })
+
+    common = {"variables": {}, "lists": {}, "broadcasts": {}, "comments": {}, "currentCostume": 0,
+              "sounds": [], "volume": 100}
+    stage = dict(common, isStage=True, name="Stage", blocks={}, costumes=[backdrop], layerOrder=0,
+                 tempo=60, videoTransparency=50, videoState="on", textToSpeechLanguage=None)
+    sprite = dict(common, isStage=False, name=sprite_name, blocks=blocks, costumes=[costume], layerOrder=1,
+                  visible=True, x=0, y=0, size=100, direction=90, draggable=False,
+                  rotationStyle="all around")
+    project = {
+        "targets": [stage, sprite],
+        "monitors": [],
+        "extensions": extensions,
+        "meta": {"semver": "3.0.0", "vm": "0.2.0", "agent": "scratchattach-mcp"}
+    }
+    return project, {backdrop["md5ext"]: backdrop_data, costume["md5ext"]: costume_data}
+
+
+def write_project(path: Union[str, Path], blocks_data: List[Dict[str, Any]], sprite_name: str = "Sprite1") -> Path:
+    """Write `blocks_data` as a .sb3 or .pbl archive and return its resolved path"""
+    path = Path(path)
+    if path.suffix.lower() not in PROJECT_SUFFIXES:
+        raise ValueError(f"Project files must end in {' or '.join(PROJECT_SUFFIXES)}: {path.name}")
+    project, assets = build_project(blocks_data, sprite_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("project.json", json.dumps(project, separators=(",", ":")))
+        for name, data in assets.items():
+            archive.writestr(name, data)
+    return path.resolve()
+
+
+def read_project(path: Union[str, Path]) -> Dict[str, Any]:
+    """project.json of a .sb3/.pbl archive"""
+    with zipfile.ZipFile(path) as archive:
+        return json.loads(archive.read("project.json"))
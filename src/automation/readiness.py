@@ -0,0 +1,115 @@
+"""
+Readiness - Wait for the PictoBlox UI to settle instead of sleeping
+
+Every GUI step used to sleep for a fixed, pessimistic time. ScreenPoller
+watches a small screen region instead: optionally until it differs from a
+frame taken before the action (the expected change), then until several
+consecutive captures agree (pixel stability). Each wait ends as soon as the
+UI has settled, and never later than its timeout.
+"""
+
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+Region = Tuple[int, int, int, int]
+
+
+class ScreenPoller:
+    """
+    Poll a screen region until it is stable.
+
+    Args:
+        capture: Function returning a grayscale array for a (left, top, width, height) region
+        interval: Seconds between captures
+        stable_frames: Consecutive unchanged captures that count as settled
+        tolerance: Mean absolute grey-level difference still counted as unchanged
+        timeout: Default upper bound on a wait, in seconds
+        change_timeout: How long to wait for an expected change to appear
+        clock, sleep: Time source, replaceable for replayed or simulated screens
+    """
+
+    def __init__(self, capture: Callable[[Region], np.ndarray], interval: float = 0.03,
+                 stable_frames: int = 2, tolerance: float = 1.0, timeout: float = 2.0,
+                 change_timeout: float = 0.5, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.capture = capture
+        self.interval = interval
+        self.stable_frames = stable_frames
+        self.tolerance = tolerance
+        self.timeout = timeout
+        self.change_timeout = change_timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.waits = 0
+        self.timeouts = 0
+        self.waited = 0.0
+
+    def frame(self, region: Region) -> np.ndarray:
+        return np.asarray(self.capture(region), dtype=np.float32)
+
+    def changed(self, before: np.ndarray, after: np.ndarray) -> bool:
+        return before.shape != after.shape or float(np.abs(after - before).mean()) > self.tolerance
+
+    def wait_for_change(self, region: Region, reference: np.ndarray, timeout: Optional[float] = None) -> bool:
+        """Wait until the region differs from reference; False on timeout"""
+        deadline = self.clock() + (self.change_timeout if timeout is None else timeout)
+        while True:
+            if self.changed(reference, self.frame(region)):
+                return True
+            if self.clock() >= deadline:
+                return False
+            self.sleep(self.interval)
+
+    def wait_until_stable(self, region: Region, before: Optional[np.ndarray] = None,
+                          timeout: Optional[float] = None) -> float:
+        """
+        Wait for the region to settle.
+
+        Args:
+            region: Screen region to watch
+            before: Capture taken before the action; if given, first wait
+                (up to change_timeout) for the region to change
+            timeout: Upper bound for the whole wait (default: self.timeout)
+
+        Returns:
+            Seconds spent waiting
+        """
+        start = self.clock()
+        deadline = start + (self.timeout if timeout is None else timeout)
+        if before is not None:
+            self.wait_for_change(region, before, min(self.change_timeout, max(deadline - self.clock(), 0.0)))
+
+        previous = self.frame(region)
+        stable = 0
+        while stable < self.stable_frames:
+            if self.clock() >= deadline:
+                self.timeouts += 1
+                break
+            self.sleep(self.interval)
+            current = self.frame(region)
+            stable = 0 if self.changed(previous, current) else stable + 1
+            previous = current
+
+        elapsed = self.clock() - start
+        self.waits += 1
+        self.waited += elapsed
+        return elapsed
+
+    def wait_for(self, predicate: Callable[[], bool], timeout: float) -> bool:
+        """Poll an arbitrary condition (e.g. a window existing) until true or timeout"""
+        deadline = self.clock() + timeout
+        while not predicate():
+            if self.clock() >= deadline:
+                self.timeouts += 1
+                return False
+            self.sleep(self.interval)
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'waits': self.waits,
+            'timeouts': self.timeouts,
+            'seconds_waited': round(self.waited, 3)
+        }
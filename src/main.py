@@ -3,6 +3,8 @@
 import os
 import sys
 import json
+import asyncio
+import logging
 from typing import List, Dict, Any, Optional
 
 # Import existing scratchattach functionality
@@ -18,37 +20,70 @@ from programming.block_generator import (
 )
 from programming.parsers import NaturalLanguageParser
 from programming.formatters import TextFormatter, PictoBloxFormatter
+from programming.pipeline import (
+  BATCH_CHUNK_SIZE,
+  BATCH_MAX_SIZE,
+  BatchRequest,
+  GenerationPipeline,
+  OUTPUT_FORMATS,
+  init_worker,
+  run_in_worker,
+  run_batch_in_worker
+)
+from utils.profile_writes import ProfileWriteQueue
+from utils.journal import RequestJournal
+from utils.logging_setup import configure_logging, shutdown_logging
+from utils.metrics import MetricsRegistry
+from utils.profiling import RequestProfiler
+from utils.single_flight import SingleFlight
+from utils.tracing import tracer
+from utils.workers import WorkerPools
 
 # --- REVISED INITIALIZATION SECTION ---
 
+# Log to stderr (or SCRATCH_LOG_FILE) through a background queue; stdout carries the MCP protocol
+configure_logging()
+logger = logging.getLogger("scratchattach_mcp")
+
 # Initialize MCP server
 mcp = FastMCP("scratchattach-edu")
 
-# Initialize the block generation system FIRST (stateless, no Scratch session required)
+# Initialize the block generation system FIRST (stateless, no Scratch session required).
+# One parser and generator are shared by every worker thread; both are safe for concurrent use.
 try:
-  print("Initializing block generation system...")
+  logger.info("Initializing block generation system...")
 
   # These components don't need Scratch authentication
   parser = NaturalLanguageParser()
   generator = BlockGenerator()  # Now loads from knowledge base
   text_formatter = TextFormatter()
   pictoblox_formatter = PictoBloxFormatter()
+  pipeline = GenerationPipeline(parser, generator, text_formatter, pictoblox_formatter)
 
-  print("[OK] Block generation system initialized successfully")
-  print(
-    f"[OK] Available actions: {', '.join(generator.get_available_actions()[:10])}...")
+  logger.info("Block generation system initialized successfully")
+  logger.info("Available actions: %s...", ", ".join(generator.get_available_actions()[:10]))
 
 except Exception as e:
-  print(f"[ERROR] Failed to initialize block generation system: {e}")
-  print("This is critical - block generation features will not work")
+  logger.exception("Failed to initialize block generation system: %s", e)
+  logger.error("This is critical - block generation features will not work")
   # We can still continue for original Scratch profile features
   generator = None
   parser = None
+  pipeline = None
+
+# Blocking Scratch I/O and CPU-heavy generation run off the event loop
+pools = WorkerPools.from_env(process_initializer=init_worker)
 
 # Global variables for Scratch session management (separate concern)
 session = None
 me = None
 
+# Profile edits are debounced so rapid revisions become a single upstream write
+profile_writes = ProfileWriteQueue(
+  debounce_seconds=float(os.environ.get("SCRATCH_PROFILE_DEBOUNCE", "2.0")),
+  max_delay_seconds=float(os.environ.get("SCRATCH_PROFILE_MAX_DELAY", "10.0"))
+)
+
 
 def initialize_scratch_session():
   """Initialize Scratch session - focused only on authentication"""
@@ -58,29 +93,59 @@ def initialize_scratch_session():
   password = os.environ.get("SCRATCH_PASSWORD")
 
   if not username or not password:
-    print("Warning: SCRATCH_USERNAME and SCRATCH_PASSWORD not set")
-    print("Profile management features will be disabled")
+    logger.warning("SCRATCH_USERNAME and SCRATCH_PASSWORD not set")
+    logger.warning("Profile management features will be disabled")
     return False
 
   try:
-    print("Authenticating with Scratch...")
+    logger.info("Authenticating with Scratch...")
     session = sa.login(username, password)
     me = session.get_linked_user()
-    print(f"[OK] Successfully authenticated as {me.username}")
+    logger.info("Successfully authenticated as %s", me.username)
     return True
 
   except Exception as e:
-    print(f"[ERROR] Scratch authentication failed: {e}")
-    print("Profile management features will be disabled")
+    logger.error("Scratch authentication failed: %s", e)
+    logger.warning("Profile management features will be disabled")
     return False
 
+# Concurrent identical tool calls share one in-progress computation
+inflight = SingleFlight()
+
+# Per-tool call counts, latency histograms and per-stage timings
+metrics = MetricsRegistry()
+
+# Sampled parse → generate → format spans, written to SCRATCH_TRACE_FILE
+tracer.configure_from_env()
+
+# cProfile capture for the next N tool invocations, armed by profile_requests
+profiler = RequestProfiler()
+
+# Append-only JSONL record of every tool call (SCRATCH_JOURNAL_FILE), for replay
+journal = RequestJournal.from_env()
+
+
+def _normalize_text_fields(*fields: str):
+  """Build a normalizer that ignores case and whitespace in the given fields"""
+  def normalize(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+      name: " ".join(value.lower().split())
+      if name in fields and isinstance(value, str) else value
+      for name, value in arguments.items()
+    }
+  return normalize
+
 # --- MCP TOOLS SECTION ---
 
 # Educational tools (work without Scratch authentication)
 
 
 @mcp.tool()
-def generate_scratch_blocks(description: str, output_format: str = "text"):
+@journal.record("generate_scratch_blocks")
+@metrics.instrument("generate_scratch_blocks")
+@inflight.coalesce("generate_scratch_blocks", normalize=_normalize_text_fields("description"))
+@profiler.instrument("generate_scratch_blocks")
+async def generate_scratch_blocks(description: str, output_format: str = "text"):
   """
   Convert natural language description to Scratch programming blocks.
   Works without Scratch login - purely educational.
@@ -100,66 +165,14 @@ def generate_scratch_blocks(description: str, output_format: str = "text"):
     }
 
   try:
-    # Parse the natural language input
-    intents = parser.parse(description)
-
-    if not intents:
-      return {
-        "success": False,
-        "message": "I didn't understand that request.",
-        "suggestions": [
-          "make the cat move right 10 steps",
-          "when space key pressed jump up",
-          "play sound when sprite clicked",
-          "make the sprite say hello"
-        ],
-        "available_actions": generator.get_available_actions()
-      }
-
-    # Generate block sequence
-    block_sequence = generator.generate_blocks(intents)
-
-    # Format output based on request
-    formatters = {
-      "text": text_formatter,
-      "pictoblox": pictoblox_formatter,
-      "scratch": pictoblox_formatter  # Use PictoBlox formatter for scratch format too
-    }
-
-    if output_format in formatters:
-      formatted_output = formatters[output_format].format(block_sequence)
-      return {
-        "success": True,
-        "format": output_format,
-        "content": formatted_output,
-        "difficulty": block_sequence.difficulty,
-        "explanation": block_sequence.explanation,
-        "block_count": len(block_sequence.blocks),
-        "filename": f"generated_project.{'pbl' if output_format == 'pictoblox' else 'sb3' if output_format == 'scratch' else 'txt'}"
-      }
-
-    elif output_format == "blocks":
-      # Return raw block data for debugging/advanced use
-      from dataclasses import asdict
-      blocks_data = [asdict(block) for block in block_sequence.blocks]
-      return {
-        "success": True,
-        "format": "blocks",
-        "content": {
-          "blocks": blocks_data,
-          "explanation": block_sequence.explanation,
-          "difficulty": block_sequence.difficulty,
-          "intents_parsed": [asdict(intent) for intent in intents]
-        }
-      }
-
-    else:
-      return {
-        "success": False,
-        "message": f"Unknown output format: {output_format}",
-        "available_formats": ["text", "pictoblox", "scratch", "blocks"]
-      }
-
+    with tracer.trace("generate_scratch_blocks", output_format=output_format) as root_span:
+      result, stages = await pools.run_cpu(
+        profiler.wrap(pipeline.run_timed), description, output_format, process_fn=run_in_worker)
+      root_span.set_attribute("success", result.get("success"))
+      root_span.set_attribute("block_count", result.get("block_count"))
+    for stage, seconds in stages.items():
+      metrics.record_stage(stage, seconds)
+    return result
   except Exception as e:
     return {
       "success": False,
@@ -174,7 +187,62 @@ def generate_scratch_blocks(description: str, output_format: str = "text"):
 
 
 @mcp.tool()
-def explain_scratch_concept(concept: str, age_level: str = "beginner"):
+@journal.record("generate_scratch_blocks_batch")
+@metrics.instrument("generate_scratch_blocks_batch")
+@profiler.instrument("generate_scratch_blocks_batch")
+async def generate_scratch_blocks_batch(descriptions: List[str], output_format: str = "text"):
+  """
+  Convert many natural language descriptions at once (e.g. a classroom worksheet).
+  Identical prompts are generated once. Results come back in input order,
+  each with its own success flag, so one bad prompt doesn't fail the batch.
+
+  Args:
+    descriptions: List of natural language descriptions
+    output_format: "text", "pictoblox", "scratch", or "blocks"
+  """
+  if not generator or not parser:
+    return {
+      "success": False,
+      "message": "Block generation system not available. Check initialization logs.",
+      "error_type": "system_unavailable"
+    }
+
+  batch = BatchRequest(descriptions, BATCH_MAX_SIZE)
+  if batch.error is not None:
+    return batch.error
+
+  keys = batch.keys
+  chunks = [keys[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(keys), BATCH_CHUNK_SIZE)]
+
+  async def run_chunk(chunk: List[str]):
+    return await pools.run_cpu(
+      profiler.wrap(pipeline.run_batch_timed), batch.prompts(chunk), output_format, process_fn=run_batch_in_worker)
+
+  with tracer.trace("generate_scratch_blocks_batch", size=len(descriptions), unique=len(keys)):
+    chunk_results = await asyncio.gather(*[run_chunk(chunk) for chunk in chunks], return_exceptions=True)
+
+  for chunk, outcome in zip(chunks, chunk_results):
+    for position, key in enumerate(chunk):
+      if isinstance(outcome, BaseException):
+        result = {
+          "success": False,
+          "message": f"Error generating blocks: {outcome}",
+          "error_type": "generation_error"
+        }
+      else:
+        result, stages = outcome[position]
+        for stage, seconds in stages.items():
+          metrics.record_stage(stage, seconds)
+      batch.set_result(key, result)
+
+  return batch.response(output_format)
+
+
+@mcp.tool()
+@journal.record("explain_scratch_concept")
+@metrics.instrument("explain_scratch_concept")
+@profiler.instrument("explain_scratch_concept")
+async def explain_scratch_concept(concept: str, age_level: str = "beginner"):
   """
   Explain Scratch programming concepts in kid-friendly language.
   Works without Scratch login - purely educational.
@@ -246,7 +314,10 @@ def explain_scratch_concept(concept: str, age_level: str = "beginner"):
 
 
 @mcp.tool()
-def set_my_about_me(text: str):
+@journal.record("set_my_about_me")
+@metrics.instrument("set_my_about_me")
+@profiler.instrument("set_my_about_me")
+async def set_my_about_me(text: str):
   """Set the 'About me' section of the authenticated user's profile"""
   if not session or not me:
     return {
@@ -256,14 +327,17 @@ def set_my_about_me(text: str):
     }
 
   try:
-    me.set_bio(text)
-    return {"success": True, "message": "Profile updated successfully!"}
+    pending = profile_writes.submit("about_me", text, metrics.timed("scratch_io", me.set_bio))
+    return {"success": True, "message": "Profile update queued.", **pending}
   except Exception as e:
     return {"success": False, "message": str(e), "error_type": "scratch_api_error"}
 
 
 @mcp.tool()
-def set_my_what_im_working_on(text: str):
+@journal.record("set_my_what_im_working_on")
+@metrics.instrument("set_my_what_im_working_on")
+@profiler.instrument("set_my_what_im_working_on")
+async def set_my_what_im_working_on(text: str):
   """Set the 'What I'm working on' section of the authenticated user's profile"""
   if not session or not me:
     return {
@@ -273,14 +347,34 @@ def set_my_what_im_working_on(text: str):
     }
 
   try:
-    me.set_wiwo(text)
-    return {"success": True, "message": "Profile updated successfully!"}
+    pending = profile_writes.submit("what_im_working_on", text, metrics.timed("scratch_io", me.set_wiwo))
+    return {"success": True, "message": "Profile update queued.", **pending}
   except Exception as e:
     return {"success": False, "message": str(e), "error_type": "scratch_api_error"}
 
 
 @mcp.tool()
-def get_user_info(username: str):
+@journal.record("flush_profile_writes")
+@metrics.instrument("flush_profile_writes")
+@profiler.instrument("flush_profile_writes")
+async def flush_profile_writes():
+  """Write any queued profile updates to Scratch immediately"""
+  result = await pools.run_io(profiler.wrap(profile_writes.flush))
+  failed = [field for field, r in result["results"].items() if not r["success"]]
+  return {
+    "success": not failed,
+    "message": f"Flushed {result['flushed']} pending profile update(s)",
+    "results": result["results"],
+    "stats": profile_writes.get_stats()
+  }
+
+
+@mcp.tool()
+@journal.record("get_user_info")
+@metrics.instrument("get_user_info")
+@inflight.coalesce("get_user_info", normalize=_normalize_text_fields("username"))
+@profiler.instrument("get_user_info")
+async def get_user_info(username: str):
   """Get information about a Scratch user"""
   if not session:
     return {
@@ -290,7 +384,7 @@ def get_user_info(username: str):
     }
 
   try:
-    user = session.connect_user(username)
+    user = await pools.run_io(profiler.wrap(metrics.timed("scratch_io", session.connect_user)), username)
     data = {k: v for k, v in user.__dict__.items()
         if not k.startswith("_") and not k.startswith("update")}
     return {"success": True, "data": data}
@@ -302,7 +396,11 @@ def get_user_info(username: str):
 
 
 @mcp.tool()
-def get_project_info(id: int):
+@journal.record("get_project_info")
+@metrics.instrument("get_project_info")
+@inflight.coalesce("get_project_info")
+@profiler.instrument("get_project_info")
+async def get_project_info(id: int):
   """Get information about a Scratch project"""
   if not session:
     return {
@@ -312,7 +410,7 @@ def get_project_info(id: int):
     }
 
   try:
-    project = session.connect_project(id)
+    project = await pools.run_io(profiler.wrap(metrics.timed("scratch_io", session.connect_project)), id)
     data = {k: v for k, v in project.__dict__.items()
         if not k.startswith("_") and not k.startswith("update")}
     return {"success": True, "data": data}
@@ -362,18 +460,26 @@ def _get_related_concepts(concept: str) -> List[str]:
 
 
 @mcp.tool()
-def get_system_status():
+@journal.record("get_system_status")
+@metrics.instrument("get_system_status")
+@profiler.instrument("get_system_status")
+async def get_system_status():
   """Get status of all system components"""
   return {
     "block_generation": {
       "available": generator is not None and parser is not None,
       "available_actions": generator.get_available_actions() if generator else [],
-      "formatters": ["text", "pictoblox", "scratch", "blocks"]
+      "formatters": OUTPUT_FORMATS
     },
     "scratch_authentication": {
       "available": session is not None and me is not None,
-      "username": me.username if me else None
+      "username": me.username if me else None,
+      "profile_writes": profile_writes.get_stats()
     },
+    "request_coalescing": inflight.get_stats(),
+    "worker_pools": pools.get_stats(),
+    "tracing": tracer.get_stats(),
+    "journal": journal.get_stats(),
     "system_info": {
       "mcp_server": "scratchattach-edu",
       "version": "1.0.0"
@@ -381,21 +487,81 @@ def get_system_status():
   }
 
 
+@mcp.tool()
+@journal.record("get_metrics")
+async def get_metrics():
+  """Get per-tool call counts, error counts, latency percentiles and stage timings"""
+  snapshot = metrics.snapshot()
+  metrics_file = os.environ.get("SCRATCH_METRICS_FILE")
+  if metrics_file:
+    try:
+      metrics.write_prometheus(metrics_file)
+      snapshot["prometheus_file"] = metrics_file
+    except OSError as e:
+      snapshot["prometheus_error"] = str(e)
+  return snapshot
+
+
+@mcp.tool()
+@journal.record("profile_requests")
+async def profile_requests(n: int = 10, top: int = 15, wait_seconds: float = 0.0):
+  """
+  Profile the next n tool invocations with cProfile.
+
+  Args:
+    n: Number of upcoming tool calls to capture
+    top: Number of hot functions to return
+    wait_seconds: How long to wait for the n calls before returning (0 = return immediately)
+  """
+  try:
+    report = profiler.start(n, top=top)
+  except (ValueError, RuntimeError) as e:
+    return {"success": False, "message": str(e), "error_type": "profiler_error"}
+
+  if wait_seconds > 0:
+    report = await profiler.wait(wait_seconds)
+  return {"success": True, "profile": report}
+
+
+@mcp.tool()
+@journal.record("get_profile_report")
+async def get_profile_report():
+  """Get the hot functions and profile files from the latest profile_requests run"""
+  report = profiler.report()
+  if report is None:
+    return {"success": False, "message": "No profiling session yet. Call profile_requests first."}
+  return {"success": True, "profile": report}
+
+
 def main():
   """Main entry point for the MCP server"""
   # Try to initialize Scratch session (optional)
   initialize_scratch_session()
 
+  # Optionally publish metrics for a Prometheus textfile collector
+  metrics_file = os.environ.get("SCRATCH_METRICS_FILE")
+  if metrics_file:
+    metrics.start_file_export(metrics_file, float(os.environ.get("SCRATCH_METRICS_INTERVAL", "15")))
+
   # Start the MCP server
-  print("Starting scratchattach-edu MCP server...")
-  print("Educational features available without Scratch login")
+  logger.info("Starting scratchattach-edu MCP server...")
+  logger.info("Educational features available without Scratch login")
   if session and me:
-    print(f"Scratch profile management available for user: {me.username}")
+    logger.info("Scratch profile management available for user: %s", me.username)
   else:
-    print("Scratch profile management disabled (no credentials)")
+    logger.info("Scratch profile management disabled (no credentials)")
 
   # Run the server
-  mcp.run()
+  try:
+    mcp.run()
+  finally:
+    # Don't lose profile edits still waiting out their debounce window
+    profile_writes.close()
+    pools.shutdown()
+    metrics.stop_file_export()
+    journal.close()
+    tracer.close()
+    shutdown_logging()
 
 
 # Main execution
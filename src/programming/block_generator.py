@@ -1,9 +1,17 @@
 # programming/block_generator.py - Revised Data-Driven Implementation
 
+import copy
 import json
+import logging
 import os
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Mapping, Optional, Tuple
 from dataclasses import dataclass
+from types import MappingProxyType
+
+from utils.tracing import span
+from .retrieval import PatternIndex
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class Intent:
@@ -42,8 +50,23 @@ class BlockSequence:
   explanation: str = ""
   difficulty: str = "beginner"
 
+def _detach(value: Any) -> Any:
+  """Copy containers taken from shared knowledge so output never aliases it"""
+  if isinstance(value, (dict, list)):
+    return copy.deepcopy(value)
+  return value
+
 class BlockGenerator:
-  """Converts intents to Scratch block sequences - Data-driven approach"""
+  """
+  Converts intents to Scratch block sequences - Data-driven approach
+
+  Thread safety: one instance may be shared by any number of threads. The
+  knowledge base, pattern library and action mapping are built once and
+  only read afterwards. knowledge_base (down to each category's blocks) and
+  action_mapping are read-only views; the block definitions themselves are
+  only handed out as copies. Every call builds its blocks in locals, so
+  callers can't mutate shared state through what they get back.
+  """
   
   def __init__(self, knowledge_path: str = None, patterns_path: str = None):
     """
@@ -59,20 +82,39 @@ class BlockGenerator:
     if patterns_path is None:
       patterns_path = self._get_default_path("knowledge/patterns.json")
       
-    # Load knowledge base
-    self.knowledge_base = self._load_knowledge_base(knowledge_path)
-    self.block_templates = self.knowledge_base.get("blocks", {})
-    self.categories = self.knowledge_base.get("categories", {})
+    # Load knowledge base and patterns
+    self._setup(self._load_knowledge_base(knowledge_path), self._load_patterns(patterns_path))
     
-    # Load patterns
-    self.pattern_library = self._load_patterns(patterns_path)
+    logger.info("BlockGenerator initialized: %d block categories, %d patterns loaded",
+                len(self.block_templates), len(self.pattern_library))
+  
+  @classmethod
+  def from_loaded(cls, knowledge_base: Dict[str, Any], pattern_library: Dict[str, Any]) -> "BlockGenerator":
+    """Build a generator from already-loaded knowledge (no file I/O or JSON parsing)"""
+    generator = cls.__new__(cls)
+    generator._setup(knowledge_base, pattern_library)
+    return generator
+  
+  def _setup(self, knowledge_base: Mapping[str, Any], pattern_library: Dict[str, Any]):
+    # As loaded (plain dicts), so it can be pickled for spawned workers
+    self._loaded_knowledge = knowledge_base
+    blocks = knowledge_base.get("blocks", {})
+    self.block_templates = MappingProxyType({category: MappingProxyType(dict(category_blocks))
+                                             for category, category_blocks in blocks.items()})
+    self.categories = MappingProxyType(dict(knowledge_base.get("categories", {})))
+    self.knowledge_base = MappingProxyType(dict(knowledge_base, blocks=self.block_templates,
+                                                categories=self.categories))
+    self.pattern_library = pattern_library
     
-    # Create action-to-block mapping from knowledge base
-    self.action_mapping = self._build_action_mapping()
+    # Create action-to-block mapping from knowledge base (read-only once built)
+    self.action_mapping = MappingProxyType(self._build_action_mapping())
     
-    print(f"BlockGenerator initialized:")
-    print(f"  - {len(self.block_templates)} block categories loaded")
-    print(f"  - {len(self.pattern_library)} patterns loaded")
+    # TF-IDF index over pattern descriptions, keywords and explanations (None without numpy)
+    self.pattern_index = PatternIndex.from_library(self.pattern_library)
+  
+  def loaded_knowledge(self) -> Tuple[Mapping[str, Any], Dict[str, Any]]:
+    """Knowledge base and pattern library as loaded; picklable arguments for from_loaded()"""
+    return self._loaded_knowledge, self.pattern_library
   
   def _get_default_path(self, relative_path: str) -> str:
     """Get default path relative to this file"""
@@ -84,16 +126,16 @@ class BlockGenerator:
     try:
       with open(path, 'r', encoding='utf-8') as f:
         knowledge = json.load(f)
-        print(f"Successfully loaded knowledge base from {path}")
+        logger.info("Loaded knowledge base from %s", path)
         return knowledge
     except FileNotFoundError:
-      print(f"Warning: Knowledge base not found at {path}. Using minimal defaults.")
+      logger.warning("Knowledge base not found at %s. Using minimal defaults.", path)
       return self._get_minimal_knowledge_base()
     except json.JSONDecodeError as e:
-      print(f"Error: Could not parse knowledge base at {path}: {e}")
+      logger.error("Could not parse knowledge base at %s: %s", path, e)
       return self._get_minimal_knowledge_base()
     except Exception as e:
-      print(f"Unexpected error loading knowledge base: {e}")
+      logger.exception("Unexpected error loading knowledge base: %s", e)
       return self._get_minimal_knowledge_base()
   
   def _load_patterns(self, path: str) -> Dict[str, Any]:
@@ -101,16 +143,16 @@ class BlockGenerator:
     try:
       with open(path, 'r', encoding='utf-8') as f:
         patterns = json.load(f)
-        print(f"Successfully loaded patterns from {path}")
+        logger.info("Loaded patterns from %s", path)
         return patterns
     except FileNotFoundError:
-      print(f"Warning: Patterns file not found at {path}. Using built-in patterns.")
+      logger.warning("Patterns file not found at %s. Using built-in patterns.", path)
       return self._get_default_patterns()
     except json.JSONDecodeError as e:
-      print(f"Error: Could not parse patterns file at {path}: {e}")
+      logger.error("Could not parse patterns file at %s: %s", path, e)
       return self._get_default_patterns()
     except Exception as e:
-      print(f"Unexpected error loading patterns: {e}")
+      logger.exception("Unexpected error loading patterns: %s", e)
       return self._get_default_patterns()
   
   def _get_minimal_knowledge_base(self) -> Dict[str, Any]:
@@ -236,8 +278,10 @@ class BlockGenerator:
     all_blocks = []
     explanations = []
     
-    for intent in intents:
-      blocks, explanation = self._generate_for_intent(intent)
+    for index, intent in enumerate(intents):
+      with span("generate_intent", index=index, action=intent.action, trigger=intent.trigger) as intent_span:
+        blocks, explanation = self._generate_for_intent(intent)
+        intent_span.set_attribute("block_count", len(blocks))
       all_blocks.extend(blocks)
       explanations.append(explanation)
     
@@ -350,7 +394,7 @@ class BlockGenerator:
             block.inputs[input_name] = value
           else:
             # Use default value from knowledge base
-            block.inputs[input_name] = default_values.get(input_name, "")
+            block.inputs[input_name] = _detach(default_values.get(input_name, ""))
       
       return block
     
@@ -378,14 +422,16 @@ class BlockGenerator:
           if "inputs" in block_info:
             for input_name in block_info["inputs"]:
               if input_name in pattern_params:
-                block.inputs[input_name] = pattern_params[input_name]
+                block.inputs[input_name] = _detach(pattern_params[input_name])
           
           blocks.append(block)
           block_found = True
           break
       
       if not block_found:
-        print(f"Warning: Block {block_id} not found in knowledge base")
+        # Hot path: rate-limited so a broken pattern can't flood the log
+        logger.warning("Block %s not found in knowledge base", block_id,
+                       extra={"rate_limit": True, "pattern": intent.action})
     
     explanation = pattern.get("explanation", f"This creates a {intent.action} effect!")
     return blocks, explanation
@@ -425,11 +471,23 @@ class BlockGenerator:
     actions.extend(list(self.pattern_library.keys()))
     return sorted(actions)
   
+  def find_patterns(self, description: str, k: int = 3, min_score: float = 0.1) -> List[Dict[str, Any]]:
+    """Top-k patterns whose text best matches a free-text description, with cosine scores"""
+    if self.pattern_index is None:
+      return []
+    return self.pattern_index.search(description, k, min_score)
+  
+  def find_patterns_batch(self, descriptions: List[str], k: int = 3, min_score: float = 0.1) -> List[List[Dict[str, Any]]]:
+    """find_patterns() for many descriptions, scored in one vectorized pass"""
+    if self.pattern_index is None:
+      return [[] for _ in descriptions]
+    return self.pattern_index.search_batch(descriptions, k, min_score)
+  
   def get_block_info(self, block_id: str) -> Optional[Dict[str, Any]]:
     """Get detailed information about a specific block"""
     for category, blocks in self.block_templates.items():
       if block_id in blocks:
-        info = blocks[block_id].copy()
+        info = copy.deepcopy(blocks[block_id])
         info["category"] = category
         return info
-    return None
\ No newline at end of file
+    return None
\ No newline at end of file
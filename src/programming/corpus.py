@@ -0,0 +1,262 @@
+# programming/corpus.py - Shard a prompt corpus across a process pool
+
+"""
+Offline bulk generation, e.g. regenerating every worksheet after a
+knowledge-base change.
+
+The input file is split into byte-range shards on line boundaries. Each
+shard is processed by a worker process and written to its own
+shard-NNNNN.jsonl file, plus a manifest.json summary. The knowledge base
+is loaded and compiled once in the parent: with the "fork" start method
+workers inherit it copy-on-write; otherwise it is pickled once and handed
+to each worker, so no worker re-reads or re-parses the JSON files.
+
+Input is one prompt per line, or JSONL with a "description" field (and an
+optional "id") when the file ends in .jsonl.
+
+Usage (from src/):
+  python -m programming.corpus prompts.txt out_dir --workers 8 --format text
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .block_generator import BlockGenerator
+from .parsers import NaturalLanguageParser
+from .pipeline import GenerationPipeline
+
+_READ_BLOCK = 1 << 20
+
+# Set in the parent before workers fork; rebuilt from a pickle in spawned workers
+_shared_pipeline: Optional[GenerationPipeline] = None
+
+
+@dataclass
+class Shard:
+  """A byte range of the input file that starts and ends on line boundaries"""
+  index: int
+  start: int
+  end: int
+  first_line: int
+
+
+def plan_shards(path: str, shard_count: int) -> List[Shard]:
+  """Split the file into up to shard_count line-aligned byte ranges"""
+  size = os.path.getsize(path)
+  if size == 0:
+    return []
+
+  starts = [0]
+  with open(path, "rb") as f:
+    for i in range(1, max(shard_count, 1)):
+      target = size * i // shard_count
+      if target <= starts[-1]:
+        continue
+      f.seek(target)
+      f.readline()  # move to the start of the next line
+      position = f.tell()
+      if position >= size:
+        break
+      if position > starts[-1]:
+        starts.append(position)
+
+    # Number the first line of each shard so output keeps input line numbers
+    shards = []
+    line = 1
+    previous = 0
+    for index, start in enumerate(starts):
+      line += _count_newlines(f, previous, start)
+      end = starts[index + 1] if index + 1 < len(starts) else size
+      shards.append(Shard(index=index, start=start, end=end, first_line=line))
+      previous = start
+  return shards
+
+
+def _count_newlines(f, start: int, end: int) -> int:
+  f.seek(start)
+  count = 0
+  remaining = end - start
+  while remaining > 0:
+    block = f.read(min(_READ_BLOCK, remaining))
+    if not block:
+      break
+    count += block.count(b"\n")
+    remaining -= len(block)
+  return count
+
+
+def _iter_shard(path: str, shard: Shard, jsonl: bool) -> Iterator[Tuple[int, Optional[str], Any]]:
+  """Yield (line number, id, description) for each non-blank line in the shard"""
+  with open(path, "rb") as f:
+    f.seek(shard.start)
+    position = shard.start
+    line_number = shard.first_line
+    while position < shard.end:
+      raw = f.readline()
+      if not raw:
+        break
+      position += len(raw)
+      text = raw.decode("utf-8", errors="replace").strip()
+      if text:
+        if jsonl:
+          try:
+            record = json.loads(text)
+            yield line_number, record.get("id"), record.get("description")
+          except (json.JSONDecodeError, AttributeError):
+            yield line_number, None, None
+        else:
+          yield line_number, None, text
+      line_number += 1
+
+
+def _process_shard(path: str, shard: Shard, output_dir: str, output_format: str, jsonl: bool) -> Dict[str, Any]:
+  """Worker entry point: run one shard through the shared pipeline"""
+  pipeline = _shared_pipeline
+  output_path = os.path.join(output_dir, f"shard-{shard.index:05d}.jsonl")
+  start = time.perf_counter()
+  prompts = succeeded = 0
+
+  with open(output_path, "w", encoding="utf-8") as out:
+    for line_number, record_id, description in _iter_shard(path, shard, jsonl):
+      prompts += 1
+      if isinstance(description, str):
+        result = pipeline.run(description, output_format)
+      else:
+        result = {"success": False, "message": "Line has no description", "error_type": "invalid_input"}
+      if result.get("success"):
+        succeeded += 1
+      entry = {"line": line_number, "id": record_id, "description": description}
+      entry.update(result)
+      out.write(json.dumps(entry, default=str) + "\n")
+
+  return {
+    "shard": shard.index,
+    "output": output_path,
+    "prompts": prompts,
+    "succeeded": succeeded,
+    "failed": prompts - succeeded,
+    "seconds": round(time.perf_counter() - start, 4),
+    "pid": os.getpid()
+  }
+
+
+def _init_spawned_worker(payload: bytes):
+  """Rebuild the pipeline from the parent's already-loaded knowledge base"""
+  global _shared_pipeline
+  knowledge_base, pattern_library = pickle.loads(payload)
+  _shared_pipeline = GenerationPipeline(
+    NaturalLanguageParser(), BlockGenerator.from_loaded(knowledge_base, pattern_library))
+
+
+def process_corpus(input_path: str, output_dir: str, workers: Optional[int] = None, shards: Optional[int] = None,
+                   output_format: str = "text", knowledge_path: str = None, patterns_path: str = None,
+                   start_method: Optional[str] = None) -> Dict[str, Any]:
+  """
+  Generate blocks for every prompt in input_path, writing sharded JSONL output.
+
+  Args:
+    input_path: Text file with one prompt per line, or .jsonl with "description"
+    output_dir: Directory for shard-NNNNN.jsonl files and manifest.json
+    workers: Worker processes (default: CPU count); 1 runs in-process
+    shards: Number of shards (default: 4 per worker, for load balancing)
+    start_method: Multiprocessing start method (default: fork when available)
+
+  Returns:
+    Manifest with totals, throughput and per-shard statistics
+  """
+  global _shared_pipeline
+
+  workers = workers or os.cpu_count() or 1
+  shards = shards or workers * 4
+  jsonl = input_path.endswith(".jsonl")
+  os.makedirs(output_dir, exist_ok=True)
+
+  started = time.perf_counter()
+  generator = BlockGenerator(knowledge_path, patterns_path)
+  pipeline = GenerationPipeline(NaturalLanguageParser(), generator)
+  plan = plan_shards(input_path, shards)
+
+  if start_method is None:
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+
+  _shared_pipeline = pipeline
+  try:
+    if workers == 1:
+      sharing = "in-process"
+      shard_stats = [_process_shard(input_path, shard, output_dir, output_format, jsonl) for shard in plan]
+    else:
+      context = multiprocessing.get_context(start_method)
+      if start_method == "fork":
+        sharing = "fork copy-on-write"
+        # Keep the collector from touching (and so copying) the inherited knowledge base pages
+        gc.freeze()
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+      else:
+        sharing = "pickled once"
+        payload = pickle.dumps(generator.loaded_knowledge())
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                       initializer=_init_spawned_worker, initargs=(payload,))
+      with executor:
+        futures = [executor.submit(_process_shard, input_path, shard, output_dir, output_format, jsonl)
+                   for shard in plan]
+        shard_stats = [future.result() for future in futures]
+  finally:
+    _shared_pipeline = None
+    if start_method == "fork" and workers > 1:
+      gc.unfreeze()
+
+  elapsed = time.perf_counter() - started
+  total = sum(s["prompts"] for s in shard_stats)
+  manifest = {
+    "input": input_path,
+    "output_dir": output_dir,
+    "format": output_format,
+    "workers": workers,
+    "start_method": start_method if workers > 1 else None,
+    "knowledge_sharing": sharing,
+    "shards": len(plan),
+    "prompts": total,
+    "succeeded": sum(s["succeeded"] for s in shard_stats),
+    "failed": sum(s["failed"] for s in shard_stats),
+    "elapsed_seconds": round(elapsed, 4),
+    "throughput_per_second": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+    "shard_stats": shard_stats,
+    "shard_plan": [asdict(shard) for shard in plan]
+  }
+  with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+    json.dump(manifest, f, indent=2)
+  return manifest
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+  arg_parser = argparse.ArgumentParser(description="Generate Scratch blocks for a whole prompt corpus")
+  arg_parser.add_argument("input", help="Prompts file: one per line, or .jsonl with a description field")
+  arg_parser.add_argument("output_dir", help="Directory for sharded JSONL output")
+  arg_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+  arg_parser.add_argument("--shards", type=int, default=None, help="Number of shards (default: 4 per worker)")
+  arg_parser.add_argument("--format", default="text", help="text, pictoblox, scratch or blocks")
+  arg_parser.add_argument("--knowledge", default=None, help="Alternative scratch_blocks.json")
+  arg_parser.add_argument("--patterns", default=None, help="Alternative patterns.json")
+  arg_parser.add_argument("--start-method", default=None, choices=multiprocessing.get_all_start_methods())
+  args = arg_parser.parse_args(argv)
+
+  manifest = process_corpus(args.input, args.output_dir, workers=args.workers, shards=args.shards,
+                            output_format=args.format, knowledge_path=args.knowledge,
+                            patterns_path=args.patterns, start_method=args.start_method)
+  print(f"Processed {manifest['prompts']} prompts in {manifest['elapsed_seconds']}s "
+        f"({manifest['throughput_per_second']}/s) across {manifest['workers']} worker(s), "
+        f"{manifest['shards']} shard(s); {manifest['failed']} failed")
+  return 0 if manifest["failed"] < manifest["prompts"] or not manifest["prompts"] else 1
+
+
+if __name__ == "__main__":
+  sys.exit(main())
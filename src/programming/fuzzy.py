@@ -0,0 +1,102 @@
+# programming/fuzzy.py - Typo-tolerant vocabulary lookup (SymSpell-style delete index)
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+  """
+  Optimal string alignment distance (Levenshtein plus adjacent transpositions,
+  so "jupm" -> "jump" is 1). Returns limit + 1 as soon as the distance is
+  known to exceed limit.
+  """
+  if abs(len(a) - len(b)) > limit:
+    return limit + 1
+  previous2: List[int] = []
+  previous = list(range(len(b) + 1))
+  for i in range(1, len(a) + 1):
+    current = [i] + [0] * len(b)
+    row_min = i
+    for j in range(1, len(b) + 1):
+      cost = 0 if a[i - 1] == b[j - 1] else 1
+      value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+      if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+        value = min(value, previous2[j - 2] + 1)
+      current[j] = value
+      row_min = min(row_min, value)
+    if row_min > limit:
+      return limit + 1
+    previous2, previous = previous, current
+  return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+  """All strings reachable from word by deleting up to `distance` characters"""
+  results = {word}
+  frontier = {word}
+  for _ in range(distance):
+    frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - results
+    results |= frontier
+  return results
+
+
+class FuzzyIndex:
+  """
+  Precomputed delete dictionary over a fixed vocabulary.
+
+  Every term's deletions (up to max_distance characters) map back to the
+  term, so a lookup only generates the query's own deletions and verifies
+  the few terms they hit: cost depends on the query length, not on the
+  vocabulary size. Queries longer than max_word_length and candidate sets
+  larger than max_candidates are cut off, which bounds the worst case.
+  Read-only after construction, so safe to share between threads.
+  """
+
+  def __init__(self, terms: Iterable[str], max_distance: int = 2,
+               max_word_length: int = 24, max_candidates: int = 64):
+    self.max_distance = max_distance
+    self.max_word_length = max_word_length
+    self.max_candidates = max_candidates
+    self.terms = frozenset(t for t in terms if t)
+    deletes: Dict[str, List[str]] = {}
+    for term in sorted(self.terms):
+      for variant in _deletes(term, max_distance):
+        deletes.setdefault(variant, []).append(term)
+    self._deletes: Dict[str, Tuple[str, ...]] = {k: tuple(v) for k, v in deletes.items()}
+
+  def __contains__(self, word: str) -> bool:
+    return word in self.terms
+
+  def __len__(self) -> int:
+    return len(self.terms)
+
+  def lookup(self, word: str, max_distance: Optional[int] = None, limit: int = 3) -> List[Tuple[str, int]]:
+    """Closest terms within max_distance as (term, distance), nearest first, ties alphabetical"""
+    max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+    if word in self.terms:
+      return [(word, 0)]
+    if len(word) > self.max_word_length:
+      return []
+
+    candidates: Set[str] = set()
+    # Fewest deletions first, so a candidate cut-off keeps the closest terms (and is deterministic)
+    for variant in sorted(_deletes(word, max_distance), key=lambda v: (-len(v), v)):
+      candidates.update(self._deletes.get(variant, ()))
+      if len(candidates) >= self.max_candidates:
+        break
+
+    matches = []
+    for term in candidates:
+      distance = edit_distance(word, term, max_distance)
+      if distance <= max_distance:
+        matches.append((term, distance))
+    matches.sort(key=lambda match: (match[1], match[0]))
+    return matches[:limit]
+
+  def correct(self, word: str, max_distance: int) -> Optional[str]:
+    """The unique closest term within max_distance, or None if absent or ambiguous"""
+    matches = self.lookup(word, max_distance, limit=2)
+    if not matches:
+      return None
+    if len(matches) > 1 and matches[1][1] == matches[0][1]:
+      return None
+    return matches[0][0]
@@ -1,7 +1,86 @@
-
+import logging
+import os
 import re
-from typing import List, Optional
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
 from .block_generator import Intent
+from .fuzzy import FuzzyIndex
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z]+")
+
+# Command words besides those in the action/direction patterns, for typo correction
+_TRIGGER_WORDS = ("when", "pressed", "key", "clicked", "flag", "start", "forever", "always",
+                  "continuously", "repeat", "step", "steps", "pixel", "pixels", "second", "seconds")
+_KEY_WORDS = ("space", "enter", "up", "down", "left", "right", "arrow", "any")
+
+# Everyday words one or two edits from a command word ("then" -> "when",
+# "eight" -> "right", "more" -> "move"); these are never treated as typos
+_NOT_TYPOS = frozenset({
+    "then", "than", "them", "more", "love", "movie", "mode", "mole", "bump", "dump", "lump", "pump",
+    "hump", "place", "spice", "side", "ride", "wide", "tide", "hike", "eight", "light", "might",
+    "night", "fight", "sight", "tight", "round", "found", "bound", "wound", "town", "gown",
+    "dawn", "lift", "shot", "shop", "snow", "slow", "shoe", "stay", "sway", "wall", "tall", "tale",
+    "task", "burn", "torn", "skin", "spit", "span", "star", "stars", "stare", "smart", "flat",
+    "flap", "stops", "steep", "stems", "what", "went", "lean", "heap", "leaf", "colon", "dressed",
+    "licked", "array", "narrow", "after", "spare", "spade", "sneak", "steak", "spear", "make",
+    "shows", "saw", "sat", "set", "mow", "tag", "leg", "log",
+})
+
+# Numbers longer than this are ignored rather than converted (int() is quadratic in digits)
+_MAX_NUMBER_DIGITS = 15
+
+# A trigger matcher returns None when it doesn't match, otherwise the captured groups
+TriggerMatcher = Callable[[str], Optional[Tuple[Optional[str], ...]]]
+
+
+def _regex_matcher(pattern: str) -> TriggerMatcher:
+    compiled = re.compile(pattern)
+
+    def match(sentence: str) -> Optional[Tuple[Optional[str], ...]]:
+        found = compiled.search(sentence)
+        return found.groups() if found else None
+    return match
+
+
+def _wrapped_matcher(prefix: str, *suffixes: str) -> TriggerMatcher:
+    """
+    Linear-time equivalent of re.search("prefix(.+)suffix1|prefix(.+)suffix2|...").
+
+    The regex form backtracks its greedy (.+) at every occurrence of the
+    prefix, which is quadratic on long input. Leftmost-greedy semantics are
+    kept exactly: the first prefix on the first line that has a suffix after
+    it, capturing up to that line's last suffix ("." never spans newlines).
+    """
+    def match(sentence: str) -> Optional[Tuple[Optional[str], ...]]:
+        for line in sentence.split("\n"):
+            start = line.find(prefix)
+            if start < 0:
+                continue
+            body = start + len(prefix)
+            for index, suffix in enumerate(suffixes):
+                end = line.rfind(suffix)
+                if end > body:
+                    groups: List[Optional[str]] = [None] * len(suffixes)
+                    groups[index] = line[body:end]
+                    return tuple(groups)
+        return None
+    return match
+
+
+def _to_number(value: str) -> Optional[int]:
+    return int(value) if len(value) <= _MAX_NUMBER_DIGITS else None
+
+
+@dataclass
+class ParseResult:
+    """Intents plus any budget warnings from NaturalLanguageParser.parse_bounded"""
+    intents: List[Intent]
+    truncated: bool = False
+    warnings: List[str] = field(default_factory=list)
+    corrections: List[Dict[str, str]] = field(default_factory=list)
 
 
 class NaturalLanguageParser:
@@ -10,71 +89,263 @@ class NaturalLanguageParser:
     NOTE: This regex-based parser is a starting point. It's effective for simple,
     well-defined commands but will be less robust for complex or ambiguous phrasing.
     Future versions should consider more advanced NLP techniques.
+
+    Thread safety: one instance may be shared by any number of threads. The
+    pattern tables are compiled into tuples at construction and never
+    modified; parse() keeps all of its state in locals and returns new
+    Intent objects on every call.
+
+    Worst case: every pattern runs in time linear in the sentence length,
+    and each request is bounded by max_input_chars (SCRATCH_PARSE_MAX_CHARS)
+    and time_budget_ms (SCRATCH_PARSE_BUDGET_MS). Input over either budget is
+    truncated with a warning instead of failing.
+
+    For long documents, iter_parse() consumes text in chunks and yields each
+    intent as soon as its sentence is complete.
+
+    Typos ("jupm", "mvoe", "spcae") are corrected through a precomputed
+    FuzzyIndex over the command vocabulary, but only for sentences that
+    otherwise find no action or trigger, and for key names. suggest()
+    gives "did you mean" hints for input that still yields nothing.
     """
 
-    def __init__(self):
+    def __init__(self, max_input_chars: Optional[int] = None, time_budget_ms: Optional[float] = None):
+        self.max_input_chars = max_input_chars or int(os.environ.get("SCRATCH_PARSE_MAX_CHARS", "4000"))
+        self.time_budget_ms = time_budget_ms or float(os.environ.get("SCRATCH_PARSE_BUDGET_MS", "100"))
+
         # ... (patterns remain the same as your original)
         self.action_patterns = {
             r"move|walk|go": "move", r"jump|hop|leap": "jump", r"play sound|make noise|sound": "play_sound",
             r"change color|color": "change_color", r"rotate|turn|spin": "rotate", r"hide|disappear": "hide",
             r"show|appear": "show", r"say|speak|talk": "say",
         }
-        self.trigger_patterns = {
-            r"when (.+) pressed|when (.+) key": ("key_press", r"\1|\2"), r"when flag clicked|when start": ("flag_click", None),
-            r"when (.+) clicked": ("sprite_click", r"\1"), r"forever|always|continuously": ("forever", None), r"repeat (\d+)": ("repeat", r"\1"),
-        }
         self.direction_patterns = {
             r"right|to the right": "right", r"left|to the left": "left", r"up|upward": "up", r"down|downward": "down",
         }
 
+        # Compiled once; read-only from here on so parse() can run concurrently
+        self._actions: Tuple[Tuple[Pattern, str], ...] = tuple(
+            (re.compile(p), action) for p, action in self.action_patterns.items())
+        # In priority order. "when (.+) pressed|when (.+) key" and "when (.+) clicked"
+        # are matched without regex backtracking (see _wrapped_matcher).
+        self._triggers: Tuple[Tuple[TriggerMatcher, str], ...] = (
+            (_wrapped_matcher("when ", " pressed", " key"), "key_press"),
+            (_regex_matcher(r"when flag clicked|when start"), "flag_click"),
+            (_wrapped_matcher("when ", " clicked"), "sprite_click"),
+            (_regex_matcher(r"forever|always|continuously"), "forever"),
+            (_regex_matcher(r"repeat (\d+)"), "repeat"),
+        )
+        self._directions: Tuple[Tuple[Pattern, str], ...] = tuple(
+            (re.compile(p), direction) for p, direction in self.direction_patterns.items())
+        # Typo tolerance over the command vocabulary (see _parse_tolerant)
+        self._term_actions: Dict[str, str] = {}
+        for p, action in self.action_patterns.items():
+            for word in _WORD.findall(p):
+                self._term_actions.setdefault(word, action)
+        vocabulary = set(self._term_actions) | set(_TRIGGER_WORDS) | set(_KEY_WORDS)
+        for p in self.direction_patterns:
+            vocabulary.update(_WORD.findall(p))
+        self._vocabulary = FuzzyIndex(vocabulary - {"to", "the"})
+        self._key_vocabulary = FuzzyIndex(_KEY_WORDS)
+        self.example_prompts = {
+            "move": "make the cat move right 10 steps",
+            "jump": "when space key pressed jump up",
+            "play_sound": "play sound when sprite clicked",
+            "say": "make the sprite say hello",
+            "rotate": "turn right when flag clicked",
+            "change_color": "change color when space key pressed",
+            "hide": "hide when sprite clicked",
+            "show": "show when flag clicked",
+        }
+
+        # The lookbehinds stop a match attempt from starting inside a digit or
+        # whitespace run, which would otherwise make long runs quadratic
+        self._number = re.compile(r"(?<!\d)(\d+)\s*(steps?|pixels?|seconds?)")
+        self._conjunction = re.compile(r'(?<!\s)\s+(and|then|and then)\s+')
+
     def parse(self, text: str) -> List[Intent]:
+        return self.parse_bounded(text).intents
+
+    def parse_bounded(self, text: str) -> ParseResult:
+        """parse(), also reporting whether the input was cut short by a budget"""
+        start = time.perf_counter()
+        result = ParseResult(intents=[])
         text = text.lower().strip()
-        intents = []
+
+        if len(text) > self.max_input_chars:
+            cut = text.rfind(" ", 0, self.max_input_chars + 1)
+            if cut < self.max_input_chars // 2:
+                cut = self.max_input_chars
+            result.truncated = True
+            result.warnings.append(
+                f"Input truncated from {len(text)} to {cut} characters (limit {self.max_input_chars}).")
+            logger.warning("Parser input truncated", extra={
+                "rate_limit": True, "input_length": len(text), "kept": cut})
+            text = text[:cut]
+
         sentences = self._split_sentences(text)
-        for sentence in sentences:
-            intent = self._parse_sentence(sentence)
+        deadline = start + self.time_budget_ms / 1000.0
+        for index, sentence in enumerate(sentences):
+            if index and time.perf_counter() > deadline:
+                result.truncated = True
+                result.warnings.append(
+                    f"Parsing stopped after {index} of {len(sentences)} parts "
+                    f"(time budget {self.time_budget_ms:g} ms).")
+                logger.warning("Parser time budget exceeded", extra={
+                    "rate_limit": True, "parsed": index, "sentences": len(sentences)})
+                break
+            intent = self._parse_tolerant(sentence, result.corrections)
+            if intent:
+                result.intents.append(intent)
+        return result
+
+    def suggest(self, text: str, limit: int = 4) -> Dict[str, Any]:
+        """
+        "Did you mean" hints for input that produced no intents.
+
+        Returns did_you_mean ([{"word", "suggestions"}]) for unknown words close
+        to a command word, and example prompts for the actions they point at
+        (general examples when nothing is close).
+        """
+        did_you_mean = []
+        actions: List[str] = []
+        for word in dict.fromkeys(_WORD.findall(text.lower()[:self.max_input_chars])):
+            if len(word) < 3 or word in self._vocabulary or word in _NOT_TYPOS:
+                continue
+            matches = self._vocabulary.lookup(word, 1 if len(word) <= 4 else 2, limit=2)
+            if not matches:
+                continue
+            did_you_mean.append({"word": word, "suggestions": [term for term, _ in matches]})
+            for term, _ in matches:
+                action = self._term_actions.get(term)
+                if action and action not in actions:
+                    actions.append(action)
+            if len(did_you_mean) >= limit:
+                break
+        examples = [self.example_prompts[a] for a in actions if a in self.example_prompts]
+        if not examples:
+            examples = list(self.example_prompts.values())
+        return {"did_you_mean": did_you_mean, "examples": examples[:limit]}
+
+    def iter_parse(self, chunks: Iterable[str]) -> Iterator[Intent]:
+        """
+        Incremental parse(): yield intents as each sentence boundary is seen.
+
+        chunks can be any iterable of strings, e.g. an open text file. Only the
+        unfinished sentence is buffered, so memory doesn't grow with the
+        document; a sentence longer than max_input_chars is cut at a word
+        boundary with a warning. For text within max_input_chars,
+        list(iter_parse([text])) == parse(text).
+        """
+        pending = ""
+        for chunk in chunks:
+            if not chunk:
+                continue
+            pending = (pending + chunk.lower()) if pending else chunk.lower().lstrip()
+            sentences, pending = self._take_sentences(pending)
+            for sentence in sentences:
+                intent = self._parse_tolerant(sentence, [])
+                if intent:
+                    yield intent
+        for sentence in self._split_sentences(pending.strip()):
+            intent = self._parse_tolerant(sentence, [])
             if intent:
-                intents.append(intent)
-        return intents
+                yield intent
+
+    def _take_sentences(self, buffer: str) -> Tuple[List[str], str]:
+        """Split off the sentences that are certainly complete; return them and the rest"""
+        end = 0
+        for match in self._conjunction.finditer(buffer):
+            # A boundary at the very end may still grow (more whitespace, "and then")
+            if match.end() < len(buffer):
+                end = match.end()
+        sentences = self._split_sentences(buffer[:end]) if end else []
+        rest = buffer[end:]
+
+        while len(rest) > self.max_input_chars:
+            cut = rest.rfind(" ", 0, self.max_input_chars + 1)
+            if cut < self.max_input_chars // 2:
+                cut = self.max_input_chars
+            logger.warning("Streaming parser cut an over-long sentence", extra={
+                "rate_limit": True, "kept": cut})
+            sentences.append(rest[:cut].strip())
+            rest = rest[cut:].lstrip()
+        return sentences, rest
 
     def _split_sentences(self, text: str) -> List[str]:
         """REVISED: Improved sentence splitting to better handle conjunctions."""
         # Use regex to split on common conjunctions, preserving them for context if needed later.
-        sentences = re.split(r'\s+(and|then|and then)\s+', text)
+        sentences = self._conjunction.split(text)
         # Filter out the conjunctions and any empty strings
         return [s.strip() for s in sentences if s and s not in ['and', 'then', 'and then']]
 
+    def _parse_tolerant(self, sentence: str, corrections: List[Dict[str, str]]) -> Optional[Intent]:
+        """_parse_sentence(), retried with typos corrected when it finds no action or trigger"""
+        intent = self._parse_sentence(sentence)
+        if intent is None or intent.trigger is None:
+            fixed, changes = self._correct_typos(sentence, self._vocabulary)
+            if changes:
+                retry = self._parse_sentence(fixed)
+                if retry is not None and (intent is None or retry.trigger is not None):
+                    intent = retry
+                    corrections.extend(changes)
+        if intent is not None and intent.trigger == "key_press" and "key" in intent.parameters:
+            key, changes = self._correct_typos(intent.parameters["key"], self._key_vocabulary)
+            if changes:
+                intent.parameters["key"] = key
+                corrections.extend(changes)
+        return intent
+
+    def _correct_typos(self, text: str, index: FuzzyIndex) -> Tuple[str, List[Dict[str, str]]]:
+        changes: List[Dict[str, str]] = []
+
+        def replace(match) -> str:
+            word = match.group(0)
+            if len(word) < 4 or word in index or word in _NOT_TYPOS:
+                return word
+            # One edit for short words, two for long ones; ambiguous matches are left alone
+            term = index.correct(word, 1 if len(word) <= 7 else 2)
+            if term is None:
+                return word
+            changes.append({"word": word, "correction": term})
+            return term
+
+        return _WORD.sub(replace, text), changes
+
     def _parse_sentence(self, sentence: str) -> Optional[Intent]:
         # ... (parsing logic remains the same)
         intent = Intent(action="unknown")
-        for pattern, action in self.action_patterns.items():
-            if re.search(pattern, sentence):
+        for pattern, action in self._actions:
+            if pattern.search(sentence):
                 intent.action = action
                 break
-        for pattern, (trigger_type, param_pattern) in self.trigger_patterns.items():
-            match = re.search(pattern, sentence)
-            if match:
+        for matcher, trigger_type in self._triggers:
+            groups = matcher(sentence)
+            if groups is not None:
                 intent.trigger = trigger_type
-                if param_pattern and match.groups():
-                    param_value = next((g for g in match.groups() if g), None)
-                    if param_value:
-                        if trigger_type == "key_press":
-                            intent.parameters["key"] = param_value
-                        elif trigger_type == "repeat":
-                            intent.parameters["times"] = int(param_value)
+                param_value = next((g for g in groups if g), None)
+                if param_value:
+                    if trigger_type == "key_press":
+                        intent.parameters["key"] = param_value
+                    elif trigger_type == "repeat":
+                        times = _to_number(param_value)
+                        if times is not None:
+                            intent.parameters["times"] = times
                 break
-        for pattern, direction in self.direction_patterns.items():
-            if re.search(pattern, sentence):
+        for pattern, direction in self._directions:
+            if pattern.search(sentence):
                 intent.parameters["direction"] = direction
                 break
-        number_match = re.search(
-            r"(\d+)\s*(steps?|pixels?|seconds?)", sentence)
+        number_match = self._number.search(sentence)
         if number_match:
             value, unit = number_match.groups()
-            if "step" in unit or "pixel" in unit:
-                intent.parameters["steps"] = int(value)
+            number = _to_number(value)
+            if number is None:
+                pass
+            elif "step" in unit or "pixel" in unit:
+                intent.parameters["steps"] = number
             elif "second" in unit:
-                intent.parameters["seconds"] = float(value)
+                intent.parameters["seconds"] = float(number)
         if "direction" in intent.parameters and "steps" not in intent.parameters:
             intent.parameters["steps"] = 10
         return intent if intent.action != "unknown" else None
@@ -0,0 +1,283 @@
+# programming/pipeline.py - Parse → generate → format pipeline behind generate_scratch_blocks
+
+import os
+import time
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.tracing import span
+from .block_generator import BlockGenerator
+from .parsers import NaturalLanguageParser
+from .formatters import TextFormatter, PictoBloxFormatter
+
+OUTPUT_FORMATS = ["text", "pictoblox", "scratch", "blocks"]
+
+# Limits for generate_scratch_blocks_batch
+BATCH_MAX_SIZE = int(os.environ.get("SCRATCH_BATCH_MAX_SIZE", "1000"))
+BATCH_CHUNK_SIZE = int(os.environ.get("SCRATCH_BATCH_CHUNK_SIZE", "25"))
+
+
+class BatchRequest:
+  """
+  Validation, deduplication and response assembly for generate_scratch_blocks_batch.
+
+  The MCP tool and the journal replayer both build their response through
+  this class, so a replayed batch hashes the same as the recorded one.
+  error is the whole response when the batch is rejected outright.
+  """
+
+  def __init__(self, descriptions: Any, max_size: int = BATCH_MAX_SIZE):
+    self.descriptions = descriptions
+    self.error: Optional[Dict[str, Any]] = None
+    # Normalized prompt → indexes of the descriptions that share it
+    self.unique: Dict[str, List[int]] = {}
+    self._results: List[Optional[Dict[str, Any]]] = []
+
+    if not isinstance(descriptions, list):
+      self.error = {"success": False, "message": "descriptions must be a list of strings", "error_type": "invalid_input"}
+      return
+    if len(descriptions) > max_size:
+      self.error = {
+        "success": False,
+        "message": f"Batch too large: {len(descriptions)} prompts (max {max_size})",
+        "error_type": "batch_too_large"
+      }
+      return
+
+    # Deduplicate on the same normalization used for request coalescing
+    self._results = [None] * len(descriptions)
+    for index, description in enumerate(descriptions):
+      if not isinstance(description, str):
+        self._results[index] = {
+          "success": False,
+          "message": "Each description must be a string",
+          "error_type": "invalid_input"
+        }
+        continue
+      self.unique.setdefault(" ".join(description.lower().split()), []).append(index)
+
+  @property
+  def keys(self) -> List[str]:
+    return list(self.unique)
+
+  def prompts(self, keys: List[str]) -> List[str]:
+    """The description to generate for each normalized key"""
+    return [self.descriptions[self.unique[key][0]] for key in keys]
+
+  def set_result(self, key: str, result: Dict[str, Any]):
+    """Use one generated result for every description sharing key"""
+    for index in self.unique[key]:
+      self._results[index] = dict(result)
+
+  def response(self, output_format: str) -> Dict[str, Any]:
+    """The tool response, with results in input order"""
+    if self.error is not None:
+      return self.error
+    items = [dict(result, index=index, description=self.descriptions[index])
+             for index, result in enumerate(self._results)]
+    succeeded = sum(1 for item in items if item.get("success"))
+    return {
+      "success": True,
+      "format": output_format,
+      "count": len(items),
+      "unique_prompts": len(self.unique),
+      "succeeded": succeeded,
+      "failed": len(items) - succeeded,
+      "results": items
+    }
+
+
+class GenerationPipeline:
+  """Turns a natural language description into a formatted tool result"""
+
+  def __init__(self, parser: NaturalLanguageParser, generator: BlockGenerator,
+               text_formatter: TextFormatter = None, pictoblox_formatter: PictoBloxFormatter = None):
+    self.parser = parser
+    self.generator = generator
+    self.text_formatter = text_formatter or TextFormatter()
+    self.pictoblox_formatter = pictoblox_formatter or PictoBloxFormatter()
+
+  def run(self, description: str, output_format: str = "text") -> Dict[str, Any]:
+    """Parse, generate and format; errors are reported in the result, not raised"""
+    return self.run_timed(description, output_format)[0]
+
+  def run_timed(self, description: str, output_format: str = "text",
+                related_patterns: Optional[List[Dict[str, Any]]] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Like run(), but also return seconds spent in each stage (parse/retrieve/generate/format).
+
+    related_patterns skips the retrieve stage when the caller already scored
+    the description (run_batch_timed scores a whole chunk at once).
+    """
+    stages: Dict[str, float] = {}
+    notes: Dict[str, list] = {"warnings": [], "corrections": [], "related_patterns": []}
+    result = self._run_stages(description, output_format, stages, notes, related_patterns)
+    # warnings: parser budgets cut the input short; corrections: typos read as command words;
+    # related_patterns: patterns.json entries whose text best matches the description. They are
+    # suggestions only; generation still works from the parsed intents
+    result.update((key, value) for key, value in notes.items() if value)
+    return result, stages
+
+  def _run_stages(self, description: str, output_format: str, stages: Dict[str, float],
+                  notes: Dict[str, list], related_patterns: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    clock = time.perf_counter
+    try:
+      # Parse the natural language input
+      start = clock()
+      with span("parse", input_length=len(description)) as parse_span:
+        parsed = self.parser.parse_bounded(description)
+        intents = parsed.intents
+        notes["warnings"].extend(parsed.warnings)
+        notes["corrections"].extend(parsed.corrections)
+        parse_span.set_attribute("intent_count", len(intents))
+        parse_span.set_attribute("truncated", parsed.truncated)
+      stages["parse"] = clock() - start
+
+      if related_patterns is None:
+        start = clock()
+        with span("retrieve") as retrieve_span:
+          related_patterns = self.generator.find_patterns(description)
+          retrieve_span.set_attribute("matches", len(related_patterns))
+        stages["retrieve"] = clock() - start
+      notes["related_patterns"].extend(related_patterns)
+
+      if not intents:
+        hints = self.parser.suggest(description)
+        result = {
+          "success": False,
+          "message": "I didn't understand that request.",
+          "suggestions": hints["examples"],
+          "available_actions": self.generator.get_available_actions()
+        }
+        if hints["did_you_mean"]:
+          first = hints["did_you_mean"][0]
+          result["message"] += f" Did you mean \"{first['suggestions'][0]}\" instead of \"{first['word']}\"?"
+          result["did_you_mean"] = hints["did_you_mean"]
+        return result
+
+      # Generate block sequence
+      start = clock()
+      with span("generate", intent_count=len(intents)) as generate_span:
+        block_sequence = self.generator.generate_blocks(intents)
+        generate_span.set_attribute("block_count", len(block_sequence.blocks))
+      stages["generate"] = clock() - start
+
+      # Format output based on request
+      formatters = {
+        "text": self.text_formatter,
+        "pictoblox": self.pictoblox_formatter,
+        "scratch": self.pictoblox_formatter  # Use PictoBlox formatter for scratch format too
+      }
+
+      if output_format in formatters:
+        start = clock()
+        with span("format", format=output_format) as format_span:
+          formatted_output = formatters[output_format].format(block_sequence)
+          format_span.set_attribute("output_size", len(formatted_output))
+        stages["format"] = clock() - start
+        return {
+          "success": True,
+          "format": output_format,
+          "content": formatted_output,
+          "difficulty": block_sequence.difficulty,
+          "explanation": block_sequence.explanation,
+          "block_count": len(block_sequence.blocks),
+          "filename": f"generated_project.{'pbl' if output_format == 'pictoblox' else 'sb3' if output_format == 'scratch' else 'txt'}"
+        }
+
+      elif output_format == "blocks":
+        # Return raw block data for debugging/advanced use
+        start = clock()
+        with span("format", format=output_format):
+          blocks_data = [asdict(block) for block in block_sequence.blocks]
+          intents_data = [asdict(intent) for intent in intents]
+        stages["format"] = clock() - start
+        return {
+          "success": True,
+          "format": "blocks",
+          "content": {
+            "blocks": blocks_data,
+            "explanation": block_sequence.explanation,
+            "difficulty": block_sequence.difficulty,
+            "intents_parsed": intents_data
+          }
+        }
+
+      else:
+        return {
+          "success": False,
+          "message": f"Unknown output format: {output_format}",
+          "available_formats": OUTPUT_FORMATS
+        }
+
+    except Exception as e:
+      return {
+        "success": False,
+        "message": f"Error generating blocks: {str(e)}",
+        "error_type": "generation_error",
+        "debug_info": {
+          "input": description,
+          "format": output_format,
+          "generator_available": self.generator is not None
+        }
+      }
+
+  def run_batch_timed(self, descriptions: List[str], output_format: str = "text") -> List[Tuple[Dict[str, Any], Dict[str, float]]]:
+    """run_timed() for each description, in order; one pool task per chunk instead of per prompt"""
+    try:
+      related = self.generator.find_patterns_batch(descriptions)
+    except Exception:
+      # e.g. a non-string description; let run_timed report it per prompt
+      related = [None] * len(descriptions)
+    return [self.run_timed(description, output_format, patterns)
+            for description, patterns in zip(descriptions, related)]
+
+  def run_batch(self, descriptions: List[str], output_format: str = "text",
+                max_size: int = BATCH_MAX_SIZE) -> Dict[str, Any]:
+    """The generate_scratch_blocks_batch response, computed in this thread"""
+    batch = BatchRequest(descriptions, max_size)
+    if batch.error is None:
+      keys = batch.keys
+      for key, (result, _) in zip(keys, self.run_batch_timed(batch.prompts(keys), output_format)):
+        batch.set_result(key, result)
+    return batch.response(output_format)
+
+  def stream(self, chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming generation for long documents: parse chunks incrementally and
+    yield one entry per intent (its blocks and explanation) as soon as its
+    sentence is complete, before the rest of the text has been read.
+    """
+    for index, intent in enumerate(self.parser.iter_parse(chunks)):
+      block_sequence = self.generator.generate_blocks([intent])
+      yield {
+        "index": index,
+        "intent": asdict(intent),
+        "blocks": [asdict(block) for block in block_sequence.blocks],
+        "explanation": block_sequence.explanation
+      }
+
+
+# --- Process pool support ---
+# Worker processes build their own pipeline once, in the pool initializer.
+
+_worker_pipeline: Optional[GenerationPipeline] = None
+
+
+def init_worker():
+  """Process pool initializer: load the knowledge base once per worker"""
+  global _worker_pipeline
+  if _worker_pipeline is None:
+    _worker_pipeline = GenerationPipeline(NaturalLanguageParser(), BlockGenerator())
+
+
+def run_in_worker(description: str, output_format: str = "text") -> Tuple[Dict[str, Any], Dict[str, float]]:
+  """Picklable entry point for running the pipeline in a worker process; same return as run_timed"""
+  init_worker()
+  return _worker_pipeline.run_timed(description, output_format)
+
+
+def run_batch_in_worker(descriptions: List[str], output_format: str = "text") -> List[Tuple[Dict[str, Any], Dict[str, float]]]:
+  """Picklable batch entry point; same return as run_batch_timed"""
+  init_worker()
+  return _worker_pipeline.run_batch_timed(descriptions, output_format)
@@ -0,0 +1,210 @@
+# programming/retrieval.py - TF-IDF retrieval of patterns for free-text descriptions
+
+"""
+Ranks the patterns in patterns.json against a description by cosine
+similarity of TF-IDF vectors built from each pattern's name, description,
+keywords and explanation.
+
+The pattern matrix is stored column-wise (for each term, the patterns that
+contain it and their weights), so scoring a query is one gather over its
+terms' postings plus one np.bincount: a sparse matrix-vector product in
+NumPy with no per-pattern Python loop. score_batch() does the same for many
+queries at once by offsetting each query's pattern ids into a single
+bincount. NumPy is optional; without it pattern retrieval is disabled.
+
+Results are reported next to the generated blocks (related_patterns), not
+generated from: a pattern's blocks nest loop bodies under "contains", which
+ScratchBlock sequences can't represent yet.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+  import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+  np = None
+
+_TOKEN = re.compile(r"[a-z]+")
+_STOPWORDS = frozenset({
+  "a", "an", "and", "the", "to", "of", "it", "its", "is", "in", "on", "your", "you", "make", "makes",
+  "this", "that", "with", "for", "we", "then", "just", "like", "up", "at", "by", "be", "so", "as"
+})
+
+# Keywords are the most deliberate text in a pattern, so they count double
+_KEYWORD_WEIGHT = 2
+
+# Upper bound on queries x patterns scored in one bincount (memory of the dense score block)
+_BATCH_CELLS = 4_000_000
+
+
+def tokenize(text: str) -> List[str]:
+  """Lowercase word tokens without stopwords, with a naive plural strip"""
+  tokens = []
+  for token in _TOKEN.findall(text.lower()):
+    if token in _STOPWORDS:
+      continue
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+      token = token[:-1]
+    tokens.append(token)
+  return tokens
+
+
+def pattern_documents(pattern_library: Dict[str, Any]) -> List[Dict[str, Any]]:
+  """
+  Flatten patterns.json into retrievable documents.
+
+  Patterns are grouped by category ({"simple_patterns": {"jump": {...}}});
+  a pattern is any entry with a description. Ungrouped patterns (as in the
+  built-in defaults) are accepted too.
+  """
+  documents = []
+
+  def add(name: str, category: Optional[str], pattern: Dict[str, Any]):
+    keywords = pattern.get("keywords", [])
+    text = " ".join([name.replace("_", " "), pattern.get("description", ""), pattern.get("explanation", "")]
+                    + list(keywords) * _KEYWORD_WEIGHT)
+    documents.append({
+      "name": name,
+      "category": category,
+      "description": pattern.get("description", ""),
+      "difficulty": pattern.get("difficulty"),
+      "text": text
+    })
+
+  for key, value in pattern_library.items():
+    if not isinstance(value, dict):
+      continue
+    if "description" in value:
+      add(key, None, value)
+      continue
+    for name, pattern in value.items():
+      if isinstance(pattern, dict) and "description" in pattern:
+        add(name, key, pattern)
+  return documents
+
+
+class PatternIndex:
+  """
+  Precomputed sparse TF-IDF index over pattern documents.
+
+  Read-only after construction, so one instance can be shared by all
+  request threads (and inherited by forked corpus workers).
+  """
+
+  def __init__(self, documents: List[Dict[str, Any]]):
+    if np is None:
+      raise RuntimeError("PatternIndex requires numpy")
+    self.documents = documents
+    counts = [Counter(tokenize(doc["text"])) for doc in documents]
+
+    document_frequency: Counter = Counter()
+    for count in counts:
+      document_frequency.update(count.keys())
+    self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(sorted(document_frequency))}
+    n = len(documents)
+    # Smoothed IDF as in scikit-learn: terms in every document still count a little
+    self.idf = np.array([math.log((1 + n) / (1 + document_frequency[term])) + 1.0 for term in self.vocabulary])
+
+    # Build normalized rows, then transpose into per-term postings (CSC layout)
+    postings: List[List[Tuple[int, float]]] = [[] for _ in self.vocabulary]
+    for doc_id, count in enumerate(counts):
+      weights = {self.vocabulary[t]: (1.0 + math.log(c)) * self.idf[self.vocabulary[t]] for t, c in count.items()}
+      norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+      for column, weight in weights.items():
+        postings[column].append((doc_id, weight / norm))
+
+    lengths = np.array([len(p) for p in postings], dtype=np.int64)
+    self._term_ptr = np.zeros(len(postings) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=self._term_ptr[1:])
+    self._term_docs = np.array([d for p in postings for d, _ in p], dtype=np.int64)
+    self._term_weights = np.array([w for p in postings for _, w in p], dtype=np.float64)
+
+  @classmethod
+  def from_library(cls, pattern_library: Dict[str, Any]) -> Optional["PatternIndex"]:
+    """Index a loaded patterns.json, or None when numpy is unavailable"""
+    if np is None:
+      return None
+    return cls(pattern_documents(pattern_library))
+
+  def __len__(self) -> int:
+    return len(self.documents)
+
+  def _query(self, text: str) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Sparse query vector as (term columns, normalized weights)"""
+    count = Counter(t for t in tokenize(text) if t in self.vocabulary)
+    if not count:
+      return np.empty(0, dtype=np.int64), np.empty(0)
+    columns = np.fromiter((self.vocabulary[t] for t in count), dtype=np.int64, count=len(count))
+    weights = (1.0 + np.log(np.fromiter(count.values(), dtype=np.float64, count=len(count)))) * self.idf[columns]
+    return columns, weights / np.linalg.norm(weights)
+
+  def _gather(self, columns: "np.ndarray", weights: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Concatenate the postings of the given terms, each scaled by its query weight"""
+    starts = self._term_ptr[columns]
+    lengths = self._term_ptr[columns + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+      return np.empty(0, dtype=np.int64), np.empty(0)
+    # Index of every posting entry: each term's start, plus 0..length-1
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths) + np.arange(total)
+    return self._term_docs[offsets], self._term_weights[offsets] * np.repeat(weights, lengths)
+
+  def score(self, text: str) -> "np.ndarray":
+    """Cosine similarity of the text against every pattern"""
+    columns, weights = self._query(text)
+    docs, values = self._gather(columns, weights)
+    return np.bincount(docs, weights=values, minlength=len(self.documents))
+
+  def score_batch(self, texts: List[str]) -> "np.ndarray":
+    """Scores for many texts at once: a (len(texts), patterns) array"""
+    n = len(self.documents)
+    rows = max(1, _BATCH_CELLS // max(n, 1))
+    blocks = []
+    for first in range(0, len(texts), rows):
+      chunk = texts[first:first + rows]
+      queries = [self._query(text) for text in chunk]
+      lengths = np.array([len(columns) for columns, _ in queries], dtype=np.int64)
+      if lengths.sum() == 0:
+        blocks.append(np.zeros((len(chunk), n)))
+        continue
+      columns = np.concatenate([columns for columns, _ in queries])
+      weights = np.concatenate([weights for _, weights in queries])
+      query_ids = np.repeat(np.arange(len(chunk)), lengths)
+
+      starts = self._term_ptr[columns]
+      posting_lengths = self._term_ptr[columns + 1] - starts
+      docs, values = self._gather(columns, weights)
+      cells = np.repeat(query_ids, posting_lengths) * n + docs
+      blocks.append(np.bincount(cells, weights=values, minlength=len(chunk) * n).reshape(len(chunk), n))
+    return np.vstack(blocks) if blocks else np.zeros((0, n))
+
+  def top_k(self, scores: "np.ndarray", k: int = 3, min_score: float = 0.0) -> List[Dict[str, Any]]:
+    """Best k patterns for one row of scores, highest first"""
+    k = min(k, len(scores))
+    if k <= 0:
+      return []
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.lexsort((best, -scores[best]))]
+    results = []
+    for doc_id in best:
+      score = float(scores[doc_id])
+      if score <= min_score:
+        break
+      doc = self.documents[doc_id]
+      results.append({
+        "pattern": doc["name"],
+        "category": doc["category"],
+        "score": round(score, 4),
+        "description": doc["description"]
+      })
+    return results
+
+  def search(self, text: str, k: int = 3, min_score: float = 0.0) -> List[Dict[str, Any]]:
+    return self.top_k(self.score(text), k, min_score)
+
+  def search_batch(self, texts: Iterable[str], k: int = 3, min_score: float = 0.0) -> List[List[Dict[str, Any]]]:
+    texts = list(texts)
+    return [self.top_k(row, k, min_score) for row in self.score_batch(texts)]
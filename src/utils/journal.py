@@ -0,0 +1,162 @@
+# utils/journal.py - Append-only JSONL journal of tool invocations
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+def result_hash(result: Any) -> str:
+  """Stable short hash of a tool result, used to detect output drift on replay"""
+  encoded = json.dumps(result, sort_keys=True, default=str).encode("utf-8")
+  return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class RequestJournal:
+  """
+  Records every tool invocation as one JSONL line.
+
+  Requests only enqueue a small tuple; hashing, encoding and file writes
+  happen on a background thread. If the queue is full the entry is
+  dropped and counted rather than blocking the request.
+  """
+
+  def __init__(self, path: Optional[str], flush_interval: float = 1.0, max_queue: int = 10000):
+    self.path = path
+    self.flush_interval = flush_interval
+    self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+    self._writer: Optional[threading.Thread] = None
+    self._lock = threading.Lock()
+    self._stop = threading.Event()
+    self.written = 0
+    self.dropped = 0
+    self.write_errors = 0
+
+  @classmethod
+  def from_env(cls) -> "RequestJournal":
+    """Journal to SCRATCH_JOURNAL_FILE; disabled when it is not set"""
+    return cls(os.environ.get("SCRATCH_JOURNAL_FILE"),
+               flush_interval=float(os.environ.get("SCRATCH_JOURNAL_FLUSH_INTERVAL", "1.0")))
+
+  @property
+  def enabled(self) -> bool:
+    return bool(self.path)
+
+  def record(self, tool: str):
+    """Decorator journaling each call of an async tool handler"""
+    def decorator(fn):
+      if not self.enabled:
+        return fn
+      signature = inspect.signature(fn)
+
+      @functools.wraps(fn)
+      async def wrapper(*args, **kwargs):
+        started = time.time()
+        start = time.perf_counter()
+        result: Any = None
+        try:
+          result = await fn(*args, **kwargs)
+          return result
+        finally:
+          bound = signature.bind(*args, **kwargs)
+          bound.apply_defaults()
+          self.log(tool, dict(bound.arguments), started, time.perf_counter() - start, result)
+      return wrapper
+    return decorator
+
+  def log(self, tool: str, arguments: Dict[str, Any], started: float, duration: float, result: Any):
+    """Queue one entry for the background writer (never blocks)"""
+    if not self.enabled:
+      return
+    self._ensure_writer()
+    try:
+      self._queue.put_nowait((tool, arguments, started, duration, result))
+    except queue.Full:
+      with self._lock:
+        self.dropped += 1
+
+  def close(self, timeout: float = 5.0):
+    """Write out everything queued and stop the writer thread"""
+    self._stop.set()
+    writer = self._writer
+    if writer is not None:
+      writer.join(timeout=timeout)
+
+  def get_stats(self) -> Dict[str, Any]:
+    return {
+      "enabled": self.enabled,
+      "path": self.path,
+      "written": self.written,
+      "dropped": self.dropped,
+      "queued": self._queue.qsize(),
+      "write_errors": self.write_errors
+    }
+
+  def _ensure_writer(self):
+    if self._writer is not None and self._writer.is_alive():
+      return
+    with self._lock:
+      if self._writer is None or not self._writer.is_alive():
+        self._stop.clear()
+        self._writer = threading.Thread(target=self._run, name="request-journal", daemon=True)
+        self._writer.start()
+
+  def _run(self):
+    while True:
+      batch = self._drain(timeout=self.flush_interval)
+      if batch:
+        self._write(batch)
+      elif self._stop.is_set() and self._queue.empty():
+        return
+
+  def _drain(self, timeout: float) -> List[tuple]:
+    batch = []
+    try:
+      batch.append(self._queue.get(timeout=timeout))
+      while len(batch) < 1000:
+        batch.append(self._queue.get_nowait())
+    except queue.Empty:
+      pass
+    return batch
+
+  def _write(self, batch: List[tuple]):
+    lines = []
+    for tool, arguments, started, duration, result in batch:
+      entry = {
+        "ts": round(started, 6),
+        "tool": tool,
+        "arguments": arguments,
+        "duration_ms": round(duration * 1000, 3),
+        "success": result.get("success") if isinstance(result, dict) else None,
+        "result_hash": result_hash(result)
+      }
+      lines.append(json.dumps(entry, default=str) + "\n")
+    try:
+      with open(self.path, "a", encoding="utf-8") as f:
+        f.writelines(lines)
+    except OSError:
+      with self._lock:
+        self.write_errors += 1
+      return
+    with self._lock:
+      self.written += len(lines)
+
+
+def read_journal(path: str) -> List[Dict[str, Any]]:
+  """Load journal entries, skipping lines that fail to parse (e.g. a torn last line)"""
+  entries = []
+  with open(path, "r", encoding="utf-8") as f:
+    for line in f:
+      line = line.strip()
+      if not line:
+        continue
+      try:
+        entries.append(json.loads(line))
+      except json.JSONDecodeError:
+        continue
+  return entries
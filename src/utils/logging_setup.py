@@ -0,0 +1,149 @@
+# utils/logging_setup.py - Queue-based, non-blocking structured logging
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_STANDARD_ATTRS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+class StructuredFormatter(logging.Formatter):
+  """
+  Formats records as text with trailing key=value fields, or as JSON lines.
+
+  Fields are whatever was passed through extra= (e.g. extra={"block_id": ...}).
+  """
+
+  def __init__(self, json_output: bool = False):
+    super().__init__()
+    self.json_output = json_output
+
+  def format(self, record: logging.LogRecord) -> str:
+    fields = {k: v for k, v in record.__dict__.items()
+              if k not in _STANDARD_ATTRS and not k.startswith("_") and k != "rate_limit"}
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+    timestamp += f".{int(record.msecs):03d}"
+
+    if self.json_output:
+      entry = {
+        "ts": timestamp,
+        "level": record.levelname,
+        "logger": record.name,
+        "message": record.getMessage()
+      }
+      entry.update(fields)
+      if record.exc_info:
+        entry["exception"] = self.formatException(record.exc_info)
+      return json.dumps(entry, default=str)
+
+    line = f"{timestamp} {record.levelname:<7} {record.name}: {record.getMessage()}"
+    if fields:
+      line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+    if record.exc_info:
+      line += "\n" + self.formatException(record.exc_info)
+    return line
+
+
+class RateLimitFilter(logging.Filter):
+  """
+  Lets at most `burst` records per message template through per `interval`.
+
+  Only records logged with extra={"rate_limit": True} are limited, so
+  hot-path warnings can't flood the log while startup messages are untouched.
+  The first record after a quiet period reports how many were suppressed.
+  """
+
+  def __init__(self, burst: int = 5, interval: float = 60.0):
+    super().__init__()
+    self.burst = burst
+    self.interval = interval
+    self._lock = threading.Lock()
+    self._windows: Dict[Tuple[str, str], list] = {}
+    self.suppressed_total = 0
+
+  def filter(self, record: logging.LogRecord) -> bool:
+    if not getattr(record, "rate_limit", False):
+      return True
+
+    key = (record.name, str(record.msg))
+    now = time.monotonic()
+    with self._lock:
+      window = self._windows.get(key)
+      if window is None or now - window[0] >= self.interval:
+        suppressed = window[2] if window else 0
+        self._windows[key] = [now, 1, 0]
+        if suppressed:
+          record.suppressed = suppressed
+        return True
+      if window[1] < self.burst:
+        window[1] += 1
+        return True
+      window[2] += 1
+      self.suppressed_total += 1
+      return False
+
+
+def configure_logging(level: Optional[str] = None, log_file: Optional[str] = None,
+                      log_format: Optional[str] = None) -> logging.handlers.QueueHandler:
+  """
+  Route all logging through a queue drained by a background thread.
+
+  Defaults come from SCRATCH_LOG_LEVEL (INFO), SCRATCH_LOG_FILE (stderr when
+  unset) and SCRATCH_LOG_FORMAT ("text" or "json"). Output never goes to
+  stdout, which the stdio MCP transport uses for the protocol.
+  """
+  global _listener, _queue_handler
+
+  level = (level or os.environ.get("SCRATCH_LOG_LEVEL", "INFO")).upper()
+  log_file = log_file or os.environ.get("SCRATCH_LOG_FILE")
+  log_format = (log_format or os.environ.get("SCRATCH_LOG_FORMAT", "text")).lower()
+
+  if log_file:
+    target: logging.Handler = logging.FileHandler(log_file, encoding="utf-8")
+  else:
+    target = logging.StreamHandler(sys.stderr)
+  target.setFormatter(StructuredFormatter(json_output=log_format == "json"))
+
+  shutdown_logging()
+
+  _queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+  _queue_handler.addFilter(RateLimitFilter(
+    burst=int(os.environ.get("SCRATCH_LOG_RATE_BURST", "5")),
+    interval=float(os.environ.get("SCRATCH_LOG_RATE_INTERVAL", "60"))
+  ))
+  _listener = logging.handlers.QueueListener(_queue_handler.queue, target, respect_handler_level=True)
+  _listener.start()
+
+  root = logging.getLogger()
+  for handler in list(root.handlers):
+    root.removeHandler(handler)
+  root.addHandler(_queue_handler)
+  root.setLevel(getattr(logging, level, logging.INFO))
+  return _queue_handler
+
+
+def shutdown_logging():
+  """Flush queued records and stop the background listener"""
+  global _listener, _queue_handler
+  if _listener is not None:
+    _listener.stop()
+    for handler in _listener.handlers:
+      handler.close()
+    _listener = None
+  if _queue_handler is not None:
+    logging.getLogger().removeHandler(_queue_handler)
+    _queue_handler = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,267 @@
+# utils/metrics.py - Per-tool call counters, latency histograms and stage timings
+
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# Log-spaced bucket upper bounds from 0.1ms to ~60s (25% apart)
+DEFAULT_BUCKETS: List[float] = [0.0001 * 1.25 ** i for i in range(60)]
+
+
+class Histogram:
+  """
+  Fixed-bucket latency histogram.
+
+  Recording is a bisect plus a few integer updates, so it is cheap enough for
+  every tool call. Quantiles are interpolated within the matching bucket.
+  """
+
+  def __init__(self, buckets: Optional[List[float]] = None):
+    self.bounds = list(buckets or DEFAULT_BUCKETS)
+    self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+    self.count = 0
+    self.total = 0.0
+    self.max = 0.0
+    self._lock = threading.Lock()
+
+  def observe(self, seconds: float):
+    index = bisect.bisect_left(self.bounds, seconds)
+    with self._lock:
+      self.counts[index] += 1
+      self.count += 1
+      self.total += seconds
+      if seconds > self.max:
+        self.max = seconds
+
+  def quantile(self, q: float) -> float:
+    """Estimate the q-th quantile (0..1) in seconds"""
+    with self._lock:
+      counts = list(self.counts)
+      count = self.count
+      maximum = self.max
+    if not count:
+      return 0.0
+
+    rank = q * count
+    cumulative = 0
+    for index, bucket_count in enumerate(counts):
+      if cumulative + bucket_count >= rank and bucket_count:
+        lower = self.bounds[index - 1] if index > 0 else 0.0
+        upper = self.bounds[index] if index < len(self.bounds) else maximum
+        fraction = (rank - cumulative) / bucket_count
+        return min(lower + (upper - lower) * fraction, maximum)
+      cumulative += bucket_count
+    return maximum
+
+  def summary(self) -> Dict[str, Any]:
+    """Count plus p50/p95/p99, mean and max latency in milliseconds"""
+    count = self.count
+    return {
+      "count": count,
+      "p50_ms": round(self.quantile(0.50) * 1000, 3),
+      "p95_ms": round(self.quantile(0.95) * 1000, 3),
+      "p99_ms": round(self.quantile(0.99) * 1000, 3),
+      "mean_ms": round(self.total / count * 1000, 3) if count else 0.0,
+      "max_ms": round(self.max * 1000, 3)
+    }
+
+
+class ToolStats:
+  """Call, error and latency statistics for one tool"""
+
+  def __init__(self):
+    self.calls = 0
+    self.errors = 0
+    self.latency = Histogram()
+
+
+class MetricsRegistry:
+  """Collects per-tool and per-stage metrics for the MCP server"""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._tools: Dict[str, ToolStats] = {}
+    self._stages: Dict[str, Histogram] = {}
+    self._started = time.time()
+    self._exporter: Optional[threading.Thread] = None
+    self._export_stop = threading.Event()
+
+  # --- Recording ---
+
+  def record_call(self, tool: str, seconds: float, error: bool = False):
+    stats = self._tools.get(tool)
+    if stats is None:
+      with self._lock:
+        stats = self._tools.setdefault(tool, ToolStats())
+    with self._lock:
+      stats.calls += 1
+      if error:
+        stats.errors += 1
+    stats.latency.observe(seconds)
+
+  def record_stage(self, stage: str, seconds: float):
+    histogram = self._stages.get(stage)
+    if histogram is None:
+      with self._lock:
+        histogram = self._stages.setdefault(stage, Histogram())
+    histogram.observe(seconds)
+
+  @contextmanager
+  def stage(self, name: str):
+    """Time a block of code as one occurrence of a pipeline stage"""
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.record_stage(name, time.perf_counter() - start)
+
+  def timed(self, stage: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a blocking callable so each call is recorded under stage"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+      with self.stage(stage):
+        return fn(*args, **kwargs)
+    return wrapper
+
+  def instrument(self, tool: str):
+    """Decorator recording call count, errors and latency for an MCP tool"""
+    def decorator(fn):
+      if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+          start = time.perf_counter()
+          error = True
+          try:
+            result = await fn(*args, **kwargs)
+            error = _is_error_result(result)
+            return result
+          finally:
+            self.record_call(tool, time.perf_counter() - start, error)
+        return async_wrapper
+
+      @functools.wraps(fn)
+      def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        error = True
+        try:
+          result = fn(*args, **kwargs)
+          error = _is_error_result(result)
+          return result
+        finally:
+          self.record_call(tool, time.perf_counter() - start, error)
+      return wrapper
+    return decorator
+
+  # --- Reporting ---
+
+  def snapshot(self) -> Dict[str, Any]:
+    """Get all metrics as a JSON-serializable dict"""
+    uptime = max(time.time() - self._started, 1e-9)
+    with self._lock:
+      tools = dict(self._tools)
+      stages = dict(self._stages)
+
+    return {
+      "uptime_seconds": round(uptime, 3),
+      "tools": {
+        name: {
+          "calls": stats.calls,
+          "errors": stats.errors,
+          "calls_per_second": round(stats.calls / uptime, 4),
+          "latency": stats.latency.summary()
+        }
+        for name, stats in sorted(tools.items())
+      },
+      "stages": {
+        name: dict(histogram.summary(), total_ms=round(histogram.total * 1000, 3))
+        for name, histogram in sorted(stages.items())
+      }
+    }
+
+  def to_prometheus(self) -> str:
+    """Render metrics in the Prometheus text exposition format"""
+    with self._lock:
+      tools = dict(self._tools)
+      stages = dict(self._stages)
+
+    lines = [
+      "# HELP scratch_mcp_tool_calls_total Tool invocations.",
+      "# TYPE scratch_mcp_tool_calls_total counter"
+    ]
+    for name, stats in sorted(tools.items()):
+      lines.append(f'scratch_mcp_tool_calls_total{{tool="{name}"}} {stats.calls}')
+    lines += [
+      "# HELP scratch_mcp_tool_errors_total Tool invocations that failed.",
+      "# TYPE scratch_mcp_tool_errors_total counter"
+    ]
+    for name, stats in sorted(tools.items()):
+      lines.append(f'scratch_mcp_tool_errors_total{{tool="{name}"}} {stats.errors}')
+
+    lines += [
+      "# HELP scratch_mcp_tool_latency_seconds Tool call latency.",
+      "# TYPE scratch_mcp_tool_latency_seconds histogram"
+    ]
+    for name, stats in sorted(tools.items()):
+      lines += _prometheus_histogram("scratch_mcp_tool_latency_seconds", f'tool="{name}"', stats.latency)
+
+    lines += [
+      "# HELP scratch_mcp_stage_seconds Time spent per pipeline stage.",
+      "# TYPE scratch_mcp_stage_seconds histogram"
+    ]
+    for name, histogram in sorted(stages.items()):
+      lines += _prometheus_histogram("scratch_mcp_stage_seconds", f'stage="{name}"', histogram)
+
+    return "\n".join(lines) + "\n"
+
+  def write_prometheus(self, path: str):
+    """Atomically write the Prometheus text file (for textfile collectors)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+      f.write(self.to_prometheus())
+    os.replace(tmp_path, path)
+
+  def start_file_export(self, path: str, interval_seconds: float = 15.0):
+    """Rewrite the Prometheus text file every interval_seconds in the background"""
+    if self._exporter and self._exporter.is_alive():
+      return
+
+    def export_loop():
+      while not self._export_stop.wait(interval_seconds):
+        try:
+          self.write_prometheus(path)
+        except OSError:
+          pass
+
+    self._export_stop.clear()
+    self._exporter = threading.Thread(target=export_loop, name="metrics-export", daemon=True)
+    self._exporter.start()
+
+  def stop_file_export(self):
+    self._export_stop.set()
+
+
+def _is_error_result(result: Any) -> bool:
+  """Tool results report failures as dicts with "success": False"""
+  return isinstance(result, dict) and result.get("success") is False
+
+
+def _prometheus_histogram(metric: str, labels: str, histogram: Histogram) -> List[str]:
+  with histogram._lock:
+    counts = list(histogram.counts)
+    count = histogram.count
+    total = histogram.total
+
+  lines = []
+  cumulative = 0
+  for bound, bucket_count in zip(histogram.bounds, counts):
+    cumulative += bucket_count
+    lines.append(f'{metric}_bucket{{{labels},le="{bound:.6g}"}} {cumulative}')
+  lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {count}')
+  lines.append(f'{metric}_sum{{{labels}}} {total:.6f}')
+  lines.append(f'{metric}_count{{{labels}}} {count}')
+  return lines
@@ -0,0 +1,219 @@
+# utils/profile_writes.py - Debounced write-behind queue for Scratch profile fields
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingWrite:
+  """Latest value waiting to be written for one profile field"""
+  value: str
+  writer: Callable[[str], Any]
+  first_submitted: float
+  due: float
+  updates: int = 1
+  attempts: int = 0
+  error: Optional[str] = None
+
+
+class ProfileWriteQueue:
+  """
+  Coalesces rapid updates to the same profile field into one upstream write.
+
+  Each submit() restarts the debounce window for that field; the latest value
+  wins. A field is never held back longer than max_delay_seconds after its
+  first pending update, so a stream of edits still reaches Scratch.
+
+  The caller has already been told its update is pending, so a failed
+  background write is retried with exponential backoff. Once max_retries is
+  used up the value is logged and kept as failed; flush() tries it again.
+  """
+
+  def __init__(self, debounce_seconds: float = 2.0, max_delay_seconds: float = 10.0,
+               max_retries: int = 3, retry_backoff_seconds: float = 1.0,
+               clock: Callable[[], float] = time.monotonic):
+    self.debounce_seconds = debounce_seconds
+    self.max_delay_seconds = max(max_delay_seconds, debounce_seconds)
+    self.max_retries = max_retries
+    self.retry_backoff_seconds = retry_backoff_seconds
+    self._clock = clock
+
+    self._cond = threading.Condition()
+    # Serializes upstream writes so a flush can never overtake the worker
+    self._write_lock = threading.Lock()
+    self._pending: Dict[str, PendingWrite] = {}
+    # Values whose retries ran out; kept until written or superseded
+    self._failed: Dict[str, PendingWrite] = {}
+    self._worker: Optional[threading.Thread] = None
+    self._closed = False
+
+    self._submitted = 0
+    self._coalesced = 0
+    self._upstream_writes = 0
+    self._upstream_errors = 0
+    self._retries = 0
+    self._writes_by_field: Dict[str, int] = {}
+    self._last_errors: Dict[str, str] = {}
+    self._recent_writes: Deque[float] = deque()
+
+  def submit(self, field: str, value: str, writer: Callable[[str], Any]) -> Dict[str, Any]:
+    """Queue a write of value to field; returns immediately with pending status"""
+    with self._cond:
+      if self._closed:
+        raise RuntimeError("Profile write queue is closed")
+
+      now = self._clock()
+      self._submitted += 1
+      self._failed.pop(field, None)
+      existing = self._pending.get(field)
+      if existing:
+        self._coalesced += 1
+        existing.value = value
+        existing.writer = writer
+        existing.updates += 1
+        existing.attempts = 0
+        existing.due = min(now + self.debounce_seconds,
+                           existing.first_submitted + self.max_delay_seconds)
+        pending = existing
+      else:
+        pending = PendingWrite(value=value, writer=writer, first_submitted=now,
+                               due=now + self.debounce_seconds)
+        self._pending[field] = pending
+
+      self._ensure_worker()
+      self._cond.notify_all()
+
+      return {
+        "field": field,
+        "status": "pending",
+        "coalesced_updates": pending.updates,
+        "write_in_seconds": round(max(0.0, pending.due - now), 3)
+      }
+
+  def flush(self, field: Optional[str] = None) -> Dict[str, Any]:
+    """Write pending and failed values now (all fields, or only the given one)"""
+    with self._write_lock:
+      with self._cond:
+        if field is None:
+          batch = dict(self._failed, **self._pending)
+          self._pending, self._failed = {}, {}
+        elif field in self._pending or field in self._failed:
+          failed = self._failed.pop(field, None)
+          batch = {field: self._pending.pop(field, failed)}
+        else:
+          batch = {}
+      results = {}
+      for name, pending in batch.items():
+        results[name] = self._write(name, pending)
+        if not results[name]["success"]:
+          with self._cond:
+            if name not in self._pending:  # a newer value was submitted meanwhile
+              self._failed[name] = pending
+
+    return {"flushed": len(results), "results": results}
+
+  def pending_fields(self) -> Dict[str, str]:
+    """Get the values currently waiting to be written"""
+    with self._cond:
+      return {name: pending.value for name, pending in self._pending.items()}
+
+  def get_stats(self) -> Dict[str, Any]:
+    """Get submission and upstream write counters"""
+    with self._cond:
+      now = self._clock()
+      while self._recent_writes and now - self._recent_writes[0] > 60:
+        self._recent_writes.popleft()
+      return {
+        "submitted": self._submitted,
+        "coalesced": self._coalesced,
+        "upstream_writes": self._upstream_writes,
+        "upstream_errors": self._upstream_errors,
+        "retries": self._retries,
+        "upstream_writes_last_minute": len(self._recent_writes),
+        "writes_by_field": dict(self._writes_by_field),
+        "pending": sorted(self._pending),
+        "last_errors": dict(self._last_errors),
+        "failed": {name: {"value": p.value, "error": p.error, "attempts": p.attempts}
+                   for name, p in self._failed.items()},
+        "debounce_seconds": self.debounce_seconds
+      }
+
+  def close(self) -> Dict[str, Any]:
+    """Stop the background worker after writing everything still pending"""
+    with self._cond:
+      self._closed = True
+      self._cond.notify_all()
+    worker = self._worker
+    if worker and worker is not threading.current_thread():
+      worker.join(timeout=5)
+    return self.flush()
+
+  def _ensure_worker(self):
+    if self._worker is None or not self._worker.is_alive():
+      self._worker = threading.Thread(target=self._run, name="profile-write-queue", daemon=True)
+      self._worker.start()
+
+  def _run(self):
+    while True:
+      with self._cond:
+        while not self._closed:
+          if self._pending:
+            wait = min(p.due for p in self._pending.values()) - self._clock()
+            if wait <= 0:
+              break
+            self._cond.wait(wait)
+          else:
+            self._cond.wait()
+        if self._closed:
+          return
+
+      with self._write_lock:
+        with self._cond:
+          now = self._clock()
+          due = [name for name, p in self._pending.items() if p.due <= now]
+          batch = {name: self._pending.pop(name) for name in due}
+        for name, pending in batch.items():
+          if not self._write(name, pending)["success"]:
+            self._retry_later(name, pending)
+
+  def _retry_later(self, field: str, pending: PendingWrite):
+    """Requeue a failed background write with backoff, or give up on it"""
+    with self._cond:
+      if field in self._pending:
+        return  # a newer value is already queued
+      if pending.attempts <= self.max_retries:
+        self._retries += 1
+        pending.due = self._clock() + self.retry_backoff_seconds * 2 ** (pending.attempts - 1)
+        self._pending[field] = pending
+        self._cond.notify_all()
+        return
+      self._failed[field] = pending
+    logger.warning("Giving up on profile write to %s after %d attempts: %s",
+                   field, pending.attempts, pending.error)
+
+  def _write(self, field: str, pending: PendingWrite) -> Dict[str, Any]:
+    """Perform one upstream write; caller must hold _write_lock"""
+    pending.attempts += 1
+    try:
+      pending.writer(pending.value)
+    except Exception as e:
+      pending.error = str(e)
+      with self._cond:
+        self._upstream_errors += 1
+        self._last_errors[field] = str(e)
+      return {"success": False, "message": str(e), "coalesced_updates": pending.updates,
+              "attempts": pending.attempts}
+
+    with self._cond:
+      self._upstream_writes += 1
+      self._writes_by_field[field] = self._writes_by_field.get(field, 0) + 1
+      self._recent_writes.append(self._clock())
+      self._last_errors.pop(field, None)
+      self._failed.pop(field, None)
+    return {"success": True, "coalesced_updates": pending.updates}
@@ -0,0 +1,192 @@
+# utils/profiling.py - On-demand cProfile capture for the next N tool invocations
+
+import asyncio
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+_active_session: ContextVar[Optional["ProfileSession"]] = ContextVar("scratch_profile_session", default=None)
+
+
+class ProfileSession:
+  """Aggregated cProfile data for one profile_requests(n) run"""
+
+  def __init__(self, requests: int, output_dir: str, top: int):
+    self.requests = requests
+    self.output_dir = output_dir
+    self.top = top
+    self.claimed = 0
+    self.completed = 0
+    self.tools: Dict[str, int] = {}
+    self.started_at = time.time()
+    self.finished_at: Optional[float] = None
+    self.stats: Optional[pstats.Stats] = None
+    self.files: Dict[str, str] = {}
+    self.hot_functions: List[Dict[str, Any]] = []
+    self.done = threading.Event()
+
+  def report(self) -> Dict[str, Any]:
+    return {
+      "status": "complete" if self.done.is_set() else "collecting",
+      "requests": self.requests,
+      "completed": self.completed,
+      "tools": dict(self.tools),
+      "started_at": self.started_at,
+      "finished_at": self.finished_at,
+      "files": dict(self.files),
+      "hot_functions": list(self.hot_functions)
+    }
+
+
+class RequestProfiler:
+  """
+  Profiles the next N tool invocations without restarting the server.
+
+  instrument() marks a tool invocation as profiled; wrap() runs the
+  invocation's blocking work under cProfile. Profiled work is serialized,
+  because cProfile can only be active once at a time on newer Pythons.
+  Work sent to a process pool is not profiled.
+  """
+
+  def __init__(self, output_dir: Optional[str] = None):
+    self.output_dir = output_dir or os.environ.get(
+      "SCRATCH_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "scratch-mcp-profiles"))
+    self._lock = threading.Lock()
+    self._run_lock = threading.Lock()
+    self._session: Optional[ProfileSession] = None
+    self._last: Optional[ProfileSession] = None
+
+  def start(self, requests: int, top: int = 15) -> Dict[str, Any]:
+    """Arm the profiler for the next `requests` tool invocations"""
+    if requests < 1:
+      raise ValueError("requests must be at least 1")
+    with self._lock:
+      if self._session and not self._session.done.is_set():
+        raise RuntimeError(
+          f"A profiling session is already collecting ({self._session.completed}/{self._session.requests})")
+      self._session = ProfileSession(requests, self.output_dir, top)
+      return self._session.report()
+
+  def report(self) -> Optional[Dict[str, Any]]:
+    """Report on the current session, or the last finished one"""
+    with self._lock:
+      session = self._session or self._last
+    return session.report() if session else None
+
+  async def wait(self, timeout: float) -> Optional[Dict[str, Any]]:
+    """Wait up to timeout seconds for the current session to finish"""
+    with self._lock:
+      session = self._session
+    if session is not None:
+      await asyncio.get_running_loop().run_in_executor(None, session.done.wait, timeout)
+    return self.report()
+
+  def instrument(self, tool: str):
+    """Decorator claiming a profiling slot for an invocation when armed"""
+    def decorator(fn):
+      if not inspect.iscoroutinefunction(fn):
+        raise TypeError("instrument() expects an async tool handler")
+
+      @functools.wraps(fn)
+      async def wrapper(*args, **kwargs):
+        session = self._claim(tool)
+        if session is None:
+          return await fn(*args, **kwargs)
+        token = _active_session.set(session)
+        try:
+          return await fn(*args, **kwargs)
+        finally:
+          _active_session.reset(token)
+          self._complete(session)
+      return wrapper
+    return decorator
+
+  def wrap(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap blocking work so it runs under cProfile inside a profiled invocation"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+      session = _active_session.get()
+      if session is None:
+        return fn(*args, **kwargs)
+      with self._run_lock:
+        profile = cProfile.Profile()
+        try:
+          profile.enable()
+        except ValueError:
+          # Another profiler (e.g. a debugger) is active; run unprofiled
+          return fn(*args, **kwargs)
+        try:
+          return fn(*args, **kwargs)
+        finally:
+          profile.disable()
+          self._merge(session, profile)
+    return wrapper
+
+  def _claim(self, tool: str) -> Optional[ProfileSession]:
+    session = self._session
+    if session is None or session.claimed >= session.requests:
+      return None
+    with self._lock:
+      if self._session is not session or session.claimed >= session.requests:
+        return None
+      session.claimed += 1
+      session.tools[tool] = session.tools.get(tool, 0) + 1
+      return session
+
+  def _merge(self, session: ProfileSession, profile: cProfile.Profile):
+    with self._lock:
+      if session.stats is None:
+        session.stats = pstats.Stats(profile)
+      else:
+        session.stats.add(profile)
+
+  def _complete(self, session: ProfileSession):
+    with self._lock:
+      session.completed += 1
+      if session.completed < session.requests:
+        return
+    self._finalize(session)
+    with self._lock:
+      self._last = session
+      if self._session is session:
+        self._session = None
+    session.done.set()
+
+  def _finalize(self, session: ProfileSession):
+    session.finished_at = time.time()
+    if session.stats is None:
+      return
+    session.hot_functions = hot_functions(session.stats, session.top)
+
+    os.makedirs(session.output_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(session.started_at))
+    base = os.path.join(session.output_dir, f"profile-{stamp}-{session.requests}req")
+    session.stats.dump_stats(base + ".prof")
+
+    summary = io.StringIO()
+    pstats.Stats(base + ".prof", stream=summary).sort_stats("cumulative").print_stats(40)
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+      f.write(summary.getvalue())
+    session.files = {"pstats": base + ".prof", "summary": base + ".txt"}
+
+
+def hot_functions(stats: pstats.Stats, top: int = 15) -> List[Dict[str, Any]]:
+  """Top functions by own (total) time from aggregated pstats data"""
+  rows = []
+  for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+    rows.append({
+      "function": f"{os.path.basename(filename)}:{line}({name})",
+      "calls": calls,
+      "total_ms": round(total * 1000, 3),
+      "cumulative_ms": round(cumulative * 1000, 3)
+    })
+  rows.sort(key=lambda row: row["total_ms"], reverse=True)
+  return rows[:top]
@@ -0,0 +1,162 @@
+# utils/replay.py - Replay a request journal through the generation pipeline
+
+"""
+Feed recorded generate_scratch_blocks and generate_scratch_blocks_batch calls
+back through parse → generate → format, either as fast as possible or at the recorded pacing, and report
+throughput, latency and output drift against the recorded result hashes.
+
+Usage (from src/):
+  python -m utils.replay journal.jsonl [--pace recorded] [--speed 2] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from programming.pipeline import BATCH_MAX_SIZE, GenerationPipeline
+from programming.parsers import NaturalLanguageParser
+from programming.block_generator import BlockGenerator
+from utils.journal import read_journal, result_hash
+
+REPLAYABLE_TOOLS = {"generate_scratch_blocks", "generate_scratch_blocks_batch"}
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+  if not sorted_values:
+    return 0.0
+  index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+  return sorted_values[index]
+
+
+def replay(entries: List[Dict[str, Any]], pipeline: GenerationPipeline, pace: str = "max",
+           speed: float = 1.0, limit: Optional[int] = None, max_drift_examples: int = 10) -> Dict[str, Any]:
+  """
+  Replay journal entries and return a report.
+
+  Args:
+    entries: Parsed journal entries
+    pipeline: Pipeline to run the recorded requests through
+    pace: "max" to run back-to-back, "recorded" to honour recorded gaps
+    speed: Speed-up factor applied to recorded gaps
+    limit: Replay at most this many entries
+  """
+  replayable = [e for e in entries if e.get("tool") in REPLAYABLE_TOOLS]
+  if limit is not None:
+    replayable = replayable[:limit]
+
+  latencies: List[float] = []
+  drift_examples: List[Dict[str, Any]] = []
+  drifted = 0
+  compared = 0
+  failures = 0
+  prompts = 0
+  by_tool: Dict[str, int] = {}
+
+  first_ts = replayable[0].get("ts", 0.0) if replayable else 0.0
+  wall_start = time.perf_counter()
+
+  for entry in replayable:
+    if pace == "recorded":
+      target = (entry.get("ts", first_ts) - first_ts) / max(speed, 1e-9)
+      delay = target - (time.perf_counter() - wall_start)
+      if delay > 0:
+        time.sleep(delay)
+
+    tool = entry["tool"]
+    arguments = entry.get("arguments", {})
+    start = time.perf_counter()
+    if tool == "generate_scratch_blocks_batch":
+      result = pipeline.run_batch(arguments.get("descriptions"), arguments.get("output_format", "text"),
+                                  max_size=BATCH_MAX_SIZE)
+      prompts += result.get("count", 0)
+      failures += result["failed"] if result["success"] else 1
+    else:
+      result = pipeline.run(arguments.get("description"), arguments.get("output_format", "text"))
+      prompts += 1
+      if not result.get("success"):
+        failures += 1
+    latencies.append(time.perf_counter() - start)
+    by_tool[tool] = by_tool.get(tool, 0) + 1
+
+    recorded = entry.get("result_hash")
+    if recorded:
+      compared += 1
+      replayed = result_hash(result)
+      if replayed != recorded:
+        drifted += 1
+        if len(drift_examples) < max_drift_examples:
+          drift_examples.append({
+            "arguments": arguments,
+            "recorded_hash": recorded,
+            "replayed_hash": replayed,
+            "replayed_success": result.get("success")
+          })
+
+  elapsed = time.perf_counter() - wall_start
+  latencies.sort()
+  return {
+    "entries": len(entries),
+    "replayed": len(replayable),
+    "skipped": len(entries) - len(replayable),
+    "replayed_by_tool": by_tool,
+    "prompts": prompts,
+    "failures": failures,
+    "pace": pace,
+    "elapsed_seconds": round(elapsed, 4),
+    "throughput_per_second": round(len(replayable) / elapsed, 2) if elapsed > 0 else 0.0,
+    "latency_ms": {
+      "p50": round(_percentile(latencies, 0.50) * 1000, 3),
+      "p95": round(_percentile(latencies, 0.95) * 1000, 3),
+      "p99": round(_percentile(latencies, 0.99) * 1000, 3),
+      "max": round(latencies[-1] * 1000, 3) if latencies else 0.0
+    },
+    "drift": {
+      "compared": compared,
+      "drifted": drifted,
+      "examples": drift_examples
+    }
+  }
+
+
+def _print_report(report: Dict[str, Any]):
+  latency = report["latency_ms"]
+  drift = report["drift"]
+  print(f"Replayed {report['replayed']} of {report['entries']} entries, {report['prompts']} prompts "
+        f"({report['skipped']} skipped, {report['failures']} unsuccessful)")
+  print(f"Elapsed: {report['elapsed_seconds']}s, throughput: {report['throughput_per_second']} req/s")
+  print(f"Latency: p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms max={latency['max']}ms")
+  print(f"Drift: {drift['drifted']} of {drift['compared']} results differ from the journal")
+  for example in drift["examples"]:
+    print(f"  - {example['arguments']}: {example['recorded_hash']} -> {example['replayed_hash']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+  arg_parser = argparse.ArgumentParser(description="Replay a scratchattach-mcp request journal")
+  arg_parser.add_argument("journal", help="Path to the JSONL journal (SCRATCH_JOURNAL_FILE)")
+  arg_parser.add_argument("--pace", choices=["max", "recorded"], default="max",
+                          help="Run back-to-back (max) or with the recorded gaps")
+  arg_parser.add_argument("--speed", type=float, default=1.0, help="Speed-up for recorded pacing")
+  arg_parser.add_argument("--limit", type=int, default=None, help="Replay at most N entries")
+  arg_parser.add_argument("--knowledge", default=None, help="Alternative scratch_blocks.json")
+  arg_parser.add_argument("--patterns", default=None, help="Alternative patterns.json")
+  arg_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+  arg_parser.add_argument("--fail-on-drift", action="store_true", help="Exit non-zero if any output drifted")
+  args = arg_parser.parse_args(argv)
+
+  pipeline = GenerationPipeline(NaturalLanguageParser(), BlockGenerator(args.knowledge, args.patterns))
+  report = replay(read_journal(args.journal), pipeline, pace=args.pace, speed=args.speed, limit=args.limit)
+
+  if args.json:
+    print(json.dumps(report, indent=2))
+  else:
+    _print_report(report)
+
+  if args.fail_on_drift and report["drift"]["drifted"]:
+    return 1
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,146 @@
+# utils/single_flight.py - Coalesce concurrent identical calls into one computation
+
+import asyncio
+import copy
+import functools
+import inspect
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _Call:
+  """An in-progress computation that other callers can attach to"""
+
+  def __init__(self):
+    self.done = threading.Event()
+    self.result: Any = None
+    self.error: Optional[BaseException] = None
+    self.waiters = 0
+
+
+class _AsyncCall:
+  """An in-progress coroutine that other callers can await"""
+
+  def __init__(self, task: asyncio.Task):
+    self.task = task
+    self.waiters = 0
+
+
+class SingleFlight:
+  """
+  Runs at most one computation per key at a time.
+
+  Callers that arrive while a computation for the same key is in progress
+  wait for it and receive a copy of its result instead of redoing the work.
+  Nothing is cached: once the leader finishes, the next call runs again.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._calls: Dict[str, _Call] = {}
+    self._tasks: Dict[str, _AsyncCall] = {}
+    self._stats: Dict[str, Dict[str, int]] = {}
+
+  def do(self, key: str, fn: Callable[[], Any], group: str = "default") -> Any:
+    """Run fn for key, or wait for the identical call already running"""
+    with self._lock:
+      stats = self._stats.setdefault(group, {"calls": 0, "executions": 0, "deduplicated": 0})
+      stats["calls"] += 1
+      call = self._calls.get(key)
+      if call is not None:
+        stats["deduplicated"] += 1
+        call.waiters += 1
+        leader = False
+      else:
+        stats["executions"] += 1
+        call = _Call()
+        self._calls[key] = call
+        leader = True
+
+    if not leader:
+      call.done.wait()
+      if call.error is not None:
+        raise call.error
+      # Each caller gets its own copy so callers can't see each other's edits
+      return copy.deepcopy(call.result)
+
+    try:
+      call.result = fn()
+    except BaseException as e:
+      call.error = e
+      raise
+    finally:
+      with self._lock:
+        del self._calls[key]
+      call.done.set()
+
+    if call.waiters:
+      # Waiters copy from call.result, so hand the leader an independent copy too
+      return copy.deepcopy(call.result)
+    return call.result
+
+  async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]], group: str = "default") -> Any:
+    """Async variant of do(): await fn() for key, or join the task already running"""
+    with self._lock:
+      stats = self._stats.setdefault(group, {"calls": 0, "executions": 0, "deduplicated": 0})
+      stats["calls"] += 1
+      call = self._tasks.get(key)
+      if call is not None and not call.task.done():
+        stats["deduplicated"] += 1
+        call.waiters += 1
+      else:
+        stats["executions"] += 1
+        call = _AsyncCall(asyncio.ensure_future(fn()))
+        self._tasks[key] = call
+        call.task.add_done_callback(lambda _: self._forget_task(key, call))
+
+    # Shield so one caller being cancelled doesn't cancel everyone else's result
+    result = await asyncio.shield(call.task)
+    return copy.deepcopy(result) if call.waiters else result
+
+  def _forget_task(self, key: str, call: "_AsyncCall"):
+    with self._lock:
+      if self._tasks.get(key) is call:
+        del self._tasks[key]
+
+  def coalesce(self, group: str, normalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+    """Decorator keying calls on the function's (optionally normalized) arguments"""
+    def decorator(fn):
+      signature = inspect.signature(fn)
+
+      def make_key(args, kwargs) -> str:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        if normalize:
+          arguments = normalize(arguments)
+        return group + ":" + json.dumps(arguments, sort_keys=True, default=str)
+
+      if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+          return await self.do_async(make_key(args, kwargs), lambda: fn(*args, **kwargs), group=group)
+        return async_wrapper
+
+      @functools.wraps(fn)
+      def wrapper(*args, **kwargs):
+        return self.do(make_key(args, kwargs), lambda: fn(*args, **kwargs), group=group)
+
+      return wrapper
+    return decorator
+
+  def in_flight(self) -> int:
+    """Number of computations currently running"""
+    with self._lock:
+      return len(self._calls) + len(self._tasks)
+
+  def get_stats(self) -> Dict[str, Any]:
+    """Get per-group call, execution and deduplication counters"""
+    with self._lock:
+      groups = {name: dict(counts) for name, counts in self._stats.items()}
+    return {
+      "groups": groups,
+      "total_calls": sum(g["calls"] for g in groups.values()),
+      "total_deduplicated": sum(g["deduplicated"] for g in groups.values())
+    }
@@ -0,0 +1,237 @@
+# utils/tracing.py - Lightweight sampled tracing spans with a JSONL exporter
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+
+class _NoopSpan:
+  """Returned when there is no sampled trace; every operation does nothing"""
+  sampled = False
+
+  def set_attribute(self, key: str, value: Any):
+    pass
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc, tb):
+    return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("scratch_trace_span", default=None)
+
+
+class Span:
+  """One timed operation inside a sampled trace"""
+  sampled = True
+
+  def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+    self.tracer = tracer
+    self.name = name
+    self.parent = parent
+    self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+    self.span_id = uuid.uuid4().hex[:16]
+    self.attributes = attributes
+    self.status = "ok"
+    self.start_time = 0.0
+    self.duration = 0.0
+    # Finished spans of the whole trace, exported together when the root ends
+    self.finished: List["Span"] = parent.finished if parent else []
+    self._start = 0.0
+    self._token = None
+
+  def set_attribute(self, key: str, value: Any):
+    self.attributes[key] = value
+
+  def __enter__(self):
+    self.start_time = time.time()
+    self._start = time.perf_counter()
+    self._token = _current_span.set(self)
+    return self
+
+  def __exit__(self, exc_type, exc, tb):
+    self.duration = time.perf_counter() - self._start
+    _current_span.reset(self._token)
+    if exc_type is not None:
+      self.status = "error"
+      self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+    self.finished.append(self)
+    if self.parent is None:
+      self.tracer._export(self.finished)
+    return False
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      "trace_id": self.trace_id,
+      "span_id": self.span_id,
+      "parent_id": self.parent.span_id if self.parent else None,
+      "name": self.name,
+      "start_time": round(self.start_time, 6),
+      "duration_ms": round(self.duration * 1000, 3),
+      "status": self.status,
+      "attributes": self.attributes
+    }
+
+
+class JsonlTraceExporter:
+  """
+  Appends finished spans to a local JSONL file, one span per line.
+
+  export() runs on the request's thread (often the event loop), so it only
+  queues the trace; encoding and file writes happen on a background thread.
+  If the queue is full the trace is dropped and counted rather than waiting.
+  """
+
+  def __init__(self, path: str, flush_interval: float = 1.0, max_queue: int = 10000):
+    self.path = path
+    self.flush_interval = flush_interval
+    self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+    self._writer: Optional[threading.Thread] = None
+    self._lock = threading.Lock()
+    self._stop = threading.Event()
+    self.written = 0
+    self.dropped = 0
+    self.write_errors = 0
+
+  def export(self, spans: List[Span]):
+    """Queue one finished trace for the background writer (never blocks)"""
+    self._ensure_writer()
+    try:
+      self._queue.put_nowait([span.to_dict() for span in spans])
+    except queue.Full:
+      with self._lock:
+        self.dropped += 1
+
+  def close(self, timeout: float = 5.0):
+    """Write out everything queued and stop the writer thread"""
+    self._stop.set()
+    writer = self._writer
+    if writer is not None:
+      writer.join(timeout=timeout)
+
+  def _ensure_writer(self):
+    if self._writer is not None and self._writer.is_alive():
+      return
+    with self._lock:
+      if self._writer is None or not self._writer.is_alive():
+        self._stop.clear()
+        self._writer = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._writer.start()
+
+  def _run(self):
+    while True:
+      batch = []
+      try:
+        batch.append(self._queue.get(timeout=self.flush_interval))
+        while len(batch) < 1000:
+          batch.append(self._queue.get_nowait())
+      except queue.Empty:
+        pass
+      if batch:
+        self._write(batch)
+      elif self._stop.is_set() and self._queue.empty():
+        return
+
+  def _write(self, batch: List[List[Dict[str, Any]]]):
+    lines = [json.dumps(record, default=str) + "\n" for trace in batch for record in trace]
+    try:
+      with open(self.path, "a", encoding="utf-8") as f:
+        f.writelines(lines)
+    except OSError:
+      with self._lock:
+        self.write_errors += 1
+      return
+    with self._lock:
+      self.written += len(lines)
+
+
+class Tracer:
+  """
+  Creates spans for sampled traces.
+
+  The sampling decision is made once per root trace; inside an unsampled
+  trace (or outside any trace) span() returns a shared no-op span, so
+  instrumented code costs a context variable lookup when tracing is off.
+  """
+
+  def __init__(self, sample_rate: float = 0.0, exporter: Optional[JsonlTraceExporter] = None,
+               rng: Callable[[], float] = random.random):
+    self.sample_rate = sample_rate
+    self.exporter = exporter
+    self._rng = rng
+    self._lock = threading.Lock()
+    self.traces_started = 0
+    self.traces_sampled = 0
+
+  def configure(self, sample_rate: Optional[float] = None, exporter: Optional[JsonlTraceExporter] = None):
+    if sample_rate is not None:
+      self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+    if exporter is not None:
+      self.exporter = exporter
+
+  def configure_from_env(self):
+    """Enable tracing from SCRATCH_TRACE_FILE and SCRATCH_TRACE_SAMPLE_RATE"""
+    path = os.environ.get("SCRATCH_TRACE_FILE")
+    if path:
+      self.configure(sample_rate=float(os.environ.get("SCRATCH_TRACE_SAMPLE_RATE", "1.0")),
+                     exporter=JsonlTraceExporter(path))
+
+  def trace(self, name: str, **attributes):
+    """Start a root span (or a child span if a trace is already active)"""
+    parent = _current_span.get()
+    if parent is not None:
+      return Span(self, name, parent, attributes)
+
+    with self._lock:
+      self.traces_started += 1
+    if self.exporter is None or self.sample_rate <= 0 or self._rng() >= self.sample_rate:
+      return NOOP_SPAN
+    with self._lock:
+      self.traces_sampled += 1
+    return Span(self, name, None, attributes)
+
+  def span(self, name: str, **attributes):
+    """Start a child span of the active span; no-op outside a sampled trace"""
+    parent = _current_span.get()
+    if parent is None:
+      return NOOP_SPAN
+    return Span(self, name, parent, attributes)
+
+  def get_stats(self) -> Dict[str, Any]:
+    return {
+      "enabled": self.exporter is not None and self.sample_rate > 0,
+      "sample_rate": self.sample_rate,
+      "trace_file": getattr(self.exporter, "path", None),
+      "traces_started": self.traces_started,
+      "traces_sampled": self.traces_sampled,
+      "spans_written": getattr(self.exporter, "written", 0),
+      "traces_dropped": getattr(self.exporter, "dropped", 0),
+      "export_errors": getattr(self.exporter, "write_errors", 0)
+    }
+
+  def close(self):
+    """Write out queued spans and stop the exporter's writer thread"""
+    if self.exporter is not None:
+      self.exporter.close()
+
+  def _export(self, spans: List[Span]):
+    if self.exporter is not None:
+      self.exporter.export(spans)
+
+
+# Process-wide tracer; disabled until configured
+tracer = Tracer()
+
+
+def span(name: str, **attributes):
+  """Start a child span on the process-wide tracer"""
+  return tracer.span(name, **attributes)
@@ -0,0 +1,105 @@
+# utils/workers.py - Executor pools that keep blocking work off the event loop
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class WorkerPools:
+  """
+  Bounded executors for the MCP server's async tool handlers.
+
+  Scratch network calls run on an I/O thread pool. Parse/generate/format
+  work runs on a CPU pool, which is a thread pool by default and a process
+  pool when use_processes is set. Functions sent to a process pool must be
+  picklable (module-level), so callers pass a separate process_fn for that case.
+  """
+
+  def __init__(self, io_workers: int = 8, cpu_workers: int = 4, use_processes: bool = False,
+               process_initializer: Optional[Callable[[], None]] = None):
+    self.io_workers = max(1, io_workers)
+    self.cpu_workers = max(1, cpu_workers)
+    self.use_processes = use_processes
+    self._process_initializer = process_initializer
+
+    self._lock = threading.Lock()
+    self._io_pool: Optional[Executor] = None
+    self._cpu_pool: Optional[Executor] = None
+    self._stats = {"io_submitted": 0, "cpu_submitted": 0, "io_active": 0, "cpu_active": 0}
+
+  @classmethod
+  def from_env(cls, process_initializer: Optional[Callable[[], None]] = None) -> "WorkerPools":
+    """Build pools from SCRATCH_IO_WORKERS, SCRATCH_CPU_WORKERS and SCRATCH_CPU_PROCESSES"""
+    return cls(
+      io_workers=int(os.environ.get("SCRATCH_IO_WORKERS", "8")),
+      cpu_workers=int(os.environ.get("SCRATCH_CPU_WORKERS", "4")),
+      use_processes=os.environ.get("SCRATCH_CPU_PROCESSES", "").lower() in ("1", "true", "yes"),
+      process_initializer=process_initializer
+    )
+
+  @property
+  def io_pool(self) -> Executor:
+    with self._lock:
+      if self._io_pool is None:
+        self._io_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="scratch-io")
+      return self._io_pool
+
+  @property
+  def cpu_pool(self) -> Executor:
+    with self._lock:
+      if self._cpu_pool is None:
+        if self.use_processes:
+          self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                               initializer=self._process_initializer)
+        else:
+          self._cpu_pool = ThreadPoolExecutor(max_workers=self.cpu_workers, thread_name_prefix="scratch-cpu")
+      return self._cpu_pool
+
+  async def run_io(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking I/O call on the I/O thread pool"""
+    return await self._run("io", self.io_pool, functools.partial(fn, *args, **kwargs))
+
+  async def run_cpu(self, fn: Callable[..., Any], *args, process_fn: Optional[Callable[..., Any]] = None,
+                    **kwargs) -> Any:
+    """Run CPU-bound work on the CPU pool (process_fn is used instead of fn in process mode)"""
+    if self.use_processes and process_fn is not None:
+      fn = process_fn
+    return await self._run("cpu", self.cpu_pool, functools.partial(fn, *args, **kwargs))
+
+  async def _run(self, kind: str, pool: Executor, call: Callable[[], Any]) -> Any:
+    with self._lock:
+      self._stats[f"{kind}_submitted"] += 1
+      self._stats[f"{kind}_active"] += 1
+    if isinstance(pool, ThreadPoolExecutor):
+      # Carry context variables (e.g. the active trace span) into the worker thread
+      call = functools.partial(contextvars.copy_context().run, call)
+    try:
+      return await asyncio.get_running_loop().run_in_executor(pool, call)
+    finally:
+      with self._lock:
+        self._stats[f"{kind}_active"] -= 1
+
+  def get_stats(self) -> Dict[str, Any]:
+    """Get pool sizes and submission counters"""
+    with self._lock:
+      stats = dict(self._stats)
+    stats.update({
+      "io_workers": self.io_workers,
+      "cpu_workers": self.cpu_workers,
+      "cpu_pool_type": "process" if self.use_processes else "thread"
+    })
+    return stats
+
+  def shutdown(self, wait: bool = True):
+    """Shut down both pools; they are recreated on next use"""
+    with self._lock:
+      pools = [self._io_pool, self._cpu_pool]
+      self._io_pool = None
+      self._cpu_pool = None
+    for pool in pools:
+      if pool is not None:
+        pool.shutdown(wait=wait)
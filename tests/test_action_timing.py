@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Tests for per-action timing of GUI automation"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.action_timing import ActionTimer
+from automation.backends import simulated_controller
+
+PROGRAM = [
+    {'opcode': 'event_whenflagclicked'},
+    {'opcode': 'motion_movesteps', 'inputs': {'STEPS': 10}},
+    {'opcode': 'looks_sayforsecs', 'inputs': {'MESSAGE': 'Hi', 'SECS': 2}},
+    {'opcode': 'looks_hide'},
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestActionTimer(unittest.TestCase):
+    """Test cases for spans and program breakdowns"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.timer = ActionTimer(self.clock)
+
+    def test_self_time_excludes_children(self):
+        """Test that nested spans are subtracted from their parent's self time"""
+        with self.timer.program("build"):
+            with self.timer.span("place_block"):
+                self.clock.now += 0.1
+                with self.timer.span("drag"):
+                    self.clock.now += 0.5
+                with self.timer.span("wait"):
+                    self.clock.now += 0.2
+            self.clock.now += 0.05
+        breakdown = self.timer.last.breakdown()
+        self.assertEqual(breakdown['self_seconds'], {'drag': 0.5, 'wait': 0.2, 'place_block': 0.1})
+        self.assertEqual(breakdown['actions']['place_block']['seconds'], 0.8)
+        self.assertEqual(breakdown['seconds'], 0.85)
+        self.assertEqual(breakdown['unaccounted_seconds'], 0.05)
+
+    def test_reentrant_span_counts_once(self):
+        """Test that a span inside a span of the same name isn't counted again"""
+        with self.timer.program("build"):
+            with self.timer.span("wait"):
+                with self.timer.span("wait"):
+                    self.clock.now += 0.3
+        self.assertEqual(self.timer.last.actions['wait'].count, 1)
+        self.assertAlmostEqual(self.timer.last.actions['wait'].self_seconds, 0.3)
+
+    def test_spans_outside_program_ignored(self):
+        """Test that nothing is recorded between programs"""
+        with self.timer.span("drag"):
+            self.clock.now += 1
+        self.assertIsNone(self.timer.last)
+        self.assertEqual(self.timer.stats()['programs'], 0)
+
+    def test_trace_file(self):
+        """Test that each program is appended to the trace file with its spans"""
+        with tempfile.TemporaryDirectory() as directory:
+            self.timer.trace_file = Path(directory) / "trace.jsonl"
+            for label in ("first", "second"):
+                with self.timer.program(label, blocks=2):
+                    with self.timer.span("drag"):
+                        self.clock.now += 0.5
+            lines = self.timer.trace_file.read_text().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([r['program'] for r in records], ["first", "second"])
+        self.assertEqual(records[0]['blocks'], 2)
+        self.assertEqual(records[1]['events'], [{'name': 'drag', 'start': 0.0, 'seconds': 0.5, 'depth': 0}])
+
+    def test_trace_file_is_opt_in(self):
+        """Test that only SCRATCH_AUTOMATION_TRACE_FILE turns the trace file on"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.jsonl")
+            with patch.dict(os.environ):
+                os.environ.pop("SCRATCH_AUTOMATION_TRACE_FILE", None)
+                self.assertIsNone(ActionTimer.from_env(self.clock).trace_file)
+                os.environ["SCRATCH_AUTOMATION_TRACE_FILE"] = ""
+                self.assertIsNone(ActionTimer.from_env(self.clock).trace_file)
+                os.environ["SCRATCH_AUTOMATION_TRACE_FILE"] = path
+                self.assertEqual(ActionTimer.from_env(self.clock).trace_file, Path(path))
+
+
+class TestControllerTimings(unittest.TestCase):
+    """Test cases for timings of builds on the simulated backend"""
+
+    def setUp(self):
+        self.controller, self.backend = simulated_controller()
+
+    def test_breakdown_in_status(self):
+        """Test that get_status carries the last program's per-action breakdown"""
+        self.assertTrue(self.controller.create_simple_program(PROGRAM))
+        timings = self.controller.get_status()['action_timings']['last_program']
+        self.assertEqual(timings['program'], 'create_simple_program')
+        self.assertEqual(timings['actions']['place_block']['count'], len(PROGRAM))
+        self.assertEqual(timings['actions']['drag']['count'], len(PROGRAM))
+        self.assertEqual(timings['actions']['type']['count'], 3)
+        self.assertAlmostEqual(sum(timings['self_seconds'].values()) + timings['unaccounted_seconds'],
+                               timings['seconds'], places=2)
+        self.assertAlmostEqual(timings['actions']['drag']['seconds'], 0.5 * len(PROGRAM))
+
+    def test_primitives_timed(self):
+        """Test that the individual primitives record their calls"""
+        with self.controller.timer.program("manual"):
+            first = self.controller.place_block('event_whenflagclicked')
+            second = self.controller.place_block('looks_hide', position=(first.x + 200, first.y + 200))
+            self.controller.connect_blocks(first, second)
+            self.controller.set_block_parameter(second, 'VALUE', 1)
+        actions = self.controller.timer.last.actions
+        for name in ('find_block_in_palette', 'place_block', 'connect_blocks', 'set_block_parameter'):
+            self.assertGreater(actions[name].count, 0, name)
+        self.assertEqual(actions['drag'].count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
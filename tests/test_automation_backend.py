@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Tests for PictoBloxController running on the simulated backend"""
+
+import unittest
+import importlib.util
+import os
+import sys
+import tempfile
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.backends import PyAutoGUIBackend, simulated_controller
+from automation.pictoblox_controller import PictoBloxNotFoundError, ProjectLoadError
+
+PROGRAM = [
+    {'opcode': 'event_whenflagclicked', 'category': 'events'},
+    {'opcode': 'motion_movesteps', 'category': 'motion', 'inputs': {'STEPS': 10}},
+    {'opcode': 'looks_sayforsecs', 'category': 'looks', 'inputs': {'MESSAGE': 'Hi', 'SECS': 2}},
+    {'opcode': 'motion_turnright', 'category': 'motion', 'inputs': {'DEGREES': 15}},
+    {'opcode': 'looks_hide', 'category': 'looks'},
+]
+
+
+class TestSimulatedBackend(unittest.TestCase):
+    """Test cases for the unchanged controller on a virtual screen"""
+
+    def setUp(self):
+        self.controller, self.backend = simulated_controller(connect=False)
+        self.assertTrue(self.controller.connect_to_pictoblox())
+
+    def test_create_simple_program(self):
+        """Test that blocks end up in one stack, in order, with their values"""
+        self.assertTrue(self.controller.create_simple_program(PROGRAM))
+        self.assertEqual(self.backend.scripts(), [[b['opcode'] for b in PROGRAM]])
+        values = [block.values for block in self.backend.blocks.values()]
+        self.assertEqual(values, [[], ['10'], ['Hi', '2'], ['15'], []])
+
+    def test_actions_are_recorded(self):
+        """Test that drags, clicks and typing are logged on the simulated clock"""
+        self.controller.create_simple_program(PROGRAM)
+        kinds = [action[1] for action in self.backend.actions]
+        # One drag per block, straight onto its snap point; no select clicks
+        self.assertEqual(kinds.count("drag"), len(PROGRAM))
+        self.assertEqual(kinds.count("click"), 0)
+        self.assertEqual(kinds.count("type"), 4)
+        times = [action[0] for action in self.backend.actions]
+        self.assertEqual(times, sorted(times))
+
+    def test_latency_slows_build(self):
+        """Test that configured UI latency shows up in the simulated build time"""
+        self.controller.create_simple_program(PROGRAM)
+        slow_controller, slow_backend = simulated_controller(latency={"drop": (0.1, 0.6)})
+        slow_controller.create_simple_program(PROGRAM)
+        self.assertGreater(slow_backend.now, self.backend.now + 4 * 0.5)
+
+    def test_c_block_substack(self):
+        """Test that blocks inside a C-block land in its mouth and the stack continues below"""
+        program = [
+            {'opcode': 'event_whenflagclicked'},
+            {'opcode': 'control_repeat', 'inputs': {'TIMES': 3}, 'substack': [
+                {'opcode': 'motion_movesteps', 'inputs': {'STEPS': 5}},
+                {'opcode': 'motion_turnright'},
+            ]},
+            {'opcode': 'looks_show'},
+            {'opcode': 'control_forever', 'substack': [{'opcode': 'looks_hide'}]},
+        ]
+        self.assertTrue(self.controller.create_simple_program(program))
+        self.assertEqual(self.backend.scripts(), [[
+            'event_whenflagclicked',
+            ('control_repeat', ['motion_movesteps', 'motion_turnright']),
+            'looks_show',
+            ('control_forever', ['looks_hide']),
+        ]])
+        status = self.controller.get_status()['last_plan']
+        self.assertEqual(status['drags'], 7)
+
+    def test_second_program_starts_new_script(self):
+        """Test that a later program doesn't snap onto the previous one"""
+        self.controller.create_simple_program(PROGRAM[:2])
+        self.controller.create_simple_program(PROGRAM[2:])
+        self.assertEqual(self.backend.scripts(), [[b['opcode'] for b in PROGRAM[:2]],
+                                                  [b['opcode'] for b in PROGRAM[2:]]])
+
+    def test_missing_block_fails(self):
+        """Test that a block absent from the palette makes the build fail"""
+        self.assertFalse(self.controller.create_simple_program([{'opcode': 'pen_clear'}]))
+
+    def test_palette_cache_skips_matching(self):
+        """Test that repeated lookups are served from the location cache"""
+        first = self.controller.find_blocks_in_palette(['motion_movesteps'])
+        again = self.controller.find_blocks_in_palette(['motion_movesteps'])
+        self.assertEqual(first, again)
+        self.assertEqual(self.controller.palette_cache.stats()['hits'], 1)
+
+    def test_palette_changed_behind_controller(self):
+        """Test that a palette scrolled by someone else is detected and re-matched"""
+        before = self.controller.find_block_in_palette('motion_movesteps')
+        self.backend.palette_scroll = -2
+        after = self.controller.find_block_in_palette('motion_movesteps')
+        self.assertEqual(after[1], before[1] - 60)
+        self.assertEqual(self.controller.palette_cache.stats()['invalidations'], 1)
+
+    def test_scroll_palette_changes_state(self):
+        """Test that scrolling through the controller moves to a new cache state"""
+        state = self.controller.palette_state
+        self.controller.scroll_palette(-1)
+        self.assertNotEqual(self.controller.palette_state, state)
+        self.assertEqual(self.backend.palette_scroll, -1)
+
+    def test_select_category_without_template(self):
+        """Test that a category with no button template is reported, not clicked"""
+        self.assertFalse(self.controller.select_category('motion'))
+
+
+class TestProjectInjection(unittest.TestCase):
+    """Test cases for loading generated projects through the file-open dialog"""
+
+    def setUp(self):
+        self.controller, self.backend = simulated_controller()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'program.sb3')
+
+    def test_inject_program(self):
+        """Test that the loaded workspace holds the program, with one dialog interaction"""
+        start = len(self.backend.actions)
+        self.controller.inject_program(PROGRAM, self.path)
+        self.assertEqual(self.backend.scripts(), [[b['opcode'] for b in PROGRAM]])
+        values = [block.values for block in self.backend.blocks.values()]
+        self.assertEqual(values, [[], ['10'], ['Hi', '2'], ['15'], []])
+        kinds = [action[1] for action in self.backend.actions[start:]]
+        self.assertEqual(kinds, ['hotkey', 'type', 'press'])
+        self.assertEqual(self.controller.get_status()['last_project']['path'], self.path)
+
+    def test_injection_replaces_project(self):
+        """Test that loading a file replaces blocks dragged in before"""
+        self.controller.create_simple_program(PROGRAM[:2])
+        self.controller.inject_program(PROGRAM[2:], self.path)
+        self.assertEqual(self.backend.scripts(), [[b['opcode'] for b in PROGRAM[2:]]])
+
+    def test_gui_after_injection_starts_new_script(self):
+        """Test that blocks dragged in after a load go below the loaded script"""
+        self.controller.inject_program(PROGRAM[:3], self.path)
+        self.assertTrue(self.controller.create_simple_program(PROGRAM[3:]))
+        self.assertEqual(self.backend.scripts(), [[b['opcode'] for b in PROGRAM[:3]],
+                                                  [b['opcode'] for b in PROGRAM[3:]]])
+
+    def test_unreadable_project_fails(self):
+        """Test that a file PictoBlox can't open raises instead of passing silently"""
+        with open(self.path, 'w') as f:
+            f.write('not a zip')
+        with self.assertRaises(ProjectLoadError):
+            self.controller.load_project(self.path)
+        self.assertEqual(len(self.backend.load_errors), 1)
+
+    def test_injection_faster_than_dragging(self):
+        """Test that the file route beats the GUI route for a 5-block program"""
+        start = self.backend.now
+        self.controller.create_simple_program(PROGRAM)
+        gui = self.backend.now - start
+        self.assertLess(self.controller.inject_program(PROGRAM, self.path), gui / 2)
+
+
+class TestSimulatedLaunch(unittest.TestCase):
+    """Test cases for launching and connecting"""
+
+    def test_launch_waits_for_window(self):
+        """Test that launch polls until the window appears"""
+        controller, backend = simulated_controller(connect=False, running=False)
+        controller.pictoblox_path = "PictoBlox.exe"
+        self.assertTrue(controller.launch_pictoblox())
+        self.assertGreaterEqual(backend.now, sum(backend.latency["launch"]))
+
+    def test_connect_without_window(self):
+        """Test that connecting with no PictoBlox window raises"""
+        controller, _ = simulated_controller(connect=False, running=False)
+        with self.assertRaises(PictoBloxNotFoundError):
+            controller.connect_to_pictoblox()
+
+
+class TestPyAutoGUIBackend(unittest.TestCase):
+    """Test cases for the desktop backend"""
+
+    def test_requires_pyautogui(self):
+        """Test that the desktop backend only imports pyautogui when created"""
+        if importlib.util.find_spec("pyautogui") is not None:
+            self.skipTest("pyautogui is installed")
+        with self.assertRaises(Exception):
+            PyAutoGUIBackend()
+
+
+if __name__ == '__main__':
+    unittest.main()
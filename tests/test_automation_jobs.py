@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""Tests for the background automation job queue"""
+
+import unittest
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.backends import SimulatedBackend, simulated_controller
+from automation.job_queue import AutomationJobQueue
+from automation.mcp_integration import AutomationMCP
+
+PROGRAM = [
+    {'opcode': 'event_whenflagclicked'},
+    {'opcode': 'motion_movesteps', 'inputs': {'STEPS': 10}},
+    {'opcode': 'motion_turnright', 'inputs': {'DEGREES': 15}},
+    {'opcode': 'looks_hide'},
+]
+
+
+class TestAutomationJobQueue(unittest.TestCase):
+    """Test cases for ordering, results and cancellation"""
+
+    def setUp(self):
+        self.queue = AutomationJobQueue()
+        self.addCleanup(self.queue.close)
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def hold_worker(self):
+        """Occupy the worker until the gate opens"""
+        def blocker(job):
+            self.started.set()
+            self.gate.wait(5)
+            return {"success": True}
+        job = self.queue.submit("block", blocker)
+        self.assertTrue(self.started.wait(5))
+        return job
+
+    def test_returns_immediately_with_job_id(self):
+        """Test that submit doesn't wait for the job to run"""
+        self.hold_worker()
+        job = self.queue.submit("build", lambda job: {"success": True})
+        self.assertEqual(job["status"], "queued")
+        self.assertEqual(job["queue_position"], 1)
+        self.gate.set()
+        self.assertEqual(self.queue.wait(job["job_id"], 5)["status"], "succeeded")
+
+    def test_teacher_jobs_first_then_in_order(self):
+        """Test priority order, and submission order within a priority"""
+        order = []
+        self.hold_worker()
+        ids = [self.queue.submit("build", lambda job, name=name: order.append(name) or {}, priority=priority)["job_id"]
+               for name, priority in [("s1", "student"), ("s2", "student"), ("t1", "teacher"), ("t2", "teacher")]]
+        self.assertEqual(self.queue.get(ids[2])["queue_position"], 1)
+        self.gate.set()
+        for job_id in ids:
+            self.queue.wait(job_id, 5)
+        self.assertEqual(order, ["t1", "t2", "s1", "s2"])
+
+    def test_cancel_queued_job(self):
+        """Test that a cancelled queued job never runs"""
+        ran = []
+        self.hold_worker()
+        job = self.queue.submit("build", lambda job: ran.append(1))
+        self.assertEqual(self.queue.cancel(job["job_id"])["status"], "cancelled")
+        self.gate.set()
+        follow_up = self.queue.submit("build", lambda job: {})
+        self.queue.wait(follow_up["job_id"], 5)
+        self.assertEqual(ran, [])
+
+    def test_failures_are_reported(self):
+        """Test that exceptions and success=False results fail the job"""
+        def crash(job):
+            raise RuntimeError("boom")
+        crashed = self.queue.run("build", crash, timeout=5)
+        self.assertEqual((crashed["status"], crashed["error"]), ("failed", "boom"))
+        refused = self.queue.run("build", lambda job: {"success": False, "message": "no"}, timeout=5)
+        self.assertEqual(refused["status"], "failed")
+        self.assertEqual(refused["result"]["message"], "no")
+        self.assertEqual(self.queue.get_stats()["failed"], 2)
+
+    def test_unknown_job_and_priority(self):
+        """Test lookups of unknown ids and submissions with an unknown priority"""
+        self.assertIsNone(self.queue.get("missing"))
+        self.assertIsNone(self.queue.cancel("missing"))
+        with self.assertRaises(ValueError):
+            self.queue.submit("build", lambda job: {}, priority="admin")
+
+    def test_history_limit(self):
+        """Test that only the most recent finished jobs are kept"""
+        queue = AutomationJobQueue(history=2)
+        self.addCleanup(queue.close)
+        ids = [queue.run("build", lambda job: {}, timeout=5)["job_id"] for _ in range(3)]
+        self.assertIsNone(queue.get(ids[0]))
+        self.assertIsNotNone(queue.get(ids[2]))
+
+
+class TestControllerJobs(unittest.TestCase):
+    """Test cases for builds running on the worker"""
+
+    def setUp(self):
+        self.controller, self.backend = simulated_controller()
+        self.queue = AutomationJobQueue()
+        self.addCleanup(self.queue.close)
+
+    def build(self, job):
+        return {"success": self.controller.create_simple_program(PROGRAM, job.report)}
+
+    def test_progress_per_block(self):
+        """Test that a finished build reports every block and parameter"""
+        job = self.queue.run("build", self.build, timeout=30)
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["progress"], {"blocks_placed": 4, "blocks_total": 4,
+                                           "parameters_set": 2, "parameters_total": 2})
+
+    def test_cancel_running_build(self):
+        """Test that a running build stops before its next action"""
+        placed = threading.Event()
+        resume = threading.Event()
+
+        def build(job):
+            def report(plan, index):
+                if index == 1:
+                    placed.set()
+                    resume.wait(5)
+                job.report(plan, index)
+            return {"success": self.controller.create_simple_program(PROGRAM, report)}
+
+        job = self.queue.submit("build", build)
+        self.assertTrue(placed.wait(30))
+        self.assertTrue(self.queue.cancel(job["job_id"])["cancel_requested"])
+        resume.set()
+        finished = self.queue.wait(job["job_id"], 30)
+        self.assertEqual(finished["status"], "cancelled")
+        self.assertEqual(finished["progress"]["blocks_placed"], 2)
+        self.assertEqual(self.backend.scripts(), [[b['opcode'] for b in PROGRAM[:2]]])
+
+    def test_failed_build_resumes_in_later_job(self):
+        """Test that a failed job keeps its checkpoint and a resume job finishes the build"""
+        self.backend.palette.remove('looks_hide')
+
+        def build(job):
+            ok = self.controller.create_simple_program(PROGRAM, job.report)
+            job.checkpoint = self.controller.checkpoint
+            return {"success": ok}
+
+        failed = self.queue.run("build", build, timeout=30)
+        self.assertEqual(failed["status"], "failed")
+        self.assertEqual(failed["checkpoint"]["blocks_placed"], 3)
+        self.assertTrue(failed["checkpoint"]["resumable"])
+
+        self.backend.palette.append('looks_hide')
+        checkpoint = self.queue.checkpoint(failed["job_id"])
+        resumed = self.queue.run(
+            "resume", lambda job: {"success": self.controller.resume_program(checkpoint, job.report)}, timeout=30
+        )
+        self.assertEqual(resumed["status"], "succeeded")
+        self.assertEqual(resumed["progress"]["blocks_placed"], 4)
+        self.assertEqual(self.backend.scripts(), [[b['opcode'] for b in PROGRAM]])
+
+
+DESCRIPTION = "when flag clicked move right 10 steps"
+DESCRIPTION_OPCODES = ['event_whenflagclicked', 'motion_movesteps']
+
+
+class GatedBackend(SimulatedBackend):
+    """Simulated backend that holds its first drag until the test opens the gate"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.dragged = threading.Event()
+        self.gate = threading.Event()
+
+    def drag(self, start, end, duration):
+        super().drag(start, end, duration)
+        if not self.dragged.is_set():
+            self.dragged.set()
+            self.gate.wait(5)
+
+
+class AutomationMCPTestCase(unittest.TestCase):
+    """Drives AutomationMCP tools through the simulated backend"""
+
+    def make_mcp(self, backend=None, missing=()):
+        """Initialized AutomationMCP whose palette lacks `missing` (templates still cover them)"""
+        controller, self.backend = simulated_controller(backend, palette_without=missing, connect=False)
+        self.mcp = AutomationMCP(controller)
+        self.addCleanup(self.mcp.jobs.close)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.mcp.project_dir = Path(directory.name)
+        self.assertTrue(self.mcp.initialize_automation()["success"])
+        return self.mcp
+
+    def build(self, **kwargs):
+        """Submit DESCRIPTION and wait for its job"""
+        queued = self.mcp.create_scratch_program_auto(DESCRIPTION, **kwargs)
+        self.assertTrue(queued["success"])
+        self.assertEqual(queued["job"]["status"], "queued")
+        return self.mcp.jobs.wait(queued["job_id"], 30)
+
+
+class TestAutomationMCP(AutomationMCPTestCase):
+    """Test cases for building, polling and cancelling through the MCP tools"""
+
+    def test_gui_build_job(self):
+        """Test the default route: blocks dragged in, result and progress on the job"""
+        self.make_mcp()
+        job = self.mcp.get_automation_job(self.build()["job_id"])
+        self.assertEqual((job["success"], job["status"]), (True, "succeeded"))
+        result = job["result"]
+        self.assertEqual(result["automation_mode"], "gui")
+        self.assertEqual(result["blocks_placed"], 2)
+        self.assertEqual(list(result["automation_seconds"]), ["gui"])
+        self.assertEqual(job["progress"]["blocks_placed"], 2)
+        self.assertEqual(self.backend.scripts(), [DESCRIPTION_OPCODES])
+
+    def test_file_build_job(self):
+        """Test the file route: timed on the backend clock, generated project deleted"""
+        self.make_mcp()
+        start = self.backend.now
+        result = self.build(mode="file")["result"]
+        self.assertEqual(result["automation_mode"], "file")
+        self.assertAlmostEqual(result["automation_seconds"]["file"], self.backend.now - start, places=2)
+        self.assertEqual(len(self.backend.loaded_projects), 1)
+        self.assertEqual(list(self.mcp.project_dir.iterdir()), [])
+        self.assertEqual(self.backend.scripts(), [DESCRIPTION_OPCODES])
+
+    def test_auto_falls_back_to_gui(self):
+        """Test that auto drags the blocks in when the project file can't be written"""
+        self.make_mcp()
+        blocker = self.mcp.project_dir / "taken"
+        blocker.write_text("")
+        self.mcp.project_dir = blocker / "projects"
+        result = self.build(mode="auto")["result"]
+        self.assertEqual(result["automation_mode"], "gui")
+        self.assertIn("file_error", result)
+        self.assertEqual(set(result["automation_seconds"]), {"file", "gui"})
+        self.assertEqual(self.backend.scripts(), [DESCRIPTION_OPCODES])
+
+    def test_rejects_unknown_mode_and_priority(self):
+        """Test that bad arguments are refused before anything is queued"""
+        self.make_mcp()
+        self.assertEqual(self.mcp.create_scratch_program_auto(DESCRIPTION, mode="fast")["available_modes"],
+                         ["gui", "file", "auto"])
+        for result in (self.mcp.create_scratch_program_auto(DESCRIPTION, priority="admin"),
+                       self.mcp.modify_existing_project(DESCRIPTION, priority="admin"),
+                       self.mcp.resume_automation_job("missing", priority="admin")):
+            self.assertFalse(result["success"])
+            self.assertEqual(result["available_priorities"], ["teacher", "student"])
+        self.assertEqual(self.mcp.jobs.get_stats()["queued"], 0)
+
+    def test_get_and_cancel_jobs(self):
+        """Test lookups and cancellation of unknown, queued and finished jobs"""
+        self.make_mcp()
+        self.assertFalse(self.mcp.get_automation_job("missing")["success"])
+        self.assertFalse(self.mcp.cancel_automation_job("missing")["success"])
+
+        gate, started = threading.Event(), threading.Event()
+        self.mcp.jobs.submit("block", lambda job: started.set() or gate.wait(5) or {})
+        self.assertTrue(started.wait(5))
+        queued = self.mcp.create_scratch_program_auto(DESCRIPTION, priority="teacher")
+        cancelled = self.mcp.cancel_automation_job(queued["job_id"])
+        self.assertEqual((cancelled["status"], cancelled["message"]), ("cancelled", "Job cancelled"))
+        gate.set()
+
+        finished = self.build()
+        self.assertEqual(self.mcp.cancel_automation_job(finished["job_id"])["message"], "Job already succeeded")
+        self.assertEqual(self.backend.scripts(), [DESCRIPTION_OPCODES])
+
+
+class TestResumeAutomationJob(AutomationMCPTestCase):
+    """Test cases for resume_automation_job"""
+
+    def test_resume_failed_job(self):
+        """Test that a failed GUI build finishes in a resume job without duplicate blocks"""
+        self.make_mcp(missing=['motion_movesteps'])
+        failed = self.build()
+        self.assertEqual(failed["status"], "failed")
+        self.assertTrue(failed["checkpoint"]["resumable"])
+
+        self.backend.palette.append('motion_movesteps')
+        resume = self.mcp.resume_automation_job(failed["job_id"])
+        self.assertTrue(resume["success"])
+        self.assertEqual(resume["job"]["resumes"], failed["job_id"])
+        resumed = self.mcp.jobs.wait(resume["job_id"], 30)
+        self.assertEqual(resumed["status"], "succeeded")
+        self.assertEqual(resumed["checkpoint"]["status"], "done")
+        self.assertEqual(self.backend.scripts(), [DESCRIPTION_OPCODES])
+
+    def test_resume_cancelled_job(self):
+        """Test that a job cancelled mid-build resumes after its last completed step"""
+        self.make_mcp(backend=GatedBackend())
+        queued = self.mcp.create_scratch_program_auto(DESCRIPTION)
+        self.assertTrue(self.backend.dragged.wait(30))
+        self.assertEqual(self.mcp.cancel_automation_job(queued["job_id"])["message"],
+                         "Job will stop before its next block")
+        self.backend.gate.set()
+        cancelled = self.mcp.jobs.wait(queued["job_id"], 30)
+        self.assertEqual(cancelled["status"], "cancelled")
+        self.assertEqual(cancelled["checkpoint"]["blocks_placed"], 1)
+
+        resumed = self.mcp.jobs.wait(self.mcp.resume_automation_job(queued["job_id"])["job_id"], 30)
+        self.assertEqual(resumed["status"], "succeeded")
+        self.assertEqual(self.backend.scripts(), [DESCRIPTION_OPCODES])
+
+    def test_nothing_to_resume(self):
+        """Test that unknown, finished and file-route jobs have nothing to resume"""
+        self.make_mcp()
+        unknown = self.mcp.resume_automation_job("missing")
+        self.assertFalse(unknown["success"])
+        self.assertIsNone(unknown["job"])
+
+        for mode in ("gui", "file"):
+            finished = self.build(mode=mode)
+            refused = self.mcp.resume_automation_job(finished["job_id"])
+            self.assertFalse(refused["success"])
+            self.assertIn("no unfinished build", refused["message"])
+            self.assertEqual(refused["job"]["status"], "succeeded")
+        self.assertEqual(self.mcp.jobs.get_stats()["queued"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Tests for checkpointed, resumable program construction"""
+
+import unittest
+import os
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.backends import simulated_controller
+from automation.checkpoint import BuildCheckpoint
+from automation.drag_plan import compile_plan
+from automation.pictoblox_controller import AutomationCancelled
+
+PROGRAM = [
+    {'opcode': 'event_whenflagclicked'},
+    {'opcode': 'motion_movesteps', 'inputs': {'STEPS': 10}},
+    {'opcode': 'control_repeat', 'inputs': {'TIMES': 3}, 'substack': [
+        {'opcode': 'motion_turnright', 'inputs': {'DEGREES': 15}},
+    ]},
+    {'opcode': 'looks_hide'},
+]
+EXPECTED = [['event_whenflagclicked', 'motion_movesteps', ('control_repeat', ['motion_turnright']), 'looks_hide']]
+
+
+class TestBuildCheckpoint(unittest.TestCase):
+    """Test cases for recording and rebasing steps"""
+
+    def setUp(self):
+        plan = compile_plan(PROGRAM, (100, 200), lambda opcode: (120, 32))
+        self.checkpoint = BuildCheckpoint(plan, (50, 150))
+
+    def test_records_node_ids_and_geometry(self):
+        """Test that steps carry the IR node id and where the block sits"""
+        for index in range(4):
+            self.checkpoint.record(index)
+        steps = self.checkpoint.to_dict()
+        self.assertEqual(steps['placed_nodes'], ['0', '1', '2', '2.0'])
+        self.assertEqual(steps['last_step']['geometry'], [116, 296, 120, 32])
+        with self.assertRaises(ValueError):
+            self.checkpoint.record(6)
+
+    def test_rebase_moves_plan(self):
+        """Test that a moved workspace shifts remaining actions and recorded steps"""
+        self.checkpoint.record(0)
+        self.checkpoint.rebase((80, 140))
+        self.assertEqual(self.checkpoint.steps[0].geometry[:2], (130, 190))
+        self.assertEqual(self.checkpoint.plan.blocks[1].y, 222)
+        edit = self.checkpoint.plan.actions[-1]
+        self.assertEqual(edit.point[1], 190 + 32 * 3 + 16)
+
+
+class TestResume(unittest.TestCase):
+    """Test cases for resuming builds on the simulated backend"""
+
+    def test_resume_after_failure(self):
+        """Test that a failed build finishes without duplicating placed blocks"""
+        controller, backend = simulated_controller(palette_without=['looks_hide'])
+        self.assertFalse(controller.create_simple_program(PROGRAM))
+        status = controller.get_status()['checkpoint']
+        self.assertEqual((status['status'], status['blocks_placed']), ('failed', 4))
+        self.assertIn('looks_hide', status['error'])
+
+        backend.palette.append('looks_hide')  # e.g. the extension finished loading
+        self.assertTrue(controller.resume_program())
+        self.assertEqual(backend.scripts(), EXPECTED)
+        self.assertEqual(sum(a[1] == 'drag' for a in backend.actions), 5)
+        self.assertEqual(controller.checkpoint.to_dict()['status'], 'done')
+        self.assertEqual(controller.timer.last.label, 'resume_program')
+
+    def test_resume_after_window_moved(self):
+        """Test that the rest of the plan follows the re-detected window"""
+        controller, backend = simulated_controller(palette_without=['looks_hide'])
+        controller.create_simple_program(PROGRAM)
+        backend.palette.append('looks_hide')
+        backend.window.moveTo(60, 40)
+        self.assertTrue(controller.resume_program())
+        self.assertEqual(backend.scripts(), EXPECTED)
+        values = sorted(value for block in backend.blocks.values() for value in block.values)
+        self.assertEqual(values, ['10', '15', '3'])
+
+    def test_resume_after_cancel(self):
+        """Test that a cancelled build resumes at the next action"""
+        controller, backend = simulated_controller()
+
+        def cancel_after_two(plan, index):
+            if index == 1:
+                raise AutomationCancelled("stop")
+
+        with self.assertRaises(AutomationCancelled):
+            controller.create_simple_program(PROGRAM, cancel_after_two)
+        self.assertEqual(controller.checkpoint.status, 'cancelled')
+        self.assertEqual(controller.checkpoint.completed, 2)
+        reported = []
+        self.assertTrue(controller.resume_program(progress=lambda plan, index: reported.append(index)))
+        self.assertEqual(backend.scripts(), EXPECTED)
+        self.assertEqual(reported, list(range(2, 8)))
+
+    def test_nothing_to_resume(self):
+        """Test that finished or missing builds aren't resumed"""
+        controller, _ = simulated_controller()
+        self.assertFalse(controller.resume_program())
+        controller.create_simple_program(PROGRAM)
+        self.assertFalse(controller.resume_program())
+
+
+if __name__ == '__main__':
+    unittest.main()
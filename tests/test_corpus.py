@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Tests for sharded corpus processing"""
+
+import unittest
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from programming.corpus import plan_shards, process_corpus, main as corpus_main
+from programming.block_generator import BlockGenerator
+
+PROMPTS = ["move right 10 steps", "", "jump", "when space pressed jump", "say hello",
+           "play sound", "turn right", "", "hide", "when flag clicked move up 5 steps"]
+
+
+def read_shards(output_dir):
+    entries = []
+    for name in sorted(os.listdir(output_dir)):
+        if name.startswith("shard-"):
+            with open(os.path.join(output_dir, name), encoding="utf-8") as f:
+                entries.extend(json.loads(line) for line in f)
+    return entries
+
+
+class TestCorpus(unittest.TestCase):
+    """Test cases for process_corpus and shard planning"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmp.name, "prompts.txt")
+        with open(self.input_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(PROMPTS) + "\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_plan_shards_covers_file_on_line_boundaries(self):
+        """Test that shards are contiguous, line-aligned and numbered"""
+        shards = plan_shards(self.input_path, 4)
+        size = os.path.getsize(self.input_path)
+        self.assertEqual(shards[0].start, 0)
+        self.assertEqual(shards[-1].end, size)
+        with open(self.input_path, "rb") as f:
+            data = f.read()
+        for previous, shard in zip(shards, shards[1:]):
+            self.assertEqual(previous.end, shard.start)
+            self.assertEqual(data[shard.start - 1:shard.start], b"\n")
+            self.assertEqual(shard.first_line, data[:shard.start].count(b"\n") + 1)
+
+    def test_plan_shards_empty_file(self):
+        """Test that an empty corpus has no shards"""
+        empty = os.path.join(self.tmp.name, "empty.txt")
+        open(empty, "w").close()
+        self.assertEqual(plan_shards(empty, 4), [])
+
+    def test_in_process_matches_line_numbers(self):
+        """Test that every non-blank line is processed once with its line number"""
+        output_dir = os.path.join(self.tmp.name, "out")
+        manifest = process_corpus(self.input_path, output_dir, workers=1, shards=3)
+
+        entries = read_shards(output_dir)
+        expected = [(i + 1, p) for i, p in enumerate(PROMPTS) if p]
+        self.assertEqual(sorted((e["line"], e["description"]) for e in entries), expected)
+        self.assertEqual(manifest["prompts"], len(expected))
+        self.assertEqual(manifest["knowledge_sharing"], "in-process")
+        self.assertTrue(os.path.exists(os.path.join(output_dir, "manifest.json")))
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "fork not available")
+    def test_fork_workers_match_single_process(self):
+        """Test that forked workers produce the same results as one process"""
+        single_dir = os.path.join(self.tmp.name, "single")
+        forked_dir = os.path.join(self.tmp.name, "forked")
+        process_corpus(self.input_path, single_dir, workers=1, shards=4)
+        manifest = process_corpus(self.input_path, forked_dir, workers=2, shards=4, start_method="fork")
+
+        self.assertEqual(manifest["knowledge_sharing"], "fork copy-on-write")
+        key = lambda e: e["line"]
+        self.assertEqual(sorted(read_shards(single_dir), key=key), sorted(read_shards(forked_dir), key=key))
+
+    def test_spawn_workers_rebuild_from_pickle(self):
+        """Test that spawned workers use the parent's knowledge base"""
+        output_dir = os.path.join(self.tmp.name, "spawned")
+        manifest = process_corpus(self.input_path, output_dir, workers=2, shards=2, start_method="spawn")
+        self.assertEqual(manifest["knowledge_sharing"], "pickled once")
+        self.assertEqual(manifest["prompts"], len([p for p in PROMPTS if p]))
+        self.assertEqual(manifest["failed"], 0)
+
+    def test_jsonl_input_keeps_ids(self):
+        """Test that JSONL input carries ids through and flags bad lines"""
+        input_path = os.path.join(self.tmp.name, "prompts.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "w1-q1", "description": "jump"}) + "\n")
+            f.write("not json\n")
+        output_dir = os.path.join(self.tmp.name, "jsonl")
+        manifest = process_corpus(input_path, output_dir, workers=1)
+
+        entries = sorted(read_shards(output_dir), key=lambda e: e["line"])
+        self.assertEqual(entries[0]["id"], "w1-q1")
+        self.assertTrue(entries[0]["success"])
+        self.assertEqual(entries[1]["error_type"], "invalid_input")
+        self.assertEqual(manifest["failed"], 1)
+
+    def test_cli(self):
+        """Test the command-line entry point"""
+        output_dir = os.path.join(self.tmp.name, "cli")
+        self.assertEqual(corpus_main([self.input_path, output_dir, "--workers", "1"]), 0)
+        self.assertTrue(read_shards(output_dir))
+
+
+class TestBlockGeneratorFromLoaded(unittest.TestCase):
+    """Test cases for building a generator without file I/O"""
+
+    def test_from_loaded_matches_file_load(self):
+        """Test that from_loaded builds the same lookup tables"""
+        loaded = BlockGenerator()
+        rebuilt = BlockGenerator.from_loaded(*loaded.loaded_knowledge())
+        self.assertEqual(rebuilt.action_mapping, loaded.action_mapping)
+        self.assertEqual(rebuilt.block_templates, loaded.block_templates)
+
+
+if __name__ == '__main__':
+    unittest.main()
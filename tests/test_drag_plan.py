@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Tests for the drag-plan compiler"""
+
+import unittest
+import os
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.drag_plan import C_BOTTOM_ARM, C_EMPTY_MOUTH, C_MOUTH_INDENT, compile_plan
+
+
+def size(opcode):
+    return (120, 40) if opcode.startswith("event_") else (100, 30)
+
+
+class TestCompilePlan(unittest.TestCase):
+    """Test cases for compile_plan"""
+
+    def test_blocks_stack_on_snap_points(self):
+        """Test that each block is dropped right under the previous one"""
+        plan = compile_plan([{'opcode': 'event_whenflagclicked'}, {'opcode': 'motion_movesteps'},
+                             {'opcode': 'looks_show'}], (200, 100), size)
+        self.assertEqual([(b.x, b.y) for b in plan.blocks], [(200, 100), (200, 140), (200, 170)])
+        self.assertEqual(plan.bottom, 200)
+        self.assertEqual(plan.blocks[1].drop_point, (250, 155))
+
+    def test_one_drag_per_block_and_batched_edits(self):
+        """Test the action list: all drops first, then three actions per parameter"""
+        program = [{'opcode': 'event_whenflagclicked'},
+                   {'opcode': 'looks_sayforsecs', 'inputs': {'MESSAGE': 'Hi', 'SECS': 2}},
+                   {'opcode': 'motion_movesteps', 'inputs': {'STEPS': 10}}]
+        plan = compile_plan(program, (0, 0), size)
+        self.assertEqual([a.kind for a in plan.actions], ["place"] * 3 + ["edit"] * 3)
+        self.assertEqual(plan.drag_count, 3)
+        self.assertEqual(plan.action_count, 3 + 3 * 3)
+        # Fields of one block are spread across it, not clicked at the same spot
+        first, second = plan.actions[3].point, plan.actions[4].point
+        self.assertLess(first[0], second[0])
+        self.assertGreater(plan.estimated_seconds(), 0)
+
+    def test_c_block_layout(self):
+        """Test substack offsets and the C-block's growth"""
+        program = [{'opcode': 'control_repeat', 'substack': [{'opcode': 'motion_movesteps'},
+                                                             {'opcode': 'motion_turnright'}]},
+                   {'opcode': 'looks_show'}]
+        plan = compile_plan(program, (0, 0), size)
+        positions = {b.node_id: (b.x, b.y) for b in plan.blocks}
+        self.assertEqual(positions["0.0"], (C_MOUTH_INDENT, 30))
+        self.assertEqual(positions["0.1"], (C_MOUTH_INDENT, 60))
+        self.assertEqual(positions["1"], (0, 30 + 60 + C_BOTTOM_ARM))
+        # Placement order fills the mouth before the block below
+        self.assertEqual([plan.blocks[a.block].node_id for a in plan.actions], ["0", "0.0", "0.1", "1"])
+
+    def test_empty_c_block(self):
+        """Test that an empty mouth still has its minimum height"""
+        plan = compile_plan([{'opcode': 'control_if'}, {'opcode': 'looks_hide'}], (0, 0), size)
+        self.assertEqual(plan.blocks[1].y, 30 + C_EMPTY_MOUTH + C_BOTTOM_ARM)
+
+    def test_nothing_below_cap_block(self):
+        """Test that blocks after forever are rejected"""
+        with self.assertRaises(ValueError):
+            compile_plan([{'opcode': 'control_forever'}, {'opcode': 'looks_hide'}], (0, 0), size)
+
+    def test_summary(self):
+        """Test the per-plan report"""
+        summary = compile_plan([{'opcode': 'looks_hide'}], (0, 0), size).summary()
+        self.assertEqual(summary['blocks'], 1)
+        self.assertEqual(summary['actions'], 1)
+        self.assertIn('estimated_seconds', summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
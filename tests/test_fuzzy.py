@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Tests for the fuzzy vocabulary index"""
+
+import unittest
+import os
+import random
+import string
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from programming.fuzzy import FuzzyIndex, edit_distance
+
+
+def brute_force(terms, word, limit):
+    return sorted((t, d) for t in terms for d in [edit_distance(word, t, limit)] if d <= limit)
+
+
+class TestEditDistance(unittest.TestCase):
+    """Test cases for edit_distance"""
+
+    def test_counts_transposition_as_one_edit(self):
+        """Test that swapped adjacent letters cost one edit"""
+        self.assertEqual(edit_distance("jupm", "jump", 2), 1)
+        self.assertEqual(edit_distance("mvoe", "move", 2), 1)
+
+    def test_basic_edits(self):
+        """Test insertions, deletions and substitutions"""
+        self.assertEqual(edit_distance("jmp", "jump", 2), 1)
+        self.assertEqual(edit_distance("jumpp", "jump", 2), 1)
+        self.assertEqual(edit_distance("jimp", "jump", 2), 1)
+        self.assertEqual(edit_distance("", "ab", 2), 2)
+
+    def test_stops_at_limit(self):
+        """Test that distances over the limit report limit + 1"""
+        self.assertEqual(edit_distance("space", "forever", 2), 3)
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    """Test cases for FuzzyIndex"""
+
+    def test_lookup_matches_brute_force(self):
+        """Test that the delete index finds exactly the terms within the distance"""
+        rng = random.Random(3)
+        terms = {"".join(rng.choice("abcde") for _ in range(rng.randint(3, 7))) for _ in range(300)}
+        index = FuzzyIndex(terms, max_candidates=10 ** 6)
+        for _ in range(300):
+            word = "".join(rng.choice("abcdef") for _ in range(rng.randint(2, 8)))
+            with self.subTest(word=word):
+                found = sorted(index.lookup(word, 2, limit=10 ** 6))
+                if word in terms:
+                    self.assertEqual(found, [(word, 0)])
+                else:
+                    self.assertEqual(found, brute_force(terms, word, 2))
+
+    def test_correct_prefers_unique_nearest(self):
+        """Test that correct() returns the single nearest term and rejects ties"""
+        index = FuzzyIndex(["jump", "move", "shop", "show"])
+        self.assertEqual(index.correct("jupm", 1), "jump")
+        self.assertIsNone(index.correct("shox", 1))  # shop and show tie
+        self.assertIsNone(index.correct("xyzzy", 1))
+
+    def test_long_queries_are_skipped(self):
+        """Test that queries over max_word_length are not looked up"""
+        index = FuzzyIndex(["jump"], max_word_length=10)
+        self.assertEqual(index.lookup(string.ascii_lowercase), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
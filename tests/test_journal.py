@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Tests for the request journal and replay harness"""
+
+import unittest
+import asyncio
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.journal import RequestJournal, read_journal, result_hash
+from utils import replay
+from programming.pipeline import GenerationPipeline
+from programming.parsers import NaturalLanguageParser
+from programming.block_generator import BlockGenerator
+
+
+class TestRequestJournal(unittest.TestCase):
+    """Test cases for RequestJournal"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "journal.jsonl")
+        self.pipeline = GenerationPipeline(NaturalLanguageParser(), BlockGenerator())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _record(self, journal, descriptions):
+        @journal.record("generate_scratch_blocks")
+        async def generate_scratch_blocks(description, output_format="text"):
+            return self.pipeline.run(description, output_format)
+
+        async def scenario():
+            for description in descriptions:
+                await generate_scratch_blocks(description)
+
+        asyncio.run(scenario())
+        journal.close()
+
+    def test_disabled_journal_leaves_function_unwrapped(self):
+        """Test that no path means no wrapping and no file"""
+        journal = RequestJournal(None)
+
+        async def tool():
+            return {}
+
+        self.assertIs(journal.record("tool")(tool), tool)
+        self.assertFalse(journal.enabled)
+
+    def test_entries_are_written_in_background(self):
+        """Test that each invocation becomes one JSONL entry"""
+        journal = RequestJournal(self.path, flush_interval=0.05)
+        self._record(journal, ["move right 10 steps", "jump", "xyz unknown"])
+
+        entries = read_journal(self.path)
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(journal.get_stats()["written"], 3)
+
+        first = entries[0]
+        self.assertEqual(first["tool"], "generate_scratch_blocks")
+        self.assertEqual(first["arguments"], {"description": "move right 10 steps", "output_format": "text"})
+        self.assertIn("duration_ms", first)
+        self.assertTrue(first["success"])
+        self.assertEqual(first["result_hash"], result_hash(self.pipeline.run("move right 10 steps", "text")))
+        self.assertFalse(entries[2]["success"])
+
+    def test_read_journal_skips_torn_lines(self):
+        """Test that a partially written last line is ignored"""
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"tool": "a"}) + "\n")
+            f.write('{"tool": "b"')
+        self.assertEqual(read_journal(self.path), [{"tool": "a"}])
+
+
+class TestReplay(unittest.TestCase):
+    """Test cases for the replay harness"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.pipeline = GenerationPipeline(NaturalLanguageParser(), BlockGenerator())
+        self.entries = []
+        for i, description in enumerate(["move right 10 steps", "jump", "play sound"]):
+            self.entries.append({
+                "ts": 1000.0 + i * 0.05,
+                "tool": "generate_scratch_blocks",
+                "arguments": {"description": description, "output_format": "text"},
+                "result_hash": result_hash(self.pipeline.run(description, "text"))
+            })
+        self.entries.append({"ts": 1000.2, "tool": "get_user_info", "arguments": {"username": "x"}})
+
+    def test_replay_without_drift(self):
+        """Test that replaying an unchanged pipeline reports no drift"""
+        report = replay.replay(self.entries, self.pipeline)
+
+        self.assertEqual(report["replayed"], 3)
+        self.assertEqual(report["skipped"], 1)
+        self.assertEqual(report["drift"]["compared"], 3)
+        self.assertEqual(report["drift"]["drifted"], 0)
+        self.assertGreater(report["throughput_per_second"], 0)
+        self.assertIn("p95", report["latency_ms"])
+
+    def test_replay_detects_drift(self):
+        """Test that changed output is reported as drift"""
+        self.entries[1]["result_hash"] = "0" * 16
+        report = replay.replay(self.entries, self.pipeline)
+
+        self.assertEqual(report["drift"]["drifted"], 1)
+        self.assertEqual(report["drift"]["examples"][0]["arguments"]["description"], "jump")
+
+    def test_replay_batch_entries(self):
+        """Test that batch calls are replayed and compared as a whole response"""
+        descriptions = ["jump", "Jump ", "play sound", 7]
+        entry = {"ts": 1000.3, "tool": "generate_scratch_blocks_batch",
+                 "arguments": {"descriptions": descriptions, "output_format": "text"}}
+        entry["result_hash"] = result_hash(self.pipeline.run_batch(descriptions, "text"))
+        report = replay.replay(self.entries + [entry], self.pipeline)
+
+        self.assertEqual(report["replayed"], 4)
+        self.assertEqual(report["replayed_by_tool"]["generate_scratch_blocks_batch"], 1)
+        self.assertEqual(report["prompts"], 7)
+        self.assertEqual(report["failures"], 1)
+        self.assertEqual(report["drift"]["drifted"], 0)
+
+    def test_replay_rejected_batches(self):
+        """Test that batches the tool rejected replay as the same rejection"""
+        entries = []
+        for descriptions, error_type in [("jump", "invalid_input"), (["jump"] * 3, "batch_too_large")]:
+            recorded = self.pipeline.run_batch(descriptions, "text", max_size=2)
+            self.assertEqual(recorded["error_type"], error_type)
+            entries.append({"ts": 1000.0, "tool": "generate_scratch_blocks_batch",
+                            "arguments": {"descriptions": descriptions, "output_format": "text"},
+                            "result_hash": result_hash(recorded)})
+
+        with patch("utils.replay.BATCH_MAX_SIZE", 2):
+            report = replay.replay(entries, self.pipeline)
+        self.assertEqual(report["failures"], 2)
+        self.assertEqual(report["drift"]["drifted"], 0)
+
+    def test_recorded_pacing(self):
+        """Test that recorded pacing honours the gaps between entries"""
+        report = replay.replay(self.entries, self.pipeline, pace="recorded")
+        self.assertGreaterEqual(report["elapsed_seconds"], 0.1)
+
+        fast = replay.replay(self.entries, self.pipeline, pace="recorded", speed=100)
+        self.assertLess(fast["elapsed_seconds"], report["elapsed_seconds"])
+
+    def test_cli_fail_on_drift(self):
+        """Test the CLI exit code and JSON report"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "journal.jsonl")
+            self.entries[0]["result_hash"] = "0" * 16
+            with open(path, "w", encoding="utf-8") as f:
+                for entry in self.entries:
+                    f.write(json.dumps(entry) + "\n")
+
+            output = io.StringIO()
+            with redirect_stdout(output):
+                code = replay.main([path, "--fail-on-drift"])
+            self.assertEqual(code, 1)
+            self.assertIn("Drift: 1 of 3", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Tests for queue-based structured logging"""
+
+import unittest
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logging_setup import StructuredFormatter, RateLimitFilter, configure_logging, shutdown_logging
+from programming.block_generator import BlockGenerator, Intent
+
+
+def make_record(msg, *args, **extra):
+    record = logging.LogRecord("programming.block_generator", logging.WARNING, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestStructuredFormatter(unittest.TestCase):
+    """Test cases for StructuredFormatter"""
+
+    def test_text_format_appends_fields(self):
+        """Test key=value fields in text output"""
+        line = StructuredFormatter().format(make_record("Block %s missing", "x", pattern="jump"))
+        self.assertIn("WARNING", line)
+        self.assertIn("programming.block_generator: Block x missing", line)
+        self.assertTrue(line.endswith("pattern=jump"))
+
+    def test_json_format(self):
+        """Test JSON line output"""
+        line = StructuredFormatter(json_output=True).format(make_record("hello %d", 3, count=3))
+        entry = json.loads(line)
+        self.assertEqual(entry["message"], "hello 3")
+        self.assertEqual(entry["level"], "WARNING")
+        self.assertEqual(entry["count"], 3)
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    """Test cases for RateLimitFilter"""
+
+    def test_only_flagged_records_are_limited(self):
+        """Test that unflagged records always pass"""
+        limiter = RateLimitFilter(burst=1, interval=60)
+        self.assertTrue(all(limiter.filter(make_record("startup")) for _ in range(10)))
+
+    def test_burst_then_suppress(self):
+        """Test that flagged records beyond the burst are dropped and counted"""
+        limiter = RateLimitFilter(burst=3, interval=60)
+        passed = [limiter.filter(make_record("Block %s", i, rate_limit=True)) for i in range(10)]
+        self.assertEqual(passed.count(True), 3)
+        self.assertEqual(limiter.suppressed_total, 7)
+
+    def test_suppressed_count_reported_after_window(self):
+        """Test that the next window reports how many were suppressed"""
+        limiter = RateLimitFilter(burst=1, interval=0.05)
+        for _ in range(4):
+            limiter.filter(make_record("Block %s", 1, rate_limit=True))
+        time.sleep(0.06)
+        record = make_record("Block %s", 1, rate_limit=True)
+        self.assertTrue(limiter.filter(record))
+        self.assertEqual(record.suppressed, 3)
+
+
+class TestConfigureLogging(unittest.TestCase):
+    """Test cases for configure_logging"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.root = logging.getLogger()
+        self.saved_handlers = list(self.root.handlers)
+        self.saved_level = self.root.level
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "server.log")
+
+    def tearDown(self):
+        shutdown_logging()
+        for handler in self.saved_handlers:
+            self.root.addHandler(handler)
+        self.root.setLevel(self.saved_level)
+        self.tmp.cleanup()
+
+    def _read_log(self):
+        shutdown_logging()
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def test_records_reach_file_through_queue(self):
+        """Test that records are written by the background listener"""
+        configure_logging(level="INFO", log_file=self.path, log_format="json")
+        logging.getLogger("test").info("hello %s", "world")
+        logging.getLogger("test").debug("hidden")
+
+        entries = self._read_log()
+        self.assertEqual([e["message"] for e in entries], ["hello world"])
+
+    def test_missing_block_warning_is_rate_limited(self):
+        """Test that the generator's hot-path warning cannot flood the log"""
+        patterns_path = os.path.join(self.tmp.name, "patterns.json")
+        with open(patterns_path, "w", encoding="utf-8") as f:
+            json.dump({"jump": {"blocks": ["motion_doesnotexist"], "explanation": "x"}}, f)
+        generator = BlockGenerator(patterns_path=patterns_path)
+
+        os.environ["SCRATCH_LOG_RATE_BURST"] = "2"
+        try:
+            configure_logging(level="INFO", log_file=self.path, log_format="json")
+        finally:
+            del os.environ["SCRATCH_LOG_RATE_BURST"]
+        for _ in range(50):
+            generator.generate_blocks([Intent(action="jump")])
+
+        warnings = [e for e in self._read_log() if "not found in knowledge base" in e["message"]]
+        self.assertEqual(len(warnings), 2)
+        self.assertEqual(warnings[0]["pattern"], "jump")
+
+
+if __name__ == '__main__':
+    unittest.main()
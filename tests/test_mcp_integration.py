@@ -2,9 +2,12 @@
 """Tests for MCP server integration"""
 
 import unittest
+import asyncio
 import json
 import os
 import sys
+import tempfile
+import time
 from unittest.mock import patch, MagicMock
 
 # Add src to path for imports
@@ -12,6 +15,12 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 # Import main module components
 import main
+from utils.journal import result_hash
+
+
+def run_tool(coroutine):
+    """Run an async MCP tool handler to completion"""
+    return asyncio.run(coroutine)
 
 
 class TestMCPIntegration(unittest.TestCase):
@@ -39,10 +48,10 @@ class TestMCPIntegration(unittest.TestCase):
     
     def test_generate_scratch_blocks_tool_success(self):
         """Test generate_scratch_blocks tool with valid input"""
-        result = main.generate_scratch_blocks(
+        result = run_tool(main.generate_scratch_blocks(
             description="make the cat move right 10 steps",
             output_format="text"
-        )
+        ))
         
         self.assertIsInstance(result, dict)
         self.assertIn("success", result)
@@ -55,10 +64,10 @@ class TestMCPIntegration(unittest.TestCase):
     
     def test_generate_scratch_blocks_tool_pictoblox_format(self):
         """Test generate_scratch_blocks tool with PictoBlox format"""
-        result = main.generate_scratch_blocks(
+        result = run_tool(main.generate_scratch_blocks(
             description="make the cat jump",
             output_format="pictoblox"
-        )
+        ))
         
         self.assertIsInstance(result, dict)
         self.assertIn("success", result)
@@ -73,10 +82,10 @@ class TestMCPIntegration(unittest.TestCase):
     
     def test_generate_scratch_blocks_tool_blocks_format(self):
         """Test generate_scratch_blocks tool with blocks format"""
-        result = main.generate_scratch_blocks(
+        result = run_tool(main.generate_scratch_blocks(
             description="move right",
             output_format="blocks"
-        )
+        ))
         
         self.assertIsInstance(result, dict)
         self.assertIn("success", result)
@@ -89,10 +98,10 @@ class TestMCPIntegration(unittest.TestCase):
     
     def test_generate_scratch_blocks_tool_invalid_format(self):
         """Test generate_scratch_blocks tool with invalid format"""
-        result = main.generate_scratch_blocks(
+        result = run_tool(main.generate_scratch_blocks(
             description="move right",
             output_format="invalid_format"
-        )
+        ))
         
         self.assertIsInstance(result, dict)
         self.assertIn("success", result)
@@ -101,10 +110,10 @@ class TestMCPIntegration(unittest.TestCase):
     
     def test_generate_scratch_blocks_tool_empty_input(self):
         """Test generate_scratch_blocks tool with empty input"""
-        result = main.generate_scratch_blocks(
+        result = run_tool(main.generate_scratch_blocks(
             description="",
             output_format="text"
-        )
+        ))
         
         self.assertIsInstance(result, dict)
         self.assertIn("success", result)
@@ -113,12 +122,44 @@ class TestMCPIntegration(unittest.TestCase):
         if not result["success"]:
             self.assertIn("message", result)
     
+    def test_generate_scratch_blocks_batch_tool(self):
+        """Test batch generation keeps input order, dedupes and reports per-item errors"""
+        descriptions = ["move right 10 steps", "jump", "MOVE  right 10 steps", "xyz unknown command"]
+        result = run_tool(main.generate_scratch_blocks_batch(descriptions, "text"))
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["count"], 4)
+        self.assertEqual(result["unique_prompts"], 3)
+        self.assertEqual([item["index"] for item in result["results"]], [0, 1, 2, 3])
+        self.assertEqual([item["description"] for item in result["results"]], descriptions)
+        self.assertEqual(result["results"][0]["content"], result["results"][2]["content"])
+        self.assertFalse(result["results"][3]["success"])
+        self.assertEqual(result["succeeded"], 3)
+        self.assertEqual(result["failed"], 1)
+
+        single = run_tool(main.generate_scratch_blocks("jump", "text"))
+        self.assertEqual(result["results"][1]["content"], single["content"])
+
+    def test_replay_rebuilds_batch_response(self):
+        """Test that replaying a batch reproduces the tool's response, so journal hashes match"""
+        descriptions = ["move right 10 steps", "jump", "MOVE  right 10 steps", 7]
+        result = run_tool(main.generate_scratch_blocks_batch(descriptions, "text"))
+        replayed = main.pipeline.run_batch(descriptions, "text")
+        self.assertEqual(result_hash(replayed), result_hash(result))
+
+    def test_generate_scratch_blocks_batch_too_large(self):
+        """Test that oversized batches are rejected"""
+        with patch('main.BATCH_MAX_SIZE', 2):
+            result = run_tool(main.generate_scratch_blocks_batch(["a", "b", "c"]))
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error_type"], "batch_too_large")
+
     def test_explain_scratch_concept_tool_loops(self):
         """Test explain_scratch_concept tool for loops"""
-        result = main.explain_scratch_concept(
+        result = run_tool(main.explain_scratch_concept(
             concept="loops",
             age_level="beginner"
-        )
+        ))
         
         self.assertIsInstance(result, dict)
         self.assertIn("success", result)
@@ -139,10 +180,10 @@ class TestMCPIntegration(unittest.TestCase):
         
         for level in levels:
             with self.subTest(age_level=level):
-                result = main.explain_scratch_concept(
+                result = run_tool(main.explain_scratch_concept(
                     concept="events",
                     age_level=level
-                )
+                ))
                 
                 self.assertIsInstance(result, dict)
                 self.assertIn("success", result)
@@ -153,10 +194,10 @@ class TestMCPIntegration(unittest.TestCase):
     
     def test_explain_scratch_concept_tool_unknown_concept(self):
         """Test explain_scratch_concept tool with unknown concept"""
-        result = main.explain_scratch_concept(
+        result = run_tool(main.explain_scratch_concept(
             concept="unknown_concept_xyz",
             age_level="beginner"
-        )
+        ))
         
         self.assertIsInstance(result, dict)
         self.assertIn("success", result)
@@ -165,7 +206,7 @@ class TestMCPIntegration(unittest.TestCase):
     
     def test_get_system_status_tool(self):
         """Test get_system_status tool"""
-        result = main.get_system_status()
+        result = run_tool(main.get_system_status())
         
         self.assertIsInstance(result, dict)
         self.assertIn("block_generation", result)
@@ -178,17 +219,59 @@ class TestMCPIntegration(unittest.TestCase):
         self.assertIn("available_actions", block_gen)
         self.assertIn("formatters", block_gen)
         
+        # Check request coalescing counters
+        self.assertIn("request_coalescing", result)
+        self.assertIn("total_deduplicated", result["request_coalescing"])
+
         # Check system info
         system_info = result["system_info"]
         self.assertIn("mcp_server", system_info)
         self.assertIn("version", system_info)
     
+    def test_get_metrics_tool(self):
+        """Test that get_metrics reports per-tool latency and stage timings"""
+        run_tool(main.generate_scratch_blocks(
+            description="make the cat move right 10 steps",
+            output_format="text"
+        ))
+        result = run_tool(main.get_metrics())
+
+        self.assertIn("tools", result)
+        self.assertIn("stages", result)
+        tool = result["tools"]["generate_scratch_blocks"]
+        self.assertGreaterEqual(tool["calls"], 1)
+        self.assertIn("p95_ms", tool["latency"])
+        for stage in ["parse", "generate", "format"]:
+            self.assertIn(stage, result["stages"])
+
+    def test_profile_requests_tool(self):
+        """Test that profile_requests captures the next n tool invocations"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(main.profiler, 'output_dir', tmp):
+            armed = run_tool(main.profile_requests(n=2, top=5))
+            self.assertTrue(armed["success"])
+            self.assertEqual(armed["profile"]["status"], "collecting")
+
+            for steps in (10, 20):
+                run_tool(main.generate_scratch_blocks(
+                    description=f"move right {steps} steps",
+                    output_format="text"
+                ))
+
+            report = run_tool(main.get_profile_report())
+            self.assertTrue(report["success"])
+            profile = report["profile"]
+            self.assertEqual(profile["status"], "complete")
+            self.assertEqual(profile["tools"], {"generate_scratch_blocks": 2})
+            self.assertTrue(profile["hot_functions"])
+            self.assertTrue(os.path.exists(profile["files"]["pstats"]))
+
     @patch('main.session', None)
     @patch('main.me', None)
     def test_scratch_tools_without_authentication(self):
         """Test Scratch-specific tools without authentication"""
         # Test set_my_about_me without authentication
-        result = main.set_my_about_me("Test bio")
+        result = run_tool(main.set_my_about_me("Test bio"))
         
         self.assertIsInstance(result, dict)
         self.assertIn("success", result)
@@ -197,13 +280,35 @@ class TestMCPIntegration(unittest.TestCase):
         self.assertEqual(result["error_type"], "authentication_required")
         
         # Test get_user_info without authentication
-        result = main.get_user_info("testuser")
+        result = run_tool(main.get_user_info("testuser"))
         
         self.assertIsInstance(result, dict)
         self.assertIn("success", result)
         self.assertFalse(result["success"])
         self.assertEqual(result["error_type"], "authentication_required")
     
+    def test_profile_writes_are_queued(self):
+        """Test that profile tools return pending status and flush on demand"""
+        fake_me = MagicMock()
+        queue = main.ProfileWriteQueue(debounce_seconds=60)
+
+        with patch('main.session', MagicMock()), patch('main.me', fake_me), \
+                patch('main.profile_writes', queue):
+            run_tool(main.set_my_about_me("first draft"))
+            result = run_tool(main.set_my_about_me("final draft"))
+
+            self.assertTrue(result["success"])
+            self.assertEqual(result["status"], "pending")
+            fake_me.set_bio.assert_not_called()
+
+            flushed = run_tool(main.flush_profile_writes())
+            self.assertTrue(flushed["success"])
+            fake_me.set_bio.assert_called_once_with("final draft")
+            self.assertEqual(flushed["stats"]["upstream_writes"], 1)
+            self.assertEqual(flushed["stats"]["coalesced"], 1)
+
+        queue.close()
+
     def test_helper_functions(self):
         """Test helper functions"""
         # Test _generate_concept_examples
@@ -226,10 +331,10 @@ class TestMCPIntegration(unittest.TestCase):
             with self.subTest(test_case=test_case):
                 try:
                     # This might raise an exception, which should be handled gracefully
-                    result = main.generate_scratch_blocks(
+                    result = run_tool(main.generate_scratch_blocks(
                         description=test_case.get("description", ""),
                         output_format=test_case.get("output_format", "text")
-                    )
+                    ))
                     
                     # If it returns a result, it should be a dict with success field
                     self.assertIsInstance(result, dict)
@@ -246,10 +351,10 @@ class TestMCPToolsIntegration(unittest.TestCase):
     def test_full_pipeline_text_format(self):
         """Test full pipeline from natural language to text output"""
         # Generate blocks
-        result = main.generate_scratch_blocks(
+        result = run_tool(main.generate_scratch_blocks(
             description="when space pressed make cat jump",
             output_format="text"
-        )
+        ))
         
         if result["success"]:
             # Should have all expected fields
@@ -264,10 +369,10 @@ class TestMCPToolsIntegration(unittest.TestCase):
     
     def test_full_pipeline_pictoblox_format(self):
         """Test full pipeline from natural language to PictoBlox output"""
-        result = main.generate_scratch_blocks(
+        result = run_tool(main.generate_scratch_blocks(
             description="move the sprite right 15 steps",
             output_format="pictoblox"
-        )
+        ))
         
         if result["success"]:
             # Should have PictoBlox-specific fields
@@ -284,19 +389,61 @@ class TestMCPToolsIntegration(unittest.TestCase):
     def test_concept_explanation_and_block_generation_consistency(self):
         """Test that concept explanations are consistent with block generation"""
         # Explain loops concept
-        explanation_result = main.explain_scratch_concept("loops", "beginner")
+        explanation_result = run_tool(main.explain_scratch_concept("loops", "beginner"))
         
         if explanation_result["success"]:
             # Try to generate blocks for a loop-related command
-            generation_result = main.generate_scratch_blocks(
+            generation_result = run_tool(main.generate_scratch_blocks(
                 description="repeat jumping 5 times",
                 output_format="text"
-            )
+            ))
             
             # Both should work
             self.assertTrue(explanation_result["success"])
             # Generation might or might not succeed depending on implementation
 
 
+class TestAsyncToolConcurrency(unittest.TestCase):
+    """Load test: slow Scratch I/O must not stall block generation"""
+
+    def test_slow_project_lookup_does_not_stall_generation(self):
+        """Test that generate_scratch_blocks completes while get_project_info blocks"""
+        slow_session = MagicMock()
+
+        def slow_connect_project(project_id):
+            time.sleep(1.0)  # Simulate a slow Scratch API response
+            return MagicMock()
+
+        slow_session.connect_project.side_effect = slow_connect_project
+        descriptions = [f"move right {i} steps" for i in range(1, 21)]
+
+        async def scenario():
+            start = time.perf_counter()
+            finished = {}
+
+            async def timed(name, coroutine):
+                result = await coroutine
+                finished[name] = time.perf_counter() - start
+                return result
+
+            slow = asyncio.ensure_future(timed("project", main.get_project_info(123)))
+            await asyncio.sleep(0.05)  # Let the slow lookup start first
+            results = await asyncio.gather(*[
+                timed(i, main.generate_scratch_blocks(description=d, output_format="text"))
+                for i, d in enumerate(descriptions)
+            ])
+            await slow
+            return results, finished
+
+        with patch('main.session', slow_session):
+            results, finished = run_tool(scenario())
+
+        self.assertTrue(all(r["success"] for r in results))
+        generation_done = max(finished[i] for i in range(len(descriptions)))
+        self.assertGreaterEqual(finished["project"], 1.0)
+        # All 20 generations finish long before the slow lookup returns
+        self.assertLess(generation_done, 0.8)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Tests for the metrics subsystem"""
+
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.metrics import Histogram, MetricsRegistry
+from programming.pipeline import GenerationPipeline
+from programming.parsers import NaturalLanguageParser
+from programming.block_generator import BlockGenerator
+
+
+class TestHistogram(unittest.TestCase):
+    """Test cases for Histogram"""
+
+    def test_quantiles_follow_distribution(self):
+        """Test that percentiles land near the true values"""
+        histogram = Histogram()
+        for i in range(1, 1001):
+            histogram.observe(i / 1000.0)  # 1ms .. 1s, uniform
+
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.quantile(0.50), 0.5, delta=0.1)
+        self.assertAlmostEqual(histogram.quantile(0.95), 0.95, delta=0.15)
+        self.assertLessEqual(histogram.quantile(0.99), 1.0)
+
+    def test_empty_histogram(self):
+        """Test that an empty histogram reports zeros"""
+        summary = Histogram().summary()
+        self.assertEqual(summary["count"], 0)
+        self.assertEqual(summary["p99_ms"], 0.0)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for MetricsRegistry"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.metrics = MetricsRegistry()
+
+    def test_instrument_counts_calls_and_errors(self):
+        """Test that instrumented tools record calls and error results"""
+        @self.metrics.instrument("tool")
+        async def tool(fail):
+            if fail:
+                return {"success": False, "error_type": "generation_error"}
+            return {"success": True}
+
+        async def scenario():
+            await tool(False)
+            await tool(False)
+            await tool(True)
+
+        asyncio.run(scenario())
+        stats = self.metrics.snapshot()["tools"]["tool"]
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["latency"]["count"], 3)
+
+    def test_unparseable_prompt_counts_as_error(self):
+        """Test that pipeline failures without an error_type are counted"""
+        pipeline = GenerationPipeline(NaturalLanguageParser(), BlockGenerator())
+
+        @self.metrics.instrument("generate_scratch_blocks")
+        async def generate_scratch_blocks(description, output_format="text"):
+            return pipeline.run(description, output_format)
+
+        async def scenario():
+            for description, output_format in [("jump", "text"), ("xyz unknown", "text"), ("jump", "svg")]:
+                result = await generate_scratch_blocks(description, output_format)
+                self.assertNotIn("error_type", result)
+
+        asyncio.run(scenario())
+        stats = self.metrics.snapshot()["tools"]["generate_scratch_blocks"]
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["errors"], 2)
+
+    def test_instrument_counts_exceptions(self):
+        """Test that exceptions are recorded as errors and re-raised"""
+        @self.metrics.instrument("sync_tool")
+        def sync_tool():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            sync_tool()
+        self.assertEqual(self.metrics.snapshot()["tools"]["sync_tool"]["errors"], 1)
+
+    def test_stage_timing(self):
+        """Test stage context manager and timed wrapper"""
+        with self.metrics.stage("parse"):
+            time.sleep(0.01)
+        self.metrics.timed("scratch_io", lambda: None)()
+
+        stages = self.metrics.snapshot()["stages"]
+        self.assertGreaterEqual(stages["parse"]["total_ms"], 10)
+        self.assertEqual(stages["scratch_io"]["count"], 1)
+
+    def test_prometheus_export(self):
+        """Test the Prometheus text format and file writer"""
+        self.metrics.record_call("generate_scratch_blocks", 0.02)
+        self.metrics.record_stage("parse", 0.001)
+        text = self.metrics.to_prometheus()
+
+        self.assertIn('scratch_mcp_tool_calls_total{tool="generate_scratch_blocks"} 1', text)
+        self.assertIn('scratch_mcp_tool_latency_seconds_bucket{tool="generate_scratch_blocks",le="+Inf"} 1', text)
+        self.assertIn('scratch_mcp_stage_seconds_count{stage="parse"} 1', text)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "scratch_mcp.prom")
+            self.metrics.write_prometheus(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), text)
+
+    def test_recording_overhead_is_small(self):
+        """Test that recording a call stays in the microsecond range"""
+        iterations = 20000
+        start = time.perf_counter()
+        for _ in range(iterations):
+            self.metrics.record_call("tool", 0.001)
+        per_call = (time.perf_counter() - start) / iterations
+        self.assertLess(per_call, 50e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Tests for the palette location cache"""
+
+import unittest
+import os
+import sys
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.palette_cache import STRIP_WIDTH, PaletteLocationCache, fingerprint
+
+STATE = ((0, 0, 1280, 800), "motion", 0)
+
+
+def make_strip(seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (400, STRIP_WIDTH)).astype(np.uint8)
+
+
+class TestFingerprint(unittest.TestCase):
+    """Test cases for palette strip fingerprints"""
+
+    def test_stable_under_capture_noise(self):
+        """Test that small pixel noise inside a grey bucket keeps the hash"""
+        strip = (make_strip() // 32) * 32 + 8
+        noisy = strip.astype(np.int16) + np.random.default_rng(1).integers(-4, 5, strip.shape)
+        self.assertEqual(fingerprint(strip), fingerprint(noisy))
+
+    def test_changes_with_layout(self):
+        """Test that a scrolled strip hashes differently"""
+        strip = make_strip()
+        self.assertNotEqual(fingerprint(strip), fingerprint(np.roll(strip, 40, axis=0)))
+
+    def test_rgb_strip(self):
+        """Test that RGB captures are accepted"""
+        strip = make_strip()
+        self.assertEqual(fingerprint(np.stack([strip] * 3, axis=-1)), fingerprint(strip))
+
+
+class TestPaletteLocationCache(unittest.TestCase):
+    """Test cases for PaletteLocationCache"""
+
+    def setUp(self):
+        self.cache = PaletteLocationCache()
+        self.strip = make_strip()
+        self.assertTrue(self.cache.validate(STATE, self.strip))
+        self.cache.store(STATE, ["motion_movesteps", "looks_say"], {"motion_movesteps": (40, 120)})
+
+    def test_repeat_lookup_hits(self):
+        """Test that cached blocks need no new search"""
+        found, missing = self.cache.lookup(STATE, ["motion_movesteps"])
+        self.assertEqual(found, {"motion_movesteps": (40, 120)})
+        self.assertEqual(missing, [])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_known_misses_are_not_searched_again(self):
+        """Test that a block not found in this state isn't searched again"""
+        found, missing = self.cache.lookup(STATE, ["looks_say", "control_wait"])
+        self.assertEqual(found, {})
+        self.assertEqual(missing, ["control_wait"])
+
+    def test_states_are_separate(self):
+        """Test that another category or scroll offset starts empty"""
+        for state in [(STATE[0], "looks", 0), (STATE[0], "motion", -3), ((10, 0, 1280, 800), "motion", 0)]:
+            self.assertEqual(self.cache.lookup(state, ["motion_movesteps"]), ({}, ["motion_movesteps"]))
+
+    def test_layout_change_invalidates_state(self):
+        """Test that a changed strip drops the state's locations"""
+        self.assertTrue(self.cache.validate(STATE, self.strip))
+        self.assertFalse(self.cache.validate(STATE, np.roll(self.strip, 40, axis=0)))
+        self.assertEqual(self.cache.lookup(STATE, ["motion_movesteps"]), ({}, ["motion_movesteps"]))
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+        # The new layout becomes the reference
+        self.assertTrue(self.cache.validate(STATE, np.roll(self.strip, 40, axis=0)))
+
+    def test_invalidate_all(self):
+        """Test that invalidate() with no state clears everything"""
+        self.cache.invalidate()
+        self.assertEqual(self.cache.stats()["states"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Tests for multi-template palette matching on saved screenshots"""
+
+import unittest
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.palette_matcher import DPI_SCALES, PaletteMatcher, load_image, resize, to_grayscale
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def make_palette(count=6, seed=0):
+    """Synthetic palette screenshot with `count` distinct block images stacked vertically"""
+    rng = np.random.default_rng(seed)
+    palette = np.full((60 * count + 20, 240), 235, dtype=np.uint8)
+    blocks, positions = {}, {}
+    for i in range(count):
+        block = rng.integers(0, 255, (32, 120), dtype=np.uint8)
+        y, x = 10 + 60 * i, 15 + 7 * i
+        palette[y:y + 32, x:x + 120] = block
+        blocks[f"block_{i}"] = block
+        positions[f"block_{i}"] = (x + 60, y + 16)
+    return palette, blocks, positions
+
+
+def make_blocky_palette(count=4, seed=0):
+    """Palette of low-detail blocks (like real block images) that survives rescaling"""
+    rng = np.random.default_rng(seed)
+    palette = np.full((60 * count + 20, 240), 235, dtype=np.float32)
+    blocks, corners = {}, {}
+    for i in range(count):
+        block = np.kron(rng.integers(0, 255, (4, 12)), np.ones((8, 10))).astype(np.float32)
+        y, x = 10 + 60 * i, 15 + 7 * i
+        palette[y:y + 32, x:x + 120] = block
+        blocks[f"block_{i}"] = block
+        corners[f"block_{i}"] = (x, y)
+    return palette, blocks, corners
+
+
+class TestPaletteMatcher(unittest.TestCase):
+    """Test cases for PaletteMatcher"""
+
+    def setUp(self):
+        self.palette, self.blocks, self.positions = make_palette()
+        self.matcher = PaletteMatcher(self.blocks)
+
+    def test_matches_all_templates_in_one_pass(self):
+        """Test that every template is located at its centre"""
+        self.assertEqual(self.matcher.match(self.palette), self.positions)
+
+    def test_origin_offsets_coordinates(self):
+        """Test that results are shifted into screen coordinates"""
+        found = self.matcher.match(self.palette, ["block_2"], origin=(100, 200))
+        x, y = self.positions["block_2"]
+        self.assertEqual(found, {"block_2": (x + 100, y + 200)})
+
+    def test_robust_to_brightness_and_noise(self):
+        """Test that NCC tolerates a brightness/contrast change and mild noise"""
+        rng = np.random.default_rng(1)
+        shifted = self.palette.astype(np.float32) * 0.8 + 20 + rng.normal(0, 5, self.palette.shape)
+        self.assertEqual(self.matcher.match(shifted), self.positions)
+
+    def test_missing_template_is_not_reported(self):
+        """Test that templates absent from the screenshot fall below the threshold"""
+        other = np.random.default_rng(9).integers(0, 255, (32, 120), dtype=np.uint8)
+        matcher = PaletteMatcher({"absent": other})
+        self.assertEqual(matcher.match(self.palette), {})
+
+    def test_flat_and_oversized_templates_are_skipped(self):
+        """Test that templates that can't be matched don't raise"""
+        matcher = PaletteMatcher({"flat": np.zeros((10, 10)), "huge": np.ones((2000, 10))})
+        self.assertEqual(matcher.match(self.palette), {})
+
+    def test_saved_screenshots_and_templates(self):
+        """Test matching from files saved on disk"""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = {}
+            for name, block in self.blocks.items():
+                paths[name] = os.path.join(tmp, f"{name}.npy")
+                np.save(paths[name], block)
+            screenshot = os.path.join(tmp, "palette.npy")
+            np.save(screenshot, np.stack([self.palette] * 3, axis=-1))
+
+            matcher = PaletteMatcher.from_files(paths)
+            self.assertEqual(matcher.match(load_image(screenshot)), self.positions)
+
+    @unittest.skipIf(Image is None, "Pillow not installed")
+    def test_png_templates(self):
+        """Test that PNG files decode to the same grayscale as arrays"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "block.png")
+            Image.fromarray(self.blocks["block_0"]).save(path)
+            np.testing.assert_array_equal(load_image(path), to_grayscale(self.blocks["block_0"]))
+
+
+class TestScalePyramid(unittest.TestCase):
+    """Test cases for DPI scale calibration"""
+
+    def setUp(self):
+        self.palette, self.blocks, self.corners = make_blocky_palette()
+
+    def assertNear(self, found, scale):
+        self.assertEqual(set(found), set(self.blocks))
+        for name, (x, y) in found.items():
+            corner_x, corner_y = self.corners[name]
+            self.assertAlmostEqual(x, (corner_x + 60) * scale, delta=2)
+            self.assertAlmostEqual(y, (corner_y + 16) * scale, delta=2)
+
+    def test_resize_dimensions(self):
+        """Test that resize rounds to the scaled size and keeps flat images flat"""
+        self.assertEqual(resize(np.zeros((32, 120)), 1.25).shape, (40, 150))
+        np.testing.assert_allclose(resize(np.full((5, 7), 9.0), 1.75), 9.0)
+
+    def test_calibrates_to_display_scale(self):
+        """Test that a 150% screenshot is matched with the 1.5x pyramid level"""
+        scaled = resize(self.palette, 1.5)
+        matcher = PaletteMatcher(self.blocks, scales=DPI_SCALES)
+        self.assertIsNone(matcher.scale)
+        self.assertNear(matcher.match(scaled), 1.5)
+        self.assertEqual(matcher.scale, 1.5)
+
+    def test_scale_is_chosen_once(self):
+        """Test that later screenshots reuse the calibrated scale"""
+        matcher = PaletteMatcher(self.blocks, scales=DPI_SCALES)
+        self.assertEqual(matcher.calibrate(self.palette), 1.0)
+        # A different-scale screenshot no longer triggers calibration
+        self.assertEqual(matcher.match(resize(self.palette, 2.0)), {})
+        self.assertEqual(matcher.scale, 1.0)
+
+    def test_unscaled_matcher_misses_scaled_display(self):
+        """Test that 100% templates alone don't match a 175% display"""
+        self.assertEqual(PaletteMatcher(self.blocks).match(resize(self.palette, 1.75)), {})
+
+    def test_calibration_waits_for_a_match(self):
+        """Test that a screenshot without known blocks leaves the scale open"""
+        matcher = PaletteMatcher(self.blocks, scales=DPI_SCALES)
+        self.assertIsNone(matcher.calibrate(np.full((200, 200), 235.0)))
+        self.assertIsNone(matcher.scale)
+        self.assertEqual(matcher.calibrate(resize(self.palette, 1.25)), 1.25)
+
+    def test_memory_accounting(self):
+        """Test that resized copies are made lazily and only the calibrated scale is kept"""
+        single = PaletteMatcher(self.blocks)
+        pyramid = PaletteMatcher(self.blocks, scales=DPI_SCALES)
+        self.assertEqual(pyramid.nbytes, single.nbytes)
+        pyramid.calibrate(resize(self.palette, 1.5))
+        kept = sum(resize(block, 1.5).astype(np.float32).nbytes for block in self.blocks.values())
+        self.assertEqual(pyramid.nbytes, single.nbytes + kept)
+        self.assertEqual([scale for scale, level in pyramid._pyramid.items() if level], [1.5])
+
+    def test_spectrum_cache_is_bounded(self):
+        """Test that cached spectra stay within budget and follow the current palette state"""
+        palette, blocks, _ = make_palette()
+        matcher = PaletteMatcher(blocks, spectrum_cache_bytes=2 ** 20)
+        for name in blocks:
+            self.assertIn(name, matcher.match(palette, [name]))
+        self.assertLessEqual(matcher._spectra_bytes, 2 ** 20)
+        self.assertEqual(len(matcher._spectra), 1)
+        matcher.match(np.pad(palette, ((0, 200), (0, 0)), constant_values=235))
+        self.assertLessEqual(matcher._spectra_bytes, 2 ** 20)
+        self.assertEqual(len(matcher._spectra), 1)  # the old palette state was evicted
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,10 @@ import unittest
 import json
 import os
 import sys
+import random
+import time
+import tracemalloc
+from dataclasses import asdict
 from typing import List
 
 # Add src to path for imports
@@ -143,5 +147,153 @@ class TestNaturalLanguageParser(unittest.TestCase):
                         self.assertEqual(result[0].action, expected[0]["action"])
 
 
+class TestParserBudgets(unittest.TestCase):
+    """Test cases for linear-time parsing and input budgets"""
+
+    def test_wrapped_triggers_match_regex_semantics(self):
+        """Test that backtracking-free trigger matching keeps the greedy captures"""
+        parser = NaturalLanguageParser()
+        cases = {
+            "when space key pressed jump": "space key",
+            "when up arrow key jump": "up arrow",
+            "when a pressed say hi when b pressed": "a pressed say hi when b",
+        }
+        for text, key in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(parser.parse(text)[0].parameters.get("key"), key)
+
+    def test_adversarial_input_is_linear(self):
+        """Test that inputs that made the regexes quadratic now parse quickly"""
+        parser = NaturalLanguageParser(max_input_chars=10 ** 6, time_budget_ms=10 ** 6)
+        for text in ["when " * 20000, "move" + " " * 100000 + "x", "move " + "1" * 50000 + "x"]:
+            start = time.perf_counter()
+            parser.parse(text)
+            self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_long_input_is_truncated_with_warning(self):
+        """Test that input over the length budget is cut at a word boundary"""
+        parser = NaturalLanguageParser(max_input_chars=50)
+        result = parser.parse_bounded("jump and then " * 20)
+        self.assertTrue(result.truncated)
+        self.assertIn("truncated", result.warnings[0])
+        self.assertGreater(len(result.intents), 0)
+        self.assertLessEqual(len(result.intents), 4)
+
+    def test_time_budget_stops_parsing(self):
+        """Test that parsing stops between sentences once the time budget is spent"""
+        parser = NaturalLanguageParser(max_input_chars=10 ** 6, time_budget_ms=1e-6)
+        result = parser.parse_bounded(" and ".join(["jump"] * 1000))
+        self.assertTrue(result.truncated)
+        self.assertLess(len(result.intents), 1000)
+        self.assertIn("time budget", result.warnings[0])
+
+    def test_short_input_has_no_warnings(self):
+        """Test that normal requests are not flagged"""
+        result = NaturalLanguageParser().parse_bounded("move right 10 steps")
+        self.assertFalse(result.truncated)
+        self.assertEqual(result.warnings, [])
+
+
+class TestIterParse(unittest.TestCase):
+    """Test cases for the streaming parser"""
+
+    def setUp(self):
+        self.parser = NaturalLanguageParser()
+
+    def chunked(self, text, size):
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def test_matches_parse_for_any_chunking(self):
+        """Test that iter_parse yields the same intents as parse regardless of chunk size"""
+        words = ["when", "space", "pressed", "move", "right", "10", "steps", "and", "then",
+                 "jump", "say", "hello", "  ", "\n", "repeat", "3", "clicked", "LEFT"]
+        rng = random.Random(7)
+        for _ in range(100):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 30)))
+            expected = [asdict(i) for i in self.parser.parse(text)]
+            for size in (1, 3, 8, len(text)):
+                with self.subTest(text=text, size=size):
+                    streamed = [asdict(i) for i in self.parser.iter_parse(self.chunked(text, size))]
+                    self.assertEqual(streamed, expected)
+
+    def test_yields_before_input_is_exhausted(self):
+        """Test that the first intent arrives as soon as its sentence ends"""
+        consumed = []
+
+        def chunks():
+            for chunk in ["move right 5 steps ", "and then ", "jump ", "and say hello"]:
+                consumed.append(chunk)
+                yield chunk
+
+        first = next(self.parser.iter_parse(chunks()))
+        self.assertEqual(first.action, "move")
+        self.assertEqual(len(consumed), 2)
+
+    def test_memory_stays_bounded(self):
+        """Test that a long document is parsed without buffering it"""
+        def document(sentences):
+            for i in range(sentences):
+                yield f"move right {i % 50 + 1} steps and then jump then "
+
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in self.parser.iter_parse(document(20000)))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(count, 40000)
+        self.assertLess(peak, 256 * 1024)  # the document itself is ~0.9 MB
+
+    def test_overlong_sentence_is_cut(self):
+        """Test that a sentence without boundaries can't grow the buffer without limit"""
+        parser = NaturalLanguageParser(max_input_chars=100)
+        intents = list(parser.iter_parse(["jump " * 10] * 100))
+        self.assertGreater(len(intents), 1)
+
+
+class TestTypoTolerance(unittest.TestCase):
+    """Test cases for typo correction and suggestions"""
+
+    def setUp(self):
+        self.parser = NaturalLanguageParser()
+
+    def test_misspelled_commands_are_corrected(self):
+        """Test that common misspellings parse like the intended words"""
+        cases = {
+            "jupm": "make the sprite jump",
+            "mvoe right 10 steps": "move right 10 steps",
+            "when spcae pressed jump": "when space pressed jump",
+            "wehn space pressed jump": "when space pressed jump",
+        }
+        for typo, intended in cases.items():
+            with self.subTest(typo=typo):
+                result = self.parser.parse_bounded(typo)
+                expected = self.parser.parse(intended)
+                self.assertEqual([asdict(i) for i in result.intents], [asdict(i) for i in expected])
+                self.assertTrue(result.corrections)
+
+    def test_valid_sentences_are_untouched(self):
+        """Test that sentences that already parse aren't rewritten"""
+        result = self.parser.parse_bounded("move right 10 steps then jump")
+        self.assertEqual(result.corrections, [])
+        self.assertEqual(len(result.intents), 2)
+
+    def test_common_words_are_not_typos(self):
+        """Test that everyday words near command words are left alone"""
+        self.assertEqual(self.parser.parse("eight more"), [])
+
+    def test_suggest_did_you_mean(self):
+        """Test that suggest() names close command words and matching examples"""
+        hints = self.parser.suggest("jmp")
+        self.assertEqual(hints["did_you_mean"], [{"word": "jmp", "suggestions": ["jump"]}])
+        self.assertIn("jump", hints["examples"][0])
+
+    def test_suggest_falls_back_to_examples(self):
+        """Test that unrelated input gets general example prompts"""
+        hints = self.parser.suggest("xyz unknown command")
+        self.assertEqual(hints["did_you_mean"], [])
+        self.assertEqual(len(hints["examples"]), 4)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Tests for the debounced profile write queue"""
+
+import unittest
+import os
+import sys
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.profile_writes import ProfileWriteQueue
+
+
+class RecordingWriter:
+    """Collects values written upstream"""
+
+    def __init__(self, fail=False, failures=0):
+        self.values = []
+        self.fail = fail
+        self.failures = failures
+
+    def __call__(self, value):
+        if self.fail or self.failures:
+            self.failures = max(self.failures - 1, 0)
+            raise RuntimeError("rate limited")
+        self.values.append(value)
+
+
+class TestProfileWriteQueue(unittest.TestCase):
+    """Test cases for ProfileWriteQueue"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.queue = ProfileWriteQueue(debounce_seconds=0.05, max_delay_seconds=1.0)
+
+    def tearDown(self):
+        self.queue.close()
+
+    def _wait_for(self, predicate, timeout=2.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_submit_returns_pending(self):
+        """Test that submit returns immediately without writing"""
+        writer = RecordingWriter()
+        result = self.queue.submit("about_me", "hello", writer)
+
+        self.assertEqual(result["status"], "pending")
+        self.assertEqual(result["field"], "about_me")
+        self.assertEqual(writer.values, [])
+
+    def test_rapid_updates_are_coalesced(self):
+        """Test that rapid updates to one field produce a single write"""
+        writer = RecordingWriter()
+        for text in ["h", "he", "hel", "hello"]:
+            self.queue.submit("about_me", text, writer)
+
+        self.assertTrue(self._wait_for(lambda: writer.values))
+        time.sleep(0.1)
+        self.assertEqual(writer.values, ["hello"])
+
+        stats = self.queue.get_stats()
+        self.assertEqual(stats["submitted"], 4)
+        self.assertEqual(stats["coalesced"], 3)
+        self.assertEqual(stats["upstream_writes"], 1)
+        self.assertEqual(stats["writes_by_field"], {"about_me": 1})
+
+    def test_fields_are_written_independently(self):
+        """Test that different fields are not merged together"""
+        bio = RecordingWriter()
+        wiwo = RecordingWriter()
+        self.queue.submit("about_me", "bio", bio)
+        self.queue.submit("what_im_working_on", "game", wiwo)
+
+        result = self.queue.flush()
+        self.assertEqual(result["flushed"], 2)
+        self.assertEqual(bio.values, ["bio"])
+        self.assertEqual(wiwo.values, ["game"])
+
+    def test_flush_writes_immediately(self):
+        """Test that flush does not wait for the debounce window"""
+        queue = ProfileWriteQueue(debounce_seconds=60)
+        writer = RecordingWriter()
+        queue.submit("about_me", "now", writer)
+
+        result = queue.flush("about_me")
+        self.assertTrue(result["results"]["about_me"]["success"])
+        self.assertEqual(writer.values, ["now"])
+        self.assertEqual(queue.pending_fields(), {})
+        queue.close()
+
+    def test_max_delay_caps_debounce(self):
+        """Test that continuous edits are still written after max_delay"""
+        queue = ProfileWriteQueue(debounce_seconds=0.2, max_delay_seconds=0.3)
+        writer = RecordingWriter()
+        for i in range(8):
+            queue.submit("about_me", str(i), writer)
+            time.sleep(0.05)
+
+        self.assertTrue(self._wait_for(lambda: writer.values, timeout=1.0))
+        queue.close()
+        self.assertLessEqual(len(writer.values), 2)
+        self.assertEqual(writer.values[-1], "7")
+
+    def test_writer_errors_are_counted(self):
+        """Test that failing upstream writes are reported"""
+        writer = RecordingWriter(fail=True)
+        self.queue.submit("about_me", "text", writer)
+
+        result = self.queue.flush()
+        self.assertFalse(result["results"]["about_me"]["success"])
+
+        stats = self.queue.get_stats()
+        self.assertEqual(stats["upstream_errors"], 1)
+        self.assertEqual(stats["upstream_writes"], 0)
+        self.assertIn("about_me", stats["last_errors"])
+
+    def test_failed_background_write_is_retried(self):
+        """Test that a debounced write that fails is retried with backoff"""
+        queue = ProfileWriteQueue(debounce_seconds=0.01, retry_backoff_seconds=0.02)
+        writer = RecordingWriter(failures=2)
+        queue.submit("about_me", "text", writer)
+
+        self.assertTrue(self._wait_for(lambda: writer.values))
+        stats = queue.get_stats()
+        self.assertEqual(writer.values, ["text"])
+        self.assertEqual((stats["upstream_errors"], stats["retries"]), (2, 2))
+        self.assertEqual(stats["failed"], {})
+        queue.close()
+
+    def test_exhausted_retries_are_logged_and_flushable(self):
+        """Test that a write that keeps failing is logged and kept for flush"""
+        queue = ProfileWriteQueue(debounce_seconds=0.01, max_retries=1, retry_backoff_seconds=0.01)
+        writer = RecordingWriter(fail=True)
+        with self.assertLogs("utils.profile_writes", level="WARNING"):
+            queue.submit("about_me", "text", writer)
+            self.assertTrue(self._wait_for(lambda: queue.get_stats()["failed"]))
+        self.assertEqual(queue.get_stats()["failed"]["about_me"]["attempts"], 2)
+
+        writer.fail = False
+        result = queue.flush()
+        self.assertTrue(result["results"]["about_me"]["success"])
+        self.assertEqual(writer.values, ["text"])
+        self.assertEqual(queue.get_stats()["failed"], {})
+        queue.close()
+
+    def test_submit_during_failing_flush_wins(self):
+        """Test that a value submitted while a flush fails is not overwritten later"""
+        queue = ProfileWriteQueue(debounce_seconds=0.05)
+        writer = RecordingWriter()
+
+        def failing_writer(value):
+            queue.submit("about_me", "newer", writer)
+            raise RuntimeError("rate limited")
+
+        queue.submit("about_me", "older", failing_writer)
+        self.assertFalse(queue.flush()["results"]["about_me"]["success"])
+        self.assertEqual(queue.get_stats()["failed"], {})
+
+        self.assertTrue(self._wait_for(lambda: writer.values))
+        queue.flush()
+        self.assertEqual(writer.values, ["newer"])
+        queue.close()
+
+    def test_close_flushes_pending(self):
+        """Test that closing the queue writes pending values"""
+        queue = ProfileWriteQueue(debounce_seconds=60)
+        writer = RecordingWriter()
+        queue.submit("about_me", "final", writer)
+        queue.close()
+
+        self.assertEqual(writer.values, ["final"])
+        with self.assertRaises(RuntimeError):
+            queue.submit("about_me", "late", writer)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Tests for the on-demand request profiler"""
+
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.profiling import RequestProfiler
+from programming.pipeline import GenerationPipeline
+from programming.parsers import NaturalLanguageParser
+from programming.block_generator import BlockGenerator
+
+
+class TestRequestProfiler(unittest.TestCase):
+    """Test cases for RequestProfiler"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profiler = RequestProfiler(output_dir=self.tmp.name)
+        self.pipeline = GenerationPipeline(NaturalLanguageParser(), BlockGenerator())
+
+        @self.profiler.instrument("generate")
+        async def generate(description):
+            # to_thread carries the profiling context into the worker thread
+            return await asyncio.to_thread(self.profiler.wrap(self.pipeline.run), description)
+
+        self.generate = generate
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _call(self, count):
+        async def scenario():
+            for i in range(count):
+                await self.generate(f"move right {i} steps")
+        asyncio.run(scenario())
+
+    def test_not_armed_records_nothing(self):
+        """Test that invocations are not profiled until armed"""
+        self._call(2)
+        self.assertIsNone(self.profiler.report())
+
+    def test_profiles_next_n_invocations(self):
+        """Test that exactly n invocations are captured and written to disk"""
+        self.profiler.start(3, top=5)
+        self._call(5)
+
+        report = self.profiler.report()
+        self.assertEqual(report["status"], "complete")
+        self.assertEqual(report["completed"], 3)
+        self.assertEqual(report["tools"], {"generate": 3})
+        self.assertLessEqual(len(report["hot_functions"]), 5)
+        self.assertTrue(report["hot_functions"])
+        self.assertTrue(os.path.exists(report["files"]["pstats"]))
+        self.assertTrue(os.path.exists(report["files"]["summary"]))
+
+        with open(report["files"]["summary"], encoding="utf-8") as f:
+            summary = f.read()
+        self.assertIn("parse", summary)
+        self.assertIn("generate_blocks", summary)
+
+    def test_collecting_status_and_rearm(self):
+        """Test in-progress reporting and refusing to re-arm mid-session"""
+        self.profiler.start(2)
+        self._call(1)
+        self.assertEqual(self.profiler.report()["status"], "collecting")
+        with self.assertRaises(RuntimeError):
+            self.profiler.start(2)
+
+        self._call(1)
+        self.assertEqual(self.profiler.report()["status"], "complete")
+        self.profiler.start(1)
+
+    def test_invalid_request_count(self):
+        """Test that n must be positive"""
+        with self.assertRaises(ValueError):
+            self.profiler.start(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Tests for writing generated programs as Scratch 3 project files"""
+
+import unittest
+import hashlib
+import os
+import sys
+import tempfile
+import zipfile
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.project_file import build_blocks, build_project, read_project, write_project
+
+PROGRAM = [
+    {'opcode': 'event_whenkeypressed', 'fields': {'KEY_OPTION': 'space'}},
+    {'opcode': 'control_repeat', 'inputs': {'TIMES': 3}, 'substack': [
+        {'opcode': 'motion_movesteps', 'inputs': {'STEPS': 10}},
+        {'opcode': 'sound_play', 'inputs': {'SOUND_MENU': 'meow'}},
+    ]},
+    {'opcode': 'looks_sayforsecs', 'inputs': {'MESSAGE': 'Hello!', 'SECS': 2}},
+]
+
+
+class TestBuildBlocks(unittest.TestCase):
+    """Test cases for the project.json block map"""
+
+    def setUp(self):
+        self.blocks = build_blocks(PROGRAM)
+
+    def test_stack_links(self):
+        """Test that next/parent link the top-level stack and only the hat is top-level"""
+        self.assertEqual(self.blocks['b1']['next'], 'b2')
+        self.assertEqual(self.blocks['b2']['parent'], 'b1')
+        self.assertEqual(self.blocks['b2']['next'], 'b5')
+        self.assertEqual(self.blocks['b5']['parent'], 'b2')
+        self.assertTrue(self.blocks['b1']['topLevel'])
+        self.assertIn('x', self.blocks['b1'])
+        self.assertFalse(any(b['topLevel'] for key, b in self.blocks.items() if key != 'b1'))
+
+    def test_substack(self):
+        """Test that a C-block's body hangs off its SUBSTACK input"""
+        self.assertEqual(self.blocks['b2']['inputs']['SUBSTACK'], [2, 'b3'])
+        self.assertEqual(self.blocks['b3']['parent'], 'b2')
+        self.assertEqual(self.blocks['b3']['next'], 'b4')
+        self.assertIsNone(self.blocks['b4']['next'])
+
+    def test_inputs_and_fields(self):
+        """Test that numbers, text and fields use Scratch 3 serialization"""
+        self.assertEqual(self.blocks['b3']['inputs']['STEPS'], [1, [4, '10']])
+        self.assertEqual(self.blocks['b5']['inputs']['MESSAGE'], [1, [10, 'Hello!']])
+        self.assertEqual(self.blocks['b1']['fields']['KEY_OPTION'], ['space', None])
+
+    def test_menu_input_shadow(self):
+        """Test that dropdown inputs point at a shadow menu block"""
+        shadow_id = self.blocks['b4']['inputs']['SOUND_MENU'][1]
+        shadow = self.blocks[shadow_id]
+        self.assertTrue(shadow['shadow'])
+        self.assertEqual(shadow['opcode'], 'sound_sounds_menu')
+        self.assertEqual(shadow['fields']['SOUND_MENU'], ['meow', None])
+        self.assertEqual(shadow['parent'], 'b4')
+
+
+class TestWriteProject(unittest.TestCase):
+    """Test cases for the .sb3/.pbl archive"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_archive_contents(self):
+        """Test that the archive holds project.json and every costume under its MD5 name"""
+        path = write_project(os.path.join(self.directory.name, 'program.sb3'), PROGRAM)
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist())
+            project = read_project(path)
+            for target in project['targets']:
+                for costume in target['costumes']:
+                    self.assertIn(costume['md5ext'], names)
+                    data = archive.read(costume['md5ext'])
+                    self.assertEqual(hashlib.md5(data).hexdigest(), costume['assetId'])
+        self.assertIn('project.json', names)
+        stage, sprite = project['targets']
+        self.assertTrue(stage['isStage'])
+        self.assertEqual(len(sprite['blocks']), 6)
+
+    def test_pbl_suffix(self):
+        """Test that .pbl is written as the same container"""
+        path = write_project(os.path.join(self.directory.name, 'program.pbl'), PROGRAM)
+        self.assertEqual(read_project(path)['meta']['semver'], '3.0.0')
+
+    def test_rejects_other_suffix(self):
+        """Test that a path PictoBlox wouldn't open is refused"""
+        with self.assertRaises(ValueError):
+            write_project(os.path.join(self.directory.name, 'program.json'), PROGRAM)
+
+    def test_extensions(self):
+        """Test that non-core opcodes list their extension"""
+        project, _ = build_project([{'opcode': 'event_whenflagclicked'}, {'opcode': 'pen_clear'}])
+        self.assertEqual(project['extensions'], ['pen'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Tests for readiness polling on a simulated clock"""
+
+import unittest
+import os
+import sys
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from automation.readiness import ScreenPoller
+
+REGION = (0, 0, 8, 8)
+
+
+class FakeScreen:
+    """A region that starts changing at `change_at` and animates until `settle_at`"""
+
+    def __init__(self, change_at=0.0, settle_at=0.0, flicker=False):
+        self.now = 0.0
+        self.change_at = change_at
+        self.settle_at = settle_at
+        self.flicker = flicker
+        self.captures = 0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def capture(self, region):
+        self.captures += 1
+        if self.flicker or self.change_at <= self.now < self.settle_at:
+            return np.full((8, 8), 10 + (self.captures * 37) % 200)
+        return np.full((8, 8), 0 if self.now < self.change_at else 255)
+
+    def poller(self, **kwargs):
+        return ScreenPoller(self.capture, clock=self.clock, sleep=self.sleep, **kwargs)
+
+
+class TestScreenPoller(unittest.TestCase):
+    """Test cases for ScreenPoller"""
+
+    def test_settled_region_returns_quickly(self):
+        """Test that a static region costs only the stability frames"""
+        screen = FakeScreen()
+        elapsed = screen.poller(interval=0.03, stable_frames=2).wait_until_stable(REGION)
+        self.assertAlmostEqual(elapsed, 0.06)
+
+    def test_waits_for_animation_to_finish(self):
+        """Test that the wait ends shortly after the region stops changing"""
+        screen = FakeScreen(settle_at=0.25)
+        elapsed = screen.poller(interval=0.03).wait_until_stable(REGION)
+        self.assertGreaterEqual(elapsed, 0.25)
+        self.assertLess(elapsed, 0.25 + 0.1)
+
+    def test_waits_for_expected_change_first(self):
+        """Test that a reference frame makes the poller wait for the change to start"""
+        screen = FakeScreen(change_at=0.2, settle_at=0.2)
+        poller = screen.poller(interval=0.03)
+        before = poller.frame(REGION)
+        elapsed = poller.wait_until_stable(REGION, before=before)
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertEqual(poller.stats()["timeouts"], 0)
+
+    def test_missing_change_is_bounded(self):
+        """Test that an action with no visible effect waits at most change_timeout"""
+        screen = FakeScreen(change_at=99.0)
+        poller = screen.poller(interval=0.05, change_timeout=0.3)
+        elapsed = poller.wait_until_stable(REGION, before=poller.frame(REGION))
+        self.assertLess(elapsed, 0.3 + 0.2)
+
+    def test_timeout_on_constant_flicker(self):
+        """Test that a region that never settles gives up at the timeout"""
+        screen = FakeScreen(flicker=True)
+        poller = screen.poller(interval=0.05)
+        elapsed = poller.wait_until_stable(REGION, timeout=1.0)
+        self.assertAlmostEqual(elapsed, 1.0, delta=0.06)
+        self.assertEqual(poller.stats()["timeouts"], 1)
+
+    def test_wait_for_predicate(self):
+        """Test polling an arbitrary condition"""
+        screen = FakeScreen()
+        poller = screen.poller(interval=0.1)
+        self.assertTrue(poller.wait_for(lambda: screen.now >= 0.5, timeout=2.0))
+        self.assertFalse(poller.wait_for(lambda: False, timeout=0.3))
+
+
+if __name__ == '__main__':
+    unittest.main()
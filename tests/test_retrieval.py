@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Tests for TF-IDF pattern retrieval"""
+
+import unittest
+import math
+import os
+import random
+import sys
+from collections import Counter
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from programming.retrieval import PatternIndex, pattern_documents, tokenize
+from programming.block_generator import BlockGenerator
+
+WORDS = ["jump", "spin", "walk", "sound", "color", "chase", "mouse", "score", "bounce", "glide",
+         "dance", "click", "key", "forever", "costume", "collect", "star", "wall", "edge", "fast"]
+
+
+def naive_scores(documents, text):
+    """Reference cosine similarity with plain dictionaries"""
+    counts = [Counter(tokenize(d["text"])) for d in documents]
+    df = Counter(t for c in counts for t in c)
+    n = len(documents)
+    idf = {t: math.log((1 + n) / (1 + df[t])) + 1.0 for t in df}
+
+    def vector(count):
+        weights = {t: (1 + math.log(c)) * idf[t] for t, c in count.items() if t in idf}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {t: w / norm for t, w in weights.items()}
+
+    query = vector(Counter(tokenize(text)))
+    return [sum(w * vector(c).get(t, 0.0) for t, w in query.items()) for c in counts]
+
+
+class TestPatternIndex(unittest.TestCase):
+    """Test cases for PatternIndex"""
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.library = {"generated": {
+            f"pattern_{i}": {
+                "description": " ".join(rng.choice(WORDS) for _ in range(5)),
+                "keywords": [rng.choice(WORDS) for _ in range(2)],
+                "explanation": " ".join(rng.choice(WORDS) for _ in range(8))
+            } for i in range(40)
+        }}
+        self.index = PatternIndex.from_library(self.library)
+        self.queries = [" ".join(rng.choice(WORDS + ["unknown"]) for _ in range(rng.randint(1, 6)))
+                        for _ in range(30)]
+
+    def test_scores_match_naive_cosine(self):
+        """Test that vectorized scores equal a dictionary-based cosine similarity"""
+        documents = pattern_documents(self.library)
+        for query in self.queries:
+            with self.subTest(query=query):
+                expected = naive_scores(documents, query)
+                for actual, reference in zip(self.index.score(query), expected):
+                    self.assertAlmostEqual(actual, reference, places=9)
+
+    def test_batch_matches_single(self):
+        """Test that batched scoring equals scoring queries one by one"""
+        batch = self.index.score_batch(self.queries + ["", "unknown"])
+        for row, query in zip(batch, self.queries + ["", "unknown"]):
+            single = self.index.score(query)
+            for a, b in zip(row, single):
+                self.assertAlmostEqual(a, b, places=12)
+
+    def test_top_k_is_sorted_and_filtered(self):
+        """Test that results are best-first and drop scores at or below min_score"""
+        results = self.index.search("jump spin", k=5, min_score=0.05)
+        scores = [r["score"] for r in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(score > 0.05 for score in scores))
+        self.assertEqual(self.index.search("zzz", k=5), [])
+
+
+class TestGeneratorPatternRetrieval(unittest.TestCase):
+    """Test cases for BlockGenerator.find_patterns"""
+
+    def setUp(self):
+        self.generator = BlockGenerator()
+
+    def test_finds_patterns_by_description_text(self):
+        """Test that free text reaches patterns through their descriptions and keywords"""
+        self.assertEqual(self.generator.find_patterns("bounce around the screen")[0]["pattern"], "bounce_around")
+        self.assertEqual(self.generator.find_patterns("follow the mouse pointer")[0]["pattern"], "simple_chase")
+
+    def test_batch_matches_single(self):
+        """Test that find_patterns_batch agrees with find_patterns"""
+        descriptions = ["make the cat jump", "spin in circles", "nothing relevant"]
+        self.assertEqual(self.generator.find_patterns_batch(descriptions),
+                         [self.generator.find_patterns(d) for d in descriptions])
+
+
+if __name__ == '__main__':
+    unittest.main()
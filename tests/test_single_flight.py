@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Tests for single-flight request coalescing"""
+
+import unittest
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for SingleFlight"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.flight = SingleFlight()
+        self.release = threading.Event()
+        self.executions = 0
+
+    def _slow_work(self):
+        self.executions += 1
+        self.release.wait(timeout=2)
+        return {"value": [1, 2, 3]}
+
+    def _run_concurrently(self, target, count):
+        results = [None] * count
+
+        def run(i):
+            results[i] = target()
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        # Wait until every follower has attached before releasing the leader
+        deadline = time.time() + 2
+        while time.time() < deadline:
+            stats = self.flight.get_stats()["groups"].get("default", {})
+            if stats.get("calls") == count:
+                break
+            time.sleep(0.005)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_identical_calls_share_one_execution(self):
+        """Test that concurrent identical calls run the work once"""
+        results = self._run_concurrently(lambda: self.flight.do("key", self._slow_work), 5)
+
+        self.assertEqual(self.executions, 1)
+        self.assertTrue(all(r == {"value": [1, 2, 3]} for r in results))
+
+        stats = self.flight.get_stats()
+        self.assertEqual(stats["total_calls"], 5)
+        self.assertEqual(stats["total_deduplicated"], 4)
+
+    def test_callers_receive_independent_copies(self):
+        """Test that one caller mutating its result does not affect others"""
+        results = self._run_concurrently(lambda: self.flight.do("key", self._slow_work), 3)
+
+        results[0]["value"].append(4)
+        self.assertEqual(results[1]["value"], [1, 2, 3])
+        self.assertEqual(results[2]["value"], [1, 2, 3])
+
+    def test_sequential_calls_are_not_cached(self):
+        """Test that calls run again once the first computation finished"""
+        self.release.set()
+        self.flight.do("key", self._slow_work)
+        self.flight.do("key", self._slow_work)
+
+        self.assertEqual(self.executions, 2)
+        self.assertEqual(self.flight.get_stats()["total_deduplicated"], 0)
+        self.assertEqual(self.flight.in_flight(), 0)
+
+    def test_errors_propagate_to_all_callers(self):
+        """Test that an exception from the leader reaches every waiter"""
+        def failing():
+            self.release.wait(timeout=2)
+            raise ValueError("upstream failed")
+
+        def call():
+            try:
+                self.flight.do("key", failing)
+            except ValueError as e:
+                return str(e)
+
+        results = self._run_concurrently(call, 3)
+        self.assertEqual(results, ["upstream failed"] * 3)
+
+    def test_coalesce_decorator_normalizes_arguments(self):
+        """Test that the decorator keys on normalized arguments"""
+        calls = []
+
+        def lower(arguments):
+            return {k: v.lower() for k, v in arguments.items()}
+
+        @self.flight.coalesce("echo", normalize=lower)
+        def echo(text, suffix="!"):
+            calls.append(text)
+            self.release.wait(timeout=2)
+            return text + suffix
+
+        threads = [threading.Thread(target=echo, args=(text,)) for text in ["Hi", "HI", "hi"]]
+        for thread in threads:
+            thread.start()
+        deadline = time.time() + 2
+        while time.time() < deadline and self.flight.get_stats()["total_calls"] < 3:
+            time.sleep(0.005)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.flight.get_stats()["groups"]["echo"]["deduplicated"], 2)
+        self.assertEqual(echo.__name__, "echo")
+
+    def test_async_calls_share_one_task(self):
+        """Test that concurrent coroutines with the same key await one task"""
+        executions = []
+
+        @self.flight.coalesce("async_echo")
+        async def echo(text):
+            executions.append(text)
+            await asyncio.sleep(0.05)
+            return {"text": text}
+
+        async def scenario():
+            return await asyncio.gather(echo("a"), echo("a"), echo("b"))
+
+        results = asyncio.run(scenario())
+
+        self.assertEqual(sorted(executions), ["a", "b"])
+        self.assertEqual(results, [{"text": "a"}, {"text": "a"}, {"text": "b"}])
+        self.assertIsNot(results[0], results[1])
+        self.assertEqual(self.flight.get_stats()["groups"]["async_echo"]["deduplicated"], 1)
+        self.assertEqual(self.flight.in_flight(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Stress tests for sharing one parser and generator across threads"""
+
+import unittest
+import json
+import os
+import sys
+import threading
+from dataclasses import asdict
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from programming.parsers import NaturalLanguageParser
+from programming.block_generator import BlockGenerator
+from programming.pipeline import GenerationPipeline, OUTPUT_FORMATS
+
+PROMPTS = [
+    "move right 10 steps", "move left 25 steps and then jump", "jump",
+    "when space pressed jump", "when flag clicked move up 5 steps", "say hello",
+    "play sound", "turn right then turn left", "hide and then show",
+    "when sprite clicked say hi", "repeat 3 move down 4 pixels", "dance"
+]
+
+THREADS = 16
+ROUNDS = 50
+
+
+def snapshot(intents, sequence):
+    return json.dumps({"intents": [asdict(i) for i in intents], "blocks": asdict(sequence)}, sort_keys=True)
+
+
+class TestThreadSafety(unittest.TestCase):
+    """Test cases for concurrent use of shared parser and generator instances"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = NaturalLanguageParser()
+        cls.generator = BlockGenerator()
+        cls.pipeline = GenerationPipeline(cls.parser, cls.generator)
+        cls.previous_interval = sys.getswitchinterval()
+        # Switch threads as often as possible to surface interleaving bugs
+        sys.setswitchinterval(1e-6)
+
+    @classmethod
+    def tearDownClass(cls):
+        sys.setswitchinterval(cls.previous_interval)
+
+    def run_threads(self, work):
+        barrier = threading.Barrier(THREADS)
+        results = [None] * THREADS
+        errors = []
+
+        def worker(slot):
+            try:
+                barrier.wait()
+                results[slot] = work(slot)
+            except Exception as e:  # surfaced in the main thread below
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(slot,)) for slot in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return results
+
+    def test_parse_and_generate_match_single_threaded(self):
+        """Test that concurrent parse/generate output matches single-threaded output"""
+        expected = {}
+        for prompt in PROMPTS:
+            intents = self.parser.parse(prompt)
+            expected[prompt] = snapshot(intents, self.generator.generate_blocks(intents))
+
+        def work(slot):
+            mismatches = []
+            for round_number in range(ROUNDS):
+                prompt = PROMPTS[(slot + round_number) % len(PROMPTS)]
+                intents = self.parser.parse(prompt)
+                actual = snapshot(intents, self.generator.generate_blocks(intents))
+                if actual != expected[prompt]:
+                    mismatches.append(prompt)
+            return mismatches
+
+        for mismatches in self.run_threads(work):
+            self.assertEqual(mismatches, [])
+
+    def test_pipeline_formats_match_single_threaded(self):
+        """Test that every output format is stable under concurrent calls"""
+        cases = [(p, f) for p in PROMPTS for f in OUTPUT_FORMATS]
+        expected = {case: json.dumps(self.pipeline.run(*case), sort_keys=True, default=str) for case in cases}
+
+        def work(slot):
+            mismatches = []
+            for round_number in range(ROUNDS):
+                case = cases[(slot * 7 + round_number) % len(cases)]
+                if json.dumps(self.pipeline.run(*case), sort_keys=True, default=str) != expected[case]:
+                    mismatches.append(case)
+            return mismatches
+
+        for mismatches in self.run_threads(work):
+            self.assertEqual(mismatches, [])
+
+    def test_mutating_output_does_not_leak_into_shared_state(self):
+        """Test that callers mutating results can't affect later requests"""
+        before = snapshot(self.parser.parse("jump"), self.generator.generate_blocks(self.parser.parse("jump")))
+
+        sequence = self.generator.generate_blocks(self.parser.parse("jump"))
+        for block in sequence.blocks:
+            block.inputs.clear()
+            block.fields["tampered"] = True
+        info = self.generator.get_block_info("motion_movesteps")
+        if info:
+            info.get("default_values", {}).clear()
+
+        after = snapshot(self.parser.parse("jump"), self.generator.generate_blocks(self.parser.parse("jump")))
+        self.assertEqual(before, after)
+        self.assertTrue(self.generator.get_block_info("motion_movesteps").get("default_values"))
+
+    def test_action_mapping_is_read_only(self):
+        """Test that the built action mapping rejects modification"""
+        with self.assertRaises(TypeError):
+            self.generator.action_mapping["move"] = {}
+
+    def test_knowledge_base_is_read_only(self):
+        """Test that the knowledge base and its block tables reject modification"""
+        category = next(iter(self.generator.block_templates))
+        with self.assertRaises(TypeError):
+            self.generator.knowledge_base["blocks"] = {}
+        with self.assertRaises(TypeError):
+            self.generator.knowledge_base["blocks"][category]["new_block"] = {}
+        with self.assertRaises(TypeError):
+            self.generator.categories["new_category"] = {}
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Tests for tracing spans across the generation pipeline"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils import tracing
+from utils.tracing import Tracer, JsonlTraceExporter, NOOP_SPAN
+from programming.pipeline import GenerationPipeline
+from programming.parsers import NaturalLanguageParser
+from programming.block_generator import BlockGenerator
+
+
+class TestTracer(unittest.TestCase):
+    """Test cases for Tracer"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "trace.jsonl")
+        self.exporter = JsonlTraceExporter(self.path, flush_interval=0.05)
+
+    def tearDown(self):
+        self.exporter.close()
+        self.tmp.cleanup()
+
+    def _read_spans(self):
+        self.exporter.close()
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_spans_are_noop_without_trace(self):
+        """Test that span() outside a trace does nothing"""
+        tracer = Tracer(sample_rate=1.0, exporter=self.exporter)
+        self.assertIs(tracer.span("parse"), NOOP_SPAN)
+        self.exporter.close()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_nested_spans_are_exported(self):
+        """Test that child spans link to their parent and export with the root"""
+        tracer = Tracer(sample_rate=1.0, exporter=self.exporter)
+        with tracer.trace("request", tool="x") as root:
+            with tracer.span("parse") as child:
+                child.set_attribute("intent_count", 2)
+                with tracer.span("inner"):
+                    pass
+
+        spans = {s["name"]: s for s in self._read_spans()}
+        self.assertEqual(set(spans), {"request", "parse", "inner"})
+        self.assertIsNone(spans["request"]["parent_id"])
+        self.assertEqual(spans["parse"]["parent_id"], spans["request"]["span_id"])
+        self.assertEqual(spans["inner"]["parent_id"], spans["parse"]["span_id"])
+        self.assertEqual(len({s["trace_id"] for s in spans.values()}), 1)
+        self.assertEqual(spans["parse"]["attributes"]["intent_count"], 2)
+
+    def test_sampling_rate_zero_exports_nothing(self):
+        """Test that unsampled traces produce no spans"""
+        tracer = Tracer(sample_rate=0.0, exporter=self.exporter)
+        with tracer.trace("request") as root:
+            self.assertIs(root, NOOP_SPAN)
+            self.assertIs(tracer.span("parse"), NOOP_SPAN)
+        self.exporter.close()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(tracer.get_stats()["traces_started"], 1)
+        self.assertEqual(tracer.get_stats()["traces_sampled"], 0)
+
+    def test_sampling_decision_uses_rate(self):
+        """Test that roughly sample_rate of traces are recorded"""
+        values = iter([0.1, 0.6, 0.2, 0.9])
+        tracer = Tracer(sample_rate=0.5, exporter=self.exporter,
+                        rng=lambda: next(values))
+        for _ in range(4):
+            with tracer.trace("request"):
+                pass
+        self.assertEqual(tracer.get_stats()["traces_sampled"], 2)
+        self.assertEqual(len(self._read_spans()), 2)
+
+    def test_errors_mark_span_status(self):
+        """Test that an exception inside a span is recorded"""
+        tracer = Tracer(sample_rate=1.0, exporter=self.exporter)
+        with self.assertRaises(ValueError):
+            with tracer.trace("request"):
+                raise ValueError("bad input")
+
+        span = self._read_spans()[0]
+        self.assertEqual(span["status"], "error")
+        self.assertIn("bad input", span["attributes"]["error"])
+
+    def test_export_does_not_write_on_caller_thread(self):
+        """Test that finishing a trace only queues it; the writer thread appends it"""
+        tracer = Tracer(sample_rate=1.0, exporter=self.exporter)
+        write = self.exporter._write
+        writers = []
+
+        def recording_write(batch):
+            writers.append(threading.current_thread())
+            write(batch)
+
+        with patch.object(self.exporter, "_write", recording_write):
+            with tracer.trace("request"):
+                pass
+            self.assertEqual([s["name"] for s in self._read_spans()], ["request"])
+        self.assertNotIn(threading.current_thread(), writers)
+        self.assertEqual(tracer.get_stats()["spans_written"], 1)
+
+    def test_full_queue_drops_traces(self):
+        """Test that exports never block when the writer falls behind"""
+        exporter = JsonlTraceExporter(self.path, max_queue=1)
+        exporter._ensure_writer = lambda: None  # no writer draining the queue
+        tracer = Tracer(sample_rate=1.0, exporter=exporter)
+        for _ in range(3):
+            with tracer.trace("request"):
+                pass
+        self.assertEqual(tracer.get_stats()["traces_dropped"], 2)
+
+    def test_pipeline_emits_stage_and_intent_spans(self):
+        """Test that parse/generate/format and per-intent spans are recorded"""
+        pipeline = GenerationPipeline(NaturalLanguageParser(), BlockGenerator())
+        original = tracing.tracer
+        tracing.tracer = Tracer(sample_rate=1.0, exporter=self.exporter)
+        try:
+            with tracing.tracer.trace("generate_scratch_blocks"):
+                pipeline.run("move right and jump", "text")
+        finally:
+            tracing.tracer = original
+
+        spans = self._read_spans()
+        names = [s["name"] for s in spans]
+        for name in ["parse", "generate", "format", "generate_scratch_blocks"]:
+            self.assertIn(name, names)
+        self.assertEqual(names.count("generate_intent"), 2)
+
+        by_name = {s["name"]: s for s in spans}
+        self.assertEqual(by_name["parse"]["attributes"]["intent_count"], 2)
+        self.assertGreater(by_name["format"]["attributes"]["output_size"], 0)
+        self.assertEqual(by_name["generate_intent"]["parent_id"], by_name["generate"]["span_id"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Tests for executor pools and the generation pipeline"""
+
+import unittest
+import asyncio
+import os
+import sys
+import threading
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.workers import WorkerPools
+from programming.pipeline import GenerationPipeline, init_worker, run_in_worker
+from programming.parsers import NaturalLanguageParser
+from programming.block_generator import BlockGenerator
+
+
+class TestWorkerPools(unittest.TestCase):
+    """Test cases for WorkerPools"""
+
+    def test_io_runs_off_event_loop_thread(self):
+        """Test that run_io executes on a pool thread"""
+        pools = WorkerPools(io_workers=2)
+
+        async def scenario():
+            return await pools.run_io(threading.current_thread)
+
+        thread = asyncio.run(scenario())
+        self.assertNotEqual(thread, threading.main_thread())
+        self.assertTrue(thread.name.startswith("scratch-io"))
+        self.assertEqual(pools.get_stats()["io_submitted"], 1)
+        pools.shutdown()
+
+    def test_cpu_thread_pool_uses_fn(self):
+        """Test that thread mode ignores process_fn"""
+        pools = WorkerPools(cpu_workers=1)
+
+        async def scenario():
+            return await pools.run_cpu(lambda: "thread", process_fn=run_in_worker)
+
+        self.assertEqual(asyncio.run(scenario()), "thread")
+        self.assertEqual(pools.get_stats()["cpu_pool_type"], "thread")
+        pools.shutdown()
+
+    def test_cpu_process_pool_runs_pipeline(self):
+        """Test that process mode runs the picklable pipeline entry point"""
+        pools = WorkerPools(cpu_workers=2, use_processes=True, process_initializer=init_worker)
+
+        async def scenario():
+            return await asyncio.gather(*[
+                pools.run_cpu(None, "move right 10 steps", "text", process_fn=run_in_worker)
+                for _ in range(4)
+            ])
+
+        results = asyncio.run(scenario())
+        pools.shutdown()
+
+        self.assertEqual(len(results), 4)
+        for result, stages in results:
+            self.assertTrue(result["success"])
+            self.assertEqual(set(stages), {"parse", "retrieve", "generate", "format"})
+        self.assertEqual(pools.get_stats()["cpu_pool_type"], "process")
+
+
+class TestGenerationPipeline(unittest.TestCase):
+    """Test cases for GenerationPipeline"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.pipeline = GenerationPipeline(NaturalLanguageParser(), BlockGenerator())
+
+    def test_run_text_format(self):
+        """Test a successful text-format run"""
+        result = self.pipeline.run("make the cat move right 10 steps", "text")
+        self.assertTrue(result["success"])
+        self.assertEqual(result["format"], "text")
+        self.assertEqual(result["filename"], "generated_project.txt")
+
+    def test_run_unknown_input(self):
+        """Test that unparseable input returns suggestions"""
+        result = self.pipeline.run("xyz unknown command", "text")
+        self.assertFalse(result["success"])
+        self.assertIn("suggestions", result)
+
+    def test_run_timed_reports_stages(self):
+        """Test that run_timed returns per-stage timings"""
+        result, stages = self.pipeline.run_timed("move right", "blocks")
+        self.assertTrue(result["success"])
+        self.assertEqual(set(stages), {"parse", "retrieve", "generate", "format"})
+        self.assertTrue(all(seconds >= 0 for seconds in stages.values()))
+
+    def test_run_reports_errors(self):
+        """Test that exceptions become generation_error results"""
+        result = self.pipeline.run(None, "text")
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error_type"], "generation_error")
+
+    def test_run_reports_truncation_warnings(self):
+        """Test that parser budget warnings are passed through in the result"""
+        pipeline = GenerationPipeline(NaturalLanguageParser(max_input_chars=40), BlockGenerator())
+        result = pipeline.run("jump and then " * 10, "text")
+        self.assertTrue(result["success"])
+        self.assertIn("warnings", result)
+        self.assertNotIn("warnings", pipeline.run("jump", "text"))
+
+    def test_run_reports_corrections_and_did_you_mean(self):
+        """Test that typo corrections and "did you mean" hints reach the result"""
+        corrected = self.pipeline.run("jupm", "text")
+        self.assertTrue(corrected["success"])
+        self.assertEqual(corrected["corrections"], [{"word": "jupm", "correction": "jump"}])
+
+        failed = self.pipeline.run("jmp", "text")
+        self.assertFalse(failed["success"])
+        self.assertIn("Did you mean", failed["message"])
+        self.assertEqual(failed["did_you_mean"][0]["suggestions"], ["jump"])
+
+    def test_stream_yields_blocks_per_intent(self):
+        """Test that stream() generates blocks for each intent from chunked input"""
+        entries = list(self.pipeline.stream(["move right 5 st", "eps and then ju", "mp"]))
+        self.assertEqual([e["index"] for e in entries], [0, 1])
+        self.assertEqual(entries[0]["intent"]["action"], "move")
+        self.assertTrue(entries[0]["blocks"])
+        self.assertTrue(all(e["explanation"] for e in entries))
+
+
+if __name__ == '__main__':
+    unittest.main()